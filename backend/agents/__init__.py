@@ -52,25 +52,25 @@ def get_agent_info():
         'scheduler': {
             'name': 'Scheduler Agent',
             'description': 'Handles event scheduling and conflict detection',
-            'endpoints': ['/check_conflict', '/api/schedule'],
+            'endpoints': ['/check_conflict', '/check_conflict/batch', '/api/schedule/snapshot/overlaps', '/api/schedule', '/api/schedule/clashes', '/api/schedule/occupancy', '/api/schedule/free_venues', '/api/schedule/first_free', '/api/venues', '/api/venues/search', '/api/schedule/solve', '/api/schedule/events/{event_id}/reschedule', '/api/schedule/events/{event_id}/cancel', '/api/events/import', '/ws/calendar'],
             'status': 'active'
         },
         'flow': {
             'name': 'Flow Agent', 
             'description': 'Generates AI-powered event itineraries using Google Gemini',
-            'endpoints': ['/api/flow', '/generate_flow'],
+            'endpoints': ['/api/flow', '/generate_flow', '/api/flow/stream'],
             'status': 'active'
         },
         'sponsor': {
             'name': 'Sponsor Agent',
             'description': 'Matches events with sponsors and generates outreach emails',
-            'endpoints': ['/api/sponsors', '/get_sponsors'],
+            'endpoints': ['/api/sponsors', '/get_sponsors', '/api/sponsors/stream'],
             'status': 'active'
         },
         'content': {
             'name': 'Content Agent',
             'description': 'Creates marketing content and event materials', 
-            'endpoints': ['/api/content'],
+            'endpoints': ['/api/content', '/api/content/stream'],
             'status': 'active'
         },
         'analytics': {
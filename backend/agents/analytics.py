@@ -1,13 +1,14 @@
 """Analytics Agent - compute KPIs and basic reports from events data.
 
-This agent reads from Firestore (preferred) via `database.firebase_connection`.
+This agent reads from the listener-fed events replica when it is enabled,
+otherwise from Firestore via `database.firebase_connection`.
 If Firestore is not initialized it will try MongoDB (async) as a best-effort.
 """
 import logging
 from typing import Dict, Any, List
 from datetime import datetime, timezone
 
-from database.firebase_connection import get_events_collection
+from database.firebase_connection import get_async_events_collection, get_events_replica
 from utils.api_helpers import DateTimeHelper
 
 logger = logging.getLogger(__name__)
@@ -19,10 +20,14 @@ class AnalyticsAgent:
     def __init__(self):
         pass
 
-    def _fetch_events(self) -> List[Dict[str, Any]]:
-        """Fetch events from Firestore. Returns list of event dicts."""
+    async def _fetch_events(self) -> List[Dict[str, Any]]:
+        """Fetch events from the events replica or Firestore. Returns list of event dicts."""
+        replica = get_events_replica()
+        if replica is not None:
+            return replica.events()
+
         try:
-            events_col = get_events_collection()
+            events_col = get_async_events_collection()
         except Exception as e:
             logger.warning(f"Firestore not available for analytics: {e}")
             return []
@@ -31,7 +36,7 @@ class AnalyticsAgent:
             # Read all scheduled events (lightweight query)
             docs = events_col.where('status', '==', 'scheduled').stream()
             events = []
-            for d in docs:
+            async for d in docs:
                 data = d.to_dict()
                 data['id'] = d.id
                 events.append(data)
@@ -40,9 +45,9 @@ class AnalyticsAgent:
             logger.error(f"Failed to fetch events for analytics: {e}")
             return []
 
-    def basic_kpis(self) -> Dict[str, Any]:
+    async def basic_kpis(self) -> Dict[str, Any]:
         """Return simple KPIs: total events, upcoming events, average capacity, events by category."""
-        events = self._fetch_events()
+        events = await self._fetch_events()
         now = datetime.utcnow().replace(tzinfo=timezone.utc)
 
         total = len(events)
@@ -82,9 +87,9 @@ class AnalyticsAgent:
             'events_by_category': by_category
         }
 
-    def next_event(self) -> Dict[str, Any]:
+    async def next_event(self) -> Dict[str, Any]:
         """Return the next upcoming event (minimal info)"""
-        events = self._fetch_events()
+        events = await self._fetch_events()
         now = datetime.utcnow().replace(tzinfo=timezone.utc)
         next_ev = None
         next_start = None
@@ -114,10 +119,10 @@ class AnalyticsAgent:
             'venue': next_ev.get('venue')
         }
 
-    def events_over_time(self, months: int = 6) -> Dict[str, int]:
+    async def events_over_time(self, months: int = 6) -> Dict[str, int]:
         """Return a simple timeseries (month-year -> count) for the last N months."""
         from collections import defaultdict
-        events = self._fetch_events()
+        events = await self._fetch_events()
         now = datetime.utcnow()
         counts = defaultdict(int)
 
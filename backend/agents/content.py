@@ -1,13 +1,16 @@
 """Content Agent - generate emails, social posts, banners using LLMs.
 
-This agent uses the shared LLM wrapper (`utils.llm.generate_text`) so it can
-use either Google Gemini or OpenAI depending on configuration.
+This agent uses the shared LLM wrapper (`utils.llm.agenerate_text`) so it can
+use either Google Gemini or OpenAI depending on configuration. Provider errors
+fall back to simple templates; a rate-limit rejection (LLMRateLimited) is
+raised to the caller.
 """
 import logging
-from typing import Dict, Any, Optional, List
+from typing import AsyncIterator, Dict, Any, Optional, List
 from datetime import datetime
 
-from utils.llm import generate_text
+from utils.llm import agenerate_text, astream_text
+from utils.llm_scheduler import LLMRateLimited
 from utils.api_helpers import AgentHelper
 
 logger = logging.getLogger(__name__)
@@ -20,7 +23,7 @@ class ContentAgent:
         # No heavyweight initialization required; wrapper chooses provider
         pass
 
-    def generate_email(self, event: Dict[str, Any], tone: str = "professional", length: str = "short") -> str:
+    async def generate_email(self, event: Dict[str, Any], tone: str = "professional", length: str = "short") -> str:
         """Generate a sponsorship or event invitation email.
 
         Args:
@@ -33,18 +36,20 @@ class ContentAgent:
         """
         prompt = self._build_email_prompt(event, tone, length)
         try:
-            text = generate_text(prompt, max_tokens=600)
+            text = await agenerate_text(prompt, max_tokens=600, agent="content")
             AgentHelper.log_agent_action(
                 agent_name="ContentAgent",
                 action="email_generated",
                 details={"title": event.get('title'), "length": length}
             )
             return text
+        except LLMRateLimited:
+            raise
         except Exception as e:
             logger.warning(f"LLM email generation failed: {e}")
             return self._fallback_email(event)
 
-    def generate_social_post(self, event: Dict[str, Any], platform: str = "twitter", length: int = 280) -> str:
+    async def generate_social_post(self, event: Dict[str, Any], platform: str = "twitter", length: int = 280) -> str:
         """Generate a social media post for an event.
 
         Args:
@@ -54,43 +59,68 @@ class ContentAgent:
         Returns:
             Post copy string
         """
-        prompt = (
-            f"Write a {length}-character {platform} post to promote the following event:\n"
-            f"Title: {event.get('title')}\nDate: {event.get('date')}\nVenue: {event.get('venue')}\n"
-            f"Audience: {event.get('audience', 'students and faculty')}\n\nInclude a clear CTA and relevant hashtags."
-        )
+        prompt = self._build_social_prompt(event, platform, length)
         try:
-            text = generate_text(prompt, max_tokens=200)
+            text = await agenerate_text(prompt, max_tokens=200, agent="content")
             AgentHelper.log_agent_action(
                 agent_name="ContentAgent",
                 action="social_post_generated",
                 details={"title": event.get('title'), "platform": platform}
             )
             return text
+        except LLMRateLimited:
+            raise
         except Exception as e:
             logger.warning(f"LLM social post generation failed: {e}")
             # Very small fallback
             title = event.get('title', 'Upcoming Event')
             return f"{title} — Join us on {event.get('date', 'TBD')} at {event.get('venue', 'TBD')}. More info: [link] #CampusEvents"
 
-    def generate_banner_text(self, event: Dict[str, Any], size: str = "hero") -> str:
+    async def generate_banner_text(self, event: Dict[str, Any], size: str = "hero") -> str:
         """Create concise banner/headline text for promotional assets."""
-        prompt = (
-            f"Create a short, punchy banner headline for: {event.get('title')}\n"
-            f"Keep it under 10 words. Mention date and venue if space allows."
-        )
+        prompt = self._build_banner_prompt(event)
         try:
-            text = generate_text(prompt, max_tokens=50)
+            text = await agenerate_text(prompt, max_tokens=50, agent="content")
             AgentHelper.log_agent_action(
                 agent_name="ContentAgent",
                 action="banner_generated",
                 details={"title": event.get('title'), "size": size}
             )
             return text.strip()
+        except LLMRateLimited:
+            raise
         except Exception as e:
             logger.warning(f"LLM banner generation failed: {e}")
             return event.get('title', 'Upcoming Event')
 
+    async def stream_email(self, event: Dict[str, Any], tone: str = "professional", length: str = "short") -> AsyncIterator[str]:
+        """Stream the email body in chunks as it is generated (see generate_email)."""
+        async for chunk in astream_text(self._build_email_prompt(event, tone, length), max_tokens=600, agent="content"):
+            yield chunk
+
+    async def stream_social_post(self, event: Dict[str, Any], platform: str = "twitter", length: int = 280) -> AsyncIterator[str]:
+        """Stream a social post in chunks as it is generated (see generate_social_post)."""
+        async for chunk in astream_text(self._build_social_prompt(event, platform, length), max_tokens=200, agent="content"):
+            yield chunk
+
+    async def stream_banner_text(self, event: Dict[str, Any], size: str = "hero") -> AsyncIterator[str]:
+        """Stream banner text in chunks as it is generated (see generate_banner_text)."""
+        async for chunk in astream_text(self._build_banner_prompt(event), max_tokens=50, agent="content"):
+            yield chunk
+
+    def _build_social_prompt(self, event: Dict[str, Any], platform: str, length: int) -> str:
+        return (
+            f"Write a {length}-character {platform} post to promote the following event:\n"
+            f"Title: {event.get('title')}\nDate: {event.get('date')}\nVenue: {event.get('venue')}\n"
+            f"Audience: {event.get('audience', 'students and faculty')}\n\nInclude a clear CTA and relevant hashtags."
+        )
+
+    def _build_banner_prompt(self, event: Dict[str, Any]) -> str:
+        return (
+            f"Create a short, punchy banner headline for: {event.get('title')}\n"
+            f"Keep it under 10 words. Mention date and venue if space allows."
+        )
+
     def _build_email_prompt(self, event: Dict[str, Any], tone: str, length: str) -> str:
         title = event.get('title', 'Event')
         date = event.get('date', 'TBD')
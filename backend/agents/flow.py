@@ -4,17 +4,25 @@ Creates detailed, minute-by-minute event flows with professional event director
 """
 
 import os
+import re
 import logging
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
 from agents.prompts.flow_prompts import build_context_prompt, EVENT_TYPE_TEMPLATES
 from utils.api_helpers import AgentHelper
-from utils.llm import generate_text
+from utils.llm import agenerate_text, astream_text
+from utils.llm_scheduler import LLMRateLimited
+from utils.room_allocation import DAY_MINUTES, format_clock, parse_clock
 
 logger = logging.getLogger(__name__)
 
+# Timeline entries of a generated flow: "**[HH:MM] Activity Name**" and its detail lines
+_STAGE_RE = re.compile(r"^\*\*\[(\d{1,2}):(\d{2})\]\s*(.+?)\*\*$")
+_DURATION_RE = re.compile(r"^-\s*Duration:\s*(\d+(?:\.\d+)?)\s*(minutes?|mins?|hours?|hrs?|h)\b", re.IGNORECASE)
+_TRACK_RE = re.compile(r"^-\s*Track:\s*(.+)$", re.IGNORECASE)
+
 @dataclass
 class FlowRequest:
     """Request model for flow generation"""
@@ -135,7 +143,23 @@ class FlowAgent:
 *Note: This is a basic template. For detailed, AI-generated flows, please configure Google Gemini API.*
 """
     
-    def generate_flow(self, request: FlowRequest) -> FlowResponse:
+    def _build_prompt(self, request: FlowRequest) -> str:
+        """Flow prompt for the request, including any additional context"""
+        prompt = build_context_prompt(
+            event_name=request.event_name,
+            event_type=request.event_type,
+            duration=request.duration,
+            audience_size=request.audience_size or 100,
+            budget_range=request.budget_range or "Medium",
+            venue_type=request.venue_type or "Indoor campus facility",
+            special_requirements=request.special_requirements or "None"
+        )
+
+        if request.additional_context:
+            prompt += f"\n\n**ADDITIONAL CONTEXT:**\n{request.additional_context}"
+        return prompt
+
+    async def generate_flow(self, request: FlowRequest) -> FlowResponse:
         """
         Generate an intelligent event flow using Google Gemini AI.
         
@@ -163,25 +187,17 @@ class FlowAgent:
             
             # Use LLM wrapper (Gemini or OpenAI) if available
             try:
-                prompt = build_context_prompt(
-                    event_name=request.event_name,
-                    event_type=request.event_type,
-                    duration=request.duration,
-                    audience_size=request.audience_size or 100,
-                    budget_range=request.budget_range or "Medium",
-                    venue_type=request.venue_type or "Indoor campus facility",
-                    special_requirements=request.special_requirements or "None"
-                )
-
-                if request.additional_context:
-                    prompt += f"\n\n**ADDITIONAL CONTEXT:**\n{request.additional_context}"
+                prompt = self._build_prompt(request)
 
                 logger.info(f"Generating flow for {request.event_name} using configured LLM")
-                generated_flow = generate_text(prompt, max_tokens=1200)
+                generated_flow = await agenerate_text(prompt, max_tokens=1200, agent="flow", priority="interactive")
 
                 if not generated_flow:
                     raise ValueError("LLM returned empty response")
 
+            except LLMRateLimited:
+                # Overload is reported to the caller, not hidden behind the template
+                raise
             except Exception as e:
                 logger.warning(f"LLM generation failed or not configured: {e}. Using fallback flow.")
                 generated_flow = self._get_fallback_flow(request)
@@ -200,21 +216,6 @@ class FlowAgent:
                     created_at=datetime.utcnow().isoformat()
                 )
             
-            # We already generated `generated_flow` above using the configured LLM.
-            # Build prompt again for metadata tracking (if needed)
-            prompt = build_context_prompt(
-                event_name=request.event_name,
-                event_type=request.event_type,
-                duration=request.duration,
-                audience_size=request.audience_size or 100,
-                budget_range=request.budget_range or "Medium",
-                venue_type=request.venue_type or "Indoor campus facility",
-                special_requirements=request.special_requirements or "None"
-            )
-
-            if request.additional_context:
-                prompt += f"\n\n**ADDITIONAL CONTEXT:**\n{request.additional_context}"
-
             flow_response = FlowResponse(
                 event_name=request.event_name,
                 event_type=request.event_type,
@@ -256,6 +257,99 @@ class FlowAgent:
             )
             raise
     
+    def stream_flow(self, request: FlowRequest) -> AsyncIterator[str]:
+        """
+        Stream the itinerary in chunks as the LLM writes it.
+        The request is validated before the stream is returned.
+        
+        Args:
+            request: FlowRequest with event details
+            
+        Returns:
+            Async iterator of Markdown chunks of the generated itinerary
+        """
+        self._validate_request(request)
+        return self._stream_flow(request)
+
+    async def _stream_flow(self, request: FlowRequest) -> AsyncIterator[str]:
+        AgentHelper.log_agent_action(
+            agent_name="FlowAgent",
+            action="flow_stream_started",
+            details={"event_name": request.event_name, "event_type": request.event_type}
+        )
+
+        length = 0
+        async for chunk in astream_text(self._build_prompt(request), max_tokens=1200, agent="flow", priority="interactive"):
+            length += len(chunk)
+            yield chunk
+
+        AgentHelper.log_agent_action(
+            agent_name="FlowAgent",
+            action="flow_stream_completed",
+            details={"event_name": request.event_name, "flow_length": length}
+        )
+    
+    def extract_sessions(self, generated_flow: str, day_start: str = "09:00") -> List[Dict[str, Any]]:
+        """
+        Read the timed stages of a generated flow as schedule sessions.
+
+        Stages are the "**[HH:MM] Activity Name**" timeline entries with their
+        "- Duration:" and optional "- Track:" lines; setup and breakdown
+        entries ([T-120], [+60]) are skipped. A timeline starting at [00:00]
+        counts from the event start, which is placed at day_start. A stage
+        without a duration runs until the next one starts.
+
+        Returns:
+            Session dicts (session, day, startTime, endTime, track) for
+            utils.room_allocation.allocate_rooms, in flow order
+        """
+        stages = []
+        current = None
+        for line in generated_flow.splitlines():
+            line = line.strip()
+            if line.startswith("**["):
+                # Any timeline entry ends the previous stage, even one that is skipped
+                current = None
+                match = _STAGE_RE.match(line)
+                if match and int(match.group(2)) < 60:
+                    hours, minutes = int(match.group(1)), int(match.group(2))
+                    current = {"session": match.group(3).strip(), "start": hours * 60 + minutes, "duration": None, "track": None}
+                    stages.append(current)
+                continue
+            if line.startswith("#"):
+                current = None
+            if current is None:
+                continue
+            duration = _DURATION_RE.match(line)
+            if duration:
+                amount = float(duration.group(1))
+                current["duration"] = int(amount * 60 if duration.group(2).lower().startswith("h") else amount)
+                continue
+            track = _TRACK_RE.match(line)
+            if track:
+                current["track"] = track.group(1).strip().strip("[]") or None
+
+        offset = parse_clock(day_start) if stages and stages[0]["start"] == 0 else 0
+        sessions = []
+        for i, stage in enumerate(stages):
+            duration = stage["duration"]
+            if not duration:
+                later = [other["start"] for other in stages[i + 1:] if other["start"] > stage["start"]]
+                duration = later[0] - stage["start"] if later else 0
+            if duration <= 0:
+                continue
+            start = stage["start"] + offset
+            day, start_minutes = divmod(start, DAY_MINUTES)
+            sessions.append({
+                "session": stage["session"],
+                "day": day + 1,
+                "startTime": format_clock(start_minutes),
+                # Sessions are laid out within a day, so one running past midnight is cut there
+                "endTime": format_clock(min(start_minutes + duration, DAY_MINUTES)),
+                "track": stage["track"]
+            })
+        return sessions
+
     def get_supported_event_types(self) -> Dict[str, str]:
         """Get list of supported event types with descriptions"""
         return {
@@ -49,6 +49,7 @@ Generate a comprehensive event flow in Markdown format with the following sectio
 ## ⏰ Detailed Timeline
 **[HH:MM] Activity Name**
 - Duration: X minutes
+- Track: [Track name, only for sessions running in parallel]
 - Responsible: [Role/Person]
 - Details: Specific actions and logistics
 - Materials needed: [List]
@@ -3,19 +3,47 @@ Scheduler Agent - Maintain clash-free calendar
 Implements real-time conflict detection using Firestore database.
 """
 
+import asyncio
 import logging
-from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional, Tuple
-from dataclasses import dataclass
+import time
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, replace
 from dateutil import parser
+from google.cloud.firestore import ArrayUnion, async_transactional
 
-from database.firebase_connection import get_events_collection, EventDocument
+from database.change_feed import change_feed
+from database.firebase_connection import (
+    get_async_events_collection,
+    get_async_firestore_client,
+    get_async_venue_days_collection,
+    get_events_replica,
+    EventDocument,
+    VenueDayDocument
+)
 from utils.api_helpers import AgentHelper
+from utils.auto_scheduler import AutoScheduler, PlacementRequest
+from utils.availability import find_free_slots, parse_working_hours
+from utils.calendar_index import CalendarIndex, IntervalTree, event_span, event_time_bounds, expand_event
+from utils.calendar_snapshot import CalendarSnapshot, to_epoch_seconds
+from utils.clashes import clash_groups
+from utils.conflict_cache import ConflictCache
 from utils.google_calendar import create_google_calendar_event
+from utils.occupancy import OccupancyMap
+from utils.venue_catalog import VenueCatalog
 import os
+from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Event fields checked for double-booking besides the venue; list-valued
+# fields clash when any value is shared
+CONFLICT_DIMENSIONS = {
+    # dimension: Firestore operator matching any of several values
+    "organizer": "in",
+    "audience_groups": "array_contains_any"
+}
+
 @dataclass
 class ConflictResult:
     """Result of conflict detection"""
@@ -23,6 +51,8 @@ class ConflictResult:
     conflicting_event: Optional[str] = None
     conflicting_events: Optional[List[Dict[str, Any]]] = None
     message: str = ""
+    # Clashing events per extra dimension (organizer, audience_groups), when checked
+    dimension_conflicts: Optional[Dict[str, List[Dict[str, Any]]]] = None
 
 @dataclass 
 class TimeSlot:
@@ -50,15 +80,173 @@ class SchedulerAgent:
     
     def __init__(self):
         self.events_collection = None
+        # Per-venue-per-day occupancy docs; bookings for the same venue and day
+        # are serialized by transactions on these
+        self.venue_days_collection = None
+        self.firestore_client = None
+        # Per-venue interval index over scheduled events
+        self.calendar_index = CalendarIndex()
+        # Interval indexes for the other conflict dimensions, loaded and synced with calendar_index
+        self.dimension_indexes: Dict[str, CalendarIndex] = {
+            dimension: CalendarIndex(field=dimension, default_key=None) for dimension in CONFLICT_DIMENSIONS
+        }
+        # Dimensions create_event refuses to double-book, besides the venue
+        self.enforced_dimensions = [
+            dimension.strip() for dimension in
+            os.getenv("SCHEDULER_CONFLICT_DIMENSIONS", ",".join(CONFLICT_DIMENSIONS)).split(",")
+            if dimension.strip() in CONFLICT_DIMENSIONS
+        ]
+        self._index_lock = asyncio.Lock()
+        self.index_enabled = os.getenv("SCHEDULER_INDEX_ENABLED", "true").lower() != "false"
+        # Rebuild the index periodically to pick up writes from other processes (0 disables)
+        self.index_ttl_seconds = float(os.getenv("SCHEDULER_INDEX_TTL_SECONDS", "300"))
+        # Longest event we accept; bounds how far back direct queries have to look
+        self.max_event_duration = timedelta(hours=float(os.getenv("SCHEDULER_MAX_EVENT_HOURS", "72")))
+        # Suggestions are searched within this distance of the preferred start
+        self.suggestion_window = timedelta(hours=float(os.getenv("SCHEDULER_SUGGESTION_WINDOW_HOURS", "24")))
+        # Daily "HH:MM-HH:MM" window suggestions must fall in (unset means any time)
+        self.working_hours = parse_working_hours(os.getenv("SCHEDULER_WORKING_HOURS"))
+        # Slot bitmaps per venue per day, rebuilt with the calendar index
+        self.occupancy = OccupancyMap(slot_minutes=int(os.getenv("SCHEDULER_SLOT_MINUTES", "15")))
+        # Optional file the bitmaps are saved to on shutdown and warm-loaded from
+        self.occupancy_path = os.getenv("SCHEDULER_OCCUPANCY_PATH")
+        self._warm_load_occupancy()
+        # Answer venue conflict checks from venue-day summary docs when no in-memory index is ready
+        self.venue_day_checks = os.getenv("SCHEDULER_VENUE_DAY_CHECKS", "true").lower() != "false"
+        # Columnar snapshot for vectorized overlap counts, rebuilt on the index TTL
+        self.snapshot: Optional[CalendarSnapshot] = None
+        self._snapshot_lock = asyncio.Lock()
+        # Optional directory the snapshot is saved to as memory-mappable .npy files shared by workers
+        self.snapshot_dir = os.getenv("SCHEDULER_SNAPSHOT_DIR")
+        # Results of repeated conflict checks, invalidated by per-venue write versions (0 entries disables)
+        self.conflict_cache = ConflictCache(
+            max_entries=int(os.getenv("SCHEDULER_CONFLICT_CACHE_SIZE", "4096")),
+            ttl_seconds=float(os.getenv("SCHEDULER_CONFLICT_CACHE_TTL_SECONDS", "30"))
+        )
+        # Venues with capacity, features and accessibility, for combined search with availability
+        self.venue_catalog = self._load_venue_catalog(
+            os.getenv("SCHEDULER_VENUE_CATALOG_PATH") or str(Path(__file__).parent.parent / "data" / "venues.json")
+        )
+        # Time budget for the auto-scheduler's local search
+        self.solve_time_limit = float(os.getenv("SCHEDULER_SOLVE_SECONDS", "3"))
+        # Firestore allows at most 500 writes per batch commit
+        self.import_batch_size = min(int(os.getenv("SCHEDULER_IMPORT_BATCH_SIZE", "500")), 500)
         
     def _ensure_collection(self):
         """Ensure events collection is available"""
         if self.events_collection is None:
             try:
-                self.events_collection = get_events_collection()
+                self.events_collection = get_async_events_collection()
+                self.venue_days_collection = get_async_venue_days_collection()
+                self.firestore_client = get_async_firestore_client()
             except RuntimeError:
                 # Firebase not initialized yet, will retry later
                 pass
+
+    async def _load_scheduled_events(self) -> List[Dict[str, Any]]:
+        """Read every scheduled event from Firestore"""
+        events = []
+        async for event_doc in self.events_collection.where('status', '==', 'scheduled').stream():
+            event_data = event_doc.to_dict()
+            event_data['id'] = event_doc.id
+            try:
+                event_time_bounds(event_data)
+            except Exception as e:
+                logger.warning(f"Skipping event {event_doc.id} with invalid times: {e}")
+                continue
+            events.append(event_data)
+        return events
+
+    async def refresh_index(self) -> None:
+        """Rebuild the calendar index from Firestore"""
+        self._ensure_collection()
+        if self.events_collection is None:
+            return
+        events = await self._load_scheduled_events()
+        for index in self._local_indexes():
+            index.load(events)
+        self.occupancy.load(self.calendar_index.events())
+        # The reload may include writes made by other processes
+        self.conflict_cache.clear()
+        logger.info(f"Calendar index loaded with {len(self.calendar_index)} scheduled events")
+
+    @staticmethod
+    def _load_venue_catalog(path: str) -> VenueCatalog:
+        """Load the venue catalog, falling back to an empty one"""
+        try:
+            return VenueCatalog.load_file(path)
+        except Exception as e:
+            logger.error(f"Failed to load venue catalog: {e}")
+            return VenueCatalog()
+
+    def _local_indexes(self) -> List[CalendarIndex]:
+        """The venue index plus one index per extra conflict dimension"""
+        return [self.calendar_index, *self.dimension_indexes.values()]
+
+    def _index_new_event(self, event_doc: Dict[str, Any]) -> None:
+        """Add a freshly written event to every loaded in-memory index"""
+        for index in self._local_indexes():
+            if index.is_loaded:
+                index.add(dict(event_doc))
+        if self.occupancy.is_loaded:
+            self.occupancy.add_event(event_doc)
+        replica = get_events_replica()
+        if replica is not None:
+            replica.index.add(dict(event_doc))
+
+    def _warm_load_occupancy(self) -> None:
+        """Load saved occupancy bitmaps so availability works before the first index load"""
+        if not self.occupancy_path or not os.path.exists(self.occupancy_path):
+            return
+        try:
+            saved = OccupancyMap.load_file(self.occupancy_path)
+            if saved.slot_minutes == self.occupancy.slot_minutes:
+                self.occupancy = saved
+                logger.info(f"Warm-loaded occupancy maps for {len(saved.venues())} venues")
+        except Exception as e:
+            logger.warning(f"Failed to warm-load occupancy maps: {e}")
+
+    def save_occupancy(self) -> None:
+        """Persist the occupancy bitmaps to SCHEDULER_OCCUPANCY_PATH, if configured"""
+        if not self.occupancy_path or not self.occupancy.is_loaded:
+            return
+        try:
+            self.occupancy.save(self.occupancy_path)
+        except Exception as e:
+            logger.warning(f"Failed to save occupancy maps: {e}")
+
+    def _index_stale(self) -> bool:
+        index = self.calendar_index
+        if not index.is_loaded:
+            return True
+        return self.index_ttl_seconds > 0 and time.monotonic() - index.loaded_at > self.index_ttl_seconds
+
+    async def _index_ready(self) -> bool:
+        """Make sure the calendar index is loaded and fresh. Returns False if it can't be used."""
+        if not self.index_enabled:
+            return False
+        if self._index_stale():
+            # Only one request rebuilds; the rest wait for it instead of rereading Firestore
+            async with self._index_lock:
+                if self._index_stale():
+                    try:
+                        await self.refresh_index()
+                    except Exception as e:
+                        logger.warning(f"Failed to load calendar index: {e}")
+        return self.calendar_index.is_loaded
+
+    async def _active_index(self) -> Optional[CalendarIndex]:
+        """
+        Pick the in-memory index to serve reads from.
+        Prefers the listener-fed events replica, then the scheduler's own
+        calendar index. Returns None when Firestore has to be queried directly.
+        """
+        replica = get_events_replica()
+        if replica is not None:
+            return replica.index
+        if await self._index_ready():
+            return self.calendar_index
+        return None
         
     def parse_datetime(self, datetime_str: str) -> datetime:
         """Parse datetime string with various formats"""
@@ -81,19 +269,56 @@ class SchedulerAgent:
     def check_time_overlap(self, slot1: TimeSlot, slot2: TimeSlot) -> bool:
         """
         Check if two time slots overlap.
-        Two slots overlap if one starts before the other ends.
+        Two slots overlap if one starts before the other ends. Which events
+        are compared (same venue, organizer or audience group) is decided by
+        the index or query that produced them, not here.
         """
-        # For same venue conflicts, any overlap is a conflict
-        if slot1.venue and slot2.venue and slot1.venue == slot2.venue:
-            return not (slot1.end_time <= slot2.start_time or slot2.end_time <= slot1.start_time)
-        
-        # For different venues or unspecified venues, allow some buffer
-        # This could be made configurable per organization
         return not (slot1.end_time <= slot2.start_time or slot2.end_time <= slot1.start_time)
     
-    def get_overlapping_events(self, time_slot: TimeSlot) -> List[Dict[str, Any]]:
+    async def _query_candidate_events(
+        self,
+        venue: Optional[str],
+        window_start: datetime,
+        window_end: datetime,
+        field_filter: Optional[Tuple[str, str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Query Firestore for scheduled events that may overlap [window_start, window_end).
+        `field_filter` is an extra (field, op, value) condition, e.g. on organizer.
+
+        An event can only overlap the window if it starts before the window ends
+        and no earlier than `max_event_duration` before the window starts, so the
+        range filter on `start_time` keeps reads down to nearby events.
+        Recurring series are found by a second query on `series_end`; they are
+        returned unexpanded. Callers still need to check the end time. Backed
+        by the composite indexes in firestore.indexes.json.
+        """
+        base_query = self.events_collection.where('status', '==', 'scheduled')
+        if venue:
+            base_query = base_query.where('venue', '==', venue)
+        if field_filter is not None:
+            base_query = base_query.where(*field_filter)
+        single_query = (
+            base_query
+            .where('start_time', '>', window_start - self.max_event_duration)
+            .where('start_time', '<', window_end)
+        )
+        # Only series documents have `series_end`
+        series_query = base_query.where('series_end', '>', window_start)
+
+        events = {}
+        for query in (single_query, series_query):
+            async for event_doc in query.stream():
+                event_data = event_doc.to_dict()
+                event_data['id'] = event_doc.id
+                events[event_doc.id] = event_data
+        return list(events.values())
+
+    async def get_overlapping_events(self, time_slot: TimeSlot) -> List[Dict[str, Any]]:
         """
-        Query Firestore for events that overlap with the given time slot.
+        Find events that overlap with the given time slot.
+        Served from the events replica or calendar index when available,
+        otherwise Firestore is queried directly.
         """
         try:
             self._ensure_collection()
@@ -101,46 +326,40 @@ class SchedulerAgent:
                 # Firebase not available, return empty list for now
                 logger.warning("Firebase not available, returning no conflicts")
                 return []
+
+            index = await self._active_index()
+            if index is not None:
+                return [
+                    dict(event) for event in index.query(
+                        time_slot.venue, time_slot.start_time, time_slot.end_time
+                    )
+                ]
+
+            if time_slot.venue and self.venue_day_checks and self.venue_days_collection is not None:
+                return await self._venue_day_overlaps(time_slot)
                 
             overlapping_events = []
-            
-            # Query events that might overlap
-            # We need to check events where:
-            # 1. Event starts before our slot ends AND
-            # 2. Event ends after our slot starts
-            
-            events_ref = self.events_collection
-            
-            # Get all events (in production, you'd want to add date range filters)
-            events = events_ref.where('status', '==', 'scheduled').stream()
-            
-            for event_doc in events:
-                event_data = event_doc.to_dict()
-                event_data['id'] = event_doc.id
-                
+
+            for candidate in await self._query_candidate_events(
+                time_slot.venue, time_slot.start_time, time_slot.end_time
+            ):
                 try:
-                    event_start = event_data['start_time']
-                    event_end = event_data['end_time']
-                    
-                    # Convert Firestore timestamps to datetime if needed
-                    if hasattr(event_start, 'timestamp'):
-                        event_start = datetime.fromtimestamp(event_start.timestamp(), tz=timezone.utc)
-                    if hasattr(event_end, 'timestamp'):
-                        event_end = datetime.fromtimestamp(event_end.timestamp(), tz=timezone.utc)
-                    
-                    # Create TimeSlot for comparison
-                    event_slot = TimeSlot(
-                        start_time=event_start,
-                        end_time=event_end,
-                        venue=event_data.get('venue')
-                    )
-                    
-                    # Check for overlap
-                    if self.check_time_overlap(time_slot, event_slot):
-                        overlapping_events.append(event_data)
+                    # Series are expanded to the occurrences inside the slot
+                    for event_data in expand_event(candidate, time_slot.start_time, time_slot.end_time):
+                        event_start, event_end = event_time_bounds(event_data)
+
+                        # Create TimeSlot for comparison
+                        event_slot = TimeSlot(
+                            start_time=event_start,
+                            end_time=event_end,
+                            venue=event_data.get('venue')
+                        )
+                        
+                        if self.check_time_overlap(time_slot, event_slot):
+                            overlapping_events.append(event_data)
                         
                 except Exception as e:
-                    logger.warning(f"Error processing event {event_doc.id}: {e}")
+                    logger.warning(f"Error processing event {candidate.get('id')}: {e}")
                     continue
             
             return overlapping_events
@@ -149,12 +368,42 @@ class SchedulerAgent:
             logger.error(f"Error querying overlapping events: {e}")
             raise
     
-    def check_conflict(
+    def _venue_day_ref(self, venue: str, day: str):
+        return self.venue_days_collection.document(VenueDayDocument.doc_id(venue, day))
+
+    async def _venue_day_overlaps(self, time_slot: TimeSlot) -> List[Dict[str, Any]]:
+        """
+        Find overlapping bookings from the venue-day summary documents.
+        Costs one document read per UTC day the slot touches.
+        """
+        days = VenueDayDocument.days_spanned(time_slot.start_time, time_slot.end_time)
+        snapshots = await asyncio.gather(*(self._venue_day_ref(time_slot.venue, day).get() for day in days))
+
+        overlapping: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+        for snapshot in snapshots:
+            if not snapshot.exists:
+                continue
+            for booking in (snapshot.to_dict() or {}).get('bookings', []):
+                booking_start, booking_end = event_time_bounds(booking)
+                if booking_start < time_slot.end_time and time_slot.start_time < booking_end:
+                    # Bookings spanning midnight are stored on every day they touch
+                    overlapping[(booking['event_id'], booking_start)] = {
+                        "id": booking['event_id'],
+                        "title": booking.get('title', ''),
+                        "venue": time_slot.venue,
+                        "start_time": booking_start,
+                        "end_time": booking_end
+                    }
+        return sorted(overlapping.values(), key=lambda event: event['start_time'])
+
+    async def check_conflict(
         self, 
         start_time: str, 
         end_time: str, 
         venue: str = None,
-        exclude_event_id: str = None
+        exclude_event_id: str = None,
+        organizer: str = None,
+        audience_groups: List[str] = None
     ) -> ConflictResult:
         """
         Check for scheduling conflicts in the given time slot.
@@ -164,6 +413,8 @@ class SchedulerAgent:
             end_time: ISO format datetime string  
             venue: Optional venue name
             exclude_event_id: Optional event ID to exclude from conflict check
+            organizer: Optional organizer who must not be booked twice
+            audience_groups: Optional clubs / audience groups that must not be targeted twice
             
         Returns:
             ConflictResult with conflict status and details
@@ -179,16 +430,34 @@ class SchedulerAgent:
                 end_time=parsed_end,
                 venue=venue
             )
-            
-            # Get overlapping events
-            overlapping_events = self.get_overlapping_events(time_slot)
-            
-            # Filter out excluded event if specified
-            if exclude_event_id:
-                overlapping_events = [
-                    event for event in overlapping_events 
-                    if event.get('id') != exclude_event_id
-                ]
+
+            # Repeated checks of the same slot are served from the cache until
+            # a write touches the venue
+            replica = get_events_replica()
+            generation = replica.generation if replica is not None else None
+            version = self.conflict_cache.version(venue)
+            cached = self.conflict_cache.get(
+                venue, time_slot.start_time, time_slot.end_time, exclude_event_id, generation
+            )
+            if cached is not None:
+                conflict_result = self._copy_conflict_result(cached)
+            else:
+                # Get overlapping events
+                overlapping_events = await self.get_overlapping_events(time_slot)
+
+                conflict_result = self._build_conflict_result(overlapping_events, exclude_event_id)
+                self.conflict_cache.put(
+                    venue, time_slot.start_time, time_slot.end_time, exclude_event_id,
+                    self._copy_conflict_result(conflict_result),
+                    version, generation
+                )
+
+            dimension_values = self._dimension_values(organizer, audience_groups)
+            if dimension_values:
+                dimension_conflicts = await self._dimension_conflicts(
+                    time_slot.start_time, time_slot.end_time, dimension_values, exclude_event_id
+                )
+                conflict_result = self._with_dimension_conflicts(conflict_result, dimension_conflicts)
             
             # Log the conflict check
             AgentHelper.log_agent_action(
@@ -197,25 +466,11 @@ class SchedulerAgent:
                 details={
                     "time_slot": f"{start_time} - {end_time}",
                     "venue": venue,
-                    "conflicts_found": len(overlapping_events)
+                    "conflicts_found": len(conflict_result.conflicting_events or [])
                 }
             )
             
-            if overlapping_events:
-                # Return conflict result
-                primary_conflict = overlapping_events[0]
-                return ConflictResult(
-                    status="CLASH",
-                    conflicting_event=primary_conflict.get('title', 'Unknown Event'),
-                    conflicting_events=overlapping_events,
-                    message=f"Time slot conflicts with {len(overlapping_events)} existing event(s)"
-                )
-            else:
-                # No conflicts found
-                return ConflictResult(
-                    status="CLEAR",
-                    message="Time slot is available"
-                )
+            return conflict_result
                 
         except Exception as e:
             logger.error(f"Conflict check failed: {e}")
@@ -224,53 +479,531 @@ class SchedulerAgent:
                 message=f"Failed to check conflicts: {str(e)}"
             )
     
-    def suggest_alternative_times(
+    @staticmethod
+    def _dimension_values(organizer: Optional[str], audience_groups: Optional[List[str]]) -> Dict[str, List[str]]:
+        """Non-empty extra dimension values to check, keyed by dimension"""
+        values = {
+            "organizer": [organizer] if organizer else [],
+            "audience_groups": [group for group in audience_groups or [] if group]
+        }
+        return {dimension: found for dimension, found in values.items() if found}
+
+    def _enforced_dimension_values(self, event_doc: Dict[str, Any]) -> Dict[str, List[str]]:
+        """Dimension values of an event for the dimensions create_event enforces"""
+        values = {
+            dimension: list(self.dimension_indexes[dimension].event_keys(event_doc))
+            for dimension in self.enforced_dimensions
+        }
+        return {dimension: found for dimension, found in values.items() if found}
+
+    async def get_dimension_overlaps(
+        self,
+        dimension: str,
+        values: List[str],
+        start: datetime,
+        end: datetime
+    ) -> List[Dict[str, Any]]:
+        """
+        Find events sharing any of `values` in a conflict dimension and overlapping [start, end).
+        Served from the events replica when it is running, then the
+        dimension's interval index, otherwise Firestore is queried with the
+        same time window as venue checks.
+        """
+        self._ensure_collection()
+        if self.events_collection is None:
+            return []
+        replica = get_events_replica()
+        if replica is not None:
+            # The replica is keyed by venue: search every venue in the window and filter
+            wanted = set(values)
+            event_keys = self.dimension_indexes[dimension].event_keys
+            return [
+                dict(event) for event in replica.index.query(None, start, end)
+                if wanted.intersection(event_keys(event))
+            ]
+        if await self._index_ready():
+            return [dict(event) for event in self.dimension_indexes[dimension].query_keys(values, start, end)]
+
+        overlapping_events = []
+        field_filter = (dimension, CONFLICT_DIMENSIONS[dimension], list(values))
+        for candidate in await self._query_candidate_events(None, start, end, field_filter):
+            for event_data in expand_event(candidate, start, end):
+                event_start, event_end = event_time_bounds(event_data)
+                if event_start < end and start < event_end:
+                    overlapping_events.append(event_data)
+        return overlapping_events
+
+    async def _dimension_conflicts(
+        self,
+        start: datetime,
+        end: datetime,
+        dimension_values: Dict[str, List[str]],
+        exclude_event_id: str = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Clashing events per dimension; dimensions without clashes are left out"""
+        conflicts = {}
+        for dimension, values in dimension_values.items():
+            events = [
+                event for event in await self.get_dimension_overlaps(dimension, values, start, end)
+                if event.get('id') != exclude_event_id
+            ]
+            if events:
+                conflicts[dimension] = events
+        return conflicts
+
+    @staticmethod
+    def _with_dimension_conflicts(
+        result: ConflictResult,
+        dimension_conflicts: Dict[str, List[Dict[str, Any]]]
+    ) -> ConflictResult:
+        """Fold per-dimension clashes into a venue conflict result"""
+        if not dimension_conflicts or result.status == "ERROR":
+            return result
+        events = list(result.conflicting_events or [])
+        seen = {(event.get('id'), event.get('start_time')) for event in events}
+        for dimension_events in dimension_conflicts.values():
+            for event in dimension_events:
+                if (event.get('id'), event.get('start_time')) not in seen:
+                    seen.add((event.get('id'), event.get('start_time')))
+                    events.append(event)
+
+        reasons = [result.message] if result.status == "CLASH" else []
+        reasons.extend(
+            f"{dimension.replace('_', ' ')} already booked by {len(dimension_events)} overlapping event(s)"
+            for dimension, dimension_events in dimension_conflicts.items()
+        )
+        return ConflictResult(
+            status="CLASH",
+            conflicting_event=events[0].get('title', 'Unknown Event'),
+            conflicting_events=events,
+            message="; ".join(reasons),
+            dimension_conflicts=dimension_conflicts
+        )
+
+    @staticmethod
+    def _copy_conflict_result(result: ConflictResult) -> ConflictResult:
+        """Copy a result so cached entries can't be mutated by callers"""
+        if not result.conflicting_events:
+            return replace(result)
+        return replace(result, conflicting_events=[dict(event) for event in result.conflicting_events])
+
+    def _build_conflict_result(
+        self,
+        overlapping_events: List[Dict[str, Any]],
+        exclude_event_id: str = None
+    ) -> ConflictResult:
+        """Turn the overlapping events for a slot into a ConflictResult"""
+        # Filter out excluded event if specified
+        if exclude_event_id:
+            overlapping_events = [
+                event for event in overlapping_events 
+                if event.get('id') != exclude_event_id
+            ]
+
+        if overlapping_events:
+            primary_conflict = overlapping_events[0]
+            return ConflictResult(
+                status="CLASH",
+                conflicting_event=primary_conflict.get('title', 'Unknown Event'),
+                conflicting_events=overlapping_events,
+                message=f"Time slot conflicts with {len(overlapping_events)} existing event(s)"
+            )
+        return ConflictResult(
+            status="CLEAR",
+            message="Time slot is available"
+        )
+
+    async def _load_window_index(self, time_slots: List[TimeSlot]) -> CalendarIndex:
+        """
+        Return an index covering every given slot.
+
+        Uses the events replica or shared calendar index when ready. Otherwise the events
+        around the slots are read from Firestore once per venue (or once in
+        total if any slot has no venue) into a temporary index.
+        """
+        index = await self._active_index()
+        if index is not None:
+            return index
+
+        window_index = CalendarIndex()
+        if self.events_collection is None or not time_slots:
+            window_index.load([])
+            return window_index
+
+        windows: Dict[Optional[str], Tuple[datetime, datetime]] = {}
+        if any(not slot.venue for slot in time_slots):
+            windows[None] = (
+                min(slot.start_time for slot in time_slots),
+                max(slot.end_time for slot in time_slots)
+            )
+        else:
+            for slot in time_slots:
+                lo, hi = windows.get(slot.venue, (slot.start_time, slot.end_time))
+                windows[slot.venue] = (min(lo, slot.start_time), max(hi, slot.end_time))
+
+        events = []
+        for venue, (window_start, window_end) in windows.items():
+            events.extend(await self._query_candidate_events(venue, window_start, window_end))
+        window_index.load(events)
+        return window_index
+
+    async def check_conflicts_bulk(self, slots: List[Dict[str, Any]]) -> List[ConflictResult]:
+        """
+        Check many candidate slots against a single load of the calendar.
+        
+        Args:
+            slots: List of dicts with start_time, end_time and optional venue / exclude_event_id /
+                organizer / audience_groups (checked like check_conflict)
+            
+        Returns:
+            One ConflictResult per slot, in the same order
+        """
+        results: List[Optional[ConflictResult]] = [None] * len(slots)
+        parsed: List[Tuple[int, TimeSlot, Optional[str], Dict[str, List[str]]]] = []
+
+        for i, slot in enumerate(slots):
+            try:
+                time_slot = TimeSlot(
+                    start_time=self.parse_datetime(slot['start_time']),
+                    end_time=self.parse_datetime(slot['end_time']),
+                    venue=slot.get('venue')
+                )
+                dimension_values = self._dimension_values(slot.get('organizer'), slot.get('audience_groups'))
+                parsed.append((i, time_slot, slot.get('exclude_event_id'), dimension_values))
+            except Exception as e:
+                results[i] = ConflictResult(
+                    status="ERROR",
+                    message=f"Failed to check conflicts: {str(e)}"
+                )
+
+        try:
+            self._ensure_collection()
+            index = await self._load_window_index([time_slot for _, time_slot, _, _ in parsed])
+            for i, time_slot, exclude_event_id, dimension_values in parsed:
+                overlapping_events = [
+                    dict(event) for event in index.query(
+                        time_slot.venue, time_slot.start_time, time_slot.end_time
+                    )
+                ]
+                results[i] = self._build_conflict_result(overlapping_events, exclude_event_id)
+                if dimension_values:
+                    dimension_conflicts = await self._dimension_conflicts(
+                        time_slot.start_time, time_slot.end_time, dimension_values, exclude_event_id
+                    )
+                    results[i] = self._with_dimension_conflicts(results[i], dimension_conflicts)
+        except Exception as e:
+            logger.error(f"Bulk conflict check failed: {e}")
+            for i, _, _, _ in parsed:
+                results[i] = ConflictResult(
+                    status="ERROR",
+                    message=f"Failed to check conflicts: {str(e)}"
+                )
+
+        AgentHelper.log_agent_action(
+            agent_name="SchedulerAgent",
+            action="bulk_conflict_check",
+            details={
+                "slots_checked": len(slots),
+                "clashes_found": sum(1 for r in results if r.status == "CLASH")
+            }
+        )
+
+        return results
+
+    def _snapshot_fresh(self, built_at: Optional[float]) -> bool:
+        if built_at is None:
+            return False
+        return self.index_ttl_seconds <= 0 or time.time() - built_at <= self.index_ttl_seconds
+
+    async def build_snapshot(self) -> CalendarSnapshot:
+        """
+        Build a columnar snapshot of the calendar, one row per event or series occurrence.
+        Saved to SCHEDULER_SNAPSHOT_DIR when configured so other workers can map it.
+        """
+        self._ensure_collection()
+        index = await self._active_index()
+        if index is not None:
+            events = index.events()
+        elif self.events_collection is not None:
+            events = await self._load_scheduled_events()
+        else:
+            raise RuntimeError("Calendar snapshot cannot be built: Firestore is not available")
+
+        snapshot = CalendarSnapshot.build(
+            occurrence for event in events for occurrence in expand_event(event, *event_span(event))
+        )
+        if self.snapshot_dir:
+            try:
+                snapshot.save(self.snapshot_dir)
+            except Exception as e:
+                logger.warning(f"Failed to save calendar snapshot: {e}")
+        self.snapshot = snapshot
+        logger.info(f"Calendar snapshot built with {len(snapshot)} rows")
+        return snapshot
+
+    async def _snapshot_ready(self) -> CalendarSnapshot:
+        """Fresh snapshot from memory, then from SCHEDULER_SNAPSHOT_DIR, else a rebuild"""
+        if self.snapshot is not None and self._snapshot_fresh(self.snapshot.built_at):
+            return self.snapshot
+        async with self._snapshot_lock:
+            if self.snapshot is not None and self._snapshot_fresh(self.snapshot.built_at):
+                return self.snapshot
+            if self.snapshot_dir and self._snapshot_fresh(CalendarSnapshot.saved_at(self.snapshot_dir)):
+                try:
+                    self.snapshot = CalendarSnapshot.load(self.snapshot_dir)
+                    return self.snapshot
+                except Exception as e:
+                    logger.warning(f"Failed to map saved calendar snapshot: {e}")
+            return await self.build_snapshot()
+
+    async def snapshot_overlap_counts(self, slots: List[Dict[str, Any]]) -> List[int]:
+        """
+        Count the scheduled events overlapping each slot using the calendar snapshot.
+        
+        Args:
+            slots: List of dicts with start_time, end_time and optional venue
+            
+        Returns:
+            One overlap count per slot, in the same order
+        """
+        time_slots = [
+            TimeSlot(
+                start_time=self.parse_datetime(slot['start_time']),
+                end_time=self.parse_datetime(slot['end_time']),
+                venue=slot.get('venue')
+            )
+            for slot in slots
+        ]
+        snapshot = await self._snapshot_ready()
+        counts = snapshot.overlap_counts(
+            [time_slot.venue for time_slot in time_slots],
+            to_epoch_seconds(time_slot.start_time for time_slot in time_slots),
+            to_epoch_seconds((time_slot.end_time for time_slot in time_slots), round_up=True)
+        )
+        return [int(count) for count in counts]
+
+    async def _occupancy_ready(self) -> OccupancyMap:
+        """Occupancy maps kept fresh with the calendar index, or warm-loaded ones as a fallback"""
+        self._ensure_collection()
+        if self.events_collection is not None:
+            await self._index_ready()
+        if not self.occupancy.is_loaded:
+            raise RuntimeError("Occupancy maps are not available yet")
+        return self.occupancy
+
+    async def venue_occupancy(self, venue: str, day: str) -> Dict[str, Any]:
+        """
+        Slot grid for one venue on one UTC day.
+        
+        Returns:
+            Dict with slot_minutes and `slots`, a string with one character per
+            slot from midnight ("1" booked, "0" free)
+        """
+        parsed_day = self.parse_datetime(day).date()
+        occupancy = await self._occupancy_ready()
+        bits = occupancy.day_map(venue, parsed_day)
+        return {
+            "venue": venue,
+            "date": parsed_day.isoformat(),
+            "slot_minutes": occupancy.slot_minutes,
+            "slots": "".join("1" if bits >> i & 1 else "0" for i in range(occupancy.slots_per_day))
+        }
+
+    async def is_venue_free(self, venue: str, start_time: str, end_time: str) -> bool:
+        """Check a venue's slot bitmap for [start_time, end_time)"""
+        time_slot = TimeSlot(start_time=self.parse_datetime(start_time), end_time=self.parse_datetime(end_time))
+        occupancy = await self._occupancy_ready()
+        return occupancy.is_free(venue, time_slot.start_time, time_slot.end_time)
+
+    async def free_venues(self, start_time: str, end_time: str) -> List[str]:
+        """
+        Venues with no booked slot in [start_time, end_time).
+        Candidates are the catalog venues, in catalog order, followed by any
+        other venue that has bookings, so venues never booked are included.
+        """
+        time_slot = TimeSlot(start_time=self.parse_datetime(start_time), end_time=self.parse_datetime(end_time))
+        occupancy = await self._occupancy_ready()
+        candidates = dict.fromkeys(venue['name'] for venue in self.venue_catalog.venues())
+        candidates.update(dict.fromkeys(occupancy.venues()))
+        return occupancy.free_venues(time_slot.start_time, time_slot.end_time, venues=candidates)
+
+    async def first_free_block(
+        self,
+        venue: str,
+        window_start: str,
+        window_end: str,
+        duration_hours: float
+    ) -> Optional[Dict[str, str]]:
+        """Earliest free block of duration_hours for a venue within the window, slot aligned"""
+        time_slot = TimeSlot(start_time=self.parse_datetime(window_start), end_time=self.parse_datetime(window_end))
+        occupancy = await self._occupancy_ready()
+        block = occupancy.first_free_block(
+            venue, time_slot.start_time, time_slot.end_time, timedelta(hours=duration_hours)
+        )
+        if block is None:
+            return None
+        return {"start_time": block[0].isoformat(), "end_time": block[1].isoformat()}
+
+    async def find_venues(
+        self,
+        min_capacity: int = None,
+        features: List[str] = None,
+        accessibility: List[str] = None,
+        start_time: str = None,
+        end_time: str = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search the venue catalog, optionally keeping only venues free for a time range.
+        
+        Catalog requirements are answered from the feature and capacity
+        indexes; availability comes from one overlap query over all venues,
+        served by the calendar index when it is loaded.
+        
+        Args:
+            min_capacity: Minimum capacity
+            features: Required features, e.g. ["projector"]
+            accessibility: Required accessibility options, e.g. ["wheelchair"]
+            start_time: Optional range start as ISO string (requires end_time)
+            end_time: Optional range end as ISO string (requires start_time)
+            
+        Returns:
+            Matching venues, smallest sufficient capacity first
+        """
+        if (start_time is None) != (end_time is None):
+            raise ValueError("start_time and end_time must be given together")
+        matches = self.venue_catalog.search(min_capacity, features or [], accessibility or [])
+        if start_time is None or not matches:
+            return matches
+
+        time_slot = TimeSlot(start_time=self.parse_datetime(start_time), end_time=self.parse_datetime(end_time))
+        busy = {event.get('venue') for event in await self.get_overlapping_events(time_slot)}
+        available = [venue for venue in matches if venue['name'] not in busy]
+
+        AgentHelper.log_agent_action(
+            agent_name="SchedulerAgent",
+            action="venue_search",
+            details={
+                "time_range": f"{start_time} - {end_time}",
+                "catalog_matches": len(matches),
+                "available": len(available)
+            }
+        )
+        return available
+
+    async def find_clashes(
+        self,
+        window_start: str,
+        window_end: str,
+        venue: str = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Find every double-booking in a date range.
+        
+        The calendar is loaded once and each venue is swept separately, see
+        utils.clashes. Groups are produced lazily so large ranges can be
+        streamed.
+        
+        Args:
+            window_start: Range start as ISO string
+            window_end: Range end as ISO string
+            venue: Optional venue to restrict the report to
+            
+        Returns:
+            Iterator of clash groups (venue, start_time, end_time, events, pairs),
+            ordered by venue and start time
+        """
+        time_slot = TimeSlot(
+            start_time=self.parse_datetime(window_start),
+            end_time=self.parse_datetime(window_end),
+            venue=venue
+        )
+        self._ensure_collection()
+        index = await self._load_window_index([time_slot])
+
+        by_venue: Dict[str, List[Dict[str, Any]]] = {}
+        for event in index.query(venue, time_slot.start_time, time_slot.end_time):
+            by_venue.setdefault(event.get('venue') or "", []).append(dict(event))
+
+        AgentHelper.log_agent_action(
+            agent_name="SchedulerAgent",
+            action="clash_report",
+            details={
+                "time_range": f"{window_start} - {window_end}",
+                "venue": venue,
+                "events_scanned": sum(len(events) for events in by_venue.values())
+            }
+        )
+
+        def groups() -> Iterator[Dict[str, Any]]:
+            for venue_name in sorted(by_venue):
+                for group in clash_groups(by_venue[venue_name]):
+                    yield {"venue": venue_name, **group}
+
+        return groups()
+
+    async def suggest_alternative_times(
         self, 
         preferred_start: str,
         duration_hours: float,
         venue: str = None,
-        max_suggestions: int = 3
+        max_suggestions: int = 3,
+        working_hours: str = None
     ) -> List[Dict[str, Any]]:
         """
-        Suggest alternative time slots if the preferred time has conflicts.
+        Suggest free time slots nearest to the preferred start.
+        
+        Busy intervals around the preferred start are loaded once, merged and
+        subtracted from the working-hour windows; every remaining gap long
+        enough for the event is a candidate.
         
         Args:
             preferred_start: Preferred start time as ISO string
             duration_hours: Event duration in hours
             venue: Optional venue name
             max_suggestions: Maximum number of suggestions to return
+            working_hours: Optional "HH:MM-HH:MM" override of the configured working hours
             
         Returns:
             List of suggested time slots
         """
+        hours = parse_working_hours(working_hours) if working_hours else self.working_hours
+
         try:
-            from datetime import timedelta
-            
-            suggestions = []
             base_start = self.parse_datetime(preferred_start)
             duration = timedelta(hours=duration_hours)
-            
-            # Try different time offsets (1 hour increments)
-            for offset_hours in [1, 2, -1, 3, -2, 4, -3, 6, -6, 12, -12, 24]:
-                if len(suggestions) >= max_suggestions:
-                    break
-                    
-                suggested_start = base_start + timedelta(hours=offset_hours)
-                suggested_end = suggested_start + duration
-                
-                conflict_result = self.check_conflict(
-                    start_time=suggested_start.isoformat(),
-                    end_time=suggested_end.isoformat(),
-                    venue=venue
-                )
-                
-                if conflict_result.status == "CLEAR":
-                    suggestions.append({
-                        "start_time": suggested_start.isoformat(),
-                        "end_time": suggested_end.isoformat(),
-                        "confidence": 1.0,
-                        "reasoning": f"Available slot {offset_hours}h from preferred time"
-                    })
+
+            window_start = base_start - self.suggestion_window
+            window_end = base_start + self.suggestion_window + duration
+
+            self._ensure_collection()
+            index = await self._load_window_index([TimeSlot(start_time=window_start, end_time=window_end, venue=venue)])
+            busy = [
+                event_time_bounds(event)
+                for event in index.query(venue, window_start, window_end)
+            ]
+
+            free_slots = find_free_slots(
+                busy,
+                window_start,
+                window_end,
+                duration,
+                preferred_start=base_start,
+                working_hours=hours,
+                max_results=max_suggestions
+            )
+
+            suggestions = []
+            for slot_start, slot_end in free_slots:
+                offset_hours = round((slot_start - base_start).total_seconds() / 3600, 2)
+                suggestions.append({
+                    "start_time": slot_start.isoformat(),
+                    "end_time": slot_end.isoformat(),
+                    "confidence": 1.0,
+                    "reasoning": (
+                        "Preferred time is available" if offset_hours == 0
+                        else f"Available slot {offset_hours:+g}h from preferred time"
+                    )
+                })
             
             return suggestions
             
@@ -278,7 +1011,102 @@ class SchedulerAgent:
             logger.error(f"Failed to suggest alternative times: {e}")
             return []
     
-    def create_event(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def check_series_conflict(self, event_doc: Dict[str, Any], exclude_event_id: str = None) -> ConflictResult:
+        """
+        Check every occurrence of a recurring series for conflicts.
+        The calendar is read once over the whole series span and compared
+        against the series occurrences through an interval tree.
+        """
+        span_start, span_end = event_span(event_doc)
+        series = IntervalTree()
+        for n, occurrence in enumerate(expand_event(event_doc, span_start, span_end)):
+            series.add(str(n), *event_time_bounds(occurrence), occurrence)
+
+        existing_events = await self.get_overlapping_events(
+            TimeSlot(start_time=span_start, end_time=span_end, venue=event_doc.get('venue'))
+        )
+        overlapping_events = [
+            event for event in existing_events
+            if series.overlapping(*event_time_bounds(event))
+        ]
+        result = self._build_conflict_result(overlapping_events, exclude_event_id)
+
+        dimension_conflicts = await self._dimension_conflicts(
+            span_start, span_end, self._enforced_dimension_values(event_doc), exclude_event_id
+        )
+        dimension_conflicts = {
+            dimension: clashing for dimension, clashing in (
+                (dimension, [event for event in events if series.overlapping(*event_time_bounds(event))])
+                for dimension, events in dimension_conflicts.items()
+            ) if clashing
+        }
+        return self._with_dimension_conflicts(result, dimension_conflicts)
+
+    @staticmethod
+    def _check_day_bookings(
+        bookings: List[Dict[str, Any]],
+        new_bookings: List[Dict[str, Any]],
+        event_id: str,
+        action: str
+    ) -> None:
+        """Raise ValueError if any new booking overlaps another event's booking on the same venue-day"""
+        for booking in bookings:
+            if booking.get('event_id') == event_id:
+                continue
+            booking_start, booking_end = event_time_bounds(booking)
+            for new_booking in new_bookings:
+                start_time, end_time = event_time_bounds(new_booking)
+                if booking_start < end_time and start_time < booking_end:
+                    raise ValueError(
+                        f"Cannot {action} event: Time slot conflicts with "
+                        f"'{booking.get('title', 'Unknown Event')}'"
+                    )
+
+    async def _book_in_transaction(
+        self,
+        transaction,
+        event_ref,
+        event_doc: Dict[str, Any],
+        day_refs: List[Tuple[str, Any]]
+    ) -> None:
+        """
+        Check the venue-day documents and write the event in one transaction.
+        Firestore retries the transaction if another booking commits one of
+        the same venue-day documents first.
+        """
+        new_bookings = VenueDayDocument.bookings_by_day(event_ref.id, event_doc)
+        day_bookings = []
+        for day, day_ref in day_refs:
+            snapshot = await day_ref.get(transaction=transaction)
+            bookings = (snapshot.to_dict() or {}).get('bookings', []) if snapshot.exists else []
+            self._check_day_bookings(bookings, new_bookings.get(day, []), event_ref.id, "create")
+            day_bookings.append((day, day_ref, bookings))
+
+        transaction.set(event_ref, event_doc)
+        for day, day_ref, bookings in day_bookings:
+            transaction.set(
+                day_ref,
+                VenueDayDocument.create_venue_day_doc(
+                    event_doc['venue'], day, bookings + new_bookings.get(day, [])
+                )
+            )
+
+    async def _book_event(self, event_doc: Dict[str, Any]) -> str:
+        """Write the event and its venue-day bookings atomically. Returns the event ID."""
+        event_ref = self.events_collection.document()
+        days = sorted(VenueDayDocument.bookings_by_day(event_ref.id, event_doc))
+        # One write for the event plus one per venue-day, within Firestore's 500 write limit
+        if len(days) >= 500:
+            raise ValueError("Cannot create event: series spans too many days, split it into shorter series")
+        day_refs = [
+            (day, self.venue_days_collection.document(VenueDayDocument.doc_id(event_doc['venue'], day)))
+            for day in days
+        ]
+        book = async_transactional(self._book_in_transaction)
+        await book(self.firestore_client.transaction(), event_ref, event_doc, day_refs)
+        return event_ref.id
+
+    async def create_event(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create a new event in Firestore after conflict validation.
         
@@ -299,20 +1127,21 @@ class SchedulerAgent:
                 if not event_data.get(field):
                     raise ValueError(f"Missing required field: {field}")
             
-            # Check for conflicts first
-            conflict_result = self.check_conflict(
-                start_time=event_data['start_time'],
-                end_time=event_data['end_time'],
-                venue=event_data.get('venue')
-            )
-            
-            if conflict_result.status == "CLASH":
-                raise ValueError(f"Cannot create event: {conflict_result.message}")
-            
             # Parse datetime fields
             start_time = self.parse_datetime(event_data['start_time'])
             end_time = self.parse_datetime(event_data['end_time'])
-            
+
+            if end_time - start_time > self.max_event_duration:
+                max_hours = self.max_event_duration.total_seconds() / 3600
+                raise ValueError(f"Event duration cannot exceed {max_hours:g} hours")
+
+            catalog_venue = self.venue_catalog.get(event_data['venue'])
+            if catalog_venue and catalog_venue['capacity'] and (event_data.get('capacity') or 0) > catalog_venue['capacity']:
+                raise ValueError(
+                    f"Venue {event_data['venue']} holds {catalog_venue['capacity']} people, "
+                    f"fewer than the requested capacity of {event_data['capacity']}"
+                )
+
             # Create event document
             event_doc = EventDocument.create_event_doc(
                 title=event_data['title'],
@@ -320,27 +1149,61 @@ class SchedulerAgent:
                 end_time=end_time,
                 venue=event_data['venue'],
                 organizer=event_data.get('organizer'),
+                audience_groups=event_data.get('audience_groups'),
                 description=event_data.get('description'),
                 category=event_data.get('category'),
                 capacity=event_data.get('capacity'),
-                budget=event_data.get('budget')
+                budget=event_data.get('budget'),
+                recurrence=event_data.get('recurrence'),
+                exdates=[self.parse_datetime(value) for value in event_data.get('exdates') or []],
+                tzid=event_data.get('tzid')
             )
+
+            # Quick check against the calendar first; the booking transaction
+            # below is what guarantees no double booking
+            if event_doc.get('recurrence'):
+                conflict_result = await self.check_series_conflict(event_doc)
+            else:
+                enforced = self._enforced_dimension_values(event_doc)
+                conflict_result = await self.check_conflict(
+                    start_time=event_data['start_time'],
+                    end_time=event_data['end_time'],
+                    venue=event_data.get('venue'),
+                    organizer=enforced.get('organizer', [None])[0],
+                    audience_groups=enforced.get('audience_groups')
+                )
             
-            # Add to Firestore
-            doc_ref = self.events_collection.add(event_doc)
-            event_doc['id'] = doc_ref[1].id
+            if conflict_result.status == "CLASH":
+                raise ValueError(f"Cannot create event: {conflict_result.message}")
+            
+            # Add to Firestore together with the venue-day bookings
+            event_doc['id'] = await self._book_event(event_doc)
+
+            # Keep the in-memory indexes in sync with the write (the replica
+            # listener will deliver the same event shortly)
+            self._index_new_event(event_doc)
+            self.conflict_cache.bump(event_doc.get('venue'))
+            change_feed.record("firestore", "created", event_doc['id'], event_doc, event_doc.get('updated_at'))
 
             # Optionally publish to Google Calendar if a token is provided
             google_token = os.getenv("GOOGLE_CALENDAR_TOKEN")
             if google_token:
                 try:
-                    cal_event = create_google_calendar_event(
+                    # requests-based helper; keep it off the event loop
+                    cal_event = await asyncio.to_thread(
+                        create_google_calendar_event,
                         {
                             "title": event_doc['title'],
                             "description": event_doc.get('description', ''),
                             "venue": event_doc.get('venue'),
                             "start_time": event_doc['start_time'].isoformat(),
-                            "end_time": event_doc['end_time'].isoformat()
+                            "end_time": event_doc['end_time'].isoformat(),
+                            "recurrence": event_doc.get('recurrence'),
+                            "timezone": event_doc.get('tzid'),
+                            "exdates": [
+                                exdate.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+                                for exdate in event_doc.get('exdates', [])
+                            ]
                         },
                         google_token
                     )
@@ -362,5 +1225,619 @@ class SchedulerAgent:
             logger.error(f"Failed to create event: {e}")
             raise
 
+    @staticmethod
+    def _bookings_by_venue_day(event_id: str, event_doc: Optional[Dict[str, Any]]) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        if event_doc is None:
+            return {}
+        return {
+            (event_doc['venue'], day): bookings
+            for day, bookings in VenueDayDocument.bookings_by_day(event_id, event_doc).items()
+        }
+
+    async def _change_in_transaction(
+        self,
+        transaction,
+        event_ref,
+        new_slot: Optional[Tuple[datetime, datetime, Optional[str]]]
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Reschedule (new_slot given) or cancel (new_slot None) an event together
+        with its venue-day bookings. Only the venue-day documents the event
+        leaves or enters are read and written.
+        
+        Returns:
+            The stored event before and after the change (None when cancelled)
+        """
+        snapshot = await event_ref.get(transaction=transaction)
+        if not snapshot.exists:
+            raise LookupError(f"Event {event_ref.id} not found")
+        old_doc = snapshot.to_dict()
+        if old_doc.get('status') != 'scheduled':
+            raise ValueError(f"Event is {old_doc.get('status')}, only scheduled events can be changed")
+
+        if new_slot is not None:
+            start_time, end_time, venue = new_slot
+            changes = EventDocument.reschedule_event_doc(old_doc, start_time, end_time, venue or old_doc.get('venue'))
+            new_doc = {**old_doc, **changes}
+        else:
+            changes = EventDocument.update_event_doc(status="cancelled")
+            new_doc = None
+
+        old_bookings = self._bookings_by_venue_day(event_ref.id, old_doc)
+        new_bookings = self._bookings_by_venue_day(event_ref.id, new_doc)
+        if len(new_bookings) >= 500:
+            raise ValueError("Cannot reschedule event: series spans too many days, split it into shorter series")
+
+        day_bookings = {}
+        for key in sorted(set(old_bookings) | set(new_bookings)):
+            day_snapshot = await self._venue_day_ref(*key).get(transaction=transaction)
+            bookings = (day_snapshot.to_dict() or {}).get('bookings', []) if day_snapshot.exists else []
+            self._check_day_bookings(bookings, new_bookings.get(key, []), event_ref.id, "reschedule")
+            day_bookings[key] = bookings
+
+        transaction.update(event_ref, changes)
+        for (venue, day), bookings in day_bookings.items():
+            kept = [booking for booking in bookings if booking.get('event_id') != event_ref.id]
+            transaction.set(
+                self._venue_day_ref(venue, day),
+                VenueDayDocument.create_venue_day_doc(venue, day, kept + new_bookings.get((venue, day), []))
+            )
+        return old_doc, new_doc
+
+    def _sync_changed_event(self, event_id: str, old_doc: Dict[str, Any], new_doc: Optional[Dict[str, Any]]) -> None:
+        """Apply a committed reschedule or cancellation to the in-memory indexes"""
+        self.conflict_cache.bump_many({old_doc.get('venue'), (new_doc or {}).get('venue')})
+        for index in (*self._local_indexes(), getattr(get_events_replica(), 'index', None)):
+            if index is None or not index.is_loaded:
+                continue
+            index.remove(event_id)
+            if new_doc is not None:
+                index.add({**new_doc, 'id': event_id})
+
+        if not self.occupancy.is_loaded:
+            return
+        if not self.calendar_index.is_loaded:
+            # Bitmaps can't be un-marked without the events sharing the slots
+            self.occupancy.clear()
+            return
+        touched = set(self._bookings_by_venue_day(event_id, old_doc)) | set(self._bookings_by_venue_day(event_id, new_doc))
+        for venue, day in touched:
+            day_date = datetime.fromisoformat(day).date()
+            self.occupancy.reset_days(venue, [day_date])
+            day_start = datetime.fromisoformat(day).replace(tzinfo=timezone.utc)
+            for event in self.calendar_index.query(venue, day_start, day_start + timedelta(days=1)):
+                self.occupancy.mark(venue, *event_time_bounds(event))
+
+    async def reschedule_event(
+        self,
+        event_id: str,
+        start_time: str,
+        end_time: str,
+        venue: str = None
+    ) -> Dict[str, Any]:
+        """
+        Move an event (or a whole series) to a new time and optionally venue.
+        
+        Args:
+            event_id: Event document ID
+            start_time: New start as ISO string (first occurrence for a series)
+            end_time: New end as ISO string
+            venue: Optional new venue; defaults to the current one
+            
+        Returns:
+            Updated event data with ID
+        """
+        self._ensure_collection()
+        if self.events_collection is None:
+            raise RuntimeError("Firebase not available. Please configure Firebase credentials.")
+
+        time_slot = TimeSlot(start_time=self.parse_datetime(start_time), end_time=self.parse_datetime(end_time))
+        if time_slot.end_time - time_slot.start_time > self.max_event_duration:
+            max_hours = self.max_event_duration.total_seconds() / 3600
+            raise ValueError(f"Event duration cannot exceed {max_hours:g} hours")
+
+        event_ref = self.events_collection.document(event_id)
+        reschedule = async_transactional(self._change_in_transaction)
+        old_doc, new_doc = await reschedule(
+            self.firestore_client.transaction(), event_ref, (time_slot.start_time, time_slot.end_time, venue)
+        )
+        self._sync_changed_event(event_id, old_doc, new_doc)
+        change_feed.record("firestore", "rescheduled", event_id, {**new_doc, 'id': event_id}, new_doc.get('updated_at'))
+
+        AgentHelper.log_agent_action(
+            agent_name="SchedulerAgent",
+            action="event_rescheduled",
+            event_id=event_id,
+            details={"start_time": start_time, "end_time": end_time, "venue": new_doc['venue']}
+        )
+        return {**new_doc, 'id': event_id}
+
+    async def cancel_event(self, event_id: str) -> Dict[str, Any]:
+        """
+        Cancel an event and release its venue-day bookings.
+        
+        Returns:
+            Dict with the event ID and its new status
+        """
+        self._ensure_collection()
+        if self.events_collection is None:
+            raise RuntimeError("Firebase not available. Please configure Firebase credentials.")
+
+        event_ref = self.events_collection.document(event_id)
+        cancel = async_transactional(self._change_in_transaction)
+        old_doc, _ = await cancel(self.firestore_client.transaction(), event_ref, None)
+        self._sync_changed_event(event_id, old_doc, None)
+        change_feed.record("firestore", "cancelled", event_id, {**old_doc, 'id': event_id, 'status': "cancelled"})
+
+        AgentHelper.log_agent_action(
+            agent_name="SchedulerAgent",
+            action="event_cancelled",
+            event_id=event_id,
+            details={"title": old_doc.get('title'), "venue": old_doc.get('venue')}
+        )
+        return {"id": event_id, "status": "cancelled"}
+
+    async def rebuild_venue_days(self) -> int:
+        """
+        Rewrite the venue-day summary documents of every scheduled event.
+        Run once after upgrading so events booked before the summaries existed
+        are covered by venue-day conflict checks.
+        
+        Returns:
+            Number of venue-day documents written
+        """
+        self._ensure_collection()
+        if self.events_collection is None:
+            raise RuntimeError("Firebase not available. Please configure Firebase credentials.")
+
+        by_venue_day: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for event in await self._load_scheduled_events():
+            if not event.get('venue'):
+                continue
+            for key, bookings in self._bookings_by_venue_day(event['id'], event).items():
+                by_venue_day.setdefault(key, []).extend(bookings)
+
+        batch = self.firestore_client.batch()
+        writes = 0
+        for (venue, day), bookings in by_venue_day.items():
+            batch.set(self._venue_day_ref(venue, day), VenueDayDocument.create_venue_day_doc(venue, day, bookings))
+            writes += 1
+            if writes == self.import_batch_size:
+                await batch.commit()
+                batch = self.firestore_client.batch()
+                writes = 0
+        if writes:
+            await batch.commit()
+
+        logger.info(f"Rebuilt {len(by_venue_day)} venue-day documents")
+        return len(by_venue_day)
+
+    def _prepare_import_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate an import row and build its event document"""
+        if row.get('error'):
+            # The parser could not read this row
+            raise ValueError(row['error'])
+        for field in ['title', 'start_time', 'end_time', 'venue']:
+            if not row.get(field):
+                raise ValueError(f"Missing required field: {field}")
+        time_slot = TimeSlot(
+            start_time=self.parse_datetime(row['start_time']),
+            end_time=self.parse_datetime(row['end_time']),
+            venue=row['venue']
+        )
+        if time_slot.end_time - time_slot.start_time > self.max_event_duration:
+            max_hours = self.max_event_duration.total_seconds() / 3600
+            raise ValueError(f"Event duration cannot exceed {max_hours:g} hours")
+        event_doc = EventDocument.create_event_doc(
+            title=row['title'],
+            start_time=time_slot.start_time,
+            end_time=time_slot.end_time,
+            venue=row['venue'],
+            organizer=row.get('organizer'),
+            audience_groups=row.get('audience_groups'),
+            description=row.get('description'),
+            category=row.get('category'),
+            capacity=row.get('capacity'),
+            budget=row.get('budget'),
+            recurrence=row.get('recurrence'),
+            exdates=[self.parse_datetime(value) for value in row.get('exdates') or []],
+            tzid=row.get('tzid')
+        )
+        # The event and all its venue-day writes must fit in one batch commit
+        if 1 + len(VenueDayDocument.bookings_by_day("", event_doc)) > self.import_batch_size:
+            raise ValueError("Series spans too many days for one import batch, split it into shorter series")
+        return event_doc
+
+    def _import_sweep_keys(self, event_doc: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """(dimension, value) pairs an event must not share with an overlapping event"""
+        keys = [('venue', event_doc.get('venue') or "")]
+        for dimension, values in self._enforced_dimension_values(event_doc).items():
+            keys.extend((dimension, value) for value in values)
+        return keys
+
+    @staticmethod
+    def _clash_reason(base: str, key: Tuple[str, str]) -> str:
+        dimension, value = key
+        if dimension == 'venue':
+            return base
+        return f"{base} ({dimension.replace('_', ' ')} {value})"
+
+    def _sweep_import_conflicts(
+        self,
+        rows: Dict[int, Dict[str, Any]],
+        existing_events: List[Dict[str, Any]]
+    ) -> Dict[int, str]:
+        """
+        Find import rows that clash with stored events or with each other.
+
+        Incoming and stored events are sorted together by start time and swept
+        once, keeping state per venue and per value of every enforced conflict
+        dimension (organizer, audience group). Stored events always win;
+        within the batch the row that starts first (or appears first in the
+        file) is kept. Accepted rows sharing a key never overlap, so only the
+        latest accepted row per key can still be running when a later event
+        starts. Recurring rows take part with every occurrence and are
+        rejected if any occurrence clashes.
+
+        Returns:
+            Rejection reason per row number
+        """
+        # (start, 0 = stored / 1 = incoming, file order, end, keys, payload)
+        timeline = []
+        for event in existing_events:
+            start, end = event_time_bounds(event)
+            timeline.append((start, 0, 0, end, self._import_sweep_keys(event), event))
+        for row_number, event_doc in rows.items():
+            keys = self._import_sweep_keys(event_doc)
+            for occurrence in expand_event(event_doc, *event_span(event_doc)):
+                start, end = event_time_bounds(occurrence)
+                timeline.append((start, 1, row_number, end, keys, event_doc))
+        timeline.sort(key=lambda item: item[:3])
+
+        rejected: Dict[int, str] = {}
+        # key -> (end, title) of the latest-ending stored event seen so far
+        busy_until: Dict[Tuple[str, str], Tuple[datetime, str]] = {}
+        # key -> (end, row number) of the latest accepted row
+        last_accepted: Dict[Tuple[str, str], Tuple[datetime, int]] = {}
+
+        def reject(row_number: int, reason: str) -> None:
+            rejected[row_number] = reason
+            for key in [key for key, (_, accepted_row) in last_accepted.items() if accepted_row == row_number]:
+                del last_accepted[key]
+
+        for start, incoming, row_number, end, keys, payload in timeline:
+            title = payload.get('title', 'Unknown Event')
+            if not incoming:
+                for key in keys:
+                    accepted = last_accepted.get(key)
+                    if accepted and accepted[0] > start:
+                        reject(accepted[1], self._clash_reason(f"Conflicts with existing event '{title}'", key))
+                    if key not in busy_until or end > busy_until[key][0]:
+                        busy_until[key] = (end, title)
+                continue
+
+            if row_number in rejected:
+                continue
+            reason = None
+            for key in keys:
+                busy = busy_until.get(key)
+                accepted = last_accepted.get(key)
+                if busy and busy[0] > start:
+                    reason = self._clash_reason(f"Conflicts with existing event '{busy[1]}'", key)
+                elif accepted and accepted[0] > start:
+                    reason = self._clash_reason(f"Conflicts with row {accepted[1]} in this import", key)
+                if reason:
+                    break
+            if reason:
+                reject(row_number, reason)
+            else:
+                for key in keys:
+                    last_accepted[key] = (end, row_number)
+        return rejected
+
+    async def _write_import_batches(self, accepted: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """
+        Write accepted events and their venue-day bookings with batched writes.
+        Bookings are appended with ArrayUnion so no reads are needed; each
+        commit stays within the batch size counting every write.
+        """
+        batch = self.firestore_client.batch()
+        writes = 0
+        for _, event_doc in accepted:
+            event_ref = self.events_collection.document()
+            event_doc['id'] = event_ref.id
+            bookings_by_day = VenueDayDocument.bookings_by_day(event_ref.id, event_doc)
+            if writes + 1 + len(bookings_by_day) > self.import_batch_size:
+                await batch.commit()
+                batch = self.firestore_client.batch()
+                writes = 0
+            batch.set(event_ref, {k: v for k, v in event_doc.items() if k != 'id'})
+            for day, bookings in bookings_by_day.items():
+                day_ref = self.venue_days_collection.document(VenueDayDocument.doc_id(event_doc['venue'], day))
+                batch.set(day_ref, {
+                    "venue": event_doc['venue'],
+                    "date": day,
+                    "bookings": ArrayUnion(bookings),
+                    "updated_at": datetime.utcnow()
+                }, merge=True)
+            writes += 1 + len(bookings_by_day)
+        if writes:
+            await batch.commit()
+
+    async def import_events(self, rows: List[Dict[str, Any]], dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Import many events at once.
+        
+        Every row is validated, then all rows are checked against stored events
+        and each other in a single sweep. Accepted rows are written with
+        Firestore batched writes.
+        
+        Args:
+            rows: Event rows as produced by utils.event_import.parse_events
+            dry_run: Only report what would be imported
+            
+        Returns:
+            Summary counts and a per-row accept/reject report in file order
+        """
+        self._ensure_collection()
+        if self.events_collection is None:
+            raise RuntimeError("Firebase not available. Please configure Firebase credentials.")
+
+        report: List[Dict[str, Any]] = []
+        prepared: Dict[int, Dict[str, Any]] = {}
+        for row_number, row in enumerate(rows, start=1):
+            entry = {"row": row_number, "title": row.get('title')}
+            report.append(entry)
+            try:
+                prepared[row_number] = self._prepare_import_row(row)
+            except Exception as e:
+                entry.update(status="rejected", reason=str(e))
+
+        time_slots = [
+            TimeSlot(*event_span(doc), venue=doc['venue'])
+            for doc in prepared.values()
+        ]
+        index = await self._load_window_index(time_slots)
+        existing_events = []
+        for venue in {doc['venue'] for doc in prepared.values()}:
+            venue_slots = [slot for slot in time_slots if slot.venue == venue]
+            existing_events.extend(index.query(
+                venue,
+                min(slot.start_time for slot in venue_slots),
+                max(slot.end_time for slot in venue_slots)
+            ))
+        # Stored events sharing an organizer or audience group with any row
+        dimension_values: Dict[str, set] = {}
+        for doc in prepared.values():
+            for dimension, values in self._enforced_dimension_values(doc).items():
+                dimension_values.setdefault(dimension, set()).update(values)
+        if dimension_values:
+            window_start = min(slot.start_time for slot in time_slots)
+            window_end = max(slot.end_time for slot in time_slots)
+            seen = {(event.get('id'), event_time_bounds(event)[0]) for event in existing_events}
+            for dimension, values in dimension_values.items():
+                for event in await self.get_dimension_overlaps(dimension, sorted(values), window_start, window_end):
+                    if (event.get('id'), event_time_bounds(event)[0]) not in seen:
+                        seen.add((event.get('id'), event_time_bounds(event)[0]))
+                        existing_events.append(event)
+
+        rejected = self._sweep_import_conflicts(prepared, existing_events)
+        accepted = [(n, doc) for n, doc in prepared.items() if n not in rejected]
+
+        if not dry_run:
+            try:
+                await self._write_import_batches(accepted)
+            finally:
+                # Earlier batches may have committed even if a later one failed
+                self.conflict_cache.bump_many({event_doc.get('venue') for _, event_doc in accepted})
+            for _, event_doc in accepted:
+                self._index_new_event(event_doc)
+                change_feed.record("firestore", "created", event_doc['id'], event_doc, event_doc.get('updated_at'))
+
+        for row_number, reason in rejected.items():
+            report[row_number - 1].update(status="rejected", reason=reason)
+        for row_number, event_doc in accepted:
+            report[row_number - 1]["status"] = "accepted"
+            if event_doc.get('id'):
+                report[row_number - 1]["id"] = event_doc['id']
+
+        AgentHelper.log_agent_action(
+            agent_name="SchedulerAgent",
+            action="events_imported",
+            details={"rows": len(rows), "accepted": len(accepted), "dry_run": dry_run}
+        )
+
+        return {
+            "total": len(rows),
+            "accepted": len(accepted),
+            "rejected": len(rows) - len(accepted),
+            "dry_run": dry_run,
+            "rows": report
+        }
+
+    def _prepare_solve_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate an auto-scheduler request and resolve its candidate venues"""
+        for field in ['title', 'duration_hours']:
+            if not item.get(field):
+                raise ValueError(f"Missing required field: {field}")
+        duration = timedelta(hours=float(item['duration_hours']))
+        if duration <= timedelta(0):
+            raise ValueError("duration_hours must be positive")
+        if duration > self.max_event_duration:
+            max_hours = self.max_event_duration.total_seconds() / 3600
+            raise ValueError(f"Event duration cannot exceed {max_hours:g} hours")
+
+        windows = [
+            TimeSlot(start_time=self.parse_datetime(window['start_time']), end_time=self.parse_datetime(window['end_time']))
+            for window in item.get('windows') or []
+        ]
+        if not windows:
+            raise ValueError("At least one preferred window is required")
+
+        matches = [
+            venue['name'] for venue in
+            self.venue_catalog.search(item.get('capacity'), item.get('features') or [], item.get('accessibility') or [])
+        ]
+        # Listed venues keep the requester's order of preference
+        venues = [venue for venue in item['venues'] if venue in matches] if item.get('venues') else matches
+        if not venues:
+            raise ValueError("No catalogued venue has the required capacity and features")
+
+        preferred_start = self.parse_datetime(item['preferred_start']) if item.get('preferred_start') else None
+        return {"duration": duration, "windows": windows, "venues": venues, "preferred_start": preferred_start}
+
+    async def solve_schedule(self, items: List[Dict[str, Any]], commit: bool = False) -> Dict[str, Any]:
+        """
+        Assign a batch of event requests to venues and start times without clashes.
+        
+        Requests are placed on a slot grid (SCHEDULER_SLOT_MINUTES) around the
+        events already booked, see utils.auto_scheduler. Earlier windows,
+        starts nearer preferred_start and earlier listed (or smaller suitable)
+        venues are preferred.
+        
+        Args:
+            items: Requests with title, duration_hours, windows (list of
+                start_time/end_time, best first) and optional id, capacity,
+                features, accessibility, venues, preferred_start, priority,
+                organizer, audience_groups
+            commit: Create the scheduled events through the bulk import path,
+                which also refuses organizer / audience-group double-bookings
+            
+        Returns:
+            Dict with `scheduled` placements, `unscheduled` requests with reasons and stats
+        """
+        self._ensure_collection()
+        if commit and self.events_collection is None:
+            raise RuntimeError("Firebase not available. Please configure Firebase credentials.")
+
+        slot = self.occupancy.slot
+        unscheduled: List[Dict[str, Any]] = []
+        prepared: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        for n, item in enumerate(items, start=1):
+            item_id = str(item.get('id') or f"request-{n}")
+            if item_id in prepared:
+                unscheduled.append({"id": item_id, "title": item.get('title'), "reason": "Duplicate request id"})
+                continue
+            try:
+                prepared[item_id] = (item, self._prepare_solve_item(item))
+            except Exception as e:
+                unscheduled.append({"id": item_id, "title": item.get('title'), "reason": str(e)})
+
+        scheduled: List[Dict[str, Any]] = []
+        stats = {"requested": len(items), "local_search_rounds": 0, "solve_seconds": 0.0}
+        if prepared:
+            all_windows = [window for _, spec in prepared.values() for window in spec['windows']]
+            horizon_start = min(window.start_time for window in all_windows)
+            origin = horizon_start.replace(hour=0, minute=0, second=0, microsecond=0)
+            horizon_end = max(window.end_time for window in all_windows)
+            horizon_slots = -(-(horizon_end - origin) // slot)
+            venues = sorted({venue for _, spec in prepared.values() for venue in spec['venues']})
+            solver = AutoScheduler(horizon_slots, venues)
+
+            index = await self._load_window_index([
+                TimeSlot(start_time=origin, end_time=horizon_end, venue=venue) for venue in venues
+            ])
+            for venue in venues:
+                for event in index.query(venue, origin, horizon_end):
+                    event_start, event_end = event_time_bounds(event)
+                    solver.block(venue, (event_start - origin) // slot, -(-(event_end - origin) // slot))
+
+            requests: List[PlacementRequest] = []
+            window_numbers: Dict[str, List[int]] = {}
+            for item_id, (item, spec) in prepared.items():
+                duration_slots = -(-spec['duration'] // slot)
+                windows, numbers = [], []
+                for number, window in enumerate(spec['windows']):
+                    lo = -(-(window.start_time - origin) // slot)
+                    hi = (window.end_time - origin) // slot - duration_slots
+                    if hi >= lo:
+                        windows.append((lo, hi))
+                        numbers.append(number)
+                if not windows:
+                    unscheduled.append({
+                        "id": item_id,
+                        "title": item.get('title'),
+                        "reason": f"No preferred window is long enough for {float(item['duration_hours']):g} hour(s)"
+                    })
+                    continue
+                preferred = spec['preferred_start']
+                requests.append(PlacementRequest(
+                    id=item_id,
+                    duration=duration_slots,
+                    windows=windows,
+                    venues=spec['venues'],
+                    preferred_start=round((preferred - origin) / slot) if preferred else None,
+                    priority=int(item.get('priority') or 0)
+                ))
+                window_numbers[item_id] = numbers
+
+            result = await asyncio.to_thread(solver.solve, requests, self.solve_time_limit)
+            stats.update(local_search_rounds=result.iterations, solve_seconds=round(result.elapsed_seconds, 3))
+
+            for request in requests:
+                item, spec = prepared[request.id]
+                placement = result.placements.get(request.id)
+                if placement is None:
+                    unscheduled.append({
+                        "id": request.id,
+                        "title": item.get('title'),
+                        "reason": (
+                            f"Every preferred window is booked in all {len(request.venues)} suitable venue(s)"
+                        )
+                    })
+                    continue
+                start = origin + placement.start * slot
+                scheduled.append({
+                    "id": request.id,
+                    "title": item['title'],
+                    "venue": placement.venue,
+                    "start_time": start.isoformat(),
+                    "end_time": (start + spec['duration']).isoformat(),
+                    "window": window_numbers[request.id][placement.window_rank],
+                    "venue_rank": request.venues.index(placement.venue)
+                })
+
+        if commit and scheduled:
+            rows = [
+                {
+                    "title": entry['title'],
+                    "start_time": entry['start_time'],
+                    "end_time": entry['end_time'],
+                    "venue": entry['venue'],
+                    "organizer": prepared[entry['id']][0].get('organizer'),
+                    "audience_groups": prepared[entry['id']][0].get('audience_groups'),
+                    "description": prepared[entry['id']][0].get('description'),
+                    "category": prepared[entry['id']][0].get('category'),
+                    "capacity": prepared[entry['id']][0].get('capacity')
+                }
+                for entry in scheduled
+            ]
+            report = await self.import_events(rows)
+            committed = []
+            for entry, row in zip(scheduled, report['rows']):
+                if row['status'] == "accepted":
+                    committed.append({**entry, "event_id": row.get('id')})
+                else:
+                    # Booked by someone else between planning and writing
+                    unscheduled.append({"id": entry['id'], "title": entry['title'], "reason": row.get('reason')})
+            scheduled = committed
+
+        order = {str(item.get('id') or f"request-{n}"): n for n, item in enumerate(items, start=1)}
+        scheduled.sort(key=lambda entry: order.get(entry['id'], 0))
+        unscheduled.sort(key=lambda entry: order.get(entry['id'], 0))
+        stats.update(
+            scheduled=len(scheduled),
+            unscheduled=len(unscheduled),
+            first_choice=sum(1 for entry in scheduled if entry['window'] == 0 and entry['venue_rank'] == 0)
+        )
+
+        AgentHelper.log_agent_action(
+            agent_name="SchedulerAgent",
+            action="schedule_solved",
+            details={**stats, "commit": commit}
+        )
+
+        return {"scheduled": scheduled, "unscheduled": unscheduled, "committed": commit, "stats": stats}
+
 # Global scheduler agent instance
 scheduler_agent = SchedulerAgent()
@@ -6,12 +6,13 @@ Uses intelligent filtering and LLM-powered email generation.
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 from pathlib import Path
 import os
 
 from utils.api_helpers import AgentHelper
-from utils.llm import generate_text
+from utils.llm import agenerate_text, astream_text
+from utils.llm_scheduler import LLMRateLimited
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +36,7 @@ class SponsorAgent:
             logger.error(f"Failed to load sponsors data: {e}")
             return {"sponsors": [], "event_type_mappings": {}}
     
-    # Removed direct Gemini initialization - use utils.llm.generate_text when generating emails
+    # Removed direct Gemini initialization - use utils.llm.agenerate_text when generating emails
     
     def _calculate_match_score(self, sponsor: Dict[str, Any], event_type: str, budget: float = None) -> float:
         """
@@ -158,10 +159,11 @@ class SponsorAgent:
         confidence = "high" if match_score > 0.7 else "medium" if match_score > 0.4 else "low"
         return f"{confidence} match - {', '.join(reasons)}"
     
-    def generate_outreach_email(
+    async def generate_outreach_email(
         self, 
         sponsor: Dict[str, Any], 
-        event_details: Dict[str, Any]
+        event_details: Dict[str, Any],
+        priority: str = "interactive"
     ) -> str:
         """
         Generate personalized outreach email using LLM.
@@ -169,6 +171,8 @@ class SponsorAgent:
         Args:
             sponsor: Sponsor information
             event_details: Event information including name, type, date, etc.
+            priority: LLM queue priority; "interactive" for a user waiting on
+                one email, "bulk" for batch outreach
             
         Returns:
             Personalized email content
@@ -176,7 +180,7 @@ class SponsorAgent:
         # Use generic LLM wrapper (Gemini or OpenAI) when available
         try:
             prompt = self._create_email_prompt(sponsor, event_details)
-            text = generate_text(prompt, max_tokens=800)
+            text = await agenerate_text(prompt, max_tokens=800, agent="sponsor", priority=priority)
 
             AgentHelper.log_agent_action(
                 agent_name="SponsorAgent",
@@ -190,10 +194,33 @@ class SponsorAgent:
 
             return text if text else self._generate_fallback_email(sponsor, event_details)
 
+        except LLMRateLimited:
+            raise
         except Exception as e:
             logger.error(f"Error generating email with LLM: {e}")
             return self._generate_fallback_email(sponsor, event_details)
     
+    async def stream_outreach_email(
+        self,
+        sponsor: Dict[str, Any],
+        event_details: Dict[str, Any],
+        priority: str = "interactive"
+    ) -> AsyncIterator[str]:
+        """
+        Stream the outreach email in chunks as the LLM writes it.
+        
+        Args:
+            sponsor: Sponsor information
+            event_details: Event information including name, type, date, etc.
+            priority: LLM queue priority (see generate_outreach_email)
+            
+        Yields:
+            Chunks of the email content
+        """
+        prompt = self._create_email_prompt(sponsor, event_details)
+        async for chunk in astream_text(prompt, max_tokens=800, agent="sponsor", priority=priority):
+            yield chunk
+    
     def _create_email_prompt(self, sponsor: Dict[str, Any], event_details: Dict[str, Any]) -> str:
         """Create detailed prompt for email generation"""
         contact_person = sponsor.get("contact", {}).get("contact_person", "Team")
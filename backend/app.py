@@ -1,19 +1,30 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, UploadFile, File, WebSocket
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from utils.api_helpers import APIResponse, EventValidator
+from utils.event_import import detect_format, parse_events
+from utils.live_updates import Subscription, live_updates
+from utils.llm_cache import llm_cache
+from utils.llm_resilience import provider_resilience
+from utils.llm_scheduler import LLMRateLimited, llm_scheduler
 from agents.scheduler import scheduler_agent
 from agents.flow import flow_agent, FlowRequest
 from agents.sponsor import SponsorAgent
 from agents.content import content_agent
 from agents.analytics import analytics_agent
-from database.firebase_connection import init_firebase, close_firebase
+from database.change_feed import change_feed
+from database.firebase_connection import init_firebase, close_firebase, firebase_manager
 from database.mongo_connection import init_database, close_database
 from routers.auth import router as auth_router
 from routers.events import router as events_router
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List, Union
 from datetime import datetime
+import asyncio
+import json
 import logging
+import math
 import os
 from dotenv import load_dotenv
 
@@ -43,10 +54,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(LLMRateLimited)
+async def llm_rate_limited_handler(request, exc: LLMRateLimited):
+    """An LLM call shed by the scheduler: 429 with a Retry-After hint instead of a canned template"""
+    retry_after = max(1, math.ceil(exc.retry_after or 1))
+    return JSONResponse(
+        status_code=429,
+        content={
+            "status": "error",
+            "message": str(exc),
+            "error_code": "llm_rate_limited",
+            "timestamp": datetime.utcnow().isoformat()
+        },
+        headers={"Retry-After": str(retry_after)}
+    )
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(events_router)
 
+# Push every recorded event change to live WebSocket subscribers
+change_feed.add_listener(live_updates.publish)
+
 # Startup and shutdown events
 @app.on_event("startup")
 async def startup_event():
@@ -66,6 +95,7 @@ async def startup_event():
 @app.on_event("shutdown") 
 async def shutdown_event():
     """Close database connections on shutdown"""
+    scheduler_agent.save_occupancy()
     try:
         await close_firebase()
     except Exception:
@@ -81,6 +111,12 @@ class ConflictCheckRequest(BaseModel):
     end_time: str
     venue: Optional[str] = None
     exclude_event_id: Optional[str] = None
+    # Extra double-booking dimensions, checked through their own interval indexes
+    organizer: Optional[str] = None
+    audience_groups: Optional[List[str]] = None
+
+class ConflictBatchRequest(BaseModel):
+    slots: List[ConflictCheckRequest]
 
 class EventCreateRequest(BaseModel):
     title: str
@@ -92,6 +128,43 @@ class EventCreateRequest(BaseModel):
     category: Optional[str] = None
     capacity: Optional[int] = None
     budget: Optional[float] = None
+    audience_groups: Optional[List[str]] = None
+    # RRULE (bounded by COUNT or UNTIL) for a recurring series, plus skipped occurrence starts
+    recurrence: Optional[str] = None
+    exdates: Optional[List[str]] = None
+    # Zone the RRULE is expanded in (IANA name, e.g. "Europe/Berlin"); defaults to start_time's offset
+    tzid: Optional[str] = None
+
+class EventRescheduleRequest(BaseModel):
+    start_time: str
+    end_time: str
+    venue: Optional[str] = None
+
+class TimeWindow(BaseModel):
+    start_time: str
+    end_time: str
+
+class ScheduleSolveItem(BaseModel):
+    id: Optional[str] = None
+    title: str
+    duration_hours: float
+    # Preferred windows, best first; the event must fit entirely inside one
+    windows: List[TimeWindow]
+    preferred_start: Optional[str] = None
+    capacity: Optional[int] = None
+    features: Optional[List[str]] = None
+    accessibility: Optional[List[str]] = None
+    # Acceptable venues, most preferred first (defaults to every suitable catalogued venue)
+    venues: Optional[List[str]] = None
+    priority: Optional[int] = 0
+    organizer: Optional[str] = None
+    audience_groups: Optional[List[str]] = None
+    description: Optional[str] = None
+    category: Optional[str] = None
+
+class ScheduleSolveRequest(BaseModel):
+    requests: List[ScheduleSolveItem]
+    commit: bool = False
 
 # FlowAgent request model
 class FlowGenerationRequest(BaseModel):
@@ -147,11 +220,13 @@ async def check_conflict(request: ConflictCheckRequest):
     """
     try:
         # Use the scheduler agent to check conflicts
-        conflict_result = scheduler_agent.check_conflict(
+        conflict_result = await scheduler_agent.check_conflict(
             start_time=request.start_time,
             end_time=request.end_time,
             venue=request.venue,
-            exclude_event_id=request.exclude_event_id
+            exclude_event_id=request.exclude_event_id,
+            organizer=request.organizer,
+            audience_groups=request.audience_groups
         )
         
         if conflict_result.status == "ERROR":
@@ -163,6 +238,8 @@ async def check_conflict(request: ConflictCheckRequest):
             response_data["conflicting_event"] = conflict_result.conflicting_event
             if conflict_result.conflicting_events:
                 response_data["conflicting_events"] = conflict_result.conflicting_events
+            if conflict_result.dimension_conflicts:
+                response_data["dimension_conflicts"] = conflict_result.dimension_conflicts
         
         response_data["message"] = conflict_result.message
         
@@ -174,12 +251,76 @@ async def check_conflict(request: ConflictCheckRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Conflict check failed: {str(e)}")
 
+@app.post("/check_conflict/batch")
+async def check_conflict_batch(request: ConflictBatchRequest):
+    """
+    Check many candidate time slots in one request.
+    The calendar is loaded once for the whole batch.
+    
+    Returns:
+        - {"results": [...]} with one conflict check result per slot, in request order
+    """
+    try:
+        conflict_results = await scheduler_agent.check_conflicts_bulk(
+            [slot.model_dump() for slot in request.slots]
+        )
+        
+        results = []
+        for conflict_result in conflict_results:
+            result_data = {"status": conflict_result.status}
+            if conflict_result.status == "CLASH":
+                result_data["conflicting_event"] = conflict_result.conflicting_event
+                if conflict_result.conflicting_events:
+                    result_data["conflicting_events"] = conflict_result.conflicting_events
+                if conflict_result.dimension_conflicts:
+                    result_data["dimension_conflicts"] = conflict_result.dimension_conflicts
+            result_data["message"] = conflict_result.message
+            results.append(result_data)
+        
+        clashes = sum(1 for r in results if r["status"] == "CLASH")
+        return APIResponse.success(
+            data={"results": results},
+            message=f"Checked {len(results)} time slots: {clashes} clash(es)"
+        )
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch conflict check failed: {str(e)}")
+
+@app.post("/api/schedule/snapshot/overlaps")
+async def snapshot_overlaps(request: ConflictBatchRequest):
+    """
+    Count the scheduled events overlapping each slot using the columnar calendar snapshot.
+    Slots without a venue are checked against every venue.
+    
+    Returns:
+        - {"results": [...]} with status and overlap count per slot, in request order
+    """
+    try:
+        counts = await scheduler_agent.snapshot_overlap_counts([slot.model_dump() for slot in request.slots])
+        results = [
+            {"status": "CLASH" if count else "CLEAR", "overlaps": count}
+            for count in counts
+        ]
+        clashes = sum(1 for count in counts if count)
+        return APIResponse.success(
+            data={"results": results},
+            message=f"Checked {len(results)} time slots: {clashes} clash(es)"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Snapshot overlap check failed: {str(e)}")
+
 @app.get("/check_conflict")
 async def check_conflict_get(
     start_time: str = Query(..., description="Event start time (ISO format)"),
     end_time: str = Query(..., description="Event end time (ISO format)"), 
     venue: Optional[str] = Query(None, description="Event venue"),
-    exclude_event_id: Optional[str] = Query(None, description="Event ID to exclude from check")
+    exclude_event_id: Optional[str] = Query(None, description="Event ID to exclude from check"),
+    organizer: Optional[str] = Query(None, description="Organizer that must not be double-booked"),
+    audience_groups: Optional[List[str]] = Query(None, description="Audience groups that must not be double-booked")
 ):
     """
     GET version of conflict check for easy testing via browser/curl.
@@ -188,7 +329,9 @@ async def check_conflict_get(
         start_time=start_time,
         end_time=end_time,
         venue=venue,
-        exclude_event_id=exclude_event_id
+        exclude_event_id=exclude_event_id,
+        organizer=organizer,
+        audience_groups=audience_groups
     )
     return await check_conflict(request)
 
@@ -208,7 +351,7 @@ async def create_event(request: EventCreateRequest):
             })
         
         # Create event using scheduler agent
-        created_event = scheduler_agent.create_event(event_data)
+        created_event = await scheduler_agent.create_event(event_data)
         
         return APIResponse.success(
             data=created_event,
@@ -220,20 +363,354 @@ async def create_event(request: EventCreateRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create event: {str(e)}")
 
+@app.post("/api/schedule/events/{event_id}/reschedule")
+async def reschedule_event(event_id: str, request: EventRescheduleRequest):
+    """Move a scheduled event (or a whole series) to a new slot with conflict validation"""
+    try:
+        updated_event = await scheduler_agent.reschedule_event(
+            event_id,
+            start_time=request.start_time,
+            end_time=request.end_time,
+            venue=request.venue
+        )
+        return APIResponse.success(
+            data=updated_event,
+            message="Event rescheduled successfully"
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to reschedule event: {str(e)}")
+
+@app.post("/api/schedule/events/{event_id}/cancel")
+async def cancel_event(event_id: str):
+    """Cancel a scheduled event and free its venue bookings"""
+    try:
+        result = await scheduler_agent.cancel_event(event_id)
+        return APIResponse.success(
+            data=result,
+            message="Event cancelled successfully"
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to cancel event: {str(e)}")
+
+@app.post("/api/events/import")
+async def import_events(
+    file: UploadFile = File(..., description="CSV, JSON or ICS file of events"),
+    format: Optional[str] = Query(None, description="csv, json or ics (defaults to the file extension)"),
+    dry_run: bool = Query(False, description="Report conflicts without writing any events")
+):
+    """
+    Bulk import events.
+    Rows are checked against stored events and each other in one pass and
+    accepted rows are written in batches.
+    
+    Returns:
+        - Summary counts and a per-row accept/reject report
+    """
+    try:
+        fmt = format or detect_format(file.filename)
+        if not fmt:
+            raise ValueError("Could not detect import format, pass ?format=csv|json|ics")
+        content = (await file.read()).decode("utf-8-sig")
+        rows = parse_events(content, fmt)
+        
+        import_report = await scheduler_agent.import_events(rows, dry_run=dry_run)
+        
+        return APIResponse.success(
+            data=import_report,
+            message=f"Imported {import_report['accepted']} of {import_report['total']} events"
+            if not dry_run else f"{import_report['accepted']} of {import_report['total']} events can be imported"
+        )
+        
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to import events: {str(e)}")
+
+@app.get("/api/schedule/replica")
+async def events_replica_metrics():
+    """Size, lag and listener status of the in-memory events replica"""
+    replica = firebase_manager.events_replica
+    if replica is None:
+        return APIResponse.success(
+            data={"enabled": False},
+            message="Events replica is disabled"
+        )
+    return APIResponse.success(
+        data={"enabled": True, **replica.metrics()},
+        message="Events replica metrics"
+    )
+
+def _live_subscription(
+    venues: Optional[List[str]] = None,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    source: Optional[str] = None
+) -> Subscription:
+    if source not in (None, "firestore", "store"):
+        raise ValueError("source must be 'firestore' or 'store'")
+    return Subscription(
+        venues=frozenset(venues) if venues else None,
+        start=scheduler_agent.parse_datetime(start_time) if start_time else None,
+        end=scheduler_agent.parse_datetime(end_time) if end_time else None,
+        source=source
+    )
+
+@app.websocket("/ws/calendar")
+async def calendar_updates(
+    websocket: WebSocket,
+    venue: Optional[List[str]] = Query(None),
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    source: Optional[str] = None
+):
+    """
+    Push bookings, reschedules and cancellations as they happen.
+    Subscribe with query parameters (venue may repeat; omit to watch all
+    venues) or later by sending {"action": "subscribe", "venues": [...],
+    "start_time": ..., "end_time": ..., "source": ...}.
+    
+    Messages:
+        - {"type": "subscribed", "version": N} after each subscription
+        - {"type": "changes", "version": N, "changes": [...]}, latest change per event
+        - {"type": "resync", "version": N} when the client fell too far
+          behind; refetch via /api/events/changes
+    """
+    try:
+        subscription = _live_subscription(venue, start_time, end_time, source)
+    except Exception as e:
+        await websocket.close(code=1008, reason=str(e)[:120])
+        return
+
+    await websocket.accept()
+
+    async def send(message):
+        await websocket.send_json(jsonable_encoder(message))
+
+    # Register before reading the version so no change falls between the two
+    connection = live_updates.connect(send, subscription)
+    try:
+        await send({"type": "subscribed", "version": change_feed.version})
+    except Exception:
+        live_updates.disconnect(connection)
+        return
+
+    async def receive_subscriptions():
+        while True:
+            message = await websocket.receive_json()
+            if not isinstance(message, dict) or message.get("action") != "subscribe":
+                continue
+            try:
+                live_updates.subscribe(connection, _live_subscription(
+                    message.get("venues"), message.get("start_time"), message.get("end_time"), message.get("source")
+                ))
+                await send({"type": "subscribed", "version": change_feed.version})
+            except (ValueError, TypeError) as e:
+                await send({"type": "error", "message": str(e)})
+
+    sender = asyncio.create_task(connection.run())
+    receiver = asyncio.create_task(receive_subscriptions())
+    try:
+        done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        errors = {task: task.exception() for task in done}
+        if errors.get(sender) is not None:
+            logger.info(f"Closing live updates connection: {errors[sender]!r}")
+            await websocket.close(code=1013)
+    except Exception:
+        pass
+    finally:
+        live_updates.disconnect(connection)
+        for task in (sender, receiver):
+            task.cancel()
+
+@app.get("/api/schedule/live")
+async def live_updates_metrics():
+    """Connections and delivery counters of the /ws/calendar push channel"""
+    return APIResponse.success(
+        data=live_updates.stats(),
+        message="Live updates metrics"
+    )
+
+@app.get("/api/schedule/clashes")
+async def schedule_clashes(
+    from_time: str = Query(..., alias="from", description="Range start (ISO format)"),
+    to_time: str = Query(..., alias="to", description="Range end (ISO format)"),
+    venue: Optional[str] = Query(None, description="Only report this venue"),
+    stream: bool = Query(False, description="Stream clash groups as NDJSON, one group per line")
+):
+    """
+    Report every double-booking in a date range.
+    
+    Returns:
+        - {"clashes": [...]} with one entry per group of overlapping events per venue,
+          or an NDJSON stream of the same entries when stream=true
+    """
+    try:
+        groups = await scheduler_agent.find_clashes(from_time, to_time, venue=venue)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Clash report failed: {str(e)}")
+
+    if stream:
+        def ndjson():
+            for group in groups:
+                yield json.dumps(jsonable_encoder(group)) + "\n"
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    clashes = list(groups)
+    return APIResponse.success(
+        data={"clashes": clashes},
+        message=f"Found {len(clashes)} clash group(s)"
+    )
+
+@app.get("/api/schedule/occupancy")
+async def venue_occupancy(
+    venue: str = Query(..., description="Venue name"),
+    date: str = Query(..., description="Day (ISO format, UTC)")
+):
+    """Slot-by-slot availability grid for a venue on one day"""
+    try:
+        grid = await scheduler_agent.venue_occupancy(venue, date)
+        return APIResponse.success(
+            data=grid,
+            message=f"{grid['slots'].count('1')} of {len(grid['slots'])} slots booked"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load occupancy: {str(e)}")
+
+@app.get("/api/schedule/free_venues")
+async def free_venues(
+    start_time: str = Query(..., description="Start time (ISO format)"),
+    end_time: str = Query(..., description="End time (ISO format)")
+):
+    """Venues with nothing booked in the given time range"""
+    try:
+        venues = await scheduler_agent.free_venues(start_time, end_time)
+        return APIResponse.success(
+            data={"venues": venues},
+            message=f"{len(venues)} venue(s) free"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to find free venues: {str(e)}")
+
+@app.get("/api/schedule/first_free")
+async def first_free_block(
+    venue: str = Query(..., description="Venue name"),
+    from_time: str = Query(..., alias="from", description="Search window start (ISO format)"),
+    to_time: str = Query(..., alias="to", description="Search window end (ISO format)"),
+    duration_hours: float = Query(..., description="Block length in hours")
+):
+    """Earliest free block of the given length for a venue"""
+    try:
+        block = await scheduler_agent.first_free_block(venue, from_time, to_time, duration_hours)
+        return APIResponse.success(
+            data={"block": block},
+            message="Free block found" if block else "No free block in the window"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to find a free block: {str(e)}")
+
+@app.get("/api/venues")
+async def list_venues():
+    """The venue catalog with capacities, features and accessibility options"""
+    catalog = scheduler_agent.venue_catalog
+    return APIResponse.success(
+        data={
+            "venues": catalog.venues(),
+            "features": catalog.features(),
+            "accessibility": catalog.accessibility_options()
+        },
+        message=f"{len(catalog)} venue(s) in the catalog"
+    )
+
+@app.get("/api/venues/search")
+async def search_venues(
+    min_capacity: Optional[int] = Query(None, description="Minimum capacity"),
+    features: Optional[List[str]] = Query(None, description="Required features, e.g. projector (repeatable)"),
+    accessibility: Optional[List[str]] = Query(None, description="Required accessibility options, e.g. wheelchair (repeatable)"),
+    from_time: Optional[str] = Query(None, alias="from", description="Must be free from (ISO format)"),
+    to_time: Optional[str] = Query(None, alias="to", description="Must be free until (ISO format)")
+):
+    """Venues meeting the requirements, and free for the range when from/to are given"""
+    try:
+        venues = await scheduler_agent.find_venues(
+            min_capacity=min_capacity,
+            features=features,
+            accessibility=accessibility,
+            start_time=from_time,
+            end_time=to_time
+        )
+        return APIResponse.success(
+            data={"venues": venues},
+            message=f"Found {len(venues)} matching venue(s)"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to search venues: {str(e)}")
+
+@app.post("/api/schedule/solve")
+async def solve_schedule(request: ScheduleSolveRequest):
+    """
+    Place a batch of event requests into venues and start times without clashes.
+    With commit=true the placed events are created.
+    
+    Returns:
+        - {"scheduled": [...], "unscheduled": [{"id", "reason"}], "stats": {...}}
+    """
+    try:
+        result = await scheduler_agent.solve_schedule(
+            [item.model_dump() for item in request.requests],
+            commit=request.commit
+        )
+        stats = result["stats"]
+        return APIResponse.success(
+            data=result,
+            message=f"Scheduled {stats['scheduled']} of {stats['requested']} request(s)"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to solve schedule: {str(e)}")
+
 @app.post("/api/schedule/suggest")
 async def suggest_alternative_times(
     preferred_start: str = Query(..., description="Preferred start time (ISO format)"),
     duration_hours: float = Query(..., description="Event duration in hours"),
     venue: Optional[str] = Query(None, description="Event venue"),
-    max_suggestions: int = Query(3, description="Maximum suggestions to return")
+    max_suggestions: int = Query(3, description="Maximum suggestions to return"),
+    working_hours: Optional[str] = Query(None, description="Working hours as HH:MM-HH:MM (defaults to SCHEDULER_WORKING_HOURS)")
 ):
-    """Suggest alternative time slots if preferred time has conflicts"""
+    """Suggest the free time slots closest to the preferred start"""
     try:
-        suggestions = scheduler_agent.suggest_alternative_times(
+        suggestions = await scheduler_agent.suggest_alternative_times(
             preferred_start=preferred_start,
             duration_hours=duration_hours,
             venue=venue,
-            max_suggestions=max_suggestions
+            max_suggestions=max_suggestions,
+            working_hours=working_hours
         )
         
         return APIResponse.success(
@@ -241,6 +718,8 @@ async def suggest_alternative_times(
             message=f"Found {len(suggestions)} alternative time slots"
         )
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to suggest times: {str(e)}")
 
@@ -261,7 +740,7 @@ async def generate_flow(request: FlowGenerationRequest):
         )
         
         # Generate flow using FlowAgent
-        flow_response = flow_agent.generate_flow(flow_request)
+        flow_response = await flow_agent.generate_flow(flow_request)
         
         return APIResponse.success(
             data={
@@ -275,6 +754,8 @@ async def generate_flow(request: FlowGenerationRequest):
             message="Event flow generated successfully"
         )
         
+    except LLMRateLimited:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -302,6 +783,53 @@ async def generate_flow_get(
     )
     return await generate_flow(request)
 
+def _flow_request(request: FlowGenerationRequest) -> FlowRequest:
+    return FlowRequest(
+        event_name=request.event_name,
+        event_type=request.event_type,
+        duration=request.duration,
+        audience_size=request.audience_size,
+        budget_range=request.budget_range,
+        venue_type=request.venue_type,
+        special_requirements=request.special_requirements,
+        additional_context=request.additional_context
+    )
+
+@app.post("/api/flow/stream")
+async def stream_flow(request: FlowGenerationRequest):
+    """
+    Flow Agent - Stream the generated itinerary as server-sent events.
+    
+    Returns:
+        - text/event-stream with `start`, `chunk` ({"text": ...}) and `done` or `error` events
+    """
+    try:
+        chunks = flow_agent.stream_flow(_flow_request(request))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return APIResponse.event_stream(chunks, {"event_name": request.event_name, "event_type": request.event_type})
+
+@app.get("/api/flow/stream")
+async def stream_flow_get(
+    event_name: str = Query(..., description="Name of the event"),
+    event_type: str = Query(..., description="Type of event (e.g., academic_conference, cultural_festival)"),
+    duration: float = Query(..., description="Event duration in hours"),
+    audience_size: int = Query(100, description="Expected number of attendees"),
+    budget_range: str = Query("Medium", description="Budget range (Low/Medium/High)"),
+    venue_type: str = Query("Indoor campus facility", description="Type of venue"),
+    special_requirements: str = Query("None", description="Special requirements or constraints")
+):
+    """GET version of flow streaming for browser EventSource clients"""
+    return await stream_flow(FlowGenerationRequest(
+        event_name=event_name,
+        event_type=event_type,
+        duration=duration,
+        audience_size=audience_size,
+        budget_range=budget_range,
+        venue_type=venue_type,
+        special_requirements=special_requirements
+    ))
+
 @app.get("/api/flow/types")
 async def get_event_types():
     """Get supported event types with descriptions"""
@@ -331,8 +859,10 @@ async def flow_agent_health():
 async def generate_flow_frontend(request: FlowRequest):
     """Generate event flow - Frontend compatible endpoint"""
     try:
-        response = flow_agent.generate_flow(request)
+        response = await flow_agent.generate_flow(request)
         return response
+    except LLMRateLimited:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -368,40 +898,48 @@ async def generate_content_frontend(request: ContentRequest):
         # Always generate at least one piece of content
         if not request.social_platforms:
             # Default to general content if no platforms specified
-            general_content = content_agent.generate_social_post(
+            general_content = await content_agent.generate_social_post(
                 event=event_data,
                 platform="general",
                 length=500
             )
             generated_content_parts.append(f"## General Marketing Content\n\n{general_content}")
         else:
-            # Generate content for each selected platform
-            for platform in request.social_platforms:
-                try:
-                    if platform.lower() in ["twitter", "instagram", "linkedin", "facebook", "tiktok"]:
-                        social_content = content_agent.generate_social_post(
-                            event=event_data,
-                            platform=platform.lower(),
-                            length=280 if platform.lower() == "twitter" else 500
-                        )
-                        generated_content_parts.append(f"## {platform.title()} Content\n\n{social_content}")
-                    elif platform.lower() == "email":
-                        email_content = content_agent.generate_email(
-                            event=event_data, 
-                            tone=request.brand_tone
-                        )
-                        generated_content_parts.append(f"## Email Content\n\n{email_content}")
-                    else:
-                        # Generic content for other platforms
-                        generic_content = content_agent.generate_social_post(
-                            event=event_data,
-                            platform="general",
-                            length=500
-                        )
-                        generated_content_parts.append(f"## {platform.title()} Content\n\n{generic_content}")
-                except Exception as e:
-                    logger.warning(f"Error generating content for {platform}: {e}")
+            # Generate content for each selected platform, all platforms concurrently
+            async def generate_for(platform: str) -> str:
+                if platform.lower() in ["twitter", "instagram", "linkedin", "facebook", "tiktok"]:
+                    social_content = await content_agent.generate_social_post(
+                        event=event_data,
+                        platform=platform.lower(),
+                        length=280 if platform.lower() == "twitter" else 500
+                    )
+                    return f"## {platform.title()} Content\n\n{social_content}"
+                elif platform.lower() == "email":
+                    email_content = await content_agent.generate_email(
+                        event=event_data, 
+                        tone=request.brand_tone
+                    )
+                    return f"## Email Content\n\n{email_content}"
+                else:
+                    # Generic content for other platforms
+                    generic_content = await content_agent.generate_social_post(
+                        event=event_data,
+                        platform="general",
+                        length=500
+                    )
+                    return f"## {platform.title()} Content\n\n{generic_content}"
+
+            results = await asyncio.gather(
+                *(generate_for(platform) for platform in request.social_platforms),
+                return_exceptions=True
+            )
+            for platform, result in zip(request.social_platforms, results):
+                if isinstance(result, LLMRateLimited):
+                    raise result
+                if isinstance(result, Exception):
+                    logger.warning(f"Error generating content for {platform}: {result}")
                     continue
+                generated_content_parts.append(result)
         
         # Combine all content
         if not generated_content_parts:
@@ -447,6 +985,8 @@ Get ready for an amazing {request.event_type}! Join us for {request.event_name}
         logger.info(f"Content generation successful for {request.event_name}")
         return response
         
+    except LLMRateLimited:
+        raise
     except Exception as e:
         logger.error(f"Content generation error: {e}")
         # Return a fallback response instead of failing
@@ -510,9 +1050,10 @@ async def recommend_sponsors(request: SponsorRecommendationRequest):
         }
 
         # Generate outreach email using LLM
-        outreach_email = sponsor_agent.generate_outreach_email(
+        outreach_email = await sponsor_agent.generate_outreach_email(
             sponsor=recommendations[0]['sponsor'] if recommendations else {},
-            event_details=event_details
+            event_details=event_details,
+            priority="interactive"
         )
         
         return APIResponse.success(
@@ -525,11 +1066,44 @@ async def recommend_sponsors(request: SponsorRecommendationRequest):
             message=f"Found {len(recommendations)} sponsor recommendations"
         )
         
+    except LLMRateLimited:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Sponsor recommendation failed: {str(e)}")
+
+@app.post("/api/sponsors/stream")
+async def stream_sponsor_outreach(request: SponsorRecommendationRequest):
+    """
+    Sponsor Agent - Stream the outreach email for the best matching sponsor
+    as server-sent events. The `start` event names the sponsor.
+    """
+    try:
+        recommendations = sponsor_agent.get_sponsor_recommendations(
+            event_type=request.event_type,
+            event_name=request.event_name,
+            budget=request.budget_range,
+            location=None,
+            max_recommendations=1
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Sponsor recommendation failed: {str(e)}")
 
+    sponsor = recommendations[0]['sponsor'] if recommendations else {}
+    event_details = {
+        "event_name": request.event_name or f"{request.event_type.replace('_', ' ').title()} Event",
+        "event_type": request.event_type,
+        "expected_attendance": request.audience_size,
+        "objectives": request.additional_context or ""
+    }
+    return APIResponse.event_stream(
+        sponsor_agent.stream_outreach_email(sponsor=sponsor, event_details=event_details, priority="interactive"),
+        {"sponsor": sponsor.get("name"), "event_type": request.event_type}
+    )
+
 @app.get("/get_sponsors")
 async def get_sponsors(
     event_type: str = Query(..., description="Type of event (e.g., academic_conference, cultural_festival)"),
@@ -560,6 +1134,33 @@ async def sponsor_agent_health():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Sponsor health check failed: {str(e)}")
 
+class ContentStreamRequest(BaseModel):
+    content_type: str  # email, social or banner
+    event: dict
+    tone: Optional[str] = "professional"
+    length: Optional[Union[str, int]] = None
+    platform: Optional[str] = "twitter"
+    size: Optional[str] = "hero"
+
+@app.post("/api/content/stream")
+async def stream_content(request: ContentStreamRequest):
+    """
+    Content Agent - Stream an email, social post or banner as server-sent events.
+    """
+    if request.content_type == "email":
+        chunks = content_agent.stream_email(request.event, tone=request.tone, length=str(request.length or "short"))
+    elif request.content_type == "social":
+        try:
+            length = int(request.length or 280)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="length must be a number of characters for social posts")
+        chunks = content_agent.stream_social_post(request.event, platform=request.platform, length=length)
+    elif request.content_type == "banner":
+        chunks = content_agent.stream_banner_text(request.event, size=request.size)
+    else:
+        raise HTTPException(status_code=400, detail="content_type must be email, social or banner")
+    return APIResponse.event_stream(chunks, {"content_type": request.content_type, "title": request.event.get("title")})
+
 @app.post("/api/content")
 async def generate_content(request: dict):
     """Enhanced content generation endpoint with multiple content types.
@@ -594,18 +1195,18 @@ async def generate_content(request: dict):
             if content_type == "email":
                 tone = request.get("tone", "professional")
                 length = request.get("length", "short")
-                result = content_agent.generate_email(event, tone=tone, length=length)
+                result = await content_agent.generate_email(event, tone=tone, length=length)
                 return APIResponse.success(data={"content": result}, message="Email generated")
             
             elif content_type == "social":
                 platform = request.get("platform", "twitter")
                 length = request.get("length", 280)
-                result = content_agent.generate_social_post(event, platform=platform, length=length)
+                result = await content_agent.generate_social_post(event, platform=platform, length=length)
                 return APIResponse.success(data={"content": result}, message="Social post generated")
             
             elif content_type == "banner":
                 size = request.get("size", "hero")
-                result = content_agent.generate_banner_text(event, size=size)
+                result = await content_agent.generate_banner_text(event, size=size)
                 return APIResponse.success(data={"content": result}, message="Banner text generated")
         
         # New enhanced content generation
@@ -638,6 +1239,8 @@ async def generate_content(request: dict):
             message=f"{content_type.title()} content generated successfully"
         )
         
+    except LLMRateLimited:
+        raise
     except ValueError as e:
         return APIResponse.error(f"Invalid request: {e}", status_code=400)
     except Exception as e:
@@ -705,6 +1308,39 @@ async def content_health():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Content health check failed: {str(e)}")
 
+@app.get("/api/llm/cache")
+async def llm_cache_metrics():
+    """Hit/miss counters and size of the LLM response cache"""
+    return APIResponse.success(
+        data=await llm_cache.astats(),
+        message="LLM cache metrics"
+    )
+
+@app.delete("/api/llm/cache")
+async def clear_llm_cache():
+    """Drop every cached LLM generation, e.g. after changing prompts"""
+    try:
+        await llm_cache.aclear()
+        return APIResponse.success(message="LLM cache cleared")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to clear LLM cache: {str(e)}")
+
+@app.get("/api/llm/providers")
+async def llm_provider_health():
+    """Circuit breaker state, retry and failover counts per LLM provider"""
+    return APIResponse.success(
+        data=provider_resilience.stats(),
+        message="LLM provider health"
+    )
+
+@app.get("/api/llm/queue")
+async def llm_queue_metrics():
+    """Rate limit headroom, queue depth, wait times and rejections per LLM provider"""
+    return APIResponse.success(
+        data=llm_scheduler.stats(),
+        message="LLM queue metrics"
+    )
+
 # Additional event management endpoints
 @app.get("/api/events")
 async def get_events():
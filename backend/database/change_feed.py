@@ -0,0 +1,146 @@
+"""
+Versioned change feed for events.
+Every create, update, reschedule, cancel or delete of an event, in Firestore
+or in the router's in-memory store, is recorded with a monotonically
+increasing version so clients can fetch only what changed since the
+version they last saw.
+
+The feed is process-local and bounded; `epoch` identifies this process's
+version sequence, so clients holding a version from another epoch, or one
+older than the retained history, are told to reset and refetch.
+"""
+
+import logging
+import os
+import threading
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHANGE_TYPES = ("created", "updated", "rescheduled", "cancelled", "deleted")
+
+
+def _revision(value: Any) -> Any:
+    """Comparable form of a signature; naive datetimes (datetime.utcnow()) are UTC"""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return value
+
+
+class ChangeFeed:
+    """Bounded, thread-safe log of event changes"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.epoch = uuid.uuid4().hex[:12]
+        self._entries: deque = deque(maxlen=max_entries)
+        self._version = 0
+        # Last (type, signature) recorded per (source, id), to drop duplicate reports
+        self._last: Dict[Tuple[str, str], Tuple[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Call `listener(change)` after every recorded change, on the recording thread"""
+        self._listeners.append(listener)
+
+    def record(
+        self,
+        source: str,
+        change_type: str,
+        event_id: str,
+        event: Optional[Dict[str, Any]] = None,
+        signature: Any = None
+    ) -> Optional[int]:
+        """
+        Append a change and return its version.
+
+        Args:
+            source: "firestore" or "store"
+            change_type: One of CHANGE_TYPES
+            event_id: ID of the changed event
+            event: Event data after the change (last known data for deletes)
+            signature: Value identifying this revision (e.g. updated_at); a
+                second report of the same revision is dropped and None returned
+        """
+        if change_type not in CHANGE_TYPES:
+            raise ValueError(f"Unknown change type: {change_type}")
+        key = (source, event_id)
+        signature = _revision(signature)
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None:
+                if signature is not None and last[1] == signature:
+                    return None
+                if change_type in ("cancelled", "deleted") and last[0] == change_type:
+                    return None
+            self._version += 1
+            entry = {
+                "version": self._version,
+                "source": source,
+                "type": change_type,
+                "id": event_id,
+                "event": dict(event) if event is not None else None,
+                "recorded_at": datetime.now(timezone.utc).isoformat()
+            }
+            self._entries.append(entry)
+            self._last[key] = (change_type, signature)
+
+        for listener in self._listeners:
+            try:
+                listener(entry)
+            except Exception as e:
+                logger.warning(f"Change feed listener failed for {event_id}: {e}")
+        return entry["version"]
+
+    def since(self, version: int, limit: int = 500, source: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Changes after `version`, keeping only the latest change per event.
+
+        Returns:
+            Dict with the feed's epoch and current version, the changes in
+            version order, `has_more` when limit cut them short, and `reset`
+            when the client's version is no longer covered and it must refetch
+        """
+        with self._lock:
+            current = self._version
+            oldest = self._entries[0]["version"] if self._entries else current + 1
+            if version > current or version < oldest - 1:
+                return {"epoch": self.epoch, "version": current, "changes": [], "has_more": False, "reset": True}
+
+            latest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+            for entry in self._entries:
+                if entry["version"] <= version or (source and entry["source"] != source):
+                    continue
+                key = (entry["source"], entry["id"])
+                latest.pop(key, None)
+                latest[key] = entry
+
+        changes = list(latest.values())
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        return {
+            "epoch": self.epoch,
+            # Resume from the last returned change when the page was cut short
+            "version": changes[-1]["version"] if has_more else current,
+            "changes": changes,
+            "has_more": has_more,
+            "reset": False
+        }
+
+    def record_firestore_change(self, change_kind: str, event_id: str, event: Optional[Dict[str, Any]]) -> None:
+        """Listener for EventsReplica changes (ADDED, MODIFIED or REMOVED)"""
+        change_type = {"ADDED": "created", "MODIFIED": "updated"}.get(change_kind, "cancelled")
+        self.record("firestore", change_type, event_id, event, (event or {}).get('updated_at'))
+
+
+# Global change feed instance
+change_feed = ChangeFeed(max_entries=int(os.getenv("EVENTS_CHANGE_FEED_SIZE", "10000")))
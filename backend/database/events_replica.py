@@ -0,0 +1,159 @@
+"""
+Process-local replica of scheduled events for Apokria.
+Kept up to date by a Firestore snapshot listener so agents can read the
+calendar without issuing Firestore queries.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.calendar_index import CalendarIndex, event_time_bounds
+
+logger = logging.getLogger(__name__)
+
+class EventsReplica:
+    """Scheduled events mirrored from Firestore via `on_snapshot`"""
+
+    def __init__(self, restart_backoff_seconds: float = 30.0):
+        self.index = CalendarIndex()
+        self.restart_backoff_seconds = restart_backoff_seconds
+        self._collection = None
+        self._watch = None
+        self._lock = threading.Lock()
+        self._started_at: Optional[float] = None
+        self._last_snapshot_at: Optional[float] = None
+        self._lag_seconds: Optional[float] = None
+        self._snapshots = 0
+        self._changes_applied = 0
+        self._restarts = 0
+        self._invalid_documents = 0
+        self._listeners: List[Callable[[str, str, Optional[Dict[str, Any]]], None]] = []
+
+    def add_listener(self, listener: Callable[[str, str, Optional[Dict[str, Any]]], None]) -> None:
+        """
+        Call `listener(change_type, event_id, event)` for every incremental
+        change (ADDED, MODIFIED or REMOVED, with the document's latest data).
+        The initial load after (re)attaching is not reported.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, change_type: str, event_id: str, event: Optional[Dict[str, Any]]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(change_type, event_id, event)
+            except Exception as e:
+                logger.warning(f"Events replica listener failed for {event_id}: {e}")
+
+    def start(self, collection) -> None:
+        """Attach the snapshot listener to the events collection"""
+        with self._lock:
+            if self._watch is not None:
+                self._watch.unsubscribe()
+            self._collection = collection
+            # The first snapshot after (re)attaching reloads the whole index
+            self.index.clear()
+            self._started_at = time.monotonic()
+            self._watch = collection.where('status', '==', 'scheduled').on_snapshot(self._on_snapshot)
+        logger.info("Events replica listener attached")
+
+    def stop(self) -> None:
+        """Detach the snapshot listener"""
+        with self._lock:
+            if self._watch is not None:
+                self._watch.unsubscribe()
+                self._watch = None
+        logger.info("Events replica listener detached")
+
+    @property
+    def is_active(self) -> bool:
+        """True while the listener is streaming and the initial snapshot has arrived"""
+        watch = self._watch
+        return watch is not None and watch.is_active and self.index.is_loaded
+
+    def ensure_running(self) -> bool:
+        """Re-attach a dropped listener, at most once per backoff period. Returns is_active."""
+        if self.is_active or self._collection is None:
+            return self.is_active
+        watch = self._watch
+        if watch is not None and watch.is_active:
+            # Still waiting for the initial snapshot
+            return False
+        if self._started_at is not None and time.monotonic() - self._started_at < self.restart_backoff_seconds:
+            return False
+        logger.warning("Events replica listener disconnected, re-attaching")
+        self._restarts += 1
+        try:
+            self.start(self._collection)
+        except Exception as e:
+            logger.error(f"Failed to re-attach events replica listener: {e}")
+        return False
+
+    def _document_to_event(self, document) -> Optional[Dict[str, Any]]:
+        event_data = document.to_dict() or {}
+        event_data['id'] = document.id
+        try:
+            event_time_bounds(event_data)
+        except Exception as e:
+            logger.warning(f"Skipping event {document.id} with invalid times: {e}")
+            self._invalid_documents += 1
+            return None
+        return event_data
+
+    def _on_snapshot(self, docs, changes, read_time) -> None:
+        """Snapshot callback; runs on the listener's background thread"""
+        try:
+            if not self.index.is_loaded:
+                events = [e for e in (self._document_to_event(d) for d in docs) if e is not None]
+                self.index.load(events)
+                applied = len(events)
+            else:
+                applied = 0
+                for change in changes:
+                    if change.type.name == 'REMOVED':
+                        self.index.remove(change.document.id)
+                        removed = change.document.to_dict() or {}
+                        self._notify('REMOVED', change.document.id, {**removed, 'id': change.document.id})
+                    else:
+                        event_data = self._document_to_event(change.document)
+                        if event_data is None:
+                            self.index.remove(change.document.id)
+                        else:
+                            self.index.add(event_data)
+                            self._notify(change.type.name, change.document.id, dict(event_data))
+                    applied += 1
+
+            self._snapshots += 1
+            self._changes_applied += applied
+            self._last_snapshot_at = time.time()
+            if read_time is not None and hasattr(read_time, 'timestamp'):
+                self._lag_seconds = max(0.0, self._last_snapshot_at - read_time.timestamp())
+        except Exception as e:
+            logger.error(f"Failed to apply events snapshot: {e}")
+
+    @property
+    def generation(self) -> int:
+        """Number of snapshots applied; changes whenever the replica does"""
+        return self._snapshots
+
+    def events(self) -> List[Dict[str, Any]]:
+        """Copies of every replicated event"""
+        return [dict(event) for event in self.index.events()]
+
+    def metrics(self) -> Dict[str, Any]:
+        """Replica size, lag and listener status for monitoring"""
+        now = time.time()
+        return {
+            "active": self.is_active,
+            "events": len(self.index),
+            "venues": len(self.index.venues()),
+            "lag_seconds": self._lag_seconds,
+            "seconds_since_last_snapshot": (
+                now - self._last_snapshot_at if self._last_snapshot_at is not None else None
+            ),
+            "snapshots_received": self._snapshots,
+            "changes_applied": self._changes_applied,
+            "invalid_documents": self._invalid_documents,
+            "restarts": self._restarts
+        }
@@ -6,11 +6,17 @@ Handles Firestore database operations and authentication.
 import os
 import json
 import firebase_admin
-from firebase_admin import credentials, firestore
-from typing import Optional, Dict, Any
+from firebase_admin import credentials, firestore, firestore_async
+from typing import Optional, Dict, Any, List
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from urllib.parse import quote
+
+from database.change_feed import change_feed
+from database.events_replica import EventsReplica
+from utils.calendar_index import event_span, expand_event
+from utils.recurrence import as_utc, build_rule, resolve_zone, series_end, zone_name
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +26,10 @@ class FirebaseManager:
     def __init__(self):
         self.app: Optional[firebase_admin.App] = None
         self.db: Optional[firestore.Client] = None
+        # Async client for request handlers so Firestore I/O doesn't block the event loop
+        self.async_db: Optional[firestore_async.AsyncClient] = None
+        # Optional listener-fed replica of scheduled events
+        self.events_replica: Optional[EventsReplica] = None
         
     def initialize(self):
         """Initialize Firebase Admin SDK"""
@@ -88,7 +98,8 @@ class FirebaseManager:
                 self.app = firebase_admin.get_app()
                 
             self.db = firestore.client(app=self.app)
-            logger.info("Firestore client initialized")
+            self.async_db = firestore_async.client(app=self.app)
+            logger.info("Firestore clients initialized")
             
         except Exception as e:
             logger.error(f"Failed to initialize Firebase: {e}")
@@ -99,6 +110,29 @@ class FirebaseManager:
         if not self.db:
             raise RuntimeError("Firestore not initialized. Call initialize() first.")
         return self.db.collection(collection_name)
+
+    def get_async_collection(self, collection_name: str):
+        """Get a Firestore collection reference on the async client"""
+        if not self.async_db:
+            raise RuntimeError("Firestore not initialized. Call initialize() first.")
+        return self.async_db.collection(collection_name)
+    
+    def start_events_replica(self) -> EventsReplica:
+        """Attach a snapshot listener that mirrors scheduled events in memory"""
+        if self.events_replica is None:
+            self.events_replica = EventsReplica(
+                restart_backoff_seconds=float(os.getenv("EVENTS_REPLICA_RESTART_SECONDS", "30"))
+            )
+            # Writes from other processes reach this process's change feed through the listener
+            self.events_replica.add_listener(change_feed.record_firestore_change)
+        self.events_replica.start(self.get_collection("events"))
+        return self.events_replica
+
+    def stop_events_replica(self):
+        """Detach the events replica listener, if running"""
+        if self.events_replica is not None:
+            self.events_replica.stop()
+            self.events_replica = None
     
     def health_check(self) -> bool:
         """Check if Firebase connection is healthy"""
@@ -120,10 +154,18 @@ async def init_firebase():
     """Initialize Firebase connection on startup"""
     firebase_manager.initialize()
     logger.info("Firebase initialized")
+    if os.getenv("FIREBASE_EVENTS_REPLICA", "false").lower() == "true":
+        try:
+            firebase_manager.start_events_replica()
+        except Exception as e:
+            logger.warning(f"Events replica not started, agents will query Firestore directly: {e}")
 
 async def close_firebase():
     """Close Firebase connection on shutdown"""
     try:
+        firebase_manager.stop_events_replica()
+        if firebase_manager.async_db:
+            firebase_manager.async_db.close()
         if firebase_manager.app:
             firebase_admin.delete_app(firebase_manager.app)
         logger.info("Firebase connection closed")
@@ -134,10 +176,33 @@ def get_firestore_client():
     """Get Firestore client instance"""
     return firebase_manager.db
 
+def get_async_firestore_client():
+    """Get async Firestore client instance"""
+    return firebase_manager.async_db
+
 def get_events_collection():
     """Get events collection from Firestore"""
     return firebase_manager.get_collection("events")
 
+def get_async_events_collection():
+    """Get events collection from the async Firestore client"""
+    return firebase_manager.get_async_collection("events")
+
+def get_events_replica() -> Optional[EventsReplica]:
+    """
+    Get the events replica if it is running and in sync.
+    Returns None when the replica is disabled or its listener is down, in
+    which case callers should query Firestore directly.
+    """
+    replica = firebase_manager.events_replica
+    if replica is None or not replica.ensure_running():
+        return None
+    return replica
+
+def get_async_venue_days_collection():
+    """Get per-venue-per-day occupancy collection from the async Firestore client"""
+    return firebase_manager.get_async_collection("venue_days")
+
 def get_users_collection():
     """Get users collection from Firestore"""
     return firebase_manager.get_collection("users")
@@ -160,16 +225,29 @@ class EventDocument:
         description: str = None,
         category: str = None,
         capacity: int = None,
-        budget: float = None
+        budget: float = None,
+        recurrence: str = None,
+        exdates: List[datetime] = None,
+        audience_groups: List[str] = None,
+        tzid: str = None
     ) -> Dict[str, Any]:
-        """Create a standardized event document for Firestore"""
-        return {
+        """
+        Create a standardized event document for Firestore.
+        With `recurrence` (an RRULE bounded by COUNT or UNTIL) the document is
+        a series whose first occurrence is start_time-end_time; `series_end`
+        is stored so queries can find series still running in a window.
+        The rule is expanded in `tzid` (IANA name or fixed offset), which
+        defaults to start_time's own zone and is stored with the series.
+        """
+        event_doc = {
             "title": title,
             "description": description or "",
             "start_time": start_time,
             "end_time": end_time,
             "venue": venue,
             "organizer": organizer or "",
+            # Student clubs / audience groups the event targets; checked for double-booking
+            "audience_groups": sorted({group.strip() for group in audience_groups or [] if group and group.strip()}),
             "category": category or "general",
             "capacity": capacity or 0,
             "budget": budget or 0.0,
@@ -177,10 +255,108 @@ class EventDocument:
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
+        if recurrence:
+            tzid = tzid or zone_name(start_time)
+            rule = build_rule(recurrence, start_time.astimezone(resolve_zone(tzid)))
+            last_end = series_end(rule, end_time - start_time)
+            if last_end is None:
+                raise ValueError("Recurrence rule produces no occurrences")
+            event_doc.update(
+                recurrence=recurrence,
+                tzid=tzid,
+                exdates=sorted(exdates or []),
+                series_end=last_end
+            )
+        return event_doc
     
+    @staticmethod
+    def reschedule_event_doc(
+        event_doc: Dict[str, Any],
+        start_time: datetime,
+        end_time: datetime,
+        venue: str
+    ) -> Dict[str, Any]:
+        """
+        Create the update document moving an event (or a whole series) to a new slot.
+        A series' `exdates` move with it: each skipped occurrence is shifted by
+        the same local wall-clock offset as the first occurrence.
+        """
+        update_data = {"start_time": start_time, "end_time": end_time, "venue": venue}
+        if event_doc.get("recurrence"):
+            zone = resolve_zone(event_doc.get("tzid"))
+            local_start = start_time.astimezone(zone)
+            last_end = series_end(build_rule(event_doc["recurrence"], local_start), end_time - start_time)
+            if last_end is None:
+                raise ValueError("Recurrence rule produces no occurrences")
+            update_data["series_end"] = last_end
+            if event_doc.get("exdates"):
+                def wall_time(value):
+                    return as_utc(value).astimezone(zone).replace(tzinfo=None)
+                shift = wall_time(start_time) - wall_time(event_doc["start_time"])
+                update_data["exdates"] = sorted(
+                    (wall_time(exdate) + shift).replace(tzinfo=zone).astimezone(timezone.utc)
+                    for exdate in event_doc["exdates"]
+                )
+        update_data["updated_at"] = datetime.utcnow()
+        return update_data
+
     @staticmethod
     def update_event_doc(**kwargs) -> Dict[str, Any]:
         """Create an update document for Firestore"""
         update_data = {k: v for k, v in kwargs.items() if v is not None}
         update_data["updated_at"] = datetime.utcnow()
-        return update_data
\ No newline at end of file
+        return update_data
+
+class VenueDayDocument:
+    """
+    Helper class for per-venue-per-day occupancy documents in Firestore.
+    Every booking is recorded on the document of each (venue, UTC day) it
+    touches, so booking transactions only contend on the same venue and day,
+    and a conflict check for a single-day slot is one document read.
+    """
+
+    @staticmethod
+    def doc_id(venue: str, day: str) -> str:
+        """Document ID for a venue and ISO date (venue names may contain '/')"""
+        return f"{quote(venue, safe='')}__{day}"
+
+    @staticmethod
+    def days_spanned(start_time: datetime, end_time: datetime) -> List[str]:
+        """ISO dates (UTC) touched by [start_time, end_time)"""
+        day = start_time.astimezone(timezone.utc).date()
+        last_day = (end_time.astimezone(timezone.utc) - timedelta(microseconds=1)).date()
+        days = []
+        while day <= last_day:
+            days.append(day.isoformat())
+            day += timedelta(days=1)
+        return days
+
+    @staticmethod
+    def create_booking(event_id: str, event_doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Create the booking entry stored on a venue-day document"""
+        return {
+            "event_id": event_id,
+            "title": event_doc.get("title", ""),
+            "start_time": event_doc["start_time"],
+            "end_time": event_doc["end_time"]
+        }
+
+    @staticmethod
+    def bookings_by_day(event_id: str, event_doc: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Booking entries per ISO day for an event, one per occurrence of a series"""
+        by_day: Dict[str, List[Dict[str, Any]]] = {}
+        for occurrence in expand_event(event_doc, *event_span(event_doc)):
+            booking = VenueDayDocument.create_booking(event_id, occurrence)
+            for day in VenueDayDocument.days_spanned(occurrence["start_time"], occurrence["end_time"]):
+                by_day.setdefault(day, []).append(booking)
+        return by_day
+
+    @staticmethod
+    def create_venue_day_doc(venue: str, day: str, bookings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Create a venue-day document with bookings ordered by start time"""
+        return {
+            "venue": venue,
+            "date": day,
+            "bookings": sorted(bookings, key=lambda booking: booking["start_time"]),
+            "updated_at": datetime.utcnow()
+        }
@@ -16,6 +16,7 @@ class ScheduleItem(BaseModel):
     endTime: str
     session: str
     room: Optional[str] = None
+    track: Optional[str] = None
 
 
 class Package(BaseModel):
@@ -71,4 +72,21 @@ class UpdateEventRequest(BaseModel):
     startDate: Optional[str] = None
     endDate: Optional[str] = None
     venue: Optional[str] = None
-    capacity: Optional[int] = None
\ No newline at end of file
+    capacity: Optional[int] = None
+
+
+class SessionRequest(BaseModel):
+    """Session to place in a room; without startTime it follows the previous session of its track"""
+    session: str
+    day: int = 1
+    startTime: Optional[str] = None
+    endTime: Optional[str] = None
+    durationMinutes: Optional[int] = None
+    track: Optional[str] = None
+
+
+class AllocateRoomsRequest(BaseModel):
+    """Request model for allocating rooms to an event's sessions"""
+    sessions: Optional[List[SessionRequest]] = None  # defaults to the event's current schedule
+    rooms: Optional[List[str]] = None                # named rooms, used in order
+    dayStart: str = "09:00"
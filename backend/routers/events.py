@@ -3,13 +3,18 @@ Events router for the Apokria event management system.
 Provides CRUD operations for events and integration with agents.
 """
 
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from typing import List, Dict, Any, Optional
 import uuid
 from datetime import datetime
 
-from models.events import Event, CreateEventRequest, UpdateEventRequest, ScheduleItem, Package, Asset, OutreachBundle
+from models.events import (
+    Event, CreateEventRequest, UpdateEventRequest, ScheduleItem, Package, Asset, OutreachBundle, AllocateRoomsRequest
+)
+from database.change_feed import change_feed
 from utils.api_helpers import APIResponse
+from utils.llm_scheduler import LLMRateLimited
+from utils.room_allocation import allocate_rooms
 from agents.scheduler import scheduler_agent
 from agents.flow import flow_agent, FlowRequest  
 from agents.sponsor import SponsorAgent
@@ -24,12 +29,48 @@ events_store: Dict[str, Event] = {}
 sponsor_agent = SponsorAgent()
 
 
+def _store_event(event: Event, change_type: str = "updated") -> None:
+    """Save an event in the store and record the change in the change feed"""
+    events_store[event.id] = event
+    change_feed.record("store", change_type, event.id, event.model_dump())
+
+
+def _not_modified(request: Request, response: Response, etag: str) -> bool:
+    """Set the ETag header; True when the client's If-None-Match already has it"""
+    response.headers["ETag"] = etag
+    if_none_match = request.headers.get("if-none-match", "")
+    return any(tag.strip() in (etag, "*") for tag in if_none_match.split(","))
+
+
 @router.get("/events", response_model=List[Event])
-async def list_events():
-    """Get all events"""
+async def list_events(request: Request, response: Response):
+    """Get all events. Supports If-None-Match so pollers skip unchanged lists."""
+    etag = f'W/"{change_feed.epoch}-{change_feed.version}"'
+    if _not_modified(request, response, etag):
+        return Response(status_code=304, headers={"ETag": etag})
     return list(events_store.values())
 
 
+@router.get("/events/changes")
+async def list_event_changes(
+    request: Request,
+    response: Response,
+    since: int = Query(0, ge=0, description="Version returned by the previous call; 0 for all retained changes"),
+    limit: int = Query(500, ge=1, le=5000),
+    source: Optional[str] = Query(None, pattern="^(firestore|store)$")
+):
+    """
+    Event changes after a version, latest change per event only.
+    Poll with the returned `version` as the next `since`; when `reset` is
+    true (server restarted or the version is too old) refetch the full list
+    and continue from the returned version. Supports If-None-Match.
+    """
+    etag = f'W/"{change_feed.epoch}-{since}-{limit}-{source or ""}-{change_feed.version}"'
+    if _not_modified(request, response, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return change_feed.since(since, limit=limit, source=source)
+
+
 @router.post("/events", response_model=Event)
 async def create_event(event_data: CreateEventRequest):
     """Create a new event"""
@@ -51,7 +92,7 @@ async def create_event(event_data: CreateEventRequest):
         )
         
         # Store the event
-        events_store[event_id] = new_event
+        _store_event(new_event, "created")
         
         return new_event
     
@@ -75,6 +116,7 @@ async def update_event(event_id: str, event_data: UpdateEventRequest):
         raise HTTPException(status_code=404, detail="Event not found")
     
     event = events_store[event_id]
+    dates = (event.startDate, event.endDate)
     
     # Update fields if provided
     if event_data.name is not None:
@@ -88,7 +130,7 @@ async def update_event(event_id: str, event_data: UpdateEventRequest):
     if event_data.capacity is not None:
         event.capacity = event_data.capacity
     
-    events_store[event_id] = event
+    _store_event(event, "rescheduled" if (event.startDate, event.endDate) != dates else "updated")
     return event
 
 
@@ -98,52 +140,98 @@ async def delete_event(event_id: str):
     if event_id not in events_store:
         raise HTTPException(status_code=404, detail="Event not found")
     
-    del events_store[event_id]
+    event = events_store.pop(event_id)
+    change_feed.record("store", "deleted", event_id, event.model_dump())
     return {"message": "Event deleted successfully"}
 
 
 @router.post("/events/{event_id}/schedule/generate")
 async def generate_schedule(event_id: str):
-    """Generate schedule for an event using the Flow Agent"""
+    """
+    Generate a schedule for an event using the Flow Agent.
+    The flow's timed stages become sessions, and parallel sessions get their own rooms.
+    """
     if event_id not in events_store:
         raise HTTPException(status_code=404, detail="Event not found")
     
     event = events_store[event_id]
     
     try:
+        days = _event_days(event)
         # Use the Flow Agent to generate event flow
         flow_request = FlowRequest(
             event_name=event.name,
             event_type="conference",  # Default type
-            duration=1,  # Default duration
+            duration=min(days * 8, 72),  # A working day per event day
             audience_size=event.capacity or 100,
             budget_range="Medium"
         )
         
         flow_response = await flow_agent.generate_flow(flow_request)
         
-        # Convert flow to schedule items
-        schedules = []
-        for i, stage in enumerate(flow_response.flow.stages[:5]):  # Limit to 5 stages
-            schedule_item = ScheduleItem(
-                id=str(uuid.uuid4()),
-                day=1,
-                startTime=f"{9 + i}:00",
-                endTime=f"{10 + i}:00",
-                session=stage.name,
-                room=f"Room {i + 1}"
-            )
-            schedules.append(schedule_item)
-        
-        # Update event with generated schedule
-        event.schedules = schedules
-        events_store[event_id] = event
-        
-        return {"message": "Schedule generated successfully", "schedules": schedules}
+        # Convert the flow's timeline to schedule items
+        sessions = [
+            {"id": str(uuid.uuid4()), **session}
+            for session in flow_agent.extract_sessions(flow_response.generated_flow)
+            if session["day"] <= days
+        ]
+        if not sessions:
+            raise ValueError("Generated flow has no timed sessions")
+        schedules = [ScheduleItem(**item) for item in allocate_rooms(sessions)]
     
+    except LLMRateLimited:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate schedule: {str(e)}")
 
+    # Update event with generated schedule
+    event.schedules = schedules
+    _store_event(event)
+
+    return {"message": "Schedule generated successfully", "schedules": schedules}
+
+
+def _event_days(event: Event) -> int:
+    """Number of days an event spans, from its ISO start and end dates"""
+    start = datetime.fromisoformat(event.startDate.replace("Z", "+00:00")).date()
+    end = datetime.fromisoformat(event.endDate.replace("Z", "+00:00")).date()
+    return max((end - start).days + 1, 1)
+
+
+@router.post("/events/{event_id}/schedule/allocate")
+async def allocate_schedule_rooms(event_id: str, request: AllocateRoomsRequest):
+    """
+    Assign rooms to an event's sessions using the fewest rooms possible.
+    Sessions of a track stay in one room whenever it is free.
+    """
+    if event_id not in events_store:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    event = events_store[event_id]
+
+    if request.sessions is not None:
+        sessions = [{"id": str(uuid.uuid4()), **session.model_dump()} for session in request.sessions]
+    else:
+        sessions = [item.model_dump() for item in event.schedules]
+
+    try:
+        days = _event_days(event)
+        late = [s["session"] for s in sessions if (s.get("day") or 1) > days]
+        if late:
+            raise ValueError(f"Sessions fall after the event's last day ({days}): {', '.join(late)}")
+        allocated = allocate_rooms(sessions, rooms=request.rooms, day_start=request.dayStart)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    event.schedules = [ScheduleItem(**item) for item in allocated]
+    _store_event(event)
+
+    return {
+        "message": "Rooms allocated successfully",
+        "rooms_used": len({item.room for item in event.schedules}),
+        "schedules": event.schedules
+    }
+
 
 @router.post("/events/{event_id}/sponsor/tiers")
 async def generate_sponsor_tiers(event_id: str):
@@ -190,7 +278,7 @@ async def generate_sponsor_tiers(event_id: str):
         
         # Update event with generated packages
         event.packages = packages
-        events_store[event_id] = event
+        _store_event(event)
         
         return {"message": "Sponsor tiers generated successfully", "packages": packages}
     
@@ -218,7 +306,7 @@ async def generate_sponsor_pdf(event_id: str):
         
         # Add asset to event
         event.assets.append(pdf_asset)
-        events_store[event_id] = event
+        _store_event(event)
         
         return {"message": "Sponsor PDF generated successfully", "asset": pdf_asset}
     
@@ -268,7 +356,7 @@ Event Team
         
         # Update event with outreach content
         event.outreach = outreach
-        events_store[event_id] = event
+        _store_event(event)
         
         return {"message": "Outreach content generated successfully", "outreach": outreach}
     
@@ -0,0 +1,141 @@
+"""
+Unit tests for the batch auto-scheduler: bitmap placement, local search and
+the SchedulerAgent.solve_schedule wrapper.
+"""
+
+import random
+import time
+import unittest
+from datetime import datetime, timezone, timedelta
+from backend.agents.scheduler import SchedulerAgent
+from backend.utils.auto_scheduler import AutoScheduler, PlacementRequest
+from backend.utils.venue_catalog import VenueCatalog
+
+
+class TestAutoScheduler(unittest.TestCase):
+    """Test placement on slot bitmaps"""
+
+    def test_nearest_free_start_to_preference(self):
+        solver = AutoScheduler(horizon_slots=20, venues=["A"])
+        solver.block("A", 4, 8)
+        request = PlacementRequest(id="r1", duration=2, windows=[(0, 18)], venues=["A"], preferred_start=5)
+        placement = solver.best_position(request)
+        # Starts 2 and 8 are both 3 slots from the preference; ties go to the later start
+        self.assertEqual(placement.start, 8)
+        self.assertEqual(placement.cost, 3)
+
+    def test_later_window_only_when_earlier_is_full(self):
+        solver = AutoScheduler(horizon_slots=20, venues=["A"])
+        solver.block("A", 0, 4)
+        request = PlacementRequest(id="r1", duration=2, windows=[(0, 2), (10, 14)], venues=["A"])
+        placement = solver.best_position(request)
+        self.assertEqual((placement.start, placement.window_rank), (10, 1))
+
+    def test_eviction_makes_room_for_constrained_request(self):
+        solver = AutoScheduler(horizon_slots=8, venues=["A", "B"])
+        # Greedy places the higher-priority r1 first, into A, the only venue r2 accepts
+        flexible = PlacementRequest(id="r1", duration=8, windows=[(0, 0)], venues=["A", "B"], priority=1)
+        constrained = PlacementRequest(id="r2", duration=8, windows=[(0, 0)], venues=["A"])
+        result = solver.solve([flexible, constrained])
+        self.assertEqual(result.unplaced, [])
+        self.assertEqual(result.placements["r2"].venue, "A")
+        self.assertEqual(result.placements["r1"].venue, "B")
+
+    def test_no_overlaps_and_capacity_of_horizon(self):
+        solver = AutoScheduler(horizon_slots=10, venues=["A"])
+        requests = [
+            PlacementRequest(id=f"r{n}", duration=3, windows=[(0, 7)], venues=["A"])
+            for n in range(4)
+        ]
+        result = solver.solve(requests)
+        self.assertEqual(len(result.placements), 3)
+        self.assertEqual(len(result.unplaced), 1)
+        starts = sorted(p.start for p in result.placements.values())
+        self.assertTrue(all(b - a >= 3 for a, b in zip(starts, starts[1:])))
+
+
+class TestSolveSchedule(unittest.IsolatedAsyncioTestCase):
+    """Test solve_schedule against the catalog and existing bookings"""
+
+    def setUp(self):
+        self.scheduler = SchedulerAgent()
+        self.scheduler.index_ttl_seconds = 0
+        self.scheduler.events_collection = object()
+        self.scheduler.venue_catalog = VenueCatalog([
+            {"name": "Main Hall", "capacity": 400, "features": ["projector"]},
+            {"name": "Room B", "capacity": 60, "features": ["projector"]},
+            {"name": "Lab 1", "capacity": 40, "features": ["computers"]}
+        ])
+        self.day = datetime(2025, 11, 14, 0, 0, tzinfo=timezone.utc)
+        self.scheduler.calendar_index.load([
+            {
+                "id": "e1",
+                "title": "Orientation",
+                "venue": "Main Hall",
+                "start_time": self.day + timedelta(hours=9),
+                "end_time": self.day + timedelta(hours=12)
+            }
+        ])
+
+    def window(self, start_hour, end_hour, day=0):
+        return {
+            "start_time": (self.day + timedelta(days=day, hours=start_hour)).isoformat(),
+            "end_time": (self.day + timedelta(days=day, hours=end_hour)).isoformat()
+        }
+
+    async def test_requests_avoid_existing_bookings_and_each_other(self):
+        result = await self.scheduler.solve_schedule([
+            {"id": "talk", "title": "Guest Talk", "duration_hours": 2, "capacity": 300, "windows": [self.window(9, 14)]},
+            {"id": "panel", "title": "Panel", "duration_hours": 2, "capacity": 300, "windows": [self.window(9, 16)]}
+        ])
+        placed = {entry["id"]: entry for entry in result["scheduled"]}
+        self.assertEqual(placed["talk"]["venue"], "Main Hall")
+        self.assertEqual(placed["talk"]["start_time"], (self.day + timedelta(hours=12)).isoformat())
+        self.assertEqual(placed["panel"]["start_time"], (self.day + timedelta(hours=14)).isoformat())
+        self.assertEqual(result["unscheduled"], [])
+
+    async def test_unplaceable_requests_have_reasons(self):
+        result = await self.scheduler.solve_schedule([
+            {"id": "huge", "title": "Concert", "duration_hours": 2, "capacity": 5000, "windows": [self.window(9, 14)]},
+            {"id": "short", "title": "Hackathon", "duration_hours": 6, "windows": [self.window(9, 12)]},
+            {"id": "full", "title": "Lecture", "duration_hours": 3, "venues": ["Main Hall"], "windows": [self.window(9, 12)]}
+        ])
+        reasons = {entry["id"]: entry["reason"] for entry in result["unscheduled"]}
+        self.assertIn("capacity", reasons["huge"])
+        self.assertIn("long enough", reasons["short"])
+        self.assertIn("booked", reasons["full"])
+        self.assertEqual(result["scheduled"], [])
+
+    async def test_thousand_requests_are_solved_quickly(self):
+        rng = random.Random(11)
+        self.scheduler.venue_catalog = VenueCatalog([
+            {"name": f"Room {n}", "capacity": rng.choice([30, 60, 120, 300]), "features": ["projector"]}
+            for n in range(20)
+        ])
+        self.scheduler.solve_time_limit = 2
+        items = []
+        for n in range(1000):
+            day = rng.randrange(30)
+            start_hour = rng.randrange(8, 18)
+            items.append({
+                "id": f"r{n}",
+                "title": f"Event {n}",
+                "duration_hours": rng.choice([1, 1.5, 2, 3]),
+                "capacity": rng.choice([20, 50, 100]),
+                "windows": [self.window(start_hour, start_hour + 4, day), self.window(8, 22, day + 1)]
+            })
+        started = time.monotonic()
+        result = await self.scheduler.solve_schedule(items)
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual(len(result["scheduled"]) + len(result["unscheduled"]), 1000)
+
+        by_venue = {}
+        for entry in result["scheduled"]:
+            by_venue.setdefault(entry["venue"], []).append((entry["start_time"], entry["end_time"]))
+        for bookings in by_venue.values():
+            bookings.sort()
+            self.assertTrue(all(prev[1] <= cur[0] for prev, cur in zip(bookings, bookings[1:])))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
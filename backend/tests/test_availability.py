@@ -0,0 +1,71 @@
+"""
+Unit tests for the free-slot finder used by SchedulerAgent suggestions.
+"""
+
+import unittest
+from datetime import datetime, time, timezone, timedelta
+from backend.utils.availability import (
+    find_free_slots, merge_intervals, parse_working_hours, working_windows
+)
+
+
+def at(hour, minute=0, day=8):
+    return datetime(2025, 11, day, hour, minute, tzinfo=timezone.utc)
+
+
+class TestMergeIntervals(unittest.TestCase):
+    """Test busy interval merging"""
+
+    def test_merges_overlapping_and_touching(self):
+        merged = merge_intervals([(at(12), at(13)), (at(9), at(10)), (at(10), at(11)), (at(12, 30), at(14))])
+        self.assertEqual(merged, [(at(9), at(11)), (at(12), at(14))])
+
+
+class TestFindFreeSlots(unittest.TestCase):
+    """Test free-slot search and ranking"""
+
+    def test_finds_gap_off_the_hour(self):
+        """A 90 minute gap starting at :30 should be found"""
+        busy = [(at(8), at(10, 30)), (at(12), at(18))]
+        slots = find_free_slots(busy, at(8), at(18), timedelta(hours=1.5), preferred_start=at(11))
+        self.assertEqual(slots, [(at(10, 30), at(12))])
+
+    def test_ranked_by_distance_from_preferred_start(self):
+        """Nearest slots come first and never overlap each other"""
+        busy = [(at(10), at(12))]
+        slots = find_free_slots(busy, at(6), at(18), timedelta(hours=1), preferred_start=at(11), max_results=4)
+        self.assertEqual([s for s, _ in slots], [at(12), at(9), at(13), at(8)])
+
+    def test_respects_working_hours(self):
+        """Slots outside working hours are never suggested"""
+        hours = parse_working_hours("09:00-17:00")
+        busy = [(at(9), at(17))]
+        slots = find_free_slots(
+            busy, at(0), at(0, day=10), timedelta(hours=2), preferred_start=at(16), working_hours=hours
+        )
+        self.assertEqual(slots[0], (at(9, day=9), at(11, day=9)))
+        for start, end in slots:
+            self.assertGreaterEqual(start.time(), time(9))
+            self.assertLessEqual(end.time(), time(17))
+
+    def test_no_room(self):
+        """Gaps shorter than the duration yield nothing"""
+        busy = [(at(8), at(10)), (at(10, 30), at(18))]
+        self.assertEqual(find_free_slots(busy, at(8), at(18), timedelta(hours=1), preferred_start=at(10)), [])
+
+
+class TestWorkingHours(unittest.TestCase):
+    """Test working hour parsing and windows"""
+
+    def test_invalid_working_hours(self):
+        with self.assertRaises(ValueError):
+            parse_working_hours("nine-to-five")
+
+    def test_overnight_window(self):
+        """Windows that close before they open run past midnight"""
+        windows = working_windows(at(0), at(0, day=9), parse_working_hours("22:00-02:00"))
+        self.assertEqual(windows, [(at(0), at(2)), (at(22), at(0, day=9))])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
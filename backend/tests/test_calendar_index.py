@@ -0,0 +1,107 @@
+"""
+Unit tests for the in-memory calendar index used by SchedulerAgent.
+Checks interval tree queries against a brute-force overlap scan.
+"""
+
+import random
+import unittest
+from datetime import datetime, timezone, timedelta
+from backend.utils.calendar_index import IntervalTree, CalendarIndex, event_time_bounds
+
+
+def make_event(event_id, venue, start, hours):
+    return {
+        "id": event_id,
+        "title": f"Event {event_id}",
+        "venue": venue,
+        "start_time": start,
+        "end_time": start + timedelta(hours=hours),
+        "status": "scheduled"
+    }
+
+
+class TestIntervalTree(unittest.TestCase):
+    """Test interval tree overlap queries"""
+
+    def test_matches_brute_force(self):
+        """Random intervals should give the same overlaps as a linear scan"""
+        rng = random.Random(42)
+        tree = IntervalTree()
+        intervals = {}
+        for i in range(500):
+            start = rng.randint(0, 10000)
+            end = start + rng.randint(1, 300)
+            tree.add(str(i), start, end, str(i))
+            intervals[str(i)] = (start, end)
+
+        # Remove some to exercise deletion
+        for i in range(0, 500, 7):
+            self.assertTrue(tree.remove(str(i)))
+            del intervals[str(i)]
+        self.assertEqual(len(tree), len(intervals))
+
+        for _ in range(200):
+            q_start = rng.randint(0, 10000)
+            q_end = q_start + rng.randint(1, 500)
+            expected = {k for k, (s, e) in intervals.items() if s < q_end and e > q_start}
+            self.assertEqual(set(tree.overlapping(q_start, q_end)), expected)
+
+    def test_touching_intervals_do_not_overlap(self):
+        """Intervals that only share a boundary should not be returned"""
+        tree = IntervalTree()
+        tree.add("a", 10, 12, "a")
+        self.assertEqual(tree.overlapping(12, 14), [])
+        self.assertEqual(tree.overlapping(8, 10), [])
+        self.assertEqual(tree.overlapping(11, 13), ["a"])
+
+    def test_add_replaces_existing_id(self):
+        """Re-adding an id should move the interval"""
+        tree = IntervalTree()
+        tree.add("a", 10, 12, "a")
+        tree.add("a", 20, 22, "a")
+        self.assertEqual(len(tree), 1)
+        self.assertEqual(tree.overlapping(10, 12), [])
+        self.assertEqual(tree.overlapping(21, 23), ["a"])
+
+
+class TestCalendarIndex(unittest.TestCase):
+    """Test per-venue calendar index"""
+
+    def setUp(self):
+        self.base_time = datetime(2025, 11, 8, 10, 0, 0, tzinfo=timezone.utc)
+        self.index = CalendarIndex()
+        self.index.load([
+            make_event("e1", "Room A", self.base_time, 2),
+            make_event("e2", "Room B", self.base_time, 2),
+            make_event("e3", "Room A", self.base_time + timedelta(hours=4), 1),
+        ])
+
+    def test_query_is_scoped_to_venue(self):
+        """Only events in the requested venue should clash"""
+        result = self.index.query("Room A", self.base_time + timedelta(hours=1), self.base_time + timedelta(hours=3))
+        self.assertEqual([e["id"] for e in result], ["e1"])
+
+    def test_query_without_venue_searches_all(self):
+        """A venue-less query should search every venue"""
+        result = self.index.query(None, self.base_time, self.base_time + timedelta(hours=1))
+        self.assertEqual({e["id"] for e in result}, {"e1", "e2"})
+
+    def test_add_and_remove(self):
+        """Index should stay in sync with writes"""
+        self.index.add(make_event("e4", "Room C", self.base_time, 1))
+        self.assertEqual(len(self.index.query("Room C", self.base_time, self.base_time + timedelta(hours=1))), 1)
+        self.assertTrue(self.index.remove("e4"))
+        self.assertFalse(self.index.remove("e4"))
+        self.assertEqual(self.index.query("Room C", self.base_time, self.base_time + timedelta(hours=1)), [])
+        self.assertNotIn("Room C", self.index.venues())
+
+    def test_event_time_bounds_normalises_naive_datetimes(self):
+        """Naive datetimes should be treated as UTC"""
+        event = make_event("e5", "Room A", datetime(2025, 11, 8, 10, 0, 0), 1)
+        start, end = event_time_bounds(event)
+        self.assertEqual(start.tzinfo, timezone.utc)
+        self.assertEqual(end - start, timedelta(hours=1))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,145 @@
+"""
+Unit tests for the NumPy calendar snapshot: vectorized overlap counts,
+memory-mapped save/load and use from the SchedulerAgent.
+"""
+
+import random
+import tempfile
+import unittest
+from datetime import datetime, timezone, timedelta
+
+import numpy as np
+
+from backend.agents.scheduler import SchedulerAgent
+from backend.utils.calendar_snapshot import CalendarSnapshot, to_epoch_seconds
+
+
+BASE_TIME = datetime(2025, 11, 8, 10, 0, 0, tzinfo=timezone.utc)
+
+
+def event(event_id, venue, offset_hours, hours=1.0):
+    start = BASE_TIME + timedelta(hours=offset_hours)
+    return {
+        "id": event_id,
+        "title": event_id,
+        "venue": venue,
+        "start_time": start,
+        "end_time": start + timedelta(hours=hours)
+    }
+
+
+def slot_arrays(offsets):
+    starts = to_epoch_seconds(BASE_TIME + timedelta(hours=start) for start, _ in offsets)
+    ends = to_epoch_seconds((BASE_TIME + timedelta(hours=end) for _, end in offsets), round_up=True)
+    return starts, ends
+
+
+class TestCalendarSnapshot(unittest.TestCase):
+    """Test overlap counting on the columnar snapshot"""
+
+    def setUp(self):
+        self.snapshot = CalendarSnapshot.build([
+            event("e1", "Main Hall", 0, hours=2),
+            event("e2", "Main Hall", 3),
+            event("e3", "Room B", 1)
+        ])
+
+    def test_counts_per_venue(self):
+        starts, ends = slot_arrays([(1, 1.5), (2, 3), (1.5, 3.5), (1, 2)])
+        counts = self.snapshot.overlap_counts(["Main Hall", "Main Hall", "Main Hall", "Room B"], starts, ends)
+        # Touching end points do not overlap
+        self.assertEqual(counts.tolist(), [1, 0, 2, 1])
+
+    def test_slot_without_venue_checks_every_venue(self):
+        starts, ends = slot_arrays([(1.5, 2.5)])
+        self.assertEqual(self.snapshot.overlap_counts([None], starts, ends).tolist(), [2])
+
+    def test_unknown_venue_is_clear(self):
+        starts, ends = slot_arrays([(0, 4)])
+        self.assertEqual(self.snapshot.overlap_counts(["Annex"], starts, ends).tolist(), [0])
+
+    def test_overlapping_ids(self):
+        start, end = slot_arrays([(1.5, 3.5)])
+        self.assertEqual(self.snapshot.overlapping_ids("Main Hall", start[0], end[0]), ["e1", "e2"])
+
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        venues = ["A", "B", "C"]
+        events = [
+            event(f"e{n}", rng.choice(venues), rng.randint(0, 200) / 4, rng.randint(1, 12) / 4)
+            for n in range(200)
+        ]
+        snapshot = CalendarSnapshot.build(events)
+        slots = [(rng.choice(venues + [None]), rng.randint(0, 200) / 4, rng.randint(1, 12) / 4) for _ in range(300)]
+        starts, ends = slot_arrays([(start, start + hours) for _, start, hours in slots])
+        counts = snapshot.overlap_counts([venue for venue, _, _ in slots], starts, ends)
+
+        for (venue, start, hours), count in zip(slots, counts):
+            slot_start = BASE_TIME + timedelta(hours=start)
+            slot_end = slot_start + timedelta(hours=hours)
+            expected = sum(
+                1 for e in events
+                if (venue is None or e["venue"] == venue)
+                and e["start_time"] < slot_end and e["end_time"] > slot_start
+            )
+            self.assertEqual(count, expected)
+
+    def test_save_and_load_memory_maps_columns(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.snapshot.save(directory)
+            self.assertEqual(CalendarSnapshot.saved_at(directory), self.snapshot.built_at)
+            loaded = CalendarSnapshot.load(directory)
+            self.assertIsInstance(loaded.starts, np.memmap)
+            starts, ends = slot_arrays([(1.5, 3.5)])
+            self.assertEqual(loaded.overlap_counts(["Main Hall"], starts, ends).tolist(), [2])
+
+    def test_empty_snapshot(self):
+        snapshot = CalendarSnapshot.build([])
+        starts, ends = slot_arrays([(0, 1)])
+        self.assertEqual(snapshot.overlap_counts(["Main Hall", None], np.repeat(starts, 2), np.repeat(ends, 2)).tolist(), [0, 0])
+
+
+class TestSchedulerSnapshot(unittest.IsolatedAsyncioTestCase):
+    """Test snapshot overlap counts through the SchedulerAgent"""
+
+    def setUp(self):
+        self.scheduler = SchedulerAgent()
+        self.scheduler.index_ttl_seconds = 0
+        self.scheduler.events_collection = object()
+        self.scheduler.calendar_index.load([
+            event("e1", "Main Hall", 0, hours=2),
+            {
+                **event("s1", "Main Hall", 24),
+                "recurrence": "FREQ=DAILY;COUNT=3"
+            }
+        ])
+
+    async def test_series_occurrences_are_counted(self):
+        counts = await self.scheduler.snapshot_overlap_counts([
+            {
+                "start_time": (BASE_TIME + timedelta(hours=1)).isoformat(),
+                "end_time": (BASE_TIME + timedelta(hours=3)).isoformat(),
+                "venue": "Main Hall"
+            },
+            {
+                "start_time": (BASE_TIME + timedelta(days=3)).isoformat(),
+                "end_time": (BASE_TIME + timedelta(days=3, hours=1)).isoformat(),
+                "venue": "Main Hall"
+            },
+            {
+                "start_time": (BASE_TIME + timedelta(days=4)).isoformat(),
+                "end_time": (BASE_TIME + timedelta(days=4, hours=1)).isoformat()
+            }
+        ])
+        self.assertEqual(counts, [1, 1, 0])
+
+    async def test_snapshot_is_reused_while_fresh(self):
+        slots = [{"start_time": BASE_TIME.isoformat(), "end_time": (BASE_TIME + timedelta(hours=1)).isoformat()}]
+        await self.scheduler.snapshot_overlap_counts(slots)
+        snapshot = self.scheduler.snapshot
+        await self.scheduler.snapshot_overlap_counts(slots)
+        self.assertIs(self.scheduler.snapshot, snapshot)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,127 @@
+"""
+Unit tests for the versioned event change feed and GET /api/events/changes.
+"""
+
+import unittest
+from datetime import datetime, timezone, timedelta
+from types import SimpleNamespace
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.database.change_feed import ChangeFeed
+from backend.database.events_replica import EventsReplica
+from backend.routers import events as events_router
+
+
+class TestChangeFeed(unittest.TestCase):
+    """Test recording and reading changes"""
+
+    def setUp(self):
+        self.feed = ChangeFeed(max_entries=5)
+
+    def test_latest_change_per_event_since_version(self):
+        self.feed.record("store", "created", "a", {"name": "A"})
+        seen = self.feed.record("store", "created", "b", {"name": "B"})
+        self.feed.record("store", "updated", "a", {"name": "A2"})
+        self.feed.record("store", "deleted", "b")
+
+        result = self.feed.since(0)
+        self.assertFalse(result["reset"])
+        self.assertEqual([(c["id"], c["type"]) for c in result["changes"]], [("a", "updated"), ("b", "deleted")])
+        self.assertEqual(result["version"], 4)
+
+        result = self.feed.since(seen)
+        self.assertEqual([c["version"] for c in result["changes"]], [3, 4])
+        self.assertEqual(self.feed.since(4)["changes"], [])
+
+    def test_reset_when_version_not_covered(self):
+        for n in range(8):
+            self.feed.record("store", "created", f"e{n}", {})
+        self.assertTrue(self.feed.since(1)["reset"])
+        self.assertFalse(self.feed.since(3)["reset"])
+        # A version from before a restart (ahead of this process's feed)
+        self.assertTrue(self.feed.since(50)["reset"])
+
+    def test_paging_resumes_from_last_returned_change(self):
+        for n in range(4):
+            self.feed.record("store", "created", f"e{n}", {})
+        page = self.feed.since(0, limit=3)
+        self.assertTrue(page["has_more"])
+        self.assertEqual(page["version"], 3)
+        rest = self.feed.since(page["version"], limit=3)
+        self.assertEqual([c["id"] for c in rest["changes"]], ["e3"])
+        self.assertFalse(rest["has_more"])
+
+    def test_same_revision_reported_twice_is_recorded_once(self):
+        updated_at = datetime(2025, 11, 8, 10, 0, 0, 123456)
+        self.assertIsNotNone(self.feed.record("firestore", "created", "e1", {}, updated_at))
+        # The listener delivers the same write with a tz-aware timestamp
+        self.feed.record_firestore_change("ADDED", "e1", {"updated_at": updated_at.replace(tzinfo=timezone.utc)})
+        self.feed.record("firestore", "cancelled", "e1", {"status": "cancelled"})
+        self.feed.record_firestore_change("REMOVED", "e1", None)
+        self.assertEqual(self.feed.version, 2)
+
+
+class TestReplicaChanges(unittest.TestCase):
+    """Test that replica snapshots reach the feed"""
+
+    def test_incremental_changes_are_reported(self):
+        feed = ChangeFeed()
+        replica = EventsReplica(restart_backoff_seconds=0)
+        replica.add_listener(feed.record_firestore_change)
+        callbacks = []
+        collection = SimpleNamespace(
+            where=lambda *args: collection,
+            on_snapshot=lambda callback: callbacks.append(callback) or SimpleNamespace(is_active=True, unsubscribe=lambda: None)
+        )
+        replica.start(collection)
+
+        start = datetime(2025, 11, 8, 10, 0, 0, tzinfo=timezone.utc)
+        data = {"title": "Talk", "venue": "Hall", "start_time": start, "end_time": start + timedelta(hours=1)}
+        document = SimpleNamespace(id="e1", to_dict=lambda: dict(data))
+        callbacks[0]([document], [], None)
+        self.assertEqual(feed.version, 0)
+
+        callbacks[0]([], [SimpleNamespace(type=SimpleNamespace(name="REMOVED"), document=document)], None)
+        self.assertEqual([(c["id"], c["type"]) for c in feed.since(0)["changes"]], [("e1", "cancelled")])
+
+
+class TestChangesEndpoint(unittest.TestCase):
+    """Test delta sync and ETags on the events router"""
+
+    def setUp(self):
+        events_router.events_store.clear()
+        app = FastAPI()
+        app.include_router(events_router.router)
+        self.client = TestClient(app)
+
+    def test_poll_changes_and_not_modified(self):
+        start = self.client.get("/api/events/changes", params={"since": 0}).json()["version"]
+        created = self.client.post("/api/events", json={
+            "name": "Hackathon", "startDate": "2025-11-14", "endDate": "2025-11-15"
+        }).json()
+        self.client.put(f"/api/events/{created['id']}", json={"startDate": "2025-11-15", "endDate": "2025-11-16"})
+
+        response = self.client.get("/api/events/changes", params={"since": start, "source": "store"})
+        body = response.json()
+        self.assertEqual([(c["id"], c["type"]) for c in body["changes"]], [(created["id"], "rescheduled")])
+        self.assertEqual(body["changes"][0]["event"]["startDate"], "2025-11-15")
+
+        again = self.client.get(
+            "/api/events/changes",
+            params={"since": start, "source": "store"},
+            headers={"If-None-Match": response.headers["ETag"]}
+        )
+        self.assertEqual(again.status_code, 304)
+
+        listing = self.client.get("/api/events")
+        self.assertEqual(
+            self.client.get("/api/events", headers={"If-None-Match": listing.headers["ETag"]}).status_code, 304
+        )
+        self.client.delete(f"/api/events/{created['id']}")
+        self.assertEqual(
+            self.client.get("/api/events", headers={"If-None-Match": listing.headers["ETag"]}).status_code, 200
+        )
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,62 @@
+"""
+Unit tests for the calendar-wide clash report.
+"""
+
+import unittest
+from datetime import datetime, timezone, timedelta
+from backend.agents.scheduler import SchedulerAgent
+from backend.utils.clashes import clash_groups
+
+BASE_TIME = datetime(2025, 11, 8, 9, 0, 0, tzinfo=timezone.utc)
+
+
+def event(event_id, start_hours, end_hours, venue="Main Hall"):
+    return {
+        "id": event_id,
+        "title": event_id,
+        "venue": venue,
+        "start_time": BASE_TIME + timedelta(hours=start_hours),
+        "end_time": BASE_TIME + timedelta(hours=end_hours)
+    }
+
+
+class TestClashGroups(unittest.TestCase):
+    """Test the sweep over sorted events"""
+
+    def test_chained_overlaps_form_one_group(self):
+        groups = list(clash_groups([
+            event("c", 6, 9), event("a", 0, 4), event("b", 3, 7), event("d", 10, 11)
+        ]))
+        self.assertEqual(len(groups), 1)
+        self.assertEqual([e["id"] for e in groups[0]["events"]], ["a", "b", "c"])
+        self.assertEqual(sorted(groups[0]["pairs"]), [(0, 1), (1, 2)])
+        self.assertEqual(groups[0]["end_time"], BASE_TIME + timedelta(hours=9))
+
+    def test_every_pair_is_reported(self):
+        groups = list(clash_groups([event("a", 0, 5), event("b", 1, 5), event("c", 2, 5)]))
+        self.assertEqual(sorted(groups[0]["pairs"]), [(0, 1), (0, 2), (1, 2)])
+
+    def test_touching_events_do_not_clash(self):
+        self.assertEqual(list(clash_groups([event("a", 0, 1), event("b", 1, 2)])), [])
+
+
+class TestFindClashes(unittest.IsolatedAsyncioTestCase):
+    """Test the scheduler clash report over the calendar index"""
+
+    async def test_groups_per_venue(self):
+        scheduler = SchedulerAgent()
+        scheduler.index_ttl_seconds = 0
+        scheduler.events_collection = object()
+        scheduler.calendar_index.load([
+            event("a", 0, 2), event("b", 1, 3),
+            event("c", 1, 3, venue="Room B"),
+            event("d", 30, 32), event("e", 31, 33)
+        ])
+        groups = list(await scheduler.find_clashes(
+            BASE_TIME.isoformat(), (BASE_TIME + timedelta(hours=24)).isoformat()
+        ))
+        self.assertEqual([(g["venue"], [e["id"] for e in g["events"]]) for g in groups], [("Main Hall", ["a", "b"])])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,116 @@
+"""
+Unit tests for the versioned conflict-result cache and its use in
+SchedulerAgent.check_conflict.
+"""
+
+import unittest
+from datetime import datetime, timezone, timedelta
+from backend.agents.scheduler import ConflictResult, SchedulerAgent
+from backend.utils.conflict_cache import ConflictCache
+
+
+BASE_TIME = datetime(2025, 11, 8, 10, 0, 0, tzinfo=timezone.utc)
+
+
+class TestConflictCache(unittest.TestCase):
+    """Test versioned invalidation of cached results"""
+
+    def setUp(self):
+        self.cache = ConflictCache(max_entries=2)
+        self.end = BASE_TIME + timedelta(hours=1)
+
+    def store(self, venue, result="CLEAR", start=BASE_TIME):
+        self.cache.put(venue, start, self.end, None, result, self.cache.version(venue))
+
+    def test_hit_until_venue_is_bumped(self):
+        self.store("Main Hall")
+        self.assertEqual(self.cache.get("Main Hall", BASE_TIME, self.end), "CLEAR")
+        self.cache.bump("Room B")
+        self.assertEqual(self.cache.get("Main Hall", BASE_TIME, self.end), "CLEAR")
+        self.cache.bump("Main Hall")
+        self.assertIsNone(self.cache.get("Main Hall", BASE_TIME, self.end))
+
+    def test_venue_less_checks_are_invalidated_by_any_write(self):
+        self.store(None)
+        self.cache.bump("Room B")
+        self.assertIsNone(self.cache.get(None, BASE_TIME, self.end))
+
+    def test_result_computed_across_a_write_is_not_stored(self):
+        version = self.cache.version("Main Hall")
+        self.cache.bump("Main Hall")
+        self.cache.put("Main Hall", BASE_TIME, self.end, None, "CLEAR", version)
+        self.assertIsNone(self.cache.get("Main Hall", BASE_TIME, self.end))
+
+    def test_generation_change_invalidates(self):
+        self.cache.put("Main Hall", BASE_TIME, self.end, None, "CLEAR", self.cache.version("Main Hall"), 1)
+        self.assertEqual(self.cache.get("Main Hall", BASE_TIME, self.end, generation=1), "CLEAR")
+        self.assertIsNone(self.cache.get("Main Hall", BASE_TIME, self.end, generation=2))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.store("A")
+        self.store("B")
+        self.cache.get("A", BASE_TIME, self.end)
+        self.store("C")
+        self.assertEqual(self.cache.get("A", BASE_TIME, self.end), "CLEAR")
+        self.assertIsNone(self.cache.get("B", BASE_TIME, self.end))
+
+    def test_clear_rejects_results_from_before_the_reload(self):
+        version = self.cache.version("Main Hall")
+        self.cache.clear()
+        self.cache.put("Main Hall", BASE_TIME, self.end, None, "CLEAR", version)
+        self.assertEqual(len(self.cache), 0)
+
+
+class TestSchedulerConflictCache(unittest.IsolatedAsyncioTestCase):
+    """Test that check_conflict serves repeats from cache and sees writes"""
+
+    def setUp(self):
+        self.scheduler = SchedulerAgent()
+        self.scheduler.index_ttl_seconds = 0
+        self.scheduler.events_collection = object()
+        self.scheduler.calendar_index.load([self.event("e1", 0)])
+
+    def event(self, event_id, offset_hours):
+        start = BASE_TIME + timedelta(hours=offset_hours)
+        return {
+            "id": event_id,
+            "title": event_id,
+            "venue": "Main Hall",
+            "status": "scheduled",
+            "start_time": start,
+            "end_time": start + timedelta(hours=1)
+        }
+
+    async def check(self, offset_hours):
+        start = BASE_TIME + timedelta(hours=offset_hours)
+        return await self.scheduler.check_conflict(
+            start.isoformat(), (start + timedelta(hours=1)).isoformat(), venue="Main Hall"
+        )
+
+    async def test_repeated_check_is_served_from_cache(self):
+        self.assertEqual((await self.check(2)).status, "CLEAR")
+        # An index change no write path reported is not seen...
+        self.scheduler.calendar_index.add(self.event("e2", 2))
+        self.assertEqual((await self.check(2)).status, "CLEAR")
+        self.assertEqual(self.scheduler.conflict_cache.hits, 1)
+        # ...until the venue's version is bumped
+        self.scheduler.conflict_cache.bump("Main Hall")
+        self.assertEqual((await self.check(2)).status, "CLASH")
+
+    async def test_reschedule_invalidates_cached_results(self):
+        self.assertEqual((await self.check(0)).status, "CLASH")
+        old_doc = self.event("e1", 0)
+        self.scheduler._sync_changed_event("e1", old_doc, self.event("e1", 5))
+        self.assertEqual((await self.check(0)).status, "CLEAR")
+        self.assertEqual((await self.check(5)).status, "CLASH")
+
+    async def test_cached_result_is_a_copy(self):
+        result = await self.check(0)
+        result.conflicting_events.clear()
+        cached = await self.check(0)
+        self.assertIsInstance(cached, ConflictResult)
+        self.assertEqual(len(cached.conflicting_events), 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
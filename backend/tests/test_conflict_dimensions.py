@@ -0,0 +1,211 @@
+"""
+Unit tests for organizer and audience-group double-booking detection.
+"""
+
+import unittest
+from datetime import datetime, timezone, timedelta
+from unittest import mock
+from backend.agents import scheduler as scheduler_module
+from backend.agents.scheduler import SchedulerAgent
+from backend.database.events_replica import EventsReplica
+from backend.database.firebase_connection import EventDocument
+from backend.utils.calendar_index import CalendarIndex
+
+
+BASE_TIME = datetime(2025, 11, 8, 10, 0, 0, tzinfo=timezone.utc)
+
+
+def event(event_id, venue, offset_hours, organizer="", audience_groups=None):
+    start = BASE_TIME + timedelta(hours=offset_hours)
+    return {
+        "id": event_id,
+        "title": event_id,
+        "venue": venue,
+        "organizer": organizer,
+        "audience_groups": audience_groups or [],
+        "status": "scheduled",
+        "start_time": start,
+        "end_time": start + timedelta(hours=1)
+    }
+
+
+EVENTS = [
+    event("e1", "Main Hall", 0, organizer="Dr. Rao", audience_groups=["Robotics Club"]),
+    event("e2", "Room B", 0, audience_groups=["Robotics Club", "Drama Club"]),
+    event("e3", "Room C", 3, organizer="Dr. Rao")
+]
+
+
+class TestDimensionIndex(unittest.TestCase):
+    """Test CalendarIndex keyed on other event fields"""
+
+    def setUp(self):
+        self.audience = CalendarIndex(field="audience_groups", default_key=None)
+        self.audience.load(EVENTS)
+
+    def test_list_field_is_indexed_under_every_value(self):
+        self.assertEqual(sorted(self.audience.venues()), ["Drama Club", "Robotics Club"])
+        found = self.audience.query("Drama Club", BASE_TIME, BASE_TIME + timedelta(hours=1))
+        self.assertEqual([e["id"] for e in found], ["e2"])
+
+    def test_events_without_a_value_are_not_indexed(self):
+        self.assertEqual(len(self.audience), 2)
+        self.assertNotIn("e3", self.audience)
+
+    def test_query_over_several_keys_returns_each_event_once(self):
+        found = self.audience.query_keys(["Robotics Club", "Drama Club"], BASE_TIME, BASE_TIME + timedelta(hours=1))
+        self.assertEqual(sorted(e["id"] for e in found), ["e1", "e2"])
+
+    def test_remove_drops_every_key(self):
+        self.audience.remove("e2")
+        self.assertEqual(self.audience.venues(), ["Robotics Club"])
+
+
+class TestDimensionConflicts(unittest.IsolatedAsyncioTestCase):
+    """Test conflict checks across venue, organizer and audience groups"""
+
+    def setUp(self):
+        self.scheduler = SchedulerAgent()
+        self.scheduler.index_ttl_seconds = 0
+        self.scheduler.events_collection = object()
+        for index in self.scheduler._local_indexes():
+            index.load(EVENTS)
+
+    async def check(self, venue, offset_hours, **dimensions):
+        start = BASE_TIME + timedelta(hours=offset_hours)
+        return await self.scheduler.check_conflict(
+            start.isoformat(), (start + timedelta(hours=1)).isoformat(), venue=venue, **dimensions
+        )
+
+    async def test_organizer_booked_twice_in_other_venue(self):
+        result = await self.check("Lab 1", 3, organizer="Dr. Rao")
+        self.assertEqual(result.status, "CLASH")
+        self.assertEqual([e["id"] for e in result.dimension_conflicts["organizer"]], ["e3"])
+
+    async def test_audience_group_targeted_twice(self):
+        result = await self.check("Lab 1", 0, audience_groups=["Drama Club"])
+        self.assertEqual(result.status, "CLASH")
+        self.assertEqual(list(result.dimension_conflicts), ["audience_groups"])
+
+    async def test_venue_and_dimension_clashes_are_merged(self):
+        result = await self.check("Main Hall", 0, organizer="Dr. Rao", audience_groups=["Robotics Club"])
+        self.assertEqual(sorted(e["id"] for e in result.conflicting_events), ["e1", "e2"])
+        self.assertEqual(sorted(result.dimension_conflicts), ["audience_groups", "organizer"])
+
+    async def test_no_dimensions_keeps_venue_only_check(self):
+        result = await self.check("Lab 1", 0)
+        self.assertEqual(result.status, "CLEAR")
+        self.assertIsNone(result.dimension_conflicts)
+
+    async def test_excluded_event_does_not_clash_with_itself(self):
+        start = BASE_TIME + timedelta(hours=3)
+        result = await self.scheduler.check_conflict(
+            start.isoformat(), (start + timedelta(hours=1)).isoformat(),
+            venue="Room C", exclude_event_id="e3", organizer="Dr. Rao"
+        )
+        self.assertEqual(result.status, "CLEAR")
+
+    async def test_batch_agrees_with_single_checks(self):
+        slots = [
+            {"venue": "Room Z", "offset": 0, "organizer": "Dr. Rao"},
+            {"venue": "Room Z", "offset": 0, "audience_groups": ["Drama Club"]},
+            {"venue": "Main Hall", "offset": 0, "organizer": "Dr. Rao", "exclude_event_id": "e1"},
+            {"venue": "Room Z", "offset": 1, "organizer": "Dr. Rao", "audience_groups": ["Robotics Club"]},
+            {"venue": "Room B", "offset": 0},
+        ]
+        requests = []
+        for slot in slots:
+            start = BASE_TIME + timedelta(hours=slot.pop("offset"))
+            requests.append({"start_time": start.isoformat(), "end_time": (start + timedelta(hours=1)).isoformat(), **slot})
+
+        batch = await self.scheduler.check_conflicts_bulk(requests)
+        singles = [await self.scheduler.check_conflict(**request) for request in requests]
+        self.assertEqual([r.status for r in batch], ["CLASH", "CLASH", "CLEAR", "CLEAR", "CLASH"])
+        self.assertEqual([r.status for r in batch], [r.status for r in singles])
+        self.assertEqual(
+            [sorted(r.dimension_conflicts or {}) for r in batch],
+            [sorted(r.dimension_conflicts or {}) for r in singles]
+        )
+
+    async def test_series_checks_enforced_dimensions(self):
+        series = EventDocument.create_event_doc(
+            title="Weekly Standup",
+            start_time=BASE_TIME - timedelta(days=7),
+            end_time=BASE_TIME - timedelta(days=7, minutes=-30),
+            venue="Lab 1",
+            audience_groups=["Drama Club"],
+            recurrence="FREQ=WEEKLY;COUNT=3"
+        )
+        result = await self.scheduler.check_series_conflict(series)
+        self.assertEqual(result.status, "CLASH")
+        self.assertEqual([e["id"] for e in result.dimension_conflicts["audience_groups"]], ["e2"])
+
+        self.scheduler.enforced_dimensions = []
+        self.assertEqual((await self.scheduler.check_series_conflict(series)).status, "CLEAR")
+
+
+class TestDimensionsFromReplica(unittest.IsolatedAsyncioTestCase):
+    """Test that dimension checks read the events replica when it is running"""
+
+    def setUp(self):
+        self.scheduler = SchedulerAgent()
+        self.scheduler.events_collection = object()
+        self.replica = EventsReplica()
+        self.replica.index.load(EVENTS)
+        patch = mock.patch.object(scheduler_module, "get_events_replica", return_value=self.replica)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    async def test_dimension_check_does_not_load_the_index(self):
+        with mock.patch.object(self.scheduler, "refresh_index", side_effect=AssertionError("Firestore read")):
+            result = await self.scheduler.check_conflict(
+                BASE_TIME.isoformat(), (BASE_TIME + timedelta(hours=1)).isoformat(),
+                venue="Lab 1", audience_groups=["Drama Club"]
+            )
+        self.assertEqual(result.status, "CLASH")
+        self.assertEqual([e["id"] for e in result.dimension_conflicts["audience_groups"]], ["e2"])
+        self.assertFalse(self.scheduler.calendar_index.is_loaded)
+
+
+class TestImportDimensions(unittest.IsolatedAsyncioTestCase):
+    """Test that bulk imports enforce the configured conflict dimensions"""
+
+    def setUp(self):
+        self.scheduler = SchedulerAgent()
+        self.scheduler.index_ttl_seconds = 0
+        self.scheduler.events_collection = object()
+        for index in self.scheduler._local_indexes():
+            index.load(EVENTS)
+
+    def row(self, title, venue, offset_hours, **fields):
+        start = BASE_TIME + timedelta(hours=offset_hours)
+        return {
+            "title": title,
+            "venue": venue,
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=1)).isoformat(),
+            **fields
+        }
+
+    async def test_rows_clashing_on_organizer_or_audience_are_rejected(self):
+        report = await self.scheduler.import_events([
+            self.row("Office Hours", "Lab 1", 3, organizer="Dr. Rao"),
+            self.row("Rehearsal", "Lab 2", 5, audience_groups=["Drama Club"]),
+            self.row("Second Rehearsal", "Lab 3", 5.5, audience_groups=["Drama Club"]),
+            self.row("Build Night", "Lab 4", 0, audience_groups=["Chess Club"]),
+        ], dry_run=True)
+        rows = report["rows"]
+        self.assertEqual([entry["status"] for entry in rows], ["rejected", "accepted", "rejected", "accepted"])
+        self.assertEqual(rows[0]["reason"], "Conflicts with existing event 'e3' (organizer Dr. Rao)")
+        self.assertEqual(rows[2]["reason"], "Conflicts with row 2 in this import (audience groups Drama Club)")
+
+    async def test_unenforced_dimensions_are_ignored(self):
+        self.scheduler.enforced_dimensions = []
+        report = await self.scheduler.import_events([
+            self.row("Office Hours", "Lab 1", 3, organizer="Dr. Rao")
+        ], dry_run=True)
+        self.assertEqual(report["rows"][0]["status"], "accepted")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,168 @@
+"""
+Unit tests for the windowed Firestore conflict query, the event duration
+limit that bounds it, and concurrent checks on the async client.
+"""
+
+import asyncio
+import unittest
+from datetime import datetime, timezone, timedelta
+from types import SimpleNamespace
+from unittest import mock
+from fastapi import HTTPException
+from backend import app as app_module
+from backend.agents.scheduler import SchedulerAgent, TimeSlot
+
+
+BASE_TIME = datetime(2025, 11, 8, 10, 0, tzinfo=timezone.utc)
+
+_OPS = {
+    "==": lambda value, bound: value == bound,
+    ">": lambda value, bound: value is not None and value > bound,
+    "<": lambda value, bound: value is not None and value < bound,
+}
+
+
+class FakeQuery:
+    """Applies chained where() filters to stored documents and records them"""
+
+    def __init__(self, docs, filters=(), log=None):
+        self.docs = docs
+        self.filters = list(filters)
+        self.log = log if log is not None else []
+
+    def where(self, field, op, value):
+        return FakeQuery(self.docs, self.filters + [(field, op, value)], self.log)
+
+    async def stream(self):
+        self.log.append(self.filters)
+        for doc_id, data in self.docs.items():
+            if all(_OPS[op](data.get(field), value) for field, op, value in self.filters):
+                yield SimpleNamespace(id=doc_id, to_dict=lambda data=data: dict(data))
+
+
+def stored_event(title, start, hours, venue="Room A"):
+    return {
+        "title": title,
+        "venue": venue,
+        "status": "scheduled",
+        "start_time": start,
+        "end_time": start + timedelta(hours=hours)
+    }
+
+
+class TestWindowedConflictQuery(unittest.IsolatedAsyncioTestCase):
+    """Test conflict checks served by the direct Firestore query"""
+
+    def setUp(self):
+        self.scheduler = SchedulerAgent()
+        self.scheduler.index_enabled = False
+        self.scheduler.venue_day_checks = False
+        self.scheduler.max_event_duration = timedelta(hours=6)
+        self.docs = {
+            # Started before the slot but still running, inside the lookback window
+            "long": stored_event("Workshop", BASE_TIME - timedelta(hours=5), 6),
+            # Too early to reach the slot; outside the window so never read
+            "early": stored_event("Breakfast", BASE_TIME - timedelta(hours=9), 1),
+            "other_venue": stored_event("Seminar", BASE_TIME, 1, venue="Room B"),
+        }
+        self.query = FakeQuery(self.docs)
+        self.scheduler.events_collection = self.query
+
+    async def test_overlap_found_through_window_bound(self):
+        slot = TimeSlot(BASE_TIME, BASE_TIME + timedelta(hours=2), venue="Room A")
+        overlapping = await self.scheduler.get_overlapping_events(slot)
+        self.assertEqual([event["id"] for event in overlapping], ["long"])
+
+        single_query = self.query.log[0]
+        self.assertIn(("venue", "==", "Room A"), single_query)
+        self.assertIn(("start_time", ">", BASE_TIME - timedelta(hours=6)), single_query)
+        self.assertIn(("start_time", "<", BASE_TIME + timedelta(hours=2)), single_query)
+
+    async def test_event_ending_at_slot_start_is_clear(self):
+        result = await self.scheduler.check_conflict(
+            start_time=(BASE_TIME + timedelta(hours=1)).isoformat(),
+            end_time=(BASE_TIME + timedelta(hours=2)).isoformat(),
+            venue="Room A"
+        )
+        self.assertEqual(result.status, "CLEAR")
+
+
+class SlowQuery(FakeQuery):
+    """FakeQuery whose streams take a while and count how many run at once"""
+
+    def __init__(self, docs, filters=(), log=None, stats=None):
+        super().__init__(docs, filters, log)
+        self.stats = stats if stats is not None else {"in_flight": 0, "max_in_flight": 0}
+
+    def where(self, field, op, value):
+        return SlowQuery(self.docs, self.filters + [(field, op, value)], self.log, self.stats)
+
+    async def stream(self):
+        self.stats["in_flight"] += 1
+        self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+        try:
+            await asyncio.sleep(0.05)
+            async for doc in super().stream():
+                yield doc
+        finally:
+            self.stats["in_flight"] -= 1
+
+
+class TestConcurrentChecks(unittest.IsolatedAsyncioTestCase):
+    """Test that conflict checks on the AsyncClient do not block each other"""
+
+    def setUp(self):
+        self.scheduler = SchedulerAgent()
+        self.scheduler.index_enabled = False
+        self.scheduler.venue_day_checks = False
+        self.events = SlowQuery({
+            "a": stored_event("Workshop", BASE_TIME, 1, venue="Room A"),
+            "b": stored_event("Seminar", BASE_TIME, 1, venue="Room B"),
+        })
+        self.client = mock.MagicMock()
+        self.client.collection.side_effect = lambda name: self.events if name == "events" else mock.MagicMock()
+        patch = mock.patch("database.firebase_connection.firebase_manager.async_db", self.client)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    async def test_two_checks_run_concurrently(self):
+        checks = [
+            self.scheduler.check_conflict(
+                start_time=BASE_TIME.isoformat(),
+                end_time=(BASE_TIME + timedelta(hours=1)).isoformat(),
+                venue=venue
+            )
+            for venue in ("Room A", "Room B")
+        ]
+        results = await asyncio.gather(*checks)
+
+        self.assertEqual([result.conflicting_event for result in results], ["Workshop", "Seminar"])
+        self.client.collection.assert_any_call("events")
+        # Both checks were waiting on Firestore at the same time
+        self.assertEqual(self.events.stats["max_in_flight"], 2)
+
+
+class TestMaxEventDuration(unittest.IsolatedAsyncioTestCase):
+    """Test that events longer than the query lookback are refused"""
+
+    def setUp(self):
+        self.scheduler = SchedulerAgent()
+        self.scheduler.events_collection = object()
+
+    async def test_over_long_event_is_rejected_with_400(self):
+        request = app_module.EventCreateRequest(
+            title="Marathon Hackathon",
+            start_time=BASE_TIME.isoformat(),
+            end_time=(BASE_TIME + self.scheduler.max_event_duration + timedelta(hours=1)).isoformat(),
+            venue="Room A"
+        )
+        # Call the handler directly: routers.events also serves POST /api/events
+        with mock.patch.object(app_module, "scheduler_agent", self.scheduler):
+            with self.assertRaises(HTTPException) as context:
+                await app_module.create_event(request)
+        self.assertEqual(context.exception.status_code, 400)
+        self.assertIn("cannot exceed", context.exception.detail)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
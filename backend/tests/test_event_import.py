@@ -0,0 +1,212 @@
+"""
+Unit tests for bulk event imports: file parsing, the conflict sweep and
+batched writes. Firestore is replaced with in-memory stand-ins.
+"""
+
+import unittest
+from datetime import datetime, timezone, timedelta
+from backend.agents.scheduler import SchedulerAgent
+from backend.utils.event_import import detect_format, parse_events
+
+
+class FakeRef:
+    def __init__(self, doc_id):
+        self.id = doc_id
+
+
+class FakeCollection:
+    def __init__(self):
+        self.count = 0
+
+    def document(self, doc_id=None):
+        if doc_id is None:
+            self.count += 1
+            doc_id = f"new{self.count}"
+        return FakeRef(doc_id)
+
+
+class FakeBatch:
+    def __init__(self, commits):
+        self.commits = commits
+        self.writes = []
+
+    def set(self, ref, data, merge=False):
+        self.writes.append(ref.id)
+
+    async def commit(self):
+        self.commits.append(self.writes)
+
+
+class FakeClient:
+    def __init__(self):
+        self.commits = []
+
+    def batch(self):
+        return FakeBatch(self.commits)
+
+
+class TestParseEvents(unittest.TestCase):
+    """Test reading CSV, JSON and ICS files"""
+
+    def test_detect_format(self):
+        self.assertEqual(detect_format("fall.ICS"), "ics")
+        self.assertEqual(detect_format("clubs.csv"), "csv")
+        self.assertIsNone(detect_format("notes.txt"))
+
+    def test_csv(self):
+        content = "Title,Start_Time,End_Time,Venue,Capacity\nChess Club,2025-11-08T10:00:00Z,2025-11-08T11:00:00Z,Room B,30\n"
+        rows = parse_events(content, "csv")
+        self.assertEqual(rows, [{
+            "title": "Chess Club",
+            "start_time": "2025-11-08T10:00:00Z",
+            "end_time": "2025-11-08T11:00:00Z",
+            "venue": "Room B",
+            "capacity": 30
+        }])
+
+    def test_csv_audience_groups(self):
+        content = "title,audience_groups\nDebate,Drama Club; Debate Society\n"
+        self.assertEqual(parse_events(content, "csv")[0]["audience_groups"], ["Drama Club", "Debate Society"])
+
+    def test_json_wrapped_list(self):
+        rows = parse_events('{"events": [{"title": "Talk", "venue": "Hall", "extra": 1}]}', "json")
+        self.assertEqual(rows, [{"title": "Talk", "venue": "Hall"}])
+
+    def test_ics(self):
+        content = (
+            "BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nSUMMARY:Robotics\\, Intro\r\n"
+            "DTSTART:20251108T100000Z\r\nDTEND:20251108T120000Z\r\n"
+            "LOCATION:Lab 1\r\nDESCRIPTION:A long\r\n  description\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n"
+        )
+        rows = parse_events(content, "ics")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["title"], "Robotics, Intro")
+        self.assertEqual(rows[0]["venue"], "Lab 1")
+        self.assertEqual(rows[0]["description"], "A long description")
+        self.assertEqual(rows[0]["start_time"], "2025-11-08T10:00:00+00:00")
+
+    def test_ics_tzid(self):
+        content = (
+            "BEGIN:VEVENT\r\nSUMMARY:Board Meeting\r\n"
+            "DTSTART;TZID=America/New_York:20250901T100000\r\n"
+            "DTEND;TZID=America/New_York:20250901T110000\r\nEND:VEVENT\r\n"
+            "BEGIN:VEVENT\r\nSUMMARY:Somewhere\r\n"
+            "DTSTART;TZID=Nowhere/Special:20250901T100000\r\nEND:VEVENT\r\n"
+        )
+        rows = parse_events(content, "ics")
+        start = datetime.fromisoformat(rows[0]["start_time"])
+        self.assertEqual(start.astimezone(timezone.utc), datetime(2025, 9, 1, 14, 0, tzinfo=timezone.utc))
+        self.assertEqual(rows[0]["tzid"], "America/New_York")
+        self.assertIn("Unknown time zone 'Nowhere/Special'", rows[1]["error"])
+
+    def test_unreadable_row_is_reported(self):
+        content = "title,start_time,end_time,venue,capacity\nA,x,y,Hall,thirty\nB,x,y,Hall,30\n"
+        rows = parse_events(content, "csv")
+        self.assertEqual(rows[0], {"title": "A", "error": "Invalid capacity 'thirty'"})
+        self.assertEqual(rows[1]["capacity"], 30)
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            parse_events("", "xlsx")
+
+
+class TestImportEvents(unittest.IsolatedAsyncioTestCase):
+    """Test the single-pass conflict sweep and batched writes"""
+
+    def setUp(self):
+        self.scheduler = SchedulerAgent()
+        self.scheduler.index_ttl_seconds = 0
+        self.scheduler.events_collection = FakeCollection()
+        self.scheduler.venue_days_collection = FakeCollection()
+        self.scheduler.firestore_client = FakeClient()
+        self.base_time = datetime(2025, 11, 8, 10, 0, 0, tzinfo=timezone.utc)
+        self.scheduler.calendar_index.load([
+            {
+                "id": "e1",
+                "title": "Hackathon Kickoff",
+                "venue": "Main Hall",
+                "start_time": self.base_time,
+                "end_time": self.base_time + timedelta(hours=2)
+            }
+        ])
+
+    def row(self, title, offset_hours, hours=1, venue="Main Hall"):
+        start = self.base_time + timedelta(hours=offset_hours)
+        return {
+            "title": title,
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=hours)).isoformat(),
+            "venue": venue
+        }
+
+    async def test_report_covers_every_row(self):
+        """Rows clashing with stored events or earlier rows are rejected"""
+        report = await self.scheduler.import_events([
+            self.row("Overlaps kickoff", 1),
+            self.row("After kickoff", 2),
+            self.row("Overlaps previous row", 2.5),
+            self.row("Other venue", 0, venue="Room B"),
+            {"title": "Missing times", "venue": "Main Hall"},
+        ], dry_run=True)
+        self.assertEqual(
+            [entry["status"] for entry in report["rows"]],
+            ["rejected", "accepted", "rejected", "accepted", "rejected"]
+        )
+        self.assertIn("Hackathon Kickoff", report["rows"][0]["reason"])
+        self.assertIn("row 2", report["rows"][2]["reason"])
+        self.assertEqual((report["accepted"], report["rejected"]), (2, 3))
+
+    async def test_unreadable_row_is_rejected_alone(self):
+        rows = parse_events(
+            '[{"title": "Bad budget", "budget": "lots"}, '
+            f'{{"title": "Fine", "start_time": "{self.row("", 3)["start_time"]}", '
+            f'"end_time": "{self.row("", 3)["end_time"]}", "venue": "Main Hall"}}]',
+            "json"
+        )
+        report = await self.scheduler.import_events(rows, dry_run=True)
+        self.assertEqual([entry["status"] for entry in report["rows"]], ["rejected", "accepted"])
+        self.assertEqual(report["rows"][0]["reason"], "Invalid budget 'lots'")
+
+    async def test_ics_row_with_unknown_tzid_is_rejected(self):
+        content = (
+            "BEGIN:VEVENT\r\nSUMMARY:Somewhere\r\nLOCATION:Room B\r\n"
+            "DTSTART;TZID=Nowhere/Special:20251108T100000\r\n"
+            "DTEND;TZID=Nowhere/Special:20251108T110000\r\nEND:VEVENT\r\n"
+            "BEGIN:VEVENT\r\nSUMMARY:Late Talk\r\nLOCATION:Main Hall\r\n"
+            "DTSTART;TZID=Europe/Berlin:20251108T123000\r\n"
+            "DTEND;TZID=Europe/Berlin:20251108T133000\r\nEND:VEVENT\r\n"
+        )
+        report = await self.scheduler.import_events(parse_events(content, "ics"), dry_run=True)
+        self.assertEqual(report["rows"][0]["status"], "rejected")
+        self.assertIn("Nowhere/Special", report["rows"][0]["reason"])
+        # 12:30 Berlin is 11:30 UTC, inside the 10:00-12:00 UTC kickoff
+        self.assertIn("Hackathon Kickoff", report["rows"][1]["reason"])
+
+    async def test_series_too_long_for_one_batch_is_rejected(self):
+        self.scheduler.import_batch_size = 10
+        series = dict(self.row("Daily Standup", 30), recurrence="FREQ=DAILY;COUNT=20")
+        report = await self.scheduler.import_events([series, self.row("Talk", 4)])
+        self.assertEqual([entry["status"] for entry in report["rows"]], ["rejected", "accepted"])
+        self.assertIn("too many days", report["rows"][0]["reason"])
+        self.assertTrue(all(len(writes) <= 10 for writes in self.scheduler.firestore_client.commits))
+
+    async def test_stored_event_wins_over_earlier_starting_row(self):
+        """A row running into a later stored event is rejected"""
+        report = await self.scheduler.import_events([self.row("Runs into kickoff", -1, hours=2)], dry_run=True)
+        self.assertEqual(report["rows"][0]["status"], "rejected")
+
+    async def test_writes_are_batched(self):
+        """Accepted rows are committed in batches within the size limit"""
+        self.scheduler.import_batch_size = 4
+        rows = [self.row(f"Session {i}", 2 + i) for i in range(5)]
+        report = await self.scheduler.import_events(rows)
+        self.assertEqual(report["accepted"], 5)
+        commits = self.scheduler.firestore_client.commits
+        # One event plus one venue-day booking per row, at most 4 writes per commit
+        self.assertEqual([len(writes) for writes in commits], [4, 4, 2])
+        self.assertTrue(all(entry.get("id") for entry in report["rows"]))
+        self.assertEqual(len(self.scheduler.calendar_index), 6)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,87 @@
+"""
+Unit tests for the snapshot-listener-backed events replica.
+Uses a fake collection and watch in place of Firestore.
+"""
+
+import unittest
+from datetime import datetime, timezone, timedelta
+from types import SimpleNamespace
+from backend.database.events_replica import EventsReplica
+
+
+class FakeWatch:
+    def __init__(self):
+        self.is_active = True
+
+    def unsubscribe(self):
+        self.is_active = False
+
+
+class FakeCollection:
+    def __init__(self):
+        self.callback = None
+        self.watch = None
+
+    def where(self, *args):
+        return self
+
+    def on_snapshot(self, callback):
+        self.callback = callback
+        self.watch = FakeWatch()
+        return self.watch
+
+
+def doc(event_id, venue, start, hours=1):
+    data = {"title": event_id, "venue": venue, "start_time": start, "end_time": start + timedelta(hours=hours)}
+    return SimpleNamespace(id=event_id, to_dict=lambda: dict(data))
+
+
+def change(kind, document):
+    return SimpleNamespace(type=SimpleNamespace(name=kind), document=document)
+
+
+class TestEventsReplica(unittest.TestCase):
+    """Test applying snapshots to the replica"""
+
+    def setUp(self):
+        self.base_time = datetime(2025, 11, 8, 10, 0, 0, tzinfo=timezone.utc)
+        self.collection = FakeCollection()
+        self.replica = EventsReplica(restart_backoff_seconds=0)
+        self.replica.start(self.collection)
+
+    def query(self, venue):
+        return [e["id"] for e in self.replica.index.query(venue, self.base_time, self.base_time + timedelta(hours=1))]
+
+    def test_inactive_until_first_snapshot(self):
+        self.assertFalse(self.replica.is_active)
+        self.collection.callback([doc("e1", "Hall", self.base_time)], [], self.base_time)
+        self.assertTrue(self.replica.is_active)
+        self.assertEqual(self.query("Hall"), ["e1"])
+
+    def test_incremental_changes(self):
+        """Added, modified and removed documents should update the index"""
+        e1 = doc("e1", "Hall", self.base_time)
+        self.collection.callback([e1], [], self.base_time)
+        self.collection.callback([], [change("ADDED", doc("e2", "Lab", self.base_time))], self.base_time)
+        self.collection.callback([], [change("MODIFIED", doc("e1", "Lab", self.base_time + timedelta(hours=2)))], self.base_time)
+        self.assertEqual(self.query("Hall"), [])
+        self.assertEqual(self.query("Lab"), ["e2"])
+        self.collection.callback([], [change("REMOVED", doc("e2", "Lab", self.base_time))], self.base_time)
+        self.assertEqual(self.query("Lab"), [])
+
+        metrics = self.replica.metrics()
+        self.assertEqual(metrics["events"], 1)
+        self.assertEqual(metrics["snapshots_received"], 4)
+
+    def test_restarts_dropped_listener(self):
+        """A disconnected listener reports inactive and is re-attached"""
+        self.collection.callback([doc("e1", "Hall", self.base_time)], [], self.base_time)
+        self.collection.watch.is_active = False
+        self.assertFalse(self.replica.ensure_running())
+        self.assertEqual(self.replica.metrics()["restarts"], 1)
+        self.collection.callback([doc("e1", "Hall", self.base_time)], [], self.base_time)
+        self.assertTrue(self.replica.ensure_running())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
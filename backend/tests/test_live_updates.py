@@ -0,0 +1,109 @@
+"""
+Unit tests for live calendar push: subscription filtering, coalescing and
+per-connection backpressure.
+"""
+
+import asyncio
+import unittest
+from datetime import datetime, timezone, timedelta
+from backend.database.change_feed import ChangeFeed
+from backend.utils.live_updates import LiveUpdatesHub, Subscription
+
+
+class Recorder:
+    """Fake WebSocket send that can be made to stall"""
+
+    def __init__(self):
+        self.messages = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def send(self, message):
+        await self.gate.wait()
+        self.messages.append(message)
+
+    def changed_ids(self):
+        return [c["id"] for m in self.messages if m["type"] == "changes" for c in m["changes"]]
+
+
+class TestLiveUpdates(unittest.IsolatedAsyncioTestCase):
+    """Test fan-out from the change feed to subscribers"""
+
+    async def asyncSetUp(self):
+        self.feed = ChangeFeed()
+        self.hub = LiveUpdatesHub(max_pending=3, flush_interval=0.01, send_timeout=0.5)
+        self.feed.add_listener(self.hub.publish)
+        self.start = datetime(2025, 11, 14, 9, 0, tzinfo=timezone.utc)
+        self.tasks = []
+
+    async def asyncTearDown(self):
+        for task in self.tasks:
+            task.cancel()
+
+    def connect(self, subscription):
+        recorder = Recorder()
+        connection = self.hub.connect(recorder.send, subscription)
+        self.tasks.append(asyncio.create_task(connection.run()))
+        return recorder, connection
+
+    def book(self, event_id, venue, hours_from_start=0, change_type="created"):
+        start = self.start + timedelta(hours=hours_from_start)
+        self.feed.record("firestore", change_type, event_id, {
+            "id": event_id, "venue": venue, "start_time": start, "end_time": start + timedelta(hours=1)
+        })
+
+    async def test_venue_and_time_range_filters(self):
+        hall, _ = self.connect(Subscription(venues=frozenset({"Hall"})))
+        morning, _ = self.connect(Subscription(start=self.start, end=self.start + timedelta(hours=3)))
+        self.book("e1", "Hall", 0)
+        self.book("e2", "Lab", 1)
+        self.book("e3", "Hall", 8)
+        await asyncio.sleep(0.05)
+        self.assertEqual(hall.changed_ids(), ["e1", "e3"])
+        self.assertEqual(morning.changed_ids(), ["e1", "e2"])
+
+    async def test_bursts_are_coalesced_per_event(self):
+        recorder, connection = self.connect(Subscription())
+        self.book("e1", "Hall", 0)
+        self.book("e1", "Hall", 2, change_type="rescheduled")
+        self.book("e1", "Hall", 2, change_type="cancelled")
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(recorder.messages), 1)
+        self.assertEqual([c["type"] for c in recorder.messages[0]["changes"]], ["cancelled"])
+        self.assertEqual(connection.coalesced, 2)
+
+    async def test_slow_client_gets_resync_without_blocking_others(self):
+        slow, _ = self.connect(Subscription())
+        fast, _ = self.connect(Subscription())
+        slow.gate.clear()
+        self.book("e0", "Hall")
+        await asyncio.sleep(0.02)
+        # Small bursts the fast client keeps up with, piling up for the slow one
+        for n in range(1, 7):
+            self.book(f"e{n}", "Hall")
+            if n % 2 == 0:
+                await asyncio.sleep(0.03)
+        self.assertEqual(fast.changed_ids(), [f"e{n}" for n in range(7)])
+
+        slow.gate.set()
+        await asyncio.sleep(0.05)
+        self.assertEqual(slow.messages[-1], {"type": "resync", "version": self.feed.version})
+
+    async def test_stalled_send_ends_connection(self):
+        recorder, connection = self.connect(Subscription())
+        recorder.gate.clear()
+        self.book("e1", "Hall")
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(self.tasks[-1], 1)
+        self.hub.disconnect(connection)
+        self.assertEqual(self.hub.stats()["connections"], 0)
+
+    async def test_changes_from_other_threads(self):
+        recorder, _ = self.connect(Subscription())
+        await asyncio.to_thread(self.book, "e1", "Hall")
+        await asyncio.sleep(0.05)
+        self.assertEqual(recorder.changed_ids(), ["e1"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,69 @@
+"""
+Unit tests for the async LLM path (agenerate_text) and the agents awaiting it.
+"""
+
+import asyncio
+import os
+import time
+import unittest
+from unittest import mock
+from backend.utils import llm
+from backend.utils.llm_cache import LLMCache
+from backend.utils.llm_resilience import ProviderResilience
+from backend.utils.llm_scheduler import LLMScheduler
+from backend.agents.flow import FlowAgent, FlowRequest
+
+
+async def slow_provider(prompt, api_key, model):
+    await asyncio.sleep(0.2)
+    return f"generated: {prompt}"
+
+
+class TestAgenerateText(unittest.IsolatedAsyncioTestCase):
+    """Test agenerate_text against a fake async provider"""
+
+    def setUp(self):
+        self.cache = LLMCache(memory_entries=64)
+        patches = [
+            mock.patch.dict(os.environ, {"LLM_PROVIDER": "gemini", "GEMINI_API_KEY": "test-key"}),
+            mock.patch.object(llm, "llm_cache", self.cache),
+            mock.patch.object(llm, "provider_resilience", ProviderResilience(base_delay=0)),
+            mock.patch.object(llm, "llm_scheduler", LLMScheduler()),
+            mock.patch.object(llm, "_agenerate_gemini", side_effect=slow_provider)
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def test_generations_run_concurrently(self):
+        started = time.monotonic()
+        texts = await asyncio.gather(*(llm.agenerate_text(f"Plan event {n}") for n in range(50)))
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(texts[7], "generated: Plan event 7")
+
+    async def test_shares_the_response_cache(self):
+        await llm.agenerate_text("Plan a hackathon", max_tokens=800, agent="flow")
+        self.assertEqual(llm.generate_text("Plan a hackathon", max_tokens=800, agent="flow"), "generated: Plan a hackathon")
+        self.assertEqual(llm._agenerate_gemini.call_count, 1)
+
+    async def test_provider_error_falls_back_to_demo(self):
+        llm._agenerate_gemini.side_effect = RuntimeError("503 unavailable")
+        text = await llm.agenerate_text("Plan a workshop flow for an event")
+        self.assertIn("Event Flow", text)
+        self.assertEqual(self.cache.stats()["stores"], 0)
+
+
+class TestFlowAgentAsync(unittest.IsolatedAsyncioTestCase):
+    """Test that the flow agent awaits the async path"""
+
+    async def test_generate_flow_in_demo_mode(self):
+        with mock.patch.dict(os.environ, {"LLM_PROVIDER": "demo"}):
+            response = await FlowAgent().generate_flow(
+                FlowRequest(event_name="Tech Fest", event_type="workshop", duration=3)
+            )
+        self.assertEqual(response.metadata["generator"], "llm")
+        self.assertTrue(response.generated_flow)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
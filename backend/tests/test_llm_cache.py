@@ -0,0 +1,154 @@
+"""
+Unit tests for the two-tier LLM response cache and its use in generate_text.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+from backend.utils import llm
+from backend.utils.llm_cache import LLMCache
+from backend.utils.llm_resilience import ProviderResilience
+from backend.utils.llm_scheduler import LLMScheduler
+
+
+class TestLLMCache(unittest.TestCase):
+    """Test memory and disk tiers"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache.sqlite3")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_covers_every_generation_parameter(self):
+        base = LLMCache.key("gemini", "gemini-1.5-flash", "prompt", 0.7, 800)
+        self.assertEqual(base, LLMCache.key("gemini", "gemini-1.5-flash", "prompt", 0.7, 800))
+        self.assertNotEqual(base, LLMCache.key("openai", "gemini-1.5-flash", "prompt", 0.7, 800))
+        self.assertNotEqual(base, LLMCache.key("gemini", "gemini-1.5-pro", "prompt", 0.7, 800))
+        self.assertNotEqual(base, LLMCache.key("gemini", "gemini-1.5-flash", "prompt", 0.2, 800))
+        self.assertNotEqual(base, LLMCache.key("gemini", "gemini-1.5-flash", "prompt", 0.7, 600))
+
+    def test_disk_tier_survives_restart(self):
+        cache = LLMCache(path=self.path)
+        cache.put("k", "flow text")
+        self.assertEqual(cache.get("k"), "flow text")
+
+        restarted = LLMCache(path=self.path)
+        self.assertEqual(restarted.get("k"), "flow text")
+        self.assertEqual(restarted.get("k"), "flow text")
+        stats = restarted.stats()
+        self.assertEqual((stats["disk_hits"], stats["memory_hits"], stats["misses"]), (1, 1, 0))
+
+    def test_lru_and_disk_bounds(self):
+        cache = LLMCache(memory_entries=2, disk_entries=3, path=self.path)
+        for n in range(5):
+            cache.put(f"k{n}", f"text {n}")
+        self.assertEqual(cache.stats()["memory_entries"], 2)
+        self.assertEqual(cache.stats()["disk_entries"], 3)
+        self.assertIsNone(LLMCache(path=self.path).get("k0"))
+        self.assertEqual(LLMCache(path=self.path).get("k4"), "text 4")
+
+    def test_entries_expire(self):
+        cache = LLMCache(ttl_seconds=0.05, path=self.path)
+        cache.put("k", "text")
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["disk_entries"], 0)
+
+    def test_unusable_database_falls_back_to_memory(self):
+        blocker = os.path.join(self.tmp.name, "file")
+        open(blocker, "w").close()
+        cache = LLMCache(path=os.path.join(blocker, "cache.sqlite3"))
+        cache.put("k", "text")
+        self.assertEqual(cache.get("k"), "text")
+        self.assertEqual(cache.stats()["max_disk_entries"], 0)
+
+
+class TestAsyncCacheTiers(unittest.IsolatedAsyncioTestCase):
+    """Test that async lookups keep SQLite off the event loop"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "cache.sqlite3")
+
+    async def test_disk_tier_runs_in_a_thread_and_memory_hits_inline(self):
+        to_thread = asyncio.to_thread
+        with mock.patch("asyncio.to_thread", side_effect=to_thread) as spy:
+            await LLMCache(path=self.path).aput("k", "flow text")
+            self.assertEqual(spy.call_count, 1)
+
+            restarted = LLMCache(path=self.path)
+            self.assertEqual(await restarted.aget("k"), "flow text")
+            self.assertEqual(spy.call_count, 2)
+            # Now in the memory tier
+            self.assertEqual(await restarted.aget("k"), "flow text")
+            self.assertEqual(spy.call_count, 2)
+
+        stats = restarted.stats()
+        self.assertEqual((stats["disk_hits"], stats["memory_hits"], stats["misses"]), (1, 1, 0))
+
+    async def test_stats_and_clear_run_in_a_thread(self):
+        cache = LLMCache(path=self.path)
+        await cache.aput("k", "text")
+        to_thread = asyncio.to_thread
+        with mock.patch("asyncio.to_thread", side_effect=to_thread) as spy:
+            self.assertEqual((await cache.astats())["disk_entries"], 1)
+            await cache.aclear()
+        self.assertEqual([call.args[0] for call in spy.call_args_list], [cache.stats, cache.clear])
+        self.assertEqual(cache.stats()["disk_entries"], 0)
+
+    async def test_memory_only_cache_never_leaves_the_loop(self):
+        cache = LLMCache(memory_entries=4)
+        with mock.patch("asyncio.to_thread") as spy:
+            await cache.aput("k", "text")
+            self.assertEqual(await cache.aget("k"), "text")
+            self.assertIsNone(await cache.aget("missing"))
+        spy.assert_not_called()
+        self.assertEqual(cache.stats()["misses"], 1)
+
+
+class TestGenerateTextCaching(unittest.TestCase):
+    """Test generate_text against a fake provider"""
+
+    def setUp(self):
+        self.cache = LLMCache(disabled_agents=["content"])
+        patches = [
+            mock.patch.dict(os.environ, {"LLM_PROVIDER": "gemini", "GEMINI_API_KEY": "test-key"}),
+            mock.patch.object(llm, "llm_cache", self.cache),
+            mock.patch.object(llm, "provider_resilience", ProviderResilience(base_delay=0)),
+            mock.patch.object(llm, "llm_scheduler", LLMScheduler()),
+            mock.patch.object(llm, "_generate_gemini", side_effect=lambda prompt, key, model: f"generated: {prompt}")
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_repeated_prompt_calls_provider_once(self):
+        first = llm.generate_text("Plan a hackathon", max_tokens=800, agent="flow")
+        second = llm.generate_text("Plan a hackathon", max_tokens=800, agent="flow")
+        self.assertEqual(first, second)
+        self.assertEqual(llm._generate_gemini.call_count, 1)
+        llm.generate_text("Plan a hackathon", max_tokens=600, agent="flow")
+        self.assertEqual(llm._generate_gemini.call_count, 2)
+
+    def test_opt_out_per_agent_and_per_call(self):
+        llm.generate_text("Write a tweet", agent="content")
+        llm.generate_text("Write a tweet", agent="content")
+        llm.generate_text("Plan a fair", agent="flow", use_cache=False)
+        llm.generate_text("Plan a fair", agent="flow", use_cache=False)
+        self.assertEqual(llm._generate_gemini.call_count, 4)
+        self.assertEqual(self.cache.stats()["stores"], 0)
+
+    def test_demo_fallback_is_not_cached(self):
+        llm._generate_gemini.side_effect = RuntimeError("429 quota exceeded")
+        llm.generate_text("Plan a workshop flow for an event", agent="flow")
+        self.assertEqual(self.cache.stats()["stores"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
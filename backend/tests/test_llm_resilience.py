@@ -0,0 +1,154 @@
+"""
+Unit tests for LLM retries, circuit breakers and provider failover.
+"""
+
+import os
+import unittest
+from unittest import mock
+from backend.utils import llm
+from backend.utils.llm_cache import LLMCache
+from backend.utils.llm_resilience import CircuitBreaker, ProviderResilience, is_provider_failure, is_retryable
+from backend.utils.llm_scheduler import LLMScheduler
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test breaker state transitions"""
+
+    def test_opens_after_threshold_and_half_opens_after_timeout(self):
+        breaker = CircuitBreaker("gemini", failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+        with mock.patch("backend.utils.llm_resilience.time.monotonic", return_value=breaker._opened_at + 31):
+            self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+            self.assertTrue(breaker.allow())
+            # Only one trial call at a time
+            self.assertFalse(breaker.allow())
+            breaker.record_failure()
+            self.assertEqual(breaker._state, CircuitBreaker.OPEN)
+
+    def test_success_closes(self):
+        breaker = CircuitBreaker("openai", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.snapshot()["consecutive_failures"], 0)
+        self.assertEqual(breaker.times_opened, 1)
+
+
+class TestRetries(unittest.TestCase):
+    """Test the retry loop"""
+
+    def test_transient_errors_are_retried(self):
+        resilience = ProviderResilience(attempts=3, base_delay=0)
+        fn = mock.Mock(side_effect=[RuntimeError("503"), RuntimeError("503"), "ok"])
+        self.assertEqual(resilience.call("gemini", fn), "ok")
+        stats = resilience.stats()["providers"]["gemini"]
+        self.assertEqual((stats["retries"], stats["successes"], stats["state"]), (2, 1, "closed"))
+
+    def test_permanent_errors_are_not_retried(self):
+        self.assertFalse(is_retryable(StatusError(401)))
+        self.assertTrue(is_retryable(StatusError(429)))
+        resilience = ProviderResilience(attempts=3, base_delay=0)
+        fn = mock.Mock(side_effect=StatusError(400))
+        with self.assertRaises(StatusError):
+            resilience.call("openai", fn)
+        self.assertEqual(fn.call_count, 1)
+
+    def test_request_errors_do_not_trip_the_breaker(self):
+        self.assertFalse(is_provider_failure(StatusError(422)))
+        self.assertFalse(is_provider_failure(ValueError("response blocked by safety filters")))
+        self.assertTrue(is_provider_failure(StatusError(403)))
+        self.assertTrue(is_provider_failure(RuntimeError("503")))
+
+        resilience = ProviderResilience(attempts=3, base_delay=0, failure_threshold=2)
+        for error in (StatusError(400), ValueError("blocked"), StatusError(422)):
+            with self.assertRaises(type(error)):
+                resilience.call("gemini", mock.Mock(side_effect=error))
+        stats = resilience.stats()["providers"]["gemini"]
+        self.assertEqual((stats["state"], stats["consecutive_failures"], stats["request_errors"]), ("closed", 0, 3))
+
+        # A rejected key breaks every request, so it does count
+        for _ in range(2):
+            with self.assertRaises(StatusError):
+                resilience.call("gemini", mock.Mock(side_effect=StatusError(401)))
+        self.assertEqual(resilience.breaker("gemini").state, CircuitBreaker.OPEN)
+
+    def test_request_error_gives_back_the_half_open_trial(self):
+        resilience = ProviderResilience(attempts=1, base_delay=0, failure_threshold=1, reset_timeout=0)
+        resilience.record_failure("gemini")
+        breaker = resilience.breaker("gemini")
+        self.assertTrue(breaker.allow())
+        with self.assertRaises(StatusError):
+            resilience.call("gemini", mock.Mock(side_effect=StatusError(400)))
+        self.assertTrue(breaker.allow())
+
+    def test_backoff_is_jittered_and_capped(self):
+        resilience = ProviderResilience(base_delay=1, max_delay=4)
+        delays = [resilience.backoff(10) for _ in range(50)]
+        self.assertTrue(all(0 <= delay <= 4 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+
+class TestFailover(unittest.IsolatedAsyncioTestCase):
+    """Test generate_text and agenerate_text walking the provider chain"""
+
+    def setUp(self):
+        self.resilience = ProviderResilience(attempts=2, base_delay=0, failure_threshold=2)
+        patches = [
+            mock.patch.dict(os.environ, {
+                "LLM_PROVIDER": "gemini", "GEMINI_API_KEY": "g-key", "OPENAI_API_KEY": "o-key",
+                "LLM_FAILOVER_CHAIN": "gemini,openai"
+            }),
+            mock.patch.object(llm, "llm_cache", LLMCache(memory_entries=16)),
+            mock.patch.object(llm, "provider_resilience", self.resilience),
+            mock.patch.object(llm, "llm_scheduler", LLMScheduler()),
+            mock.patch.object(llm, "_generate_gemini", side_effect=RuntimeError("503 unavailable")),
+            mock.patch.object(llm, "_generate_openai", return_value="from openai")
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_fails_over_to_next_provider(self):
+        self.assertEqual(llm.generate_text("Plan a fair", agent="flow"), "from openai")
+        self.assertEqual(llm._generate_gemini.call_count, 2)
+        # Breaker is open now, so gemini is skipped without a call
+        self.assertEqual(llm.generate_text("Plan a quiz", agent="flow"), "from openai")
+        self.assertEqual(llm._generate_gemini.call_count, 2)
+
+        stats = self.resilience.stats()
+        self.assertEqual(stats["providers"]["gemini"]["state"], "open")
+        self.assertEqual(stats["providers"]["gemini"]["skipped_open"], 1)
+        self.assertEqual(stats["failovers"], {"gemini->openai": 2})
+
+    def test_all_providers_failing_uses_template(self):
+        llm._generate_openai.side_effect = StatusError(401)
+        text = llm.generate_text("Plan a workshop flow for an event")
+        self.assertEqual(text, llm._generate_demo_response("Plan a workshop flow for an event"))
+        self.assertEqual(llm._generate_openai.call_count, 1)
+        self.assertEqual(self.resilience.stats()["failovers"], {"gemini->openai": 1, "openai->template": 1})
+
+    def test_chain_without_fallback_keys(self):
+        with mock.patch.dict(os.environ, {"LLM_FAILOVER_CHAIN": "gemini"}):
+            self.assertIn("Event Flow", llm.generate_text("Plan a workshop flow for an event"))
+        llm._generate_openai.assert_not_called()
+
+    async def test_async_failover(self):
+        with mock.patch.object(llm, "_agenerate_gemini", side_effect=RuntimeError("timeout")), \
+                mock.patch.object(llm, "_agenerate_openai", return_value="async openai"):
+            self.assertEqual(await llm.agenerate_text("Plan a fair"), "async openai")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
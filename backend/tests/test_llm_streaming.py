@@ -0,0 +1,112 @@
+"""
+Unit tests for token streaming (astream_text) and server-sent event responses.
+"""
+
+import asyncio
+import os
+import time
+import unittest
+from unittest import mock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.utils import llm
+from backend.utils.api_helpers import APIResponse
+from backend.utils.llm_cache import LLMCache
+from backend.utils.llm_resilience import ProviderResilience
+from backend.utils.llm_scheduler import LLMScheduler
+from backend.agents.flow import FlowAgent, FlowRequest
+
+
+def fake_stream(chunks, fail_after=None, delay=0.05):
+    async def stream(prompt, api_key, model):
+        for n, chunk in enumerate(chunks):
+            if fail_after is not None and n == fail_after:
+                raise RuntimeError("connection reset")
+            await asyncio.sleep(delay)
+            yield chunk
+    return stream
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+class TestAstreamText(unittest.IsolatedAsyncioTestCase):
+    """Test streaming from a fake provider, the cache and the demo generator"""
+
+    def setUp(self):
+        self.cache = LLMCache(memory_entries=16)
+        patches = [
+            mock.patch.dict(os.environ, {"LLM_PROVIDER": "gemini", "GEMINI_API_KEY": "test-key"}),
+            mock.patch.object(llm, "llm_cache", self.cache),
+            mock.patch.object(llm, "provider_resilience", ProviderResilience(base_delay=0)),
+            mock.patch.object(llm, "llm_scheduler", LLMScheduler())
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def test_chunks_arrive_before_generation_finishes(self):
+        with mock.patch.object(llm, "_astream_gemini", side_effect=fake_stream(["# Flow", " for", " the fest"], delay=0.2)):
+            started = time.monotonic()
+            stream = llm.astream_text("Plan the fest", agent="flow")
+            first = await stream.__anext__()
+            self.assertLess(time.monotonic() - started, 0.4)
+            rest = await collect(stream)
+        self.assertEqual(first + "".join(rest), "# Flow for the fest")
+
+    async def test_completed_stream_is_cached_and_replayed(self):
+        provider = mock.Mock(side_effect=fake_stream(["Hello", " campus"]))
+        with mock.patch.object(llm, "_astream_gemini", provider):
+            await collect(llm.astream_text("Greet", agent="flow"))
+            replayed = await collect(llm.astream_text("Greet", agent="flow"))
+        self.assertEqual("".join(replayed), "Hello campus")
+        self.assertEqual(provider.call_count, 1)
+
+    async def test_failure_before_first_chunk_streams_demo_text(self):
+        with mock.patch.object(llm, "_astream_gemini", side_effect=fake_stream(["x"], fail_after=0)):
+            chunks = await collect(llm.astream_text("Plan a workshop flow for an event"))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), llm._generate_demo_response("Plan a workshop flow for an event"))
+
+    async def test_failure_mid_stream_is_raised(self):
+        with mock.patch.object(llm, "_astream_gemini", side_effect=fake_stream(["a", "b", "c"], fail_after=2)):
+            with self.assertRaises(RuntimeError):
+                await collect(llm.astream_text("Plan"))
+        self.assertEqual(self.cache.stats()["stores"], 0)
+
+
+class TestEventStream(unittest.TestCase):
+    """Test the SSE response format"""
+
+    def test_events_and_errors(self):
+        async def chunks():
+            yield "Hello"
+            yield " world"
+
+        async def broken():
+            yield "Hel"
+            raise RuntimeError("provider went away")
+
+        app = FastAPI()
+        app.get("/ok")(lambda: APIResponse.event_stream(chunks(), {"kind": "test"}))
+        app.get("/broken")(lambda: APIResponse.event_stream(broken()))
+        client = TestClient(app)
+
+        response = client.get("/ok")
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        self.assertEqual(response.text, (
+            'event: start\ndata: {"kind": "test"}\n\n'
+            'event: chunk\ndata: {"text": "Hello"}\n\n'
+            'event: chunk\ndata: {"text": " world"}\n\n'
+            'event: done\ndata: {"length": 11}\n\n'
+        ))
+        self.assertTrue(client.get("/broken").text.endswith('event: error\ndata: {"message": "provider went away"}\n\n'))
+
+    def test_flow_stream_validates_up_front(self):
+        with self.assertRaises(ValueError):
+            FlowAgent().stream_flow(FlowRequest(event_name="", event_type="workshop", duration=2))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
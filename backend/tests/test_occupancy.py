@@ -0,0 +1,100 @@
+"""
+Unit tests for per-venue slot-occupancy bitmaps.
+"""
+
+import unittest
+from datetime import datetime, timezone, timedelta
+from backend.agents.scheduler import SchedulerAgent
+from backend.utils.occupancy import OccupancyMap
+from backend.utils.venue_catalog import VenueCatalog
+
+DAY_START = datetime(2025, 11, 8, 0, 0, 0, tzinfo=timezone.utc)
+
+
+def at(hours):
+    return DAY_START + timedelta(hours=hours)
+
+
+class TestOccupancyMap(unittest.TestCase):
+    """Test bitmap updates and availability queries"""
+
+    def setUp(self):
+        self.occupancy = OccupancyMap(slot_minutes=15)
+        self.occupancy.load([
+            {"id": "e1", "venue": "Main Hall", "start_time": at(10), "end_time": at(12)},
+            {"id": "e2", "venue": "Main Hall", "start_time": at(13), "end_time": at(13.1)},
+            {"id": "e3", "venue": "Room B", "start_time": at(23), "end_time": at(25)},
+        ])
+
+    def test_slots_are_marked(self):
+        bits = self.occupancy.day_map("Main Hall", DAY_START.date())
+        self.assertEqual(bin(bits).count("1"), 8 + 1)
+        self.assertTrue(bits >> 40 & 1)
+        self.assertFalse(bits >> 39 & 1)
+
+    def test_is_free(self):
+        self.assertTrue(self.occupancy.is_free("Main Hall", at(14), at(16)))
+        self.assertFalse(self.occupancy.is_free("Main Hall", at(11.5), at(12.5)))
+        # Partially booked slots count as busy
+        self.assertFalse(self.occupancy.is_free("Main Hall", at(13.2), at(13.5)))
+
+    def test_event_across_midnight(self):
+        self.assertFalse(self.occupancy.is_free("Room B", at(24), at(24.5)))
+        self.assertTrue(self.occupancy.is_free("Room B", at(25), at(26)))
+
+    def test_first_free_block(self):
+        block = self.occupancy.first_free_block("Main Hall", at(9), at(18), timedelta(hours=2))
+        self.assertEqual(block, (at(13.25), at(15.25)))
+        self.assertIsNone(self.occupancy.first_free_block("Main Hall", at(10), at(13), timedelta(hours=1.5)))
+
+    def test_first_free_block_spans_days(self):
+        block = self.occupancy.first_free_block("Room B", at(22), at(30), timedelta(hours=3))
+        self.assertEqual(block, (at(25), at(28)))
+
+    def test_free_venues(self):
+        self.assertEqual(self.occupancy.free_venues(at(10), at(11)), ["Room B"])
+        self.assertEqual(self.occupancy.free_venues(at(23.5), at(24)), ["Main Hall"])
+
+    def test_round_trip(self):
+        restored = OccupancyMap.from_dict(self.occupancy.to_dict())
+        self.assertEqual(
+            restored.day_map("Main Hall", DAY_START.date()),
+            self.occupancy.day_map("Main Hall", DAY_START.date())
+        )
+        self.assertTrue(restored.is_loaded)
+
+
+class TestSchedulerOccupancy(unittest.IsolatedAsyncioTestCase):
+    """Test occupancy queries through the scheduler"""
+
+    async def test_grid_follows_index(self):
+        scheduler = SchedulerAgent()
+        scheduler.index_ttl_seconds = 0
+        scheduler.events_collection = object()
+        scheduler.calendar_index.load([])
+        scheduler.occupancy.load([
+            {"id": "e1", "venue": "Main Hall", "start_time": at(10), "end_time": at(11)}
+        ])
+        grid = await scheduler.venue_occupancy("Main Hall", "2025-11-08")
+        self.assertEqual(len(grid["slots"]), 96)
+        self.assertEqual(grid["slots"][40:44], "1111")
+        self.assertEqual(grid["slots"].count("1"), 4)
+
+    async def test_unbooked_catalog_venue_is_free(self):
+        scheduler = SchedulerAgent()
+        scheduler.index_ttl_seconds = 0
+        scheduler.events_collection = object()
+        scheduler.venue_catalog = VenueCatalog([{"name": "Main Hall"}, {"name": "Quiet Room"}])
+        scheduler.calendar_index.load([])
+        scheduler.occupancy.load([
+            {"id": "e1", "venue": "Main Hall", "start_time": at(10), "end_time": at(11)},
+            {"id": "e2", "venue": "Lab 2", "start_time": at(12), "end_time": at(13)}
+        ])
+        self.assertEqual(
+            await scheduler.free_venues(at(10).isoformat(), at(11).isoformat()),
+            ["Quiet Room", "Lab 2"]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
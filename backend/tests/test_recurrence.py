@@ -0,0 +1,207 @@
+"""
+Unit tests for recurring event series: rule parsing, lazy expansion and
+conflict checks through the calendar index.
+"""
+
+import unittest
+from datetime import datetime, timezone, timedelta
+from zoneinfo import ZoneInfo
+from backend.agents.scheduler import SchedulerAgent
+from backend.database.firebase_connection import EventDocument, VenueDayDocument
+from backend.utils.calendar_index import CalendarIndex, event_span, expand_event
+from backend.utils.recurrence import build_rule, occurrences, resolve_zone
+
+
+FIRST_START = datetime(2025, 9, 2, 16, 0, tzinfo=timezone.utc)  # a Tuesday
+FIRST_END = FIRST_START + timedelta(hours=1)
+
+
+def weekly_series(event_id="s1", count=15, exdates=None):
+    event = EventDocument.create_event_doc(
+        title="Chess Club",
+        start_time=FIRST_START,
+        end_time=FIRST_END,
+        venue="Room B",
+        recurrence=f"FREQ=WEEKLY;COUNT={count}",
+        exdates=exdates
+    )
+    event["id"] = event_id
+    return event
+
+
+class TestRecurrenceRules(unittest.TestCase):
+    """Test RRULE parsing and occurrence generation"""
+
+    def test_unbounded_rule_is_rejected(self):
+        with self.assertRaises(ValueError):
+            build_rule("FREQ=WEEKLY", FIRST_START)
+
+    def test_sub_daily_rule_is_rejected(self):
+        for rule in ("FREQ=SECONDLY;UNTIL=20991231T000000Z", "FREQ=MINUTELY;COUNT=100000000"):
+            with self.assertRaises(ValueError):
+                build_rule(rule, FIRST_START)
+
+    def test_occurrence_limit(self):
+        with self.assertRaises(ValueError):
+            build_rule("FREQ=DAILY;BYHOUR=8,12,16;COUNT=5000", FIRST_START)
+        with self.assertRaises(ValueError):
+            build_rule("FREQ=WEEKLY;UNTIL=20991231", FIRST_START)
+
+    def test_until_date_is_inclusive(self):
+        rule = build_rule("RRULE:FREQ=WEEKLY;UNTIL=20250916", FIRST_START)
+        self.assertEqual(len(list(rule)), 3)
+
+    def test_only_window_occurrences_are_generated(self):
+        rule = build_rule("FREQ=DAILY;COUNT=100", FIRST_START)
+        window_start = FIRST_START + timedelta(days=10, minutes=30)
+        found = list(occurrences(rule, FIRST_START, FIRST_END, window_start, window_start + timedelta(days=2)))
+        # The occurrence running at window_start is included
+        self.assertEqual([start.day for start, _ in found], [12, 13, 14])
+
+    def test_series_document(self):
+        event = weekly_series()
+        self.assertEqual(event["series_end"], FIRST_END + timedelta(weeks=14))
+
+
+class TestSeriesTimeZones(unittest.TestCase):
+    """Test that rules are expanded in the organiser's zone, not UTC"""
+
+    def series(self, start, tzid=None, rule="FREQ=WEEKLY;BYDAY=TU;COUNT=3"):
+        event = EventDocument.create_event_doc(
+            title="Evening Club",
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+            venue="Room B",
+            recurrence=rule,
+            tzid=tzid
+        )
+        event["id"] = "tz1"
+        # Firestore hands times back in UTC
+        event["start_time"] = start.astimezone(timezone.utc)
+        event["end_time"] = event["start_time"] + timedelta(hours=1)
+        return event
+
+    def starts(self, event):
+        return [occurrence["start_time"] for occurrence in expand_event(event, *event_span(event))]
+
+    def test_offset_start_crossing_midnight_keeps_local_weekday(self):
+        # Tuesday 20:00 at -07:00 is Wednesday 03:00 UTC
+        start = datetime(2025, 9, 2, 20, 0, tzinfo=timezone(timedelta(hours=-7)))
+        event = self.series(start)
+        self.assertEqual(event["tzid"], "-07:00")
+        expected = [datetime(2025, 9, day, 3, 0, tzinfo=timezone.utc) for day in (3, 10, 17)]
+        self.assertEqual(self.starts(event), expected)
+        self.assertEqual(event["series_end"], expected[-1] + timedelta(hours=1))
+
+    def test_dst_transition_keeps_local_time(self):
+        # New York leaves DST on 2025-11-02; 20:00 local moves from 00:00Z to 01:00Z
+        start = datetime(2025, 10, 28, 20, 0, tzinfo=ZoneInfo("America/New_York"))
+        event = self.series(start)
+        self.assertEqual(event["tzid"], "America/New_York")
+        self.assertEqual(self.starts(event), [
+            datetime(2025, 10, 29, 0, 0, tzinfo=timezone.utc),
+            datetime(2025, 11, 5, 1, 0, tzinfo=timezone.utc),
+            datetime(2025, 11, 12, 1, 0, tzinfo=timezone.utc),
+        ])
+        self.assertEqual(event_span(event)[1], datetime(2025, 11, 12, 2, 0, tzinfo=timezone.utc))
+
+    def test_explicit_tzid_overrides_start_offset(self):
+        start = datetime(2025, 10, 29, 0, 0, tzinfo=timezone.utc)
+        event = self.series(start, tzid="America/New_York", rule="FREQ=DAILY;BYHOUR=20;COUNT=6")
+        # 20:00 New York every day, an hour later in UTC from Nov 2
+        self.assertEqual([occ.hour for occ in self.starts(event)], [0, 0, 0, 0, 0, 1])
+
+    def test_exdate_matches_shifted_occurrence(self):
+        start = datetime(2025, 10, 28, 20, 0, tzinfo=ZoneInfo("America/New_York"))
+        event = self.series(start)
+        event["exdates"] = [datetime(2025, 11, 4, 20, 0, tzinfo=ZoneInfo("America/New_York"))]
+        self.assertEqual(len(self.starts(event)), 2)
+
+    def test_unknown_zone_is_rejected(self):
+        with self.assertRaises(ValueError):
+            resolve_zone("Mars/Olympus_Mons")
+
+
+class TestSeriesInCalendarIndex(unittest.TestCase):
+    """Test series stored once and expanded at query time"""
+
+    def setUp(self):
+        self.index = CalendarIndex()
+        self.index.load([weekly_series(exdates=[FIRST_START + timedelta(weeks=3)])])
+
+    def test_series_is_stored_once(self):
+        self.assertEqual(len(self.index), 1)
+
+    def test_query_returns_occurrence(self):
+        week_five = FIRST_START + timedelta(weeks=5)
+        results = self.index.query("Room B", week_five, week_five + timedelta(minutes=30))
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["start_time"], week_five)
+        self.assertEqual(results[0]["series_id"], "s1")
+
+    def test_gaps_and_exdates_are_free(self):
+        between = FIRST_START + timedelta(days=2)
+        self.assertEqual(self.index.query("Room B", between, between + timedelta(hours=1)), [])
+        skipped = FIRST_START + timedelta(weeks=3)
+        self.assertEqual(self.index.query("Room B", skipped, skipped + timedelta(hours=1)), [])
+
+
+class TestSeriesReschedule(unittest.TestCase):
+    """Test moving a whole series"""
+
+    def test_exdates_move_with_the_series(self):
+        series = weekly_series(count=5, exdates=[FIRST_START + timedelta(weeks=2)])
+        new_start = FIRST_START + timedelta(days=2, hours=1)
+        changes = EventDocument.reschedule_event_doc(series, new_start, new_start + timedelta(hours=1), "Room B")
+        self.assertEqual(changes["exdates"], [new_start + timedelta(weeks=2)])
+
+        moved = {**series, **changes}
+        starts = [occurrence["start_time"] for occurrence in expand_event(moved, *event_span(moved))]
+        self.assertEqual(starts, [new_start + timedelta(weeks=week) for week in (0, 1, 3, 4)])
+
+    def test_exdates_keep_local_time_across_dst(self):
+        zone = ZoneInfo("America/New_York")
+        start = datetime(2025, 10, 21, 20, 0, tzinfo=zone)
+        series = EventDocument.create_event_doc(
+            title="Evening Club", start_time=start, end_time=start + timedelta(hours=1), venue="Room B",
+            recurrence="FREQ=WEEKLY;COUNT=4", exdates=[datetime(2025, 11, 4, 20, 0, tzinfo=zone)]
+        )
+        new_start = datetime(2025, 10, 22, 19, 0, tzinfo=zone)
+        changes = EventDocument.reschedule_event_doc(series, new_start, new_start + timedelta(hours=1), "Room B")
+        self.assertEqual(changes["exdates"], [datetime(2025, 11, 5, 19, 0, tzinfo=zone)])
+
+
+class TestSeriesConflicts(unittest.IsolatedAsyncioTestCase):
+    """Test conflict checks for a new series against the calendar"""
+
+    def setUp(self):
+        self.scheduler = SchedulerAgent()
+        self.scheduler.index_ttl_seconds = 0
+        self.scheduler.events_collection = object()
+        self.scheduler.calendar_index.load([
+            {
+                "id": "e1",
+                "title": "Guest Lecture",
+                "venue": "Room B",
+                "start_time": FIRST_START + timedelta(weeks=4, minutes=30),
+                "end_time": FIRST_START + timedelta(weeks=4, hours=2)
+            }
+        ])
+
+    async def test_clashing_occurrence_is_found(self):
+        result = await self.scheduler.check_series_conflict(weekly_series("s2"))
+        self.assertEqual(result.status, "CLASH")
+        self.assertEqual(result.conflicting_event, "Guest Lecture")
+
+    async def test_exdate_avoids_clash(self):
+        series = weekly_series("s2", exdates=[FIRST_START + timedelta(weeks=4)])
+        result = await self.scheduler.check_series_conflict(series)
+        self.assertEqual(result.status, "CLEAR")
+
+    def test_venue_day_bookings_per_occurrence(self):
+        by_day = VenueDayDocument.bookings_by_day("s2", weekly_series("s2", count=3))
+        self.assertEqual(sorted(by_day), ["2025-09-02", "2025-09-09", "2025-09-16"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,210 @@
+"""
+Unit tests for session-to-room allocation by interval-graph coloring.
+"""
+
+import random
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.agents.flow import FlowAgent, FlowRequest
+from backend.routers import events as events_router
+from backend.utils.room_allocation import allocate_rooms, parse_clock
+
+
+def session(name, start, end, day=1, track=None):
+    return {"session": name, "day": day, "startTime": start, "endTime": end, "track": track}
+
+
+def max_overlap(items):
+    points = []
+    for item in items:
+        offset = (item["day"] - 1) * 1440
+        points.append((offset + parse_clock(item["startTime"]), 1))
+        points.append((offset + parse_clock(item["endTime"]), -1))
+    running = peak = 0
+    for _, change in sorted(points):
+        running += change
+        peak = max(peak, running)
+    return peak
+
+
+class TestRoomAllocation(unittest.TestCase):
+    """Test room assignment for fixed and duration-only sessions"""
+
+    def test_rooms_are_reused_once_free(self):
+        items = allocate_rooms([
+            session("Keynote", "09:00", "10:00"),
+            session("Talk A", "10:00", "11:00"),
+            session("Talk B", "10:30", "11:30")
+        ])
+        rooms = {item["session"]: item["room"] for item in items}
+        self.assertEqual(rooms["Keynote"], rooms["Talk A"])
+        self.assertNotEqual(rooms["Talk A"], rooms["Talk B"])
+        self.assertEqual(len(set(rooms.values())), 2)
+
+    def test_tracks_keep_their_room(self):
+        items = allocate_rooms([
+            session("ML 1", "09:00", "10:00", track="ML"),
+            session("Web 1", "09:00", "10:00", track="Web"),
+            session("Web 2", "10:00", "11:00", track="Web"),
+            session("ML 2", "10:00", "11:00", track="ML")
+        ])
+        rooms = {item["session"]: item["room"] for item in items}
+        self.assertEqual(rooms["ML 1"], rooms["ML 2"])
+        self.assertEqual(rooms["Web 1"], rooms["Web 2"])
+
+    def test_duration_only_sessions_follow_their_track(self):
+        items = allocate_rooms([
+            {"session": "Intro", "durationMinutes": 45, "track": "Main"},
+            {"session": "Panel", "durationMinutes": 60, "track": "Main"},
+            {"session": "Workshop", "durationMinutes": 90, "track": "Labs"}
+        ])
+        times = {item["session"]: (item["startTime"], item["endTime"]) for item in items}
+        self.assertEqual(times["Intro"], ("09:00", "09:45"))
+        self.assertEqual(times["Panel"], ("09:45", "10:45"))
+        self.assertEqual(times["Workshop"], ("09:00", "10:30"))
+
+    def test_days_do_not_overlap(self):
+        items = allocate_rooms([
+            session("Day 1", "09:00", "17:00", day=1),
+            session("Day 2", "09:00", "17:00", day=2)
+        ])
+        self.assertEqual({item["room"] for item in items}, {"Room 1"})
+
+    def test_named_rooms_and_shortage(self):
+        items = allocate_rooms([session("A", "09:00", "10:00")], rooms=["Hall A", "Hall B"])
+        self.assertEqual(items[0]["room"], "Hall A")
+        with self.assertRaises(ValueError):
+            allocate_rooms(
+                [session("A", "09:00", "10:00"), session("B", "09:30", "10:30")],
+                rooms=["Hall A"]
+            )
+
+    def test_overlap_within_track_is_rejected(self):
+        with self.assertRaises(ValueError):
+            allocate_rooms([
+                session("ML 1", "09:00", "10:00", track="ML"),
+                session("ML 2", "09:30", "10:30", track="ML")
+            ])
+
+    def test_conference_scale_uses_minimum_rooms_quickly(self):
+        rng = random.Random(5)
+        sessions = []
+        for n in range(600):
+            start = rng.randrange(8 * 4, 19 * 4) * 15
+            length = rng.choice([30, 45, 60, 90])
+            sessions.append({
+                "session": f"S{n}",
+                "day": rng.randint(1, 3),
+                "startTime": f"{start // 60}:{start % 60:02d}",
+                "durationMinutes": length
+            })
+        started = time.perf_counter()
+        items = allocate_rooms(sessions)
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(len({item["room"] for item in items}), max_overlap(items))
+
+        by_room = {}
+        for item in items:
+            offset = (item["day"] - 1) * 1440
+            by_room.setdefault(item["room"], []).append(
+                (offset + parse_clock(item["startTime"]), offset + parse_clock(item["endTime"]))
+            )
+        for intervals in by_room.values():
+            intervals.sort()
+            self.assertTrue(all(a[1] <= b[0] for a, b in zip(intervals, intervals[1:])))
+
+
+PARALLEL_FLOW = """## ⏰ Detailed Timeline
+**[T-60] Setup Begins**
+- Duration: 60 minutes
+
+**[09:00] Opening Keynote**
+- Duration: 60 minutes
+- Responsible: Host
+
+**[10:00] Intro to Rust**
+- Duration: 90 minutes
+- Track: Workshops
+
+**[10:00] Scaling Postgres**
+- Duration: 45 minutes
+- Track: Talks
+
+**[10:45] Observability 101**
+- Duration: 45 minutes
+- Track: Talks
+
+**[11:30] Lunch**
+- Duration: 1 hour
+"""
+
+
+class TestExtractSessions(unittest.TestCase):
+    """Test reading timed sessions from a generated flow"""
+
+    def test_clock_times_durations_and_tracks(self):
+        sessions = FlowAgent().extract_sessions(PARALLEL_FLOW)
+        self.assertEqual(
+            [(s["session"], s["startTime"], s["endTime"], s["track"]) for s in sessions],
+            [
+                ("Opening Keynote", "09:00", "10:00", None),
+                ("Intro to Rust", "10:00", "11:30", "Workshops"),
+                ("Scaling Postgres", "10:00", "10:45", "Talks"),
+                ("Observability 101", "10:45", "11:30", "Talks"),
+                ("Lunch", "11:30", "12:30", None),
+            ]
+        )
+
+    def test_relative_timeline_starts_at_day_start(self):
+        agent = FlowAgent()
+        flow = agent._get_fallback_flow(FlowRequest(event_name="Fest", event_type="cultural", duration=3))
+        sessions = agent.extract_sessions(flow, day_start="10:00")
+        self.assertEqual(
+            [(s["session"], s["startTime"], s["endTime"]) for s in sessions[:2]],
+            [("Event Opening", "10:00", "10:15"), ("Main Activities", "10:15", "12:45")]
+        )
+
+
+class TestGenerateScheduleEndpoint(unittest.TestCase):
+    """Test POST /api/events/{id}/schedule/generate with a stubbed flow"""
+
+    def setUp(self):
+        events_router.events_store.clear()
+        app = FastAPI()
+        app.include_router(events_router.router)
+        self.client = TestClient(app)
+        self.event = self.client.post("/api/events", json={
+            "name": "DevConf", "startDate": "2025-11-14", "endDate": "2025-11-14"
+        }).json()
+        patch = mock.patch.object(
+            events_router.flow_agent, "generate_flow",
+            mock.AsyncMock(return_value=SimpleNamespace(generated_flow=PARALLEL_FLOW))
+        )
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_parallel_sessions_get_separate_rooms(self):
+        response = self.client.post(f"/api/events/{self.event['id']}/schedule/generate")
+        self.assertEqual(response.status_code, 200)
+        schedules = {item["session"]: item for item in response.json()["schedules"]}
+        self.assertEqual(len(schedules), 5)
+        self.assertNotEqual(schedules["Intro to Rust"]["room"], schedules["Scaling Postgres"]["room"])
+        # A track keeps its room
+        self.assertEqual(schedules["Scaling Postgres"]["room"], schedules["Observability 101"]["room"])
+        self.assertEqual(len({item["room"] for item in schedules.values()}), 2)
+        self.assertEqual(len(events_router.events_store[self.event["id"]].schedules), 5)
+
+    def test_flow_without_timeline_is_an_error(self):
+        events_router.flow_agent.generate_flow.return_value = SimpleNamespace(generated_flow="No timeline here")
+        response = self.client.post(f"/api/events/{self.event['id']}/schedule/generate")
+        self.assertEqual(response.status_code, 500)
+        self.assertIn("no timed sessions", response.json()["detail"])
+        self.assertEqual(self.client.post("/api/events/missing/schedule/generate").status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,198 @@
+"""
+Unit tests for transactional event booking in the SchedulerAgent.
+Uses in-memory stand-ins for Firestore documents and transactions.
+"""
+
+import unittest
+from datetime import datetime, timezone, timedelta
+from types import SimpleNamespace
+from backend.agents.scheduler import SchedulerAgent
+from backend.database.firebase_connection import VenueDayDocument
+
+
+class FakeDocumentRef:
+    """Document reference backed by a dict of stored documents"""
+
+    def __init__(self, store, doc_id, reads=None):
+        self.store = store
+        self.id = doc_id
+        self.reads = reads
+
+    async def get(self, transaction=None):
+        if self.reads is not None:
+            self.reads.append(self.id)
+        data = self.store.get(self.id)
+        return SimpleNamespace(exists=data is not None, to_dict=lambda: data)
+
+
+class FakeCollection:
+    """Collection whose documents live in a shared dict"""
+
+    def __init__(self, store, reads=None):
+        self.store = store
+        self.reads = reads
+
+    def document(self, doc_id):
+        return FakeDocumentRef(self.store, doc_id, self.reads)
+
+
+class FakeTransaction:
+    """Records writes so tests can inspect them"""
+
+    def __init__(self):
+        self.writes = {}
+
+    def set(self, ref, data):
+        self.writes[ref.id] = data
+
+    def update(self, ref, data):
+        self.writes[ref.id] = {**ref.store[ref.id], **data}
+
+
+class TestVenueDayDocument(unittest.TestCase):
+    """Test venue-day document helpers"""
+
+    def test_days_spanned(self):
+        """Events ending exactly at midnight should not touch the next day"""
+        start = datetime(2025, 11, 8, 22, 0, tzinfo=timezone.utc)
+        self.assertEqual(
+            VenueDayDocument.days_spanned(start, start + timedelta(hours=2)),
+            ["2025-11-08"]
+        )
+        self.assertEqual(
+            VenueDayDocument.days_spanned(start, start + timedelta(hours=3)),
+            ["2025-11-08", "2025-11-09"]
+        )
+
+    def test_doc_id_escapes_venue(self):
+        """Venue names should not be able to create nested paths"""
+        self.assertEqual(VenueDayDocument.doc_id("Lab 1/2", "2025-11-08"), "Lab%201%2F2__2025-11-08")
+
+
+class TestBookingTransaction(unittest.IsolatedAsyncioTestCase):
+    """Test the checks and writes made inside the booking transaction"""
+
+    def setUp(self):
+        self.scheduler = SchedulerAgent()
+        self.store = {}
+        self.base_time = datetime(2025, 11, 8, 10, 0, 0, tzinfo=timezone.utc)
+
+    def event(self, offset_hours, hours=1):
+        start = self.base_time + timedelta(hours=offset_hours)
+        return {
+            "title": "Workshop",
+            "venue": "Main Hall",
+            "start_time": start,
+            "end_time": start + timedelta(hours=hours)
+        }
+
+    async def book(self, event_id, event_doc):
+        transaction = FakeTransaction()
+        event_ref = FakeDocumentRef(self.store, event_id)
+        start, end = event_doc["start_time"], event_doc["end_time"]
+        day_refs = [
+            (day, FakeDocumentRef(self.store, VenueDayDocument.doc_id(event_doc["venue"], day)))
+            for day in VenueDayDocument.days_spanned(start, end)
+        ]
+        await self.scheduler._book_in_transaction(transaction, event_ref, event_doc, day_refs)
+        self.store.update(transaction.writes)
+        return transaction
+
+    async def test_booking_writes_event_and_venue_day(self):
+        """A clear booking should write the event and its venue-day booking together"""
+        transaction = await self.book("e1", self.event(0))
+        self.assertIn("e1", transaction.writes)
+        day_doc = transaction.writes["Main%20Hall__2025-11-08"]
+        self.assertEqual([b["event_id"] for b in day_doc["bookings"]], ["e1"])
+
+    async def test_overlapping_booking_is_rejected(self):
+        """A second booking overlapping the first should fail without writing"""
+        await self.book("e1", self.event(0, hours=2))
+        with self.assertRaises(ValueError):
+            await self.book("e2", self.event(1))
+        self.assertNotIn("e2", self.store)
+
+    async def test_adjacent_bookings_are_kept_in_order(self):
+        """Back-to-back bookings should both succeed and stay sorted"""
+        await self.book("e2", self.event(1))
+        await self.book("e1", self.event(0))
+        day_doc = self.store["Main%20Hall__2025-11-08"]
+        self.assertEqual([b["event_id"] for b in day_doc["bookings"]], ["e1", "e2"])
+
+
+class TestVenueDaySummaries(unittest.IsolatedAsyncioTestCase):
+    """Test conflict checks, reschedules and cancellations on venue-day documents"""
+
+    def setUp(self):
+        self.scheduler = SchedulerAgent()
+        self.scheduler.index_enabled = False
+        self.store = {}
+        self.reads = []
+        self.scheduler.events_collection = FakeCollection(self.store)
+        self.scheduler.venue_days_collection = FakeCollection(self.store, self.reads)
+        self.base_time = datetime(2025, 11, 8, 10, 0, 0, tzinfo=timezone.utc)
+        for event_id, offset in (("e1", 0), ("e2", 3)):
+            event_doc = {
+                "title": event_id,
+                "venue": "Main Hall",
+                "status": "scheduled",
+                "start_time": self.base_time + timedelta(hours=offset),
+                "end_time": self.base_time + timedelta(hours=offset + 1)
+            }
+            self.store[event_id] = event_doc
+            for day, bookings in VenueDayDocument.bookings_by_day(event_id, event_doc).items():
+                doc_id = VenueDayDocument.doc_id("Main Hall", day)
+                existing = self.store.get(doc_id, {}).get("bookings", [])
+                self.store[doc_id] = VenueDayDocument.create_venue_day_doc("Main Hall", day, existing + bookings)
+
+    async def change(self, event_id, new_slot):
+        transaction = FakeTransaction()
+        result = await self.scheduler._change_in_transaction(
+            transaction, self.scheduler.events_collection.document(event_id), new_slot
+        )
+        self.store.update(transaction.writes)
+        return result
+
+    def day_doc(self):
+        return self.store[VenueDayDocument.doc_id("Main Hall", "2025-11-08")]
+
+    async def test_conflict_check_is_one_read(self):
+        """A single-day slot is checked with one venue-day document read"""
+        start = self.base_time + timedelta(minutes=30)
+        result = await self.scheduler.check_conflict(
+            start.isoformat(), (start + timedelta(hours=1)).isoformat(), venue="Main Hall"
+        )
+        self.assertEqual(result.status, "CLASH")
+        self.assertEqual(result.conflicting_event, "e1")
+        self.assertEqual(len(self.reads), 1)
+
+    async def test_reschedule_moves_booking(self):
+        new_start = self.base_time + timedelta(hours=5)
+        _, new_doc = await self.change("e1", (new_start, new_start + timedelta(hours=1), None))
+        self.assertEqual(new_doc["start_time"], new_start)
+        self.assertEqual(self.store["e1"]["start_time"], new_start)
+        self.assertEqual(
+            [(b["event_id"], b["start_time"]) for b in self.day_doc()["bookings"]],
+            [("e2", self.base_time + timedelta(hours=3)), ("e1", new_start)]
+        )
+
+    async def test_reschedule_into_clash_is_rejected(self):
+        new_start = self.base_time + timedelta(hours=3, minutes=30)
+        with self.assertRaises(ValueError):
+            await self.change("e1", (new_start, new_start + timedelta(hours=1), None))
+        self.assertEqual(self.store["e1"]["start_time"], self.base_time)
+
+    async def test_cancel_releases_booking(self):
+        await self.change("e2", None)
+        self.assertEqual(self.store["e2"]["status"], "cancelled")
+        self.assertEqual([b["event_id"] for b in self.day_doc()["bookings"]], ["e1"])
+        with self.assertRaises(ValueError):
+            await self.change("e2", None)
+
+    async def test_missing_event(self):
+        with self.assertRaises(LookupError):
+            await self.change("missing", None)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,65 @@
+"""
+Unit tests for SchedulerAgent bulk conflict checks.
+Runs against a preloaded calendar index so no Firestore access is needed.
+"""
+
+import unittest
+from datetime import datetime, timezone, timedelta
+from backend.agents.scheduler import SchedulerAgent
+
+
+class TestBulkConflictCheck(unittest.IsolatedAsyncioTestCase):
+    """Test checking many slots in one call"""
+
+    def setUp(self):
+        self.scheduler = SchedulerAgent()
+        self.scheduler.index_ttl_seconds = 0
+        # Pretend Firestore is connected; all reads are served by the index
+        self.scheduler.events_collection = object()
+        self.base_time = datetime(2025, 11, 8, 10, 0, 0, tzinfo=timezone.utc)
+        self.scheduler.calendar_index.load([
+            {
+                "id": "e1",
+                "title": "Hackathon Kickoff",
+                "venue": "Main Hall",
+                "start_time": self.base_time,
+                "end_time": self.base_time + timedelta(hours=2)
+            }
+        ])
+
+    def slot(self, offset_hours, hours=1, venue="Main Hall", **extra):
+        start = self.base_time + timedelta(hours=offset_hours)
+        return dict(
+            start_time=start.isoformat(),
+            end_time=(start + timedelta(hours=hours)).isoformat(),
+            venue=venue,
+            **extra
+        )
+
+    async def test_results_follow_request_order(self):
+        """Each slot should get its own result in request order"""
+        results = await self.scheduler.check_conflicts_bulk([
+            self.slot(1),
+            self.slot(2),
+            self.slot(1, venue="Room B"),
+        ])
+        self.assertEqual([r.status for r in results], ["CLASH", "CLEAR", "CLEAR"])
+        self.assertEqual(results[0].conflicting_event, "Hackathon Kickoff")
+
+    async def test_exclude_event_id(self):
+        """Excluded events should not be reported as clashes"""
+        results = await self.scheduler.check_conflicts_bulk([self.slot(1, exclude_event_id="e1")])
+        self.assertEqual(results[0].status, "CLEAR")
+
+    async def test_invalid_slot_does_not_fail_batch(self):
+        """A bad slot should report ERROR without affecting the others"""
+        results = await self.scheduler.check_conflicts_bulk([
+            {"start_time": "not-a-datetime", "end_time": "2025-11-08T12:00:00Z"},
+            self.slot(0, hours=0.5),
+        ])
+        self.assertEqual(results[0].status, "ERROR")
+        self.assertEqual(results[1].status, "CLASH")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,90 @@
+"""
+Unit tests for the venue catalog and its combination with availability.
+"""
+
+import unittest
+from datetime import datetime, timezone, timedelta
+from backend.agents.scheduler import SchedulerAgent
+from backend.utils.venue_catalog import VenueCatalog
+
+
+VENUES = [
+    {"name": "Main Hall", "capacity": 400, "features": ["Projector", "sound system"], "accessibility": ["wheelchair"]},
+    {"name": "Auditorium", "capacity": 800, "features": ["projector", "stage"], "accessibility": ["wheelchair", "hearing_loop"]},
+    {"name": "Room B", "capacity": 60, "features": ["projector"], "accessibility": []},
+    {"name": "Amphitheatre", "capacity": 1200, "features": ["stage"], "accessibility": ["wheelchair"]}
+]
+
+
+class TestVenueCatalog(unittest.TestCase):
+    """Test indexed catalog search"""
+
+    def setUp(self):
+        self.catalog = VenueCatalog(VENUES)
+
+    def names(self, **requirements):
+        return [venue["name"] for venue in self.catalog.search(**requirements)]
+
+    def test_capacity_and_feature_search(self):
+        self.assertEqual(self.names(min_capacity=300, features=["projector"]), ["Main Hall", "Auditorium"])
+
+    def test_feature_names_are_normalized(self):
+        self.assertEqual(self.names(features=["Sound-System"]), ["Main Hall"])
+
+    def test_accessibility_requirement(self):
+        self.assertEqual(self.names(accessibility=["hearing loop"]), ["Auditorium"])
+
+    def test_unknown_feature_matches_nothing(self):
+        self.assertEqual(self.names(features=["hologram"]), [])
+
+    def test_capacity_above_every_venue(self):
+        self.assertEqual(self.names(min_capacity=5000), [])
+
+    def test_no_requirements_lists_everything_by_capacity(self):
+        self.assertEqual(self.names(), ["Room B", "Main Hall", "Auditorium", "Amphitheatre"])
+
+    def test_duplicate_names_are_rejected(self):
+        with self.assertRaises(ValueError):
+            VenueCatalog(VENUES + [{"name": "Room B", "capacity": 10}])
+
+
+class TestVenueSearchWithAvailability(unittest.IsolatedAsyncioTestCase):
+    """Test catalog matches intersected with the calendar"""
+
+    def setUp(self):
+        self.scheduler = SchedulerAgent()
+        self.scheduler.index_ttl_seconds = 0
+        self.scheduler.events_collection = object()
+        self.scheduler.venue_catalog = VenueCatalog(VENUES)
+        self.start = datetime(2025, 11, 14, 10, 0, tzinfo=timezone.utc)
+        self.scheduler.calendar_index.load([
+            {
+                "id": "e1",
+                "title": "Orientation",
+                "venue": "Main Hall",
+                "start_time": self.start + timedelta(hours=1),
+                "end_time": self.start + timedelta(hours=3)
+            }
+        ])
+
+    async def search(self, hours_from, hours_to, **requirements):
+        venues = await self.scheduler.find_venues(
+            start_time=(self.start + timedelta(hours=hours_from)).isoformat(),
+            end_time=(self.start + timedelta(hours=hours_to)).isoformat(),
+            **requirements
+        )
+        return [venue["name"] for venue in venues]
+
+    async def test_busy_venue_is_excluded(self):
+        self.assertEqual(await self.search(0, 2, min_capacity=300, features=["projector"]), ["Auditorium"])
+
+    async def test_free_venue_is_kept(self):
+        self.assertEqual(await self.search(3, 4, min_capacity=300, features=["projector"]), ["Main Hall", "Auditorium"])
+
+    async def test_time_range_needs_both_ends(self):
+        with self.assertRaises(ValueError):
+            await self.scheduler.find_venues(start_time=self.start.isoformat())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -4,9 +4,10 @@ Common functions for response handling, validation, and utilities.
 """
 
 from fastapi import HTTPException, status
-from fastapi.responses import JSONResponse
-from typing import Dict, Any, Optional, List
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import AsyncIterator, Dict, Any, Optional, List
 from datetime import datetime
+import json
 import logging
 from typing import Dict, Any
 from utils.mongo_logger import schedule_log
@@ -41,6 +42,37 @@ class APIResponse:
             
         raise HTTPException(status_code=status_code, detail=error_detail)
     
+    @staticmethod
+    def event_stream(chunks: AsyncIterator[str], metadata: Optional[Dict[str, Any]] = None) -> StreamingResponse:
+        """
+        Server-sent events response forwarding text chunks as they arrive.
+        
+        Events: `start` (metadata), one `chunk` per piece of text
+        ({"text": ...}), then `done` ({"length": total characters}) or
+        `error` ({"message": ...}) if generation fails part way.
+        """
+        def sse(event: str, data: Dict[str, Any]) -> str:
+            return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+        async def events():
+            yield sse("start", metadata or {})
+            length = 0
+            try:
+                async for chunk in chunks:
+                    length += len(chunk)
+                    yield sse("chunk", {"text": chunk})
+            except Exception as e:
+                logger.error(f"Stream failed: {e}")
+                yield sse("error", {"message": str(e)})
+                return
+            yield sse("done", {"length": length})
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
     @staticmethod
     def validation_error(errors: List[str]) -> HTTPException:
         """Validation error response"""
@@ -0,0 +1,244 @@
+"""Batch placement of event requests into venues and start times.
+
+Time is cut into fixed slots from the start of the planning horizon and each
+venue's bookings are one int bitmap over that horizon (bit i set = slot i
+busy), like utils.occupancy. For a request needing d slots, AND-shifting the
+free bits leaves exactly the starts of free runs of length >= d, and the
+start nearest the preferred one is found with a couple of bit tricks.
+
+Solving runs in two phases:
+
+  1. Greedy interval partitioning: requests are taken most-constrained first
+     (fewest venue/start combinations, longest first) and each is put in the
+     lowest-cost free position: earliest preferred window, nearest to the
+     preferred start, most preferred (or smallest sufficient) venue.
+  2. Local search until no move helps or the time budget runs out:
+     - insertion: an unplaced request may evict one placed request from a
+       suitable venue if the evicted request can be re-placed elsewhere
+     - improvement: each placed request is moved to a cheaper free
+       position when one exists
+
+Usage:
+  from utils.auto_scheduler import AutoScheduler, PlacementRequest
+  solver = AutoScheduler(horizon_slots=96 * 7, venues=["Main Hall", "Room B"])
+  solver.block("Main Hall", 0, 8)
+  result = solver.solve(requests, time_limit=3.0)
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Cost of moving a request one venue down its preference list, in slots of shift
+VENUE_RANK_COST = 4
+
+
+@dataclass
+class PlacementRequest:
+    """One request in slot units. Windows are inclusive ranges of allowed start slots, best first."""
+    id: str
+    duration: int
+    windows: List[Tuple[int, int]]
+    venues: List[str]
+    preferred_start: Optional[int] = None
+    priority: int = 0
+
+
+@dataclass
+class Placement:
+    venue: str
+    start: int
+    window_rank: int
+    cost: int
+
+
+@dataclass
+class SolveResult:
+    placements: Dict[str, Placement] = field(default_factory=dict)
+    unplaced: List[str] = field(default_factory=list)
+    iterations: int = 0
+    elapsed_seconds: float = 0.0
+
+
+def _span_mask(first: int, last: int) -> int:
+    """Bits first..last inclusive"""
+    return (1 << (last + 1)) - (1 << first)
+
+
+class AutoScheduler:
+    """Greedy placement plus local search over per-venue slot bitmaps."""
+
+    def __init__(self, horizon_slots: int, venues: List[str]):
+        self.horizon_slots = horizon_slots
+        self._full = (1 << horizon_slots) - 1
+        self.busy: Dict[str, int] = {venue: 0 for venue in venues}
+        self._runs_cache: Dict[Tuple[str, int], int] = {}
+        # Window rank must outweigh any shift inside the horizon
+        self.window_rank_cost = horizon_slots + 1
+
+    def block(self, venue: str, start: int, end: int) -> None:
+        """Mark slots [start, end) of a venue as taken by an existing booking."""
+        start, end = max(start, 0), min(end, self.horizon_slots)
+        if venue in self.busy and end > start:
+            self._set(venue, self.busy[venue] | _span_mask(start, end - 1))
+
+    def _set(self, venue: str, bits: int) -> None:
+        self.busy[venue] = bits
+        for key in [key for key in self._runs_cache if key[0] == venue]:
+            del self._runs_cache[key]
+
+    def _runs(self, venue: str, duration: int) -> int:
+        """Bit p set when slots p..p+duration-1 of the venue are all free"""
+        key = (venue, duration)
+        runs = self._runs_cache.get(key)
+        if runs is None:
+            runs = ~self.busy[venue] & self._full
+            length = 1
+            while length < duration and runs:
+                shift = min(length, duration - length)
+                runs &= runs >> shift
+                length += shift
+            self._runs_cache[key] = runs
+        return runs
+
+    def best_position(self, request: PlacementRequest, venues: Optional[List[str]] = None) -> Optional[Placement]:
+        """Cheapest free position for the request, optionally limited to some venues."""
+        best = None
+        for venue_rank, venue in enumerate(request.venues):
+            if venues is not None and venue not in venues:
+                continue
+            runs = self._runs(venue, request.duration)
+            if not runs:
+                continue
+            for window_rank, (lo, hi) in enumerate(request.windows):
+                candidates = runs & _span_mask(lo, hi)
+                if not candidates:
+                    continue
+                target = min(max(request.preferred_start if request.preferred_start is not None else lo, lo), hi)
+                start = None
+                above = candidates >> target
+                if above:
+                    start = target + (above & -above).bit_length() - 1
+                below = candidates & ((1 << target) - 1)
+                if below:
+                    before = below.bit_length() - 1
+                    if start is None or target - before < start - target:
+                        start = before
+                cost = window_rank * self.window_rank_cost + abs(start - target) + venue_rank * VENUE_RANK_COST
+                if best is None or cost < best.cost:
+                    best = Placement(venue, start, window_rank, cost)
+                # Later windows only cost more at this venue
+                break
+        return best
+
+    def place(self, request: PlacementRequest, placement: Placement) -> None:
+        mask = _span_mask(placement.start, placement.start + request.duration - 1)
+        self._set(placement.venue, self.busy[placement.venue] | mask)
+
+    def unplace(self, request: PlacementRequest, placement: Placement) -> None:
+        mask = _span_mask(placement.start, placement.start + request.duration - 1)
+        self._set(placement.venue, self.busy[placement.venue] & ~mask)
+
+    @staticmethod
+    def _flexibility(request: PlacementRequest) -> int:
+        return len(request.venues) * sum(hi - lo + 1 for lo, hi in request.windows)
+
+    def solve(self, requests: List[PlacementRequest], time_limit: float = 3.0) -> SolveResult:
+        """
+        Place as many requests as possible at the lowest total cost.
+
+        Args:
+            requests: Requests with at least one window and venue
+            time_limit: Seconds the local search may run after the greedy pass
+
+        Returns:
+            SolveResult with a Placement per placed request id and the ids left unplaced
+        """
+        started = time.monotonic()
+        deadline = started + time_limit
+        result = SolveResult()
+        by_id = {request.id: request for request in requests}
+        placements = result.placements
+
+        order = sorted(requests, key=lambda r: (-r.priority, self._flexibility(r), -r.duration, r.id))
+        unplaced = []
+        for request in order:
+            placement = self.best_position(request)
+            if placement is None:
+                unplaced.append(request)
+                continue
+            self.place(request, placement)
+            placements[request.id] = placement
+
+        improved = True
+        while improved and time.monotonic() < deadline:
+            improved = False
+            result.iterations += 1
+
+            # Insertion by evicting one placed request that fits elsewhere
+            still_unplaced = []
+            for request in unplaced:
+                if time.monotonic() >= deadline or not self._insert_by_eviction(request, by_id, placements):
+                    still_unplaced.append(request)
+                else:
+                    improved = True
+            unplaced = still_unplaced
+
+            # Move placed requests to cheaper free positions
+            for request_id in sorted(placements, key=lambda request_id: -placements[request_id].cost):
+                if time.monotonic() >= deadline:
+                    break
+                request, current = by_id[request_id], placements[request_id]
+                if current.cost == 0:
+                    continue
+                self.unplace(request, current)
+                better = self.best_position(request)
+                if better is not None and better.cost < current.cost:
+                    self.place(request, better)
+                    placements[request_id] = better
+                    improved = True
+                else:
+                    self.place(request, current)
+
+        positions = {request_id: n for n, request_id in enumerate(by_id)}
+        result.unplaced = sorted((request.id for request in unplaced), key=positions.__getitem__)
+        result.elapsed_seconds = time.monotonic() - started
+        logger.debug(
+            f"Placed {len(placements)} of {len(requests)} requests in "
+            f"{result.elapsed_seconds:.2f}s ({result.iterations} local search rounds)"
+        )
+        return result
+
+    def _insert_by_eviction(
+        self,
+        request: PlacementRequest,
+        by_id: Dict[str, PlacementRequest],
+        placements: Dict[str, Placement]
+    ) -> bool:
+        """Place an unplaced request by moving one blocking request elsewhere."""
+        reach = [(lo, hi + request.duration - 1) for lo, hi in request.windows]
+        for venue in request.venues:
+            blockers = [
+                request_id for request_id, placement in placements.items()
+                if placement.venue == venue and any(
+                    placement.start <= hi and lo < placement.start + by_id[request_id].duration
+                    for lo, hi in reach
+                )
+            ]
+            for blocker_id in blockers:
+                blocker, old = by_id[blocker_id], placements[blocker_id]
+                self.unplace(blocker, old)
+                placement = self.best_position(request, [venue])
+                if placement is not None:
+                    self.place(request, placement)
+                    moved = self.best_position(blocker)
+                    if moved is not None:
+                        self.place(blocker, moved)
+                        placements[blocker_id] = moved
+                        placements[request.id] = placement
+                        return True
+                    self.unplace(request, placement)
+                self.place(blocker, old)
+        return False
@@ -0,0 +1,163 @@
+"""Free-slot search over busy intervals.
+
+Used by the SchedulerAgent to suggest alternative times. Busy intervals for a
+venue are merged with a sweep over their start times, subtracted from the
+allowed working-hour windows, and the remaining gaps are searched for starts
+that fit the requested duration, nearest to the preferred start first.
+
+Usage:
+  from utils.availability import find_free_slots
+  slots = find_free_slots(busy, window_start, window_end, timedelta(hours=2), preferred_start)
+"""
+import heapq
+from datetime import datetime, time, timedelta
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+Interval = Tuple[datetime, datetime]
+WorkingHours = Tuple[time, time]
+
+
+def parse_working_hours(value: Optional[str]) -> Optional[WorkingHours]:
+    """Parse an "HH:MM-HH:MM" string. Empty values mean no restriction."""
+    if not value or not value.strip():
+        return None
+    try:
+        start_str, end_str = value.strip().split("-")
+        start = time.fromisoformat(start_str.strip())
+        end = time.fromisoformat(end_str.strip())
+    except ValueError:
+        raise ValueError(f"Invalid working hours '{value}', expected HH:MM-HH:MM")
+    if start == end:
+        raise ValueError("Working hours must not start and end at the same time")
+    return start, end
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Merge overlapping or touching intervals into a sorted, disjoint list."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def working_windows(
+    window_start: datetime,
+    window_end: datetime,
+    working_hours: Optional[WorkingHours]
+) -> List[Interval]:
+    """Split [window_start, window_end) into the daily working-hour windows it covers.
+
+    Working hours are read in the timezone of `window_start`. Windows that end
+    before they start (e.g. 22:00-02:00) run past midnight.
+    """
+    if working_hours is None:
+        return [(window_start, window_end)]
+
+    tz = window_start.tzinfo
+    open_time, close_time = working_hours
+    windows: List[Interval] = []
+    day = window_start.astimezone(tz).date() - timedelta(days=1)
+    last_day = window_end.astimezone(tz).date()
+    while day <= last_day:
+        opens = datetime.combine(day, open_time, tzinfo=tz)
+        closes = datetime.combine(day, close_time, tzinfo=tz)
+        if closes <= opens:
+            closes += timedelta(days=1)
+        start = max(opens, window_start)
+        end = min(closes, window_end)
+        if start < end:
+            windows.append((start, end))
+        day += timedelta(days=1)
+    return windows
+
+
+def free_gaps(allowed: List[Interval], busy: List[Interval]) -> List[Interval]:
+    """Subtract merged busy intervals from sorted allowed windows."""
+    gaps: List[Interval] = []
+    i = 0
+    for win_start, win_end in allowed:
+        cursor = win_start
+        # Skip busy intervals that finish before this window
+        while i < len(busy) and busy[i][1] <= win_start:
+            i += 1
+        j = i
+        while j < len(busy) and busy[j][0] < win_end:
+            busy_start, busy_end = busy[j]
+            if busy_start > cursor:
+                gaps.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+            j += 1
+        if cursor < win_end:
+            gaps.append((cursor, win_end))
+    return gaps
+
+
+def _gap_candidates(gap: Interval, duration: timedelta, preferred_start: datetime) -> Iterator[datetime]:
+    """Yield non-overlapping starts inside a gap, in increasing distance from preferred_start."""
+    latest = gap[1] - duration
+    nearest = min(max(preferred_start, gap[0]), latest)
+    yield nearest
+    before = nearest - duration
+    after = nearest + duration
+    while before >= gap[0] or after <= latest:
+        if after > latest or (before >= gap[0] and preferred_start - before <= after - preferred_start):
+            yield before
+            before -= duration
+        else:
+            yield after
+            after += duration
+
+
+def find_free_slots(
+    busy: Iterable[Interval],
+    window_start: datetime,
+    window_end: datetime,
+    duration: timedelta,
+    preferred_start: datetime,
+    working_hours: Optional[WorkingHours] = None,
+    max_results: int = 3
+) -> List[Interval]:
+    """
+    Find free slots of `duration` inside [window_start, window_end).
+
+    Args:
+        busy: Busy (start, end) intervals, in any order
+        window_start: Start of the search window
+        window_end: End of the search window
+        duration: Length of the slot to place
+        preferred_start: Slots are ranked by distance from this start
+        working_hours: Optional daily (open, close) restriction
+        max_results: Maximum number of slots to return
+
+    Returns:
+        Up to `max_results` (start, end) slots, nearest to preferred_start first
+    """
+    if duration <= timedelta(0) or max_results <= 0:
+        return []
+
+    gaps = free_gaps(
+        working_windows(window_start, window_end, working_hours),
+        merge_intervals(busy)
+    )
+
+    heap = []
+    for n, gap in enumerate(gaps):
+        if gap[1] - gap[0] < duration:
+            continue
+        candidates = _gap_candidates(gap, duration, preferred_start)
+        start = next(candidates)
+        heap.append((abs(start - preferred_start), start, n, candidates))
+    heapq.heapify(heap)
+
+    slots: List[Interval] = []
+    while heap and len(slots) < max_results:
+        _, start, n, candidates = heapq.heappop(heap)
+        slots.append((start, start + duration))
+        following = next(candidates, None)
+        if following is not None:
+            heapq.heappush(heap, (abs(following - preferred_start), following, n, candidates))
+    return slots
@@ -0,0 +1,350 @@
+"""In-memory calendar index used by the SchedulerAgent.
+
+Scheduled events are kept in one interval tree per venue so that overlap
+queries cost O(log n + k) instead of a scan over the whole `events`
+collection. The tree is a treap ordered by (start_time, event_id) where every
+node also tracks the latest end time in its subtree, which lets a query skip
+any subtree that finishes before the requested slot begins.
+
+Usage:
+  from utils.calendar_index import CalendarIndex
+  index = CalendarIndex()
+  index.load(events)
+  clashes = index.query("Main Auditorium", start, end)
+
+Recurring series (see utils.recurrence) are stored once, spanning their
+first occurrence to `series_end`; queries expand only the occurrences that
+fall inside the requested window.
+"""
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.recurrence import as_utc, cached_rule, occurrences, series_end
+
+logger = logging.getLogger(__name__)
+
+
+def event_time_bounds(event: Dict[str, Any]) -> Tuple[datetime, datetime]:
+    """Return timezone-aware (start, end) datetimes for an event document.
+
+    Firestore returns its own timestamp type; anything exposing `timestamp()`
+    is normalised to a UTC datetime, naive datetimes are assumed to be UTC.
+    """
+    return as_utc(event['start_time']), as_utc(event['end_time'])
+
+
+def event_span(event: Dict[str, Any]) -> Tuple[datetime, datetime]:
+    """Return the (start, end) covered by an event, or by every occurrence of a series."""
+    start, end = event_time_bounds(event)
+    if not event.get('recurrence'):
+        return start, end
+    if event.get('series_end'):
+        return start, as_utc(event['series_end'])
+    last_end = series_end(cached_rule(event['recurrence'], start, event.get('tzid')), end - start)
+    return start, last_end or end
+
+
+def expand_event(event: Dict[str, Any], window_start: datetime, window_end: datetime) -> List[Dict[str, Any]]:
+    """Return the event, or copies of each series occurrence, overlapping [window_start, window_end).
+
+    Occurrence copies keep the series `id` and carry the occurrence times in
+    `start_time`/`end_time` plus `series_id`. The rule is expanded in the
+    series' `tzid` zone and occurrence times are UTC.
+    """
+    start, end = event_time_bounds(event)
+    if not event.get('recurrence'):
+        return [event] if start < window_end and end > window_start else []
+    exdates = [as_utc(value) for value in event.get('exdates') or []]
+    expanded = []
+    for occ_start, occ_end in occurrences(
+        cached_rule(event['recurrence'], start, event.get('tzid')), start, end, window_start, window_end, exdates
+    ):
+        occurrence = dict(event)
+        occurrence.update(start_time=occ_start, end_time=occ_end, series_id=event.get('id'))
+        expanded.append(occurrence)
+    return expanded
+
+
+class _Node:
+    __slots__ = ("key", "start", "end", "value", "priority", "left", "right", "max_end")
+
+    def __init__(self, key: Tuple[Any, str], start: Any, end: Any, value: Any):
+        self.key = key
+        self.start = start
+        self.end = end
+        self.value = value
+        self.priority = random.random()
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+        self.max_end = end
+
+
+def _update(node: _Node) -> None:
+    max_end = node.end
+    if node.left is not None and node.left.max_end > max_end:
+        max_end = node.left.max_end
+    if node.right is not None and node.right.max_end > max_end:
+        max_end = node.right.max_end
+    node.max_end = max_end
+
+
+def _split(node: Optional[_Node], key) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Split a treap into (< key, >= key)."""
+    if node is None:
+        return None, None
+    if node.key < key:
+        left, right = _split(node.right, key)
+        node.right = left
+        _update(node)
+        return node, right
+    left, right = _split(node.left, key)
+    node.left = right
+    _update(node)
+    return left, node
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+def _insert(node: Optional[_Node], new: _Node) -> _Node:
+    if node is None:
+        return new
+    if new.priority > node.priority:
+        new.left, new.right = _split(node, new.key)
+        _update(new)
+        return new
+    if new.key < node.key:
+        node.left = _insert(node.left, new)
+    else:
+        node.right = _insert(node.right, new)
+    _update(node)
+    return node
+
+
+def _delete(node: Optional[_Node], key) -> Optional[_Node]:
+    if node is None:
+        return None
+    if key < node.key:
+        node.left = _delete(node.left, key)
+    elif node.key < key:
+        node.right = _delete(node.right, key)
+    else:
+        return _merge(node.left, node.right)
+    _update(node)
+    return node
+
+
+def _query(node: Optional[_Node], start, end, out: List[Any]) -> None:
+    # Nothing in this subtree ends after the query starts
+    if node is None or node.max_end <= start:
+        return
+    _query(node.left, start, end, out)
+    # This node and its whole right subtree start at or after the query end
+    if node.start >= end:
+        return
+    if node.end > start:
+        out.append(node.value)
+    _query(node.right, start, end, out)
+
+
+def _walk(node: Optional[_Node]) -> Iterator[_Node]:
+    stack: List[_Node] = []
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        yield node
+        node = node.right
+
+
+class IntervalTree:
+    """Augmented treap of half-open [start, end) intervals keyed by id."""
+
+    def __init__(self):
+        self._root: Optional[_Node] = None
+        self._starts: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._starts
+
+    def add(self, item_id: str, start, end, value: Any = None) -> None:
+        """Insert an interval, replacing any interval already stored under `item_id`."""
+        if item_id in self._starts:
+            self.remove(item_id)
+        node = _Node((start, item_id), start, end, value)
+        self._root = _insert(self._root, node)
+        self._starts[item_id] = start
+
+    def remove(self, item_id: str) -> bool:
+        """Remove an interval by id. Returns False if it was not present."""
+        start = self._starts.pop(item_id, None)
+        if start is None:
+            return False
+        self._root = _delete(self._root, (start, item_id))
+        return True
+
+    def overlapping(self, start, end) -> List[Any]:
+        """Return values of every interval overlapping [start, end), ordered by start."""
+        out: List[Any] = []
+        _query(self._root, start, end, out)
+        return out
+
+    def items(self) -> Iterator[Tuple[Any, Any, Any]]:
+        """Iterate (start, end, value) tuples in start order."""
+        for node in _walk(self._root):
+            yield node.start, node.end, node.value
+
+
+class CalendarIndex:
+    """Per-venue interval index over scheduled events.
+
+    Events are stored as the dicts returned from Firestore (with an `id` key).
+    The index is safe to share between threads.
+
+    Other conflict dimensions are indexed the same way by keying on another
+    field (e.g. `organizer`). A list-valued field such as `audience_groups`
+    puts the event in one tree per value. Events with no value are kept
+    under `default_key`, or left out of the index when it is None.
+    """
+
+    def __init__(self, field: str = 'venue', default_key: Optional[str] = ""):
+        self.field = field
+        self.default_key = default_key
+        self._trees: Dict[str, IntervalTree] = {}
+        self._keys_by_id: Dict[str, Tuple[str, ...]] = {}
+        self._lock = threading.RLock()
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def __len__(self) -> int:
+        return len(self._keys_by_id)
+
+    def __contains__(self, event_id: str) -> bool:
+        return event_id in self._keys_by_id
+
+    def venues(self) -> List[str]:
+        with self._lock:
+            return list(self._trees.keys())
+
+    def load(self, events: Iterable[Dict[str, Any]]) -> None:
+        """Replace the index contents with the given events."""
+        with self._lock:
+            self._trees = {}
+            self._keys_by_id = {}
+            for event in events:
+                self._add_locked(event)
+            self.loaded_at = time.monotonic()
+        logger.debug(f"Calendar index loaded with {len(self._keys_by_id)} events across {len(self._trees)} venues")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._trees = {}
+            self._keys_by_id = {}
+            self.loaded_at = None
+
+    def add(self, event: Dict[str, Any]) -> None:
+        """Insert or replace a single event."""
+        with self._lock:
+            self._add_locked(event)
+
+    def event_keys(self, event: Dict[str, Any]) -> Tuple[str, ...]:
+        """Keys an event is indexed under"""
+        value = event.get(self.field)
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        keys = tuple(sorted({str(v) for v in values if v}))
+        if not keys and self.default_key is not None:
+            return (self.default_key,)
+        return keys
+
+    def _add_locked(self, event: Dict[str, Any]) -> None:
+        event_id = event.get('id')
+        if not event_id:
+            raise ValueError("Event must have an id to be indexed")
+        if event_id in self._keys_by_id:
+            self._remove_locked(event_id)
+        keys = self.event_keys(event)
+        if not keys:
+            return
+        start, end = event_span(event)
+        for key in keys:
+            tree = self._trees.get(key)
+            if tree is None:
+                tree = self._trees[key] = IntervalTree()
+            tree.add(event_id, start, end, event)
+        self._keys_by_id[event_id] = keys
+
+    def remove(self, event_id: str) -> bool:
+        """Remove an event by id. Returns False if it was not indexed."""
+        with self._lock:
+            return self._remove_locked(event_id)
+
+    def _remove_locked(self, event_id: str) -> bool:
+        keys = self._keys_by_id.pop(event_id, None)
+        if keys is None:
+            return False
+        for key in keys:
+            tree = self._trees[key]
+            tree.remove(event_id)
+            if not len(tree):
+                del self._trees[key]
+        return True
+
+    def events(self) -> List[Dict[str, Any]]:
+        """Return every indexed event (series unexpanded), grouped by venue and ordered by start."""
+        with self._lock:
+            events = {}
+            for tree in self._trees.values():
+                for _, _, value in tree.items():
+                    events.setdefault(value['id'], value)
+            return list(events.values())
+
+    def query(self, venue: Optional[str], start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Return events overlapping [start, end), with series expanded to occurrences.
+
+        With a venue (or other key) only that key's tree is searched; without
+        one every tree is searched.
+        """
+        return self.query_keys(None if venue is None else [venue], start, end)
+
+    def query_keys(self, keys: Optional[Iterable[str]], start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Like query(), over several keys; events under more than one key are returned once."""
+        with self._lock:
+            if keys is not None:
+                trees = [self._trees[key] for key in dict.fromkeys(keys) if key in self._trees]
+            else:
+                trees = list(self._trees.values())
+            results: List[Dict[str, Any]] = []
+            seen = set()
+            for tree in trees:
+                for event in tree.overlapping(start, end):
+                    if len(trees) > 1:
+                        if event['id'] in seen:
+                            continue
+                        seen.add(event['id'])
+                    if event.get('recurrence'):
+                        results.extend(expand_event(event, start, end))
+                    else:
+                        results.append(event)
+            return results
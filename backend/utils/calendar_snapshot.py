@@ -0,0 +1,200 @@
+"""Array-backed calendar snapshot for vectorized overlap queries.
+
+Every event (or series occurrence) becomes one row of int64 epoch-second
+start/end columns plus an integer venue code. Starts and ends are each kept
+sorted per venue as combined `venue_code * span + offset` keys, so a batch of
+proposed slots is answered with two `np.searchsorted` calls per column: the
+number of events overlapping [s, e) is
+
+    #(starts < e) - #(ends <= s)
+
+which holds because an event that ended by `s` also started before `e`.
+Snapshots are saved as plain `.npy` files and reopened with `mmap_mode="r"`,
+so worker processes share the pages instead of copying them.
+
+Usage:
+  from utils.calendar_snapshot import CalendarSnapshot
+  snapshot = CalendarSnapshot.build(events)
+  counts = snapshot.overlap_counts(venues, starts, ends)
+"""
+import json
+import logging
+import math
+import os
+import shutil
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from utils.calendar_index import event_time_bounds
+
+logger = logging.getLogger(__name__)
+
+_ARRAYS = ("start_keys", "end_keys", "all_starts", "all_ends", "starts", "ends", "venue_codes", "ids")
+
+
+def to_epoch_seconds(values: Iterable[datetime], round_up: bool = False) -> np.ndarray:
+    """Convert aware datetimes to int64 epoch seconds (ceil when round_up)."""
+    rounding = math.ceil if round_up else math.floor
+    return np.fromiter((rounding(value.timestamp()) for value in values), dtype=np.int64)
+
+
+class CalendarSnapshot:
+    """Immutable columnar view of scheduled events."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], venues: List[str], base: int, span: int, built_at: float):
+        self.start_keys = arrays["start_keys"]
+        self.end_keys = arrays["end_keys"]
+        # Venue-independent sorted columns for slots without a venue
+        self.all_starts = arrays["all_starts"]
+        self.all_ends = arrays["all_ends"]
+        # Unkeyed columns, in venue then start order, for listing events
+        self.starts = arrays["starts"]
+        self.ends = arrays["ends"]
+        self.venue_codes = arrays["venue_codes"]
+        self.ids = arrays["ids"]
+        self.venues = venues
+        self.venue_lookup = {venue: code for code, venue in enumerate(venues)}
+        self.base = base
+        self.span = span
+        self.built_at = built_at
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @classmethod
+    def build(cls, events: Iterable[Dict[str, Any]]) -> "CalendarSnapshot":
+        """Build a snapshot from expanded events (dicts with id, venue, start_time, end_time)."""
+        rows = []
+        for event in events:
+            start, end = event_time_bounds(event)
+            rows.append((event.get('venue') or "", start, end, str(event.get('id', ''))))
+
+        venues = sorted({row[0] for row in rows})
+        lookup = {venue: code for code, venue in enumerate(venues)}
+        venue_codes = np.array([lookup[row[0]] for row in rows], dtype=np.int64)
+        starts = to_epoch_seconds((row[1] for row in rows))
+        ends = to_epoch_seconds((row[2] for row in rows), round_up=True)
+        ids = np.array([row[3] for row in rows], dtype=str)
+
+        base = int(starts.min()) if len(rows) else 0
+        # Offsets lie in [0, span) so keys of different venues never interleave
+        span = int(ends.max()) - base + 2 if len(rows) else 2
+
+        order = np.lexsort((starts, venue_codes))
+        arrays = {
+            "start_keys": np.sort(venue_codes * span + (starts - base)),
+            "end_keys": np.sort(venue_codes * span + (ends - base)),
+            "all_starts": np.sort(starts),
+            "all_ends": np.sort(ends),
+            "starts": starts[order],
+            "ends": ends[order],
+            "venue_codes": venue_codes[order],
+            "ids": ids[order] if len(rows) else np.array([], dtype="<U1"),
+        }
+        return cls(arrays, venues, base, span, time.time())
+
+    def _offsets(self, values: np.ndarray) -> np.ndarray:
+        return np.clip(values - self.base, 0, self.span)
+
+    def overlap_counts(
+        self,
+        venues: Sequence[Optional[str]],
+        starts: np.ndarray,
+        ends: np.ndarray
+    ) -> np.ndarray:
+        """
+        Count stored events overlapping each proposed slot.
+
+        Args:
+            venues: Venue per slot; None checks every venue
+            starts: int64 epoch-second slot starts
+            ends: int64 epoch-second slot ends
+
+        Returns:
+            int64 array of overlap counts, one per slot
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        codes = np.array([self.venue_lookup.get(venue, -1) if venue is not None else -2 for venue in venues],
+                         dtype=np.int64)
+        counts = np.zeros(len(codes), dtype=np.int64)
+
+        scoped = codes >= 0
+        if scoped.any():
+            segment = codes[scoped] * self.span
+            started = (
+                np.searchsorted(self.start_keys, segment + self._offsets(ends[scoped]), side="left")
+                - np.searchsorted(self.start_keys, segment, side="left")
+            )
+            finished = (
+                np.searchsorted(self.end_keys, segment + self._offsets(starts[scoped]), side="right")
+                - np.searchsorted(self.end_keys, segment, side="left")
+            )
+            counts[scoped] = started - finished
+
+        unscoped = codes == -2
+        if unscoped.any():
+            counts[unscoped] = (
+                np.searchsorted(self.all_starts, ends[unscoped], side="left")
+                - np.searchsorted(self.all_ends, starts[unscoped], side="right")
+            )
+        return counts
+
+    def overlapping_ids(self, venue: Optional[str], start: int, end: int) -> List[str]:
+        """IDs of events overlapping one slot (epoch seconds), in start order."""
+        mask = (self.starts < end) & (self.ends > start)
+        if venue is not None:
+            mask &= self.venue_codes == self.venue_lookup.get(venue, -1)
+        return [str(event_id) for event_id in self.ids[mask]]
+
+    def save(self, directory: str) -> None:
+        """
+        Write the columns to a new version folder, then point meta.json at it.
+
+        Readers that already mapped an older version keep their pages after
+        the folder is removed, so a save never tears a snapshot in use.
+        """
+        version = f"v{int(self.built_at * 1000)}-{os.getpid()}"
+        os.makedirs(os.path.join(directory, version), exist_ok=True)
+        for name in _ARRAYS:
+            np.save(os.path.join(directory, version, f"{name}.npy"), np.asarray(getattr(self, name)))
+
+        meta = {
+            "version": version,
+            "venues": self.venues,
+            "base": self.base,
+            "span": self.span,
+            "built_at": self.built_at
+        }
+        tmp_path = os.path.join(directory, f"meta.json.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(directory, "meta.json"))
+
+        for entry in os.listdir(directory):
+            path = os.path.join(directory, entry)
+            if entry != version and entry.startswith("v") and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: str) -> "CalendarSnapshot":
+        """Open a saved snapshot with memory-mapped columns."""
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(directory, meta["version"], f"{name}.npy"), mmap_mode="r")
+            for name in _ARRAYS
+        }
+        return cls(arrays, meta["venues"], meta["base"], meta["span"], meta["built_at"])
+
+    @staticmethod
+    def saved_at(directory: str) -> Optional[float]:
+        """built_at of the snapshot saved in directory, or None if there is none."""
+        try:
+            with open(os.path.join(directory, "meta.json")) as f:
+                return json.load(f)["built_at"]
+        except (OSError, ValueError, KeyError):
+            return None
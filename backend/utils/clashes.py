@@ -0,0 +1,59 @@
+"""Double-booking detection over a set of events.
+
+Events are sorted by start time and swept once while a heap holds the events
+still running. Each new event clashes with exactly the events in the heap,
+so all k overlapping pairs are found in O(n log n + k). Overlapping events
+are also chained into groups (connected runs of overlaps), which are yielded
+as soon as the sweep moves past them so callers can stream results.
+
+Usage:
+  from utils.clashes import clash_groups
+  for group in clash_groups(events):
+      print(group["start_time"], [e["id"] for e in group["events"]])
+"""
+import heapq
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from utils.calendar_index import event_time_bounds
+
+
+def clash_groups(events: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every group of mutually connected overlapping events, in start order.
+
+    Events are compared regardless of venue; group them by venue first to
+    find double-bookings of a room.
+
+    Yields:
+        Dicts with start_time/end_time of the group, its events (in start
+        order) and the overlapping pairs as (index, index) into the group's events
+    """
+    timeline: List[Tuple[Any, Any, int, Dict[str, Any]]] = []
+    for n, event in enumerate(events):
+        start, end = event_time_bounds(event)
+        timeline.append((start, end, n, event))
+    timeline.sort(key=lambda item: (item[0], item[2]))
+
+    # (end, position in group) of events still running; every event added
+    # while this is non-empty overlaps all of them, so groups only hold clashes
+    active: List[Tuple[Any, int]] = []
+    group: List[Dict[str, Any]] = []
+    pairs: List[Tuple[int, int]] = []
+    group_start = group_end = None
+
+    for start, end, _, event in timeline:
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        if not active:
+            if pairs:
+                yield {"start_time": group_start, "end_time": group_end, "events": group, "pairs": pairs}
+            group, pairs = [], []
+            group_start, group_end = start, end
+        position = len(group)
+        pairs.extend((other, position) for _, other in active)
+        group.append(event)
+        group_end = max(group_end, end)
+        heapq.heappush(active, (end, position))
+
+    if pairs:
+        yield {"start_time": group_start, "end_time": group_end, "events": group, "pairs": pairs}
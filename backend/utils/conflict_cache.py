@@ -0,0 +1,142 @@
+"""Conflict-check result cache with write-driven invalidation.
+
+Results are keyed by venue and exact UTC slot and stamped with the venue's
+version counter when stored. Every write to a venue bumps its counter, so a
+cached result is only served while no booking for that venue has changed
+since it was computed. Checks without a venue span every venue and are
+stamped with a global counter that any write bumps.
+
+A source generation (e.g. the events replica's snapshot count) can be passed
+with each lookup so changes that arrive from other processes invalidate too;
+entries also expire after ttl_seconds as a bound on what neither catches.
+
+Usage:
+  from utils.conflict_cache import ConflictCache
+  cache = ConflictCache(max_entries=4096, ttl_seconds=30)
+  version = cache.version(venue)
+  result = cache.get(venue, start, end, exclude_event_id)
+  if result is None:
+      result = compute()
+      cache.put(venue, start, end, exclude_event_id, result, version)
+  cache.bump(venue)  # after every write to the venue
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+
+class ConflictCache:
+    """Bounded LRU of conflict results, invalidated by per-venue versions. Thread safe."""
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[Any, ...], Tuple[Tuple[int, int], Hashable, float, Any]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._global_version = 0
+        # Bumped by clear() so results computed before a reload are never stored
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def version(self, venue: Optional[str]) -> Tuple[int, int]:
+        """Current version of a venue, or the global version for venue-less checks"""
+        with self._lock:
+            return self._version_locked(venue)
+
+    def _version_locked(self, venue: Optional[str]) -> Tuple[int, int]:
+        if venue is None:
+            return self._epoch, self._global_version
+        return self._epoch, self._versions.get(venue, 0)
+
+    @staticmethod
+    def _key(venue: Optional[str], start: datetime, end: datetime, exclude_event_id: Optional[str]) -> Tuple[Any, ...]:
+        return venue, start.timestamp(), end.timestamp(), exclude_event_id
+
+    def get(
+        self,
+        venue: Optional[str],
+        start: datetime,
+        end: datetime,
+        exclude_event_id: Optional[str] = None,
+        generation: Hashable = None
+    ) -> Optional[Any]:
+        """Cached result for the slot, or None if missing or invalidated"""
+        if not self.enabled:
+            return None
+        key = self._key(venue, start, end, exclude_event_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                version, entry_generation, stored_at, result = entry
+                fresh = self.ttl_seconds <= 0 or time.monotonic() - stored_at <= self.ttl_seconds
+                if version == self._version_locked(venue) and entry_generation == generation and fresh:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        venue: Optional[str],
+        start: datetime,
+        end: datetime,
+        exclude_event_id: Optional[str],
+        result: Any,
+        version: Tuple[int, int],
+        generation: Hashable = None
+    ) -> None:
+        """
+        Store a result computed while the venue was at `version`.
+
+        Pass the version read before computing the result: if a write bumped
+        it in the meantime the result is dropped rather than cached stale.
+        """
+        if not self.enabled:
+            return
+        key = self._key(venue, start, end, exclude_event_id)
+        with self._lock:
+            if version != self._version_locked(venue):
+                return
+            self._entries[key] = (version, generation, time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def bump(self, venue: Optional[str]) -> None:
+        """Invalidate cached results for a venue (and every venue-less check)"""
+        self.bump_many([venue])
+
+    def bump_many(self, venues: Iterable[Optional[str]]) -> None:
+        with self._lock:
+            for venue in venues:
+                if venue is not None:
+                    self._versions[venue] = self._versions.get(venue, 0) + 1
+            self._global_version += 1
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. after the calendar was reloaded"""
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses
+            }
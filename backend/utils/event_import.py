@@ -0,0 +1,198 @@
+"""Parsers for bulk event imports.
+
+Turns CSV, JSON or ICS (iCalendar) files into event rows with the same fields
+as `POST /api/events` (title, start_time, end_time, venue, ...). Times are
+returned as ISO strings; validation and conflict checks are left to the
+SchedulerAgent so every row gets a report entry. Rows that cannot be read
+(e.g. a non-numeric capacity or an unknown TZID) come back as
+{"title": ..., "error": reason} and are rejected with that reason.
+
+Usage:
+  from utils.event_import import parse_events
+  rows = parse_events(content, "csv")
+"""
+import csv
+import io
+import json
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from utils.recurrence import resolve_zone
+
+SUPPORTED_FORMATS = ("csv", "json", "ics")
+
+# Columns accepted from CSV/JSON rows; anything else is ignored
+EVENT_FIELDS = (
+    "title", "description", "start_time", "end_time", "venue",
+    "organizer", "audience_groups", "category", "capacity", "budget", "recurrence", "exdates", "tzid"
+)
+
+# iCalendar properties mapped onto event fields
+_ICS_FIELDS = {
+    "SUMMARY": "title",
+    "DESCRIPTION": "description",
+    "LOCATION": "venue",
+    "ORGANIZER": "organizer",
+    "CATEGORIES": "category",
+}
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    """Guess the import format from a file name's extension."""
+    if not filename or "." not in filename:
+        return None
+    extension = filename.rsplit(".", 1)[1].lower()
+    if extension == "ical":
+        extension = "ics"
+    return extension if extension in SUPPORTED_FORMATS else None
+
+
+def parse_events(content: str, fmt: str) -> List[Dict[str, Any]]:
+    """Parse an import file into event rows, in file order."""
+    fmt = (fmt or "").lower()
+    if fmt == "csv":
+        return _parse_csv(content)
+    if fmt == "json":
+        return _parse_json(content)
+    if fmt == "ics":
+        return _parse_ics(content)
+    raise ValueError(f"Unsupported import format '{fmt}', expected one of {', '.join(SUPPORTED_FORMATS)}")
+
+
+def _clean_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    cleaned = {}
+    for field in EVENT_FIELDS:
+        value = row.get(field)
+        if isinstance(value, str):
+            value = value.strip()
+        if value in ("", None):
+            continue
+        try:
+            if field == "capacity":
+                value = int(value)
+            elif field == "budget":
+                value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid {field} '{value}'")
+        if field == "exdates" and isinstance(value, str):
+            # CSV cells hold a space or comma separated list
+            value = [part for part in re.split(r"[\s,]+", value) if part]
+        elif field == "audience_groups" and isinstance(value, str):
+            # Group names may contain spaces, so CSV cells are comma or semicolon separated
+            value = [part for part in re.split(r"\s*[,;]\s*", value) if part]
+        cleaned[field] = value
+    return cleaned
+
+
+def _parse_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    events = []
+    for row in rows:
+        try:
+            events.append(_clean_row(row))
+        except (TypeError, ValueError) as e:
+            title = row.get("title")
+            events.append({"title": title.strip() if isinstance(title, str) else title, "error": str(e)})
+    return events
+
+
+def _parse_csv(content: str) -> List[Dict[str, Any]]:
+    reader = csv.DictReader(io.StringIO(content.lstrip("﻿")))
+    if not reader.fieldnames:
+        return []
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    return _parse_rows(list(reader))
+
+
+def _parse_json(content: str) -> List[Dict[str, Any]]:
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e}")
+    # Accept either a bare list or {"events": [...]}
+    if isinstance(data, dict):
+        data = data.get("events")
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        raise ValueError("JSON import must be a list of event objects or {\"events\": [...]}")
+    return _parse_rows(data)
+
+
+def _unfold_ics(content: str) -> List[str]:
+    """Join folded iCalendar lines (continuations start with a space or tab)."""
+    lines: List[str] = []
+    for line in content.splitlines():
+        if line[:1] in (" ", "\t") and lines:
+            lines[-1] += line[1:]
+        elif line:
+            lines.append(line)
+    return lines
+
+
+def _unescape_ics(value: str) -> str:
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def parse_ics_datetime(value: str, params: Dict[str, str]) -> datetime:
+    """Parse an iCalendar DATE or DATE-TIME value.
+
+    UTC ("Z") values and values with a TZID parameter are timezone-aware;
+    an unknown TZID raises ValueError. Floating values are returned naive and
+    treated as UTC by the scheduler.
+    """
+    value = value.strip()
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.strptime(value, "%Y%m%d")
+    if value.endswith("Z"):
+        return datetime.strptime(value[:-1], "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc)
+    parsed = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    if params.get("TZID"):
+        return parsed.replace(tzinfo=resolve_zone(params["TZID"]))
+    return parsed
+
+
+def _parse_ics_line(line: str):
+    name_part, _, value = line.partition(":")
+    name, *param_parts = name_part.split(";")
+    params = {}
+    for part in param_parts:
+        key, _, param_value = part.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def _parse_ics(content: str) -> List[Dict[str, Any]]:
+    events = []
+    current: Optional[Dict[str, Any]] = None
+    for line in _unfold_ics(content):
+        name, params, value = _parse_ics_line(line)
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            current = {}
+        elif name == "END" and value.upper() == "VEVENT":
+            if current is not None:
+                events.append(current)
+            current = None
+        elif current is None:
+            continue
+        elif name in ("DTSTART", "DTEND"):
+            field = "start_time" if name == "DTSTART" else "end_time"
+            try:
+                current[field] = parse_ics_datetime(value, params).isoformat()
+            except ValueError as e:
+                current.setdefault("error", f"Invalid {name} '{value}': {e}")
+                continue
+            if name == "DTSTART" and params.get("TZID"):
+                # Recurrences repeat in the zone of DTSTART
+                current["tzid"] = params["TZID"]
+        elif name == "RRULE":
+            current["recurrence"] = value.strip()
+        elif name == "EXDATE":
+            for exdate in value.split(","):
+                try:
+                    current.setdefault("exdates", []).append(parse_ics_datetime(exdate, params).isoformat())
+                except ValueError as e:
+                    current.setdefault("error", f"Invalid EXDATE '{exdate}': {e}")
+        elif name == "ORGANIZER":
+            current["organizer"] = params.get("CN") or re.sub(r"^mailto:", "", value, flags=re.IGNORECASE)
+        elif name in _ICS_FIELDS:
+            current[_ICS_FIELDS[name]] = _unescape_ics(value).strip()
+    return events
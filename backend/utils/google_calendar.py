@@ -21,7 +21,9 @@ def create_google_calendar_event(event: Dict[str, Any], access_token: str) -> Op
     """Create a Google Calendar event using a bearer access token.
 
     Args:
-        event: Event dictionary with keys: title, start_time (ISO), end_time (ISO), description, venue
+        event: Event dictionary with keys: title, start_time (ISO), end_time (ISO), description, venue,
+            and optionally recurrence (RRULE), exdates (UTC "YYYYMMDDTHHMMSSZ" strings) and the
+            timezone (IANA name) the recurrence is expanded in
         access_token: OAuth2 access token with calendar.events scope
 
     Returns:
@@ -32,13 +34,22 @@ def create_google_calendar_event(event: Dict[str, Any], access_token: str) -> Op
         "Content-Type": "application/json"
     }
 
+    # Google expands recurrences in timeZone, which must be an IANA name
+    time_zone = event.get("timezone") or "UTC"
+    if time_zone[0] in "+-":
+        time_zone = "UTC"
+
     payload = {
         "summary": event.get("title", "Apokria Event"),
         "description": event.get("description", ""),
         "location": event.get("venue"),
-        "start": {"dateTime": event.get("start_time"), "timeZone": "UTC"},
-        "end": {"dateTime": event.get("end_time"), "timeZone": "UTC"},
+        "start": {"dateTime": event.get("start_time"), "timeZone": time_zone},
+        "end": {"dateTime": event.get("end_time"), "timeZone": time_zone},
     }
+    if event.get("recurrence"):
+        rule = event["recurrence"]
+        payload["recurrence"] = [rule if rule.upper().startswith("RRULE:") else f"RRULE:{rule}"]
+        payload["recurrence"] += [f"EXDATE:{exdate}" for exdate in event.get("exdates", [])]
 
     try:
         resp = requests.post(GOOGLE_CALENDAR_EVENTS_ENDPOINT, headers=headers, json=payload, timeout=10)
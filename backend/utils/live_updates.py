@@ -0,0 +1,249 @@
+"""Live push of calendar changes to WebSocket subscribers.
+
+The hub listens to the event change feed (database.change_feed), which is
+fed by the scheduler's write path, the events router and the Firestore
+replica listener, and fans each change out to the connections whose
+subscription (venues, time range, source) it matches. Connections are
+indexed by venue so a change only visits subscribers of its own venue plus
+those watching every venue.
+
+Every connection has its own sender task and a bounded buffer of pending
+changes keyed by event, so a burst of updates to one event collapses into
+its latest state and a slow client never delays the others:
+
+  - changes arriving within `flush_interval` are sent as one batch
+  - if more than `max_pending` distinct events pile up, the buffer is
+    dropped and the client is told to resync from /api/events/changes
+  - a send that blocks longer than `send_timeout` ends the connection
+
+Usage:
+  from utils.live_updates import live_updates, Subscription
+  connection = live_updates.connect(websocket_send, Subscription(venues=frozenset({"Main Hall"})))
+  await connection.run()
+"""
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Optional, Set, Tuple
+
+from utils.calendar_index import event_span
+from utils.recurrence import as_utc
+
+logger = logging.getLogger(__name__)
+
+
+def change_span(event: Optional[Dict[str, Any]]) -> Optional[Tuple[datetime, datetime]]:
+    """Time covered by a changed event: scheduler documents or router store events (whole days)."""
+    if not event:
+        return None
+    try:
+        if event.get('start_time') is not None:
+            return event_span(event)
+        if event.get('startDate'):
+            end_date = event.get('endDate') or event['startDate']
+            start, end = as_utc(event['startDate']), as_utc(end_date)
+            if 'T' not in end_date:
+                end += timedelta(days=1)
+            return start, end
+    except Exception as e:
+        logger.debug(f"Could not read times of changed event {event.get('id')}: {e}")
+    return None
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """What a connection wants to hear about; None matches everything."""
+    venues: Optional[FrozenSet[str]] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    source: Optional[str] = None
+
+    def matches(self, change: Dict[str, Any], span: Optional[Tuple[datetime, datetime]]) -> bool:
+        if self.source and change['source'] != self.source:
+            return False
+        if self.start is None and self.end is None:
+            return True
+        if span is None:
+            # Unknown times: let the client decide rather than miss a change
+            return True
+        return (self.end is None or span[0] < self.end) and (self.start is None or span[1] > self.start)
+
+
+class LiveConnection:
+    """One subscriber with a coalescing, bounded send buffer."""
+
+    def __init__(
+        self,
+        send: Callable[[Dict[str, Any]], Awaitable[None]],
+        subscription: Subscription,
+        max_pending: int = 256,
+        flush_interval: float = 0.1,
+        send_timeout: float = 10.0
+    ):
+        self.subscription = subscription
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.send_timeout = send_timeout
+        self._send = send
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._overflowed = False
+        self._version = 0
+        self._wake = asyncio.Event()
+        self._closed = False
+        self.sent = 0
+        self.coalesced = 0
+        self.resyncs = 0
+
+    def offer(self, change: Dict[str, Any]) -> None:
+        """Queue a change; never blocks"""
+        self._version = change['version']
+        if not self._overflowed:
+            key = (change['source'], change['id'])
+            if key in self._pending:
+                self.coalesced += 1
+                # Re-insert so batches stay in version order
+                del self._pending[key]
+            if len(self._pending) >= self.max_pending:
+                self._pending.clear()
+                self._overflowed = True
+            else:
+                self._pending[key] = change
+        self._wake.set()
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+
+    async def run(self) -> None:
+        """Send batches until closed. Raises asyncio.TimeoutError when the client stops reading."""
+        while True:
+            await self._wake.wait()
+            if self._closed:
+                return
+            if self.flush_interval:
+                await asyncio.sleep(self.flush_interval)
+            self._wake.clear()
+
+            if self._overflowed:
+                message = {"type": "resync", "version": self._version}
+                self._overflowed = False
+                self.resyncs += 1
+            else:
+                message = {"type": "changes", "version": self._version, "changes": list(self._pending.values())}
+            self._pending = {}
+            await asyncio.wait_for(self._send(message), self.send_timeout)
+            self.sent += 1
+
+
+class LiveUpdatesHub:
+    """Fans change-feed entries out to subscribed connections."""
+
+    def __init__(self, max_pending: int = 256, flush_interval: float = 0.1, send_timeout: float = 10.0):
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.send_timeout = send_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._all_venues: Set[LiveConnection] = set()
+        self._by_venue: Dict[str, Set[LiveConnection]] = {}
+        self._published = 0
+        self._delivered = 0
+        self._closed_stats = {"sent": 0, "coalesced": 0, "resyncs": 0}
+
+    def connect(self, send: Callable[[Dict[str, Any]], Awaitable[None]], subscription: Subscription) -> LiveConnection:
+        """Register a connection; call from the event loop that serves it"""
+        self._loop = asyncio.get_running_loop()
+        connection = LiveConnection(
+            send, subscription,
+            max_pending=self.max_pending, flush_interval=self.flush_interval, send_timeout=self.send_timeout
+        )
+        self._add(connection)
+        return connection
+
+    def subscribe(self, connection: LiveConnection, subscription: Subscription) -> None:
+        """Replace a connection's subscription"""
+        self._remove(connection)
+        connection.subscription = subscription
+        self._add(connection)
+
+    def disconnect(self, connection: LiveConnection) -> None:
+        self._remove(connection)
+        connection.close()
+        for name in self._closed_stats:
+            self._closed_stats[name] += getattr(connection, name)
+
+    def _add(self, connection: LiveConnection) -> None:
+        if connection.subscription.venues is None:
+            self._all_venues.add(connection)
+        else:
+            for venue in connection.subscription.venues:
+                self._by_venue.setdefault(venue, set()).add(connection)
+
+    def _remove(self, connection: LiveConnection) -> None:
+        self._all_venues.discard(connection)
+        for venue in connection.subscription.venues or ():
+            subscribers = self._by_venue.get(venue)
+            if subscribers is not None:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self._by_venue[venue]
+
+    def _connections(self) -> Set[LiveConnection]:
+        connections = set(self._all_venues)
+        for subscribers in self._by_venue.values():
+            connections |= subscribers
+        return connections
+
+    def publish(self, change: Dict[str, Any]) -> None:
+        """Change feed listener; safe to call from any thread"""
+        loop = self._loop
+        if loop is None or (not self._all_venues and not self._by_venue):
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._dispatch(change)
+            return
+        try:
+            loop.call_soon_threadsafe(self._dispatch, change)
+        except RuntimeError:
+            # Event loop already closed
+            self._loop = None
+
+    def _dispatch(self, change: Dict[str, Any]) -> None:
+        self._published += 1
+        event = change.get('event') or {}
+        targets = self._all_venues | self._by_venue.get(event.get('venue'), set())
+        if not targets:
+            return
+        span = change_span(event)
+        for connection in targets:
+            if connection.subscription.matches(change, span):
+                connection.offer(change)
+                self._delivered += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection count and delivery counters for monitoring"""
+        connections = self._connections()
+        totals = {name: value + sum(getattr(c, name) for c in connections) for name, value in self._closed_stats.items()}
+        return {
+            "connections": len(connections),
+            "venues_watched": len(self._by_venue),
+            "changes_published": self._published,
+            "changes_delivered": self._delivered,
+            "messages_sent": totals["sent"],
+            "changes_coalesced": totals["coalesced"],
+            "resyncs": totals["resyncs"],
+            "pending": sum(len(c._pending) for c in connections)
+        }
+
+
+# Global hub instance
+live_updates = LiveUpdatesHub(
+    max_pending=int(os.getenv("LIVE_UPDATES_MAX_PENDING", "256")),
+    flush_interval=float(os.getenv("LIVE_UPDATES_FLUSH_MS", "100")) / 1000,
+    send_timeout=float(os.getenv("LIVE_UPDATES_SEND_TIMEOUT_SECONDS", "10"))
+)
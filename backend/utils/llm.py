@@ -1,22 +1,42 @@
 """Light wrapper for LLM providers: Google Gemini and OpenAI.
 
 Usage:
-  from utils.llm import generate_text
+  from utils.llm import generate_text, agenerate_text, astream_text
   text = generate_text(prompt, max_tokens=800)
+  text = await agenerate_text(prompt, max_tokens=800)  # inside async code
+  async for chunk in astream_text(prompt, max_tokens=800):
+      ...
 
 Behaviour:
   - Respects env var LLM_PROVIDER: 'gemini' or 'openai'. If not set, tries to
     use Gemini if GEMINI_API_KEY/GOOGLE_GEMINI_API_KEY is present, otherwise OpenAI.
   - Returns generated text (string) or raises Exception on fatal errors.
-
-Note: This wrapper is intentionally small — it doesn't implement streaming or
-complex chat state. It provides a single synchronous generate_text call used
-by agents in this repo.
+  - Provider responses are cached in memory and on disk, keyed by provider,
+    model, prompt, temperature and max_tokens (see utils.llm_cache).
+  - Transient provider errors are retried with jittered backoff, and each
+    provider has a circuit breaker. When the chosen provider fails the next
+    one in LLM_FAILOVER_CHAIN that has a key is tried, then the demo
+    template (see utils.llm_resilience).
+  - Provider calls are rate limited per provider and queued by priority
+    ('interactive', 'normal', 'bulk'); a call that cannot be served within
+    its queue timeout raises LLMRateLimited (see utils.llm_scheduler).
+
+Note: This wrapper is intentionally small — it doesn't keep complex chat
+state. It provides a synchronous generate_text call, its async counterpart
+agenerate_text, which the agents in this repo use, and astream_text for
+token streaming.
 """
+import asyncio
 import os
 import logging
 import random
-from typing import Optional, Dict, Any
+from dataclasses import dataclass
+from functools import partial
+from typing import AsyncIterator, Iterator, List, Optional, Dict, Any, Tuple, Union
+
+from utils.llm_cache import llm_cache
+from utils.llm_resilience import provider_resilience
+from utils.llm_scheduler import LLMRateLimited, estimate_tokens, llm_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -459,18 +479,123 @@ def _generate_demo_content(prompt: str) -> str:
 """
 
 
-def generate_text(prompt: str, *, max_tokens: int = 1024, temperature: float = 0.7, model: Optional[str] = None) -> str:
-    """Generate text using the selected provider.
+def _provider_api_key(provider: str) -> Optional[str]:
+    if provider == "gemini":
+        return os.getenv("GOOGLE_GEMINI_API_KEY") or os.getenv("GEMINI_API_KEY")
+    return os.getenv("OPENAI_API_KEY")
 
-    Args:
-        prompt: Prompt string
-        max_tokens: token limit (provider-dependent)
-        temperature: creativity parameter
-        model: Optional model override (provider-specific)
 
-    Returns:
-        Generated text string
-    """
+def _provider_model(provider: str, model: Optional[str]) -> str:
+    if provider == "gemini":
+        return model or os.getenv("GEMINI_MODEL") or "gemini-1.5-flash"
+    return model or os.getenv("OPENAI_MODEL") or "gpt-3.5-turbo"
+
+
+def _generate_gemini(prompt: str, api_key: str, model: str) -> str:
+    genai = _init_genai(api_key)
+    # Using the simple generate_content wrapper; adapt as needed
+    gmodel = genai.GenerativeModel(model)
+    resp = gmodel.generate_content(prompt)
+    return _gemini_text(resp)
+
+
+def _generate_openai(prompt: str, api_key: str, model: str, max_tokens: int, temperature: float) -> str:
+    openai = _init_openai(api_key)
+    # Use ChatCompletion for robust format
+    response = openai.ChatCompletion.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=max_tokens,
+        temperature=temperature,
+    )
+    return _openai_text(response)
+
+
+def _openai_text(response) -> str:
+    # Extract text
+    choices = response.get("choices", [])
+    if choices:
+        message = choices[0].get("message") or choices[0]
+        if isinstance(message, dict):
+            return message.get("content", "").strip()
+        return str(message)
+    return ""
+
+
+def _gemini_text(resp) -> str:
+    # depending on SDK, result may live in resp.text or resp.output[0].content
+    if hasattr(resp, 'text') and resp.text:
+        return resp.text
+    if isinstance(resp, dict):
+        # Best-effort parse
+        return resp.get('output', [{}])[0].get('content', '')
+    # Fallback
+    return str(resp)
+
+
+async def _agenerate_gemini(prompt: str, api_key: str, model: str) -> str:
+    genai = _init_genai(api_key)
+    gmodel = genai.GenerativeModel(model)
+    resp = await gmodel.generate_content_async(prompt)
+    return _gemini_text(resp)
+
+
+async def _agenerate_openai(prompt: str, api_key: str, model: str, max_tokens: int, temperature: float) -> str:
+    openai = _init_openai(api_key)
+    messages = [{"role": "user", "content": prompt}]
+    if hasattr(openai, "AsyncOpenAI"):
+        # openai>=1.0 client
+        client = _async_openai_client(openai, api_key)
+        response = await client.chat.completions.create(
+            model=model, messages=messages, max_tokens=max_tokens, temperature=temperature
+        )
+        return (response.choices[0].message.content or "").strip() if response.choices else ""
+
+    response = await openai.ChatCompletion.acreate(
+        model=model, messages=messages, max_tokens=max_tokens, temperature=temperature
+    )
+    return _openai_text(response)
+
+
+_async_openai_clients: Dict[str, Any] = {}
+
+
+def _async_openai_client(openai, api_key: str):
+    """One AsyncOpenAI client per key, so its connection pool is reused"""
+    client = _async_openai_clients.get(api_key)
+    if client is None:
+        client = _async_openai_clients[api_key] = openai.AsyncOpenAI(api_key=api_key)
+    return client
+
+
+@dataclass
+class _ProviderCall:
+    """A resolved provider request, ready to send"""
+    provider: str
+    label: str
+    api_key: str
+    model: str
+    cache_key: Optional[str]
+
+
+PROVIDER_LABELS = {"gemini": "Gemini", "openai": "OpenAI"}
+
+
+def _failover_chain(primary: str) -> List[str]:
+    """The chosen provider first, then the rest of LLM_FAILOVER_CHAIN in order"""
+    chain = [name.strip().lower() for name in os.getenv("LLM_FAILOVER_CHAIN", "gemini,openai").split(",")]
+    return [primary] + [name for name in chain if name in PROVIDER_LABELS and name != primary]
+
+
+def _prepare_calls(
+    prompt: str,
+    max_tokens: int,
+    temperature: float,
+    model: Optional[str],
+    agent: Optional[str],
+    use_cache: bool
+) -> Union[str, List[_ProviderCall]]:
+    """Resolve the providers to try, in failover order; returns demo text when there are none."""
     provider = _choose_provider()
     logger.debug(f"LLM provider chosen: {provider}")
 
@@ -478,59 +603,353 @@ def generate_text(prompt: str, *, max_tokens: int = 1024, temperature: float = 0
         logger.info("Using demo mode for LLM generation - configure API keys for full AI functionality")
         return _generate_demo_response(prompt, max_tokens)
 
-    if provider == "gemini":
-        api_key = os.getenv("GOOGLE_GEMINI_API_KEY") or os.getenv("GEMINI_API_KEY")
+    if provider not in PROVIDER_LABELS:
+        raise RuntimeError(f"Unsupported LLM provider: {provider}")
+
+    calls = []
+    for name in _failover_chain(provider):
+        api_key = _provider_api_key(name)
         if not api_key:
-            logger.warning("Gemini API key not configured, falling back to demo mode")
-            return _generate_demo_response(prompt, max_tokens)
+            if name == provider:
+                logger.warning(f"{PROVIDER_LABELS[name]} API key not configured")
+            continue
+        # A model override names a model of the chosen provider only
+        chosen_model = _provider_model(name, model if name == provider else None)
+        cache_key = None
+        if use_cache and llm_cache.enabled_for(agent):
+            cache_key = llm_cache.key(name, chosen_model, prompt, temperature, max_tokens)
+        calls.append(_ProviderCall(name, PROVIDER_LABELS[name], api_key, chosen_model, cache_key))
+
+    if not calls:
+        logger.warning("No LLM provider API key configured, falling back to demo mode")
+        return _generate_demo_response(prompt, max_tokens)
+    return calls
 
-        genai = _init_genai(api_key)
-        chosen_model = model or os.getenv("GEMINI_MODEL") or "gemini-1.5-flash"
 
-        try:
-            # Using the simple generate_content wrapper; adapt as needed
-            gmodel = genai.GenerativeModel(chosen_model)
-            resp = gmodel.generate_content(prompt)
-            # depending on SDK, result may live in resp.text or resp.output[0].content
-            if hasattr(resp, 'text') and resp.text:
-                return resp.text
-            if isinstance(resp, dict):
-                # Best-effort parse
-                return resp.get('output', [{}])[0].get('content', '')
-            # Fallback
-            return str(resp)
-        except Exception as e:
-            logger.error(f"Gemini generation failed: {e}, falling back to demo mode")
-            return _generate_demo_response(prompt, max_tokens)
+def _failover(calls: List[_ProviderCall], agent: Optional[str]) -> Iterator[Tuple[_ProviderCall, Optional[str]]]:
+    """Walk the failover chain, yielding (call, cached text or None).
 
-    elif provider == "openai":
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            logger.warning("OpenAI API key not configured, falling back to demo mode")
-            return _generate_demo_response(prompt, max_tokens)
+    Providers whose circuit is open are skipped unless the cache can answer
+    for them. Each step down the chain is counted as a failover; stop
+    iterating once a call succeeds.
+    """
+    previous = None
+    for call in calls:
+        if previous is not None:
+            provider_resilience.record_failover(previous, call.provider)
+        previous = call.provider
+
+        if call.cache_key is not None:
+            cached = llm_cache.get(call.cache_key)
+            if cached is not None:
+                logger.debug(f"LLM cache hit for {agent or 'caller'} ({call.provider}/{call.model})")
+                yield call, cached
+                continue
+
+        if _circuit_allows(call):
+            yield call, None
+
+
+async def _afailover(calls: List[_ProviderCall], agent: Optional[str]) -> AsyncIterator[Tuple[_ProviderCall, Optional[str]]]:
+    """_failover for async callers; disk cache reads run off the event loop"""
+    previous = None
+    for call in calls:
+        if previous is not None:
+            provider_resilience.record_failover(previous, call.provider)
+        previous = call.provider
+
+        if call.cache_key is not None:
+            cached = await llm_cache.aget(call.cache_key)
+            if cached is not None:
+                logger.debug(f"LLM cache hit for {agent or 'caller'} ({call.provider}/{call.model})")
+                yield call, cached
+                continue
+
+        if _circuit_allows(call):
+            yield call, None
+
+
+def _circuit_allows(call: _ProviderCall) -> bool:
+    """Claim the provider's breaker, logging and counting a skip when its circuit is open"""
+    if provider_resilience.breaker(call.provider).allow():
+        return True
+    logger.warning(f"{call.label} circuit is open, skipping")
+    provider_resilience.record_skip(call.provider)
+    return False
+
+
+def _rate_limited(call: _ProviderCall, error: LLMRateLimited) -> LLMRateLimited:
+    """The scheduler refused an attempt (its half-open trial is already given back); move on"""
+    logger.warning(f"{call.label} call rejected: {error}")
+    return error
+
+
+def _exhausted(prompt: str, max_tokens: int, calls: List[_ProviderCall], rejection: Optional[LLMRateLimited]) -> str:
+    """Every provider failed or was skipped. A rate-limit rejection is raised
+    so overloaded callers fail fast; otherwise the demo template answers."""
+    if rejection is not None:
+        raise rejection
+    provider_resilience.record_failover(calls[-1].provider, "template")
+    logger.error("All LLM providers failed, falling back to demo mode")
+    return _generate_demo_response(prompt, max_tokens)
+
+
+def generate_text(
+    prompt: str,
+    *,
+    max_tokens: int = 1024,
+    temperature: float = 0.7,
+    model: Optional[str] = None,
+    agent: Optional[str] = None,
+    use_cache: bool = True,
+    priority: str = "normal",
+    queue_timeout: Optional[float] = None
+) -> str:
+    """Generate text using the selected provider.
+
+    Blocks until the provider responds; from async code use agenerate_text.
+
+    Provider responses are cached (see utils.llm_cache) unless use_cache is
+    False or the calling agent is listed in LLM_CACHE_DISABLED_AGENTS. Demo
+    text, including the fallback after a provider error, is never cached.
 
-        openai = _init_openai(api_key)
-        chosen_model = model or os.getenv("OPENAI_MODEL") or "gpt-3.5-turbo"
+    Failed calls are retried and then failed over to the next provider in
+    LLM_FAILOVER_CHAIN; the demo template answers when every provider fails.
 
+    Provider calls pass through the rate limiter and priority queue (see
+    utils.llm_scheduler). A call that cannot get capacity within its queue
+    timeout moves on to the next provider, and raises LLMRateLimited if
+    none has capacity.
+
+    Args:
+        prompt: Prompt string
+        max_tokens: token limit (provider-dependent)
+        temperature: creativity parameter
+        model: Optional model override (provider-specific)
+        agent: Name of the calling agent, for per-agent cache opt-out
+        use_cache: Set False to always call the provider
+        priority: 'interactive', 'normal' or 'bulk' queue priority
+        queue_timeout: Seconds to wait for capacity (defaults per priority)
+
+    Returns:
+        Generated text string
+    """
+    calls = _prepare_calls(prompt, max_tokens, temperature, model, agent, use_cache)
+    if isinstance(calls, str):
+        return calls
+
+    rejection = None
+    for call, cached in _failover(calls, agent):
+        if cached is not None:
+            return cached
+        # Every attempt, retries included, waits for its own rate limit capacity
+        acquire = partial(
+            llm_scheduler.acquire_sync, call.provider, estimate_tokens(prompt, max_tokens), priority, queue_timeout
+        )
+        try:
+            if call.provider == "gemini":
+                text = provider_resilience.call(
+                    call.provider, lambda: _generate_gemini(prompt, call.api_key, call.model), acquire
+                )
+            else:
+                text = provider_resilience.call(
+                    call.provider,
+                    lambda: _generate_openai(prompt, call.api_key, call.model, max_tokens, temperature),
+                    acquire
+                )
+        except LLMRateLimited as e:
+            rejection = _rate_limited(call, e)
+            continue
+        except Exception as e:
+            logger.error(f"{call.label} generation failed: {e}")
+            continue
+        if call.cache_key is not None:
+            llm_cache.put(call.cache_key, text)
+        return text
+
+    return _exhausted(prompt, max_tokens, calls, rejection)
+
+
+async def agenerate_text(
+    prompt: str,
+    *,
+    max_tokens: int = 1024,
+    temperature: float = 0.7,
+    model: Optional[str] = None,
+    agent: Optional[str] = None,
+    use_cache: bool = True,
+    priority: str = "normal",
+    queue_timeout: Optional[float] = None
+) -> str:
+    """Async version of generate_text using the providers' async clients.
+
+    The event loop stays free while the provider works, so one worker can
+    keep many generations in flight. Arguments, caching, rate limiting and
+    demo fallback are the same as generate_text.
+    """
+    calls = _prepare_calls(prompt, max_tokens, temperature, model, agent, use_cache)
+    if isinstance(calls, str):
+        return calls
+
+    rejection = None
+    async for call, cached in _afailover(calls, agent):
+        if cached is not None:
+            return cached
+        # Every attempt, retries included, waits for its own rate limit capacity;
+        # a cancel while queued gives back the half-open trial (see acall)
+        acquire = partial(
+            llm_scheduler.acquire, call.provider, estimate_tokens(prompt, max_tokens), priority, queue_timeout
+        )
+        try:
+            if call.provider == "gemini":
+                text = await provider_resilience.acall(
+                    call.provider, lambda: _agenerate_gemini(prompt, call.api_key, call.model), acquire
+                )
+            else:
+                text = await provider_resilience.acall(
+                    call.provider,
+                    lambda: _agenerate_openai(prompt, call.api_key, call.model, max_tokens, temperature),
+                    acquire
+                )
+        except LLMRateLimited as e:
+            rejection = _rate_limited(call, e)
+            continue
+        except Exception as e:
+            logger.error(f"{call.label} generation failed: {e}")
+            continue
+        if call.cache_key is not None:
+            await llm_cache.aput(call.cache_key, text)
+        return text
+
+    return _exhausted(prompt, max_tokens, calls, rejection)
+
+
+# Characters per chunk when streaming text that is already complete (demo
+# responses, cache hits)
+STREAM_CHUNK_CHARS = 48
+
+
+async def _stream_complete_text(text: str) -> AsyncIterator[str]:
+    """Replay finished text in word-aligned chunks"""
+    start = 0
+    while start < len(text):
+        end = min(start + STREAM_CHUNK_CHARS, len(text))
+        if end < len(text):
+            space = text.rfind(" ", start + 1, end)
+            end = space + 1 if space > start else end
+        yield text[start:end]
+        start = end
+        # Let other tasks (and the response writer) run between chunks
+        await asyncio.sleep(0)
+
+
+async def _astream_gemini(prompt: str, api_key: str, model: str) -> AsyncIterator[str]:
+    genai = _init_genai(api_key)
+    gmodel = genai.GenerativeModel(model)
+    response = await gmodel.generate_content_async(prompt, stream=True)
+    async for chunk in response:
+        text = getattr(chunk, "text", "")
+        if text:
+            yield text
+
+
+async def _astream_openai(prompt: str, api_key: str, model: str, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+    openai = _init_openai(api_key)
+    messages = [{"role": "user", "content": prompt}]
+    if hasattr(openai, "AsyncOpenAI"):
+        client = _async_openai_client(openai, api_key)
+        stream = await client.chat.completions.create(
+            model=model, messages=messages, max_tokens=max_tokens, temperature=temperature, stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+        return
+
+    stream = await openai.ChatCompletion.acreate(
+        model=model, messages=messages, max_tokens=max_tokens, temperature=temperature, stream=True
+    )
+    async for chunk in stream:
+        choices = chunk.get("choices", [])
+        content = choices[0].get("delta", {}).get("content") if choices else None
+        if content:
+            yield content
+
+
+async def _open_stream(
+    call: _ProviderCall, prompt: str, max_tokens: int, temperature: float
+) -> Tuple[Optional[str], AsyncIterator[str]]:
+    """Start a provider stream and wait for its first chunk, so a failed
+    start can still be retried or failed over"""
+    if call.provider == "gemini":
+        stream = _astream_gemini(prompt, call.api_key, call.model)
+    else:
+        stream = _astream_openai(prompt, call.api_key, call.model, max_tokens, temperature)
+    try:
+        return await stream.__anext__(), stream
+    except StopAsyncIteration:
+        return None, stream
+
+
+async def astream_text(
+    prompt: str,
+    *,
+    max_tokens: int = 1024,
+    temperature: float = 0.7,
+    model: Optional[str] = None,
+    agent: Optional[str] = None,
+    use_cache: bool = True,
+    priority: str = "normal",
+    queue_timeout: Optional[float] = None
+) -> AsyncIterator[str]:
+    """Stream generated text in chunks as the provider produces them.
+
+    Same arguments, caching, rate limiting and demo fallback as agenerate_text. Cache hits
+    and demo text are replayed in chunks; a complete provider stream is
+    cached. A provider failing before the first chunk is retried and failed
+    over like agenerate_text; a failure mid-stream is raised to the caller.
+    """
+    calls = _prepare_calls(prompt, max_tokens, temperature, model, agent, use_cache)
+    if isinstance(calls, str):
+        async for chunk in _stream_complete_text(calls):
+            yield chunk
+        return
+
+    rejection = None
+    async for call, cached in _afailover(calls, agent):
+        if cached is not None:
+            async for chunk in _stream_complete_text(cached):
+                yield chunk
+            return
+        acquire = partial(
+            llm_scheduler.acquire, call.provider, estimate_tokens(prompt, max_tokens), priority, queue_timeout
+        )
         try:
-            # Use ChatCompletion for robust format
-            response = openai.ChatCompletion.create(
-                model=chosen_model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=max_tokens,
-                temperature=temperature,
+            first, stream = await provider_resilience.acall(
+                call.provider, lambda: _open_stream(call, prompt, max_tokens, temperature), acquire
             )
-            # Extract text
-            choices = response.get("choices", [])
-            if choices:
-                message = choices[0].get("message") or choices[0]
-                if isinstance(message, dict):
-                    return message.get("content", "").strip()
-                return str(message)
-            return ""
+        except LLMRateLimited as e:
+            rejection = _rate_limited(call, e)
+            continue
         except Exception as e:
-            logger.error(f"OpenAI generation failed: {e}, falling back to demo mode")
-            return _generate_demo_response(prompt, max_tokens)
+            logger.error(f"{call.label} generation failed: {e}")
+            continue
 
-    else:
-        raise RuntimeError(f"Unsupported LLM provider: {provider}")
+        parts = [first] if first else []
+        if first:
+            yield first
+        try:
+            async for chunk in stream:
+                parts.append(chunk)
+                yield chunk
+        except Exception as e:
+            logger.error(f"{call.label} stream failed after {len(parts)} chunks: {e}")
+            provider_resilience.record_failure(call.provider)
+            raise
+
+        if call.cache_key is not None:
+            await llm_cache.aput(call.cache_key, "".join(parts))
+        return
+
+    async for chunk in _stream_complete_text(_exhausted(prompt, max_tokens, calls, rejection)):
+        yield chunk
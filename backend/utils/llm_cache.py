@@ -0,0 +1,282 @@
+"""Two-tier cache for LLM generations.
+
+Responses are keyed by a SHA-256 of provider, model, prompt, temperature and
+max_tokens, so agents that build the same prompt for popular event types get
+the earlier generation back instead of paying for a new one.
+
+  - memory tier: bounded LRU, served without touching disk
+  - disk tier: SQLite table surviving restarts and shared by workers on one
+    host, bounded by row count (least recently used rows go first)
+
+Both tiers expire entries after ttl_seconds. The disk tier is optional; if
+the database cannot be opened the cache keeps working from memory only.
+Async callers use aget/aput (and astats/aclear), which run the SQLite work in a
+worker thread so a slow disk never blocks the event loop.
+
+Usage:
+  from utils.llm_cache import llm_cache
+  key = llm_cache.key("gemini", "gemini-1.5-flash", prompt, 0.7, 800)
+  text = llm_cache.get(key)
+  if text is None:
+      text = call_provider()
+      llm_cache.put(key, text)
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / "data" / "llm_cache.sqlite3"
+
+
+class LLMCache:
+    """Memory LRU in front of a SQLite table of generations. Thread safe."""
+
+    def __init__(
+        self,
+        memory_entries: int = 256,
+        disk_entries: int = 5000,
+        ttl_seconds: float = 7 * 24 * 3600,
+        path: Optional[str] = None,
+        disabled_agents: Iterable[str] = ()
+    ):
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.disabled_agents = {agent.strip().lower() for agent in disabled_agents if agent.strip()}
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_failed = False
+        # The memory lock is never held across SQLite calls, so async callers
+        # can serve memory hits inline while a worker thread waits on disk
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.memory_entries > 0 or self._disk_enabled
+
+    @property
+    def _disk_enabled(self) -> bool:
+        return bool(self.path) and self.disk_entries > 0 and not self._db_failed
+
+    def enabled_for(self, agent: Optional[str]) -> bool:
+        """False when caching is off, globally or for this agent"""
+        return self.enabled and (agent or "").lower() not in self.disabled_agents
+
+    @staticmethod
+    def key(provider: str, model: Optional[str], prompt: str, temperature: float, max_tokens: int) -> str:
+        payload = json.dumps([provider, model, prompt, float(temperature), int(max_tokens)], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Open the disk tier on first use; called with the disk lock held"""
+        if self._db is None and self._disk_enabled:
+            try:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                db = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS generations ("
+                    "key TEXT PRIMARY KEY, text TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                db.execute("CREATE INDEX IF NOT EXISTS generations_accessed ON generations (accessed_at)")
+                db.commit()
+                self._db = db
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"LLM cache database {self.path} unavailable, caching in memory only: {e}")
+                self._db_failed = True
+        return self._db
+
+    def _disk_error(self, e: Exception) -> None:
+        logger.warning(f"LLM cache database error, caching in memory only: {e}")
+        self._db_failed = True
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached text for the key, or None"""
+        now = time.time()
+        text = self._memory_get(key, now)
+        if text is None:
+            text = self._disk_get(key, now)
+        return text
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get for async callers: memory hits are served inline, disk reads run in a worker thread"""
+        now = time.time()
+        text = self._memory_get(key, now)
+        if text is None:
+            if self._disk_enabled:
+                text = await asyncio.to_thread(self._disk_get, key, now)
+            else:
+                text = self._disk_get(key, now)
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """Store a generation in both tiers"""
+        if not text:
+            return
+        now = time.time()
+        self._memory_put(key, now, text)
+        self._disk_put(key, now, text)
+
+    async def aput(self, key: str, text: str) -> None:
+        """put for async callers: the disk write runs in a worker thread"""
+        if not text:
+            return
+        now = time.time()
+        self._memory_put(key, now, text)
+        if self._disk_enabled:
+            await asyncio.to_thread(self._disk_put, key, now, text)
+
+    def _memory_get(self, key: str, now: float) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if self.ttl_seconds <= 0 or now - entry[0] <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+            del self._memory[key]
+            return None
+
+    def _memory_put(self, key: str, now: float, text: str) -> None:
+        with self._lock:
+            self._remember(key, now, text)
+            self.stores += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[str]:
+        """Disk-tier lookup after a memory miss; counts the hit or miss"""
+        row = None
+        with self._db_lock:
+            db = self._connection()
+            if db is not None:
+                try:
+                    row = db.execute("SELECT text, created_at FROM generations WHERE key = ?", (key,)).fetchone()
+                    if row is not None and (self.ttl_seconds <= 0 or now - row[1] <= self.ttl_seconds):
+                        db.execute("UPDATE generations SET accessed_at = ? WHERE key = ?", (now, key))
+                        db.commit()
+                    elif row is not None:
+                        db.execute("DELETE FROM generations WHERE key = ?", (key,))
+                        db.commit()
+                        row = None
+                except sqlite3.Error as e:
+                    self._disk_error(e)
+                    row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self._remember(key, row[1], row[0])
+            self.disk_hits += 1
+            return row[0]
+
+    def _disk_put(self, key: str, now: float, text: str) -> None:
+        with self._db_lock:
+            db = self._connection()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO generations (key, text, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, text, now, now)
+                )
+                db.execute(
+                    "DELETE FROM generations WHERE key IN ("
+                    "SELECT key FROM generations ORDER BY accessed_at "
+                    "LIMIT MAX(0, (SELECT COUNT(*) FROM generations) - ?))",
+                    (self.disk_entries,)
+                )
+                db.commit()
+            except sqlite3.Error as e:
+                self._disk_error(e)
+
+    def _remember(self, key: str, created_at: float, text: str) -> None:
+        """Add an entry to the memory tier; called with the lock held"""
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = (created_at, text)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached generation from both tiers"""
+        with self._lock:
+            self._memory.clear()
+        with self._db_lock:
+            db = self._connection()
+            if db is not None:
+                try:
+                    db.execute("DELETE FROM generations")
+                    db.commit()
+                except sqlite3.Error as e:
+                    self._disk_error(e)
+
+    def stats(self) -> Dict[str, Any]:
+        disk_rows = None
+        with self._db_lock:
+            db = self._connection()
+            if db is not None:
+                try:
+                    disk_rows = db.execute("SELECT COUNT(*) FROM generations").fetchone()[0]
+                except sqlite3.Error as e:
+                    self._disk_error(e)
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "memory_entries": len(self._memory),
+                "max_memory_entries": self.memory_entries,
+                "disk_entries": disk_rows,
+                "max_disk_entries": self.disk_entries if self._disk_enabled else 0,
+                "ttl_seconds": self.ttl_seconds,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else None,
+                "disabled_agents": sorted(self.disabled_agents)
+            }
+
+    async def aclear(self) -> None:
+        """clear for async callers: the disk delete runs in a worker thread"""
+        await asyncio.to_thread(self.clear)
+
+    async def astats(self) -> Dict[str, Any]:
+        """stats for async callers: the disk row count runs in a worker thread"""
+        return await asyncio.to_thread(self.stats)
+
+
+def _cache_from_env() -> LLMCache:
+    enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    path = os.getenv("LLM_CACHE_PATH")
+    return LLMCache(
+        memory_entries=int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256")) if enabled else 0,
+        disk_entries=int(os.getenv("LLM_CACHE_DISK_ENTRIES", "5000")) if enabled else 0,
+        ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+        path=str(DEFAULT_CACHE_PATH) if path is None else path,
+        disabled_agents=os.getenv("LLM_CACHE_DISABLED_AGENTS", "").split(",")
+    )
+
+
+# Global cache instance
+llm_cache = _cache_from_env()
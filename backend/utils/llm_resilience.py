@@ -0,0 +1,299 @@
+"""Retry, circuit breaking and failover bookkeeping for LLM providers.
+
+Every provider gets its own circuit breaker:
+
+  - closed: calls go through; consecutive failures are counted
+  - open: after `failure_threshold` consecutive failures calls are refused
+    for `reset_timeout` seconds, so a failing backend is not hammered
+  - half-open: after the timeout one trial call is let through; success
+    closes the breaker, failure opens it again
+
+Failed attempts are retried with full-jitter exponential backoff (a random
+delay between 0 and base * 2**attempt, capped) unless the error is one a
+retry cannot fix, such as a rejected key or malformed request. Only errors
+that point at the provider (transient failures, a rejected key) count
+against its breaker; a bad request fails over without tripping it. utils.llm
+walks the provider chain with these primitives and records each failover.
+
+Usage:
+  from utils.llm_resilience import provider_resilience
+  if provider_resilience.breaker("gemini").allow():
+      text = provider_resilience.call("gemini", lambda: call_gemini(prompt), acquire=wait_for_capacity)
+"""
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP statuses a retry will not change
+PERMANENT_STATUS_CODES = {400, 401, 403, 404, 422}
+
+# Permanent statuses that break every call to the provider (rejected key), not just one request
+PROVIDER_STATUS_CODES = {401, 403}
+
+
+def _status(error: Exception):
+    for attribute in ("status_code", "http_status", "code"):
+        status = getattr(error, attribute, None)
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """False for errors that will fail the same way again (bad request, bad key)"""
+    if _status(error) in PERMANENT_STATUS_CODES:
+        return False
+    return not isinstance(error, (ValueError, TypeError, ImportError))
+
+
+def is_provider_failure(error: Exception) -> bool:
+    """True if the error says the provider is unhealthy, rather than this request bad.
+
+    Transient failures, a rejected key and a missing SDK count against the
+    breaker; a malformed or refused request (400/404/422, a safety-blocked
+    Gemini response) fails over without tripping it.
+    """
+    if _status(error) in PROVIDER_STATUS_CODES or isinstance(error, ImportError):
+        return True
+    return is_retryable(error)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker. Thread safe."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """True if a call may be made now; claims the single trial call when half-open"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"LLM provider {self.name} recovered, closing circuit")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """Give back a half-open trial call that was abandoned without a result"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                    logger.warning(
+                        f"LLM provider {self.name} failed {self._failures} time(s) in a row, "
+                        f"opening circuit for {self.reset_timeout:g}s"
+                    )
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            retry_in = None
+            if state == self.OPEN:
+                retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "times_opened": self.times_opened,
+                "retry_in_seconds": retry_in
+            }
+
+
+class ProviderResilience:
+    """Per-provider breakers, retry policy and failover counters."""
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0
+    ):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._failovers: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(provider)
+            if breaker is None:
+                breaker = self._breakers[provider] = CircuitBreaker(
+                    provider, self.failure_threshold, self.reset_timeout
+                )
+            return breaker
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number `attempt` (0-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _count(self, provider: str, name: str) -> None:
+        with self._lock:
+            self._counters[provider][name] += 1
+
+    def _should_retry(self, provider: str, attempt: int, error: Exception) -> bool:
+        breaker = self.breaker(provider)
+        if not is_provider_failure(error):
+            # The provider answered; only this request is bad
+            breaker.release()
+            self._count(provider, "request_errors")
+            return False
+        breaker.record_failure()
+        if attempt + 1 < self.attempts and is_retryable(error) and breaker.state == CircuitBreaker.CLOSED:
+            self._count(provider, "retries")
+            logger.warning(f"LLM provider {provider} attempt {attempt + 1} failed, retrying: {error}")
+            return True
+        self._count(provider, "failures")
+        return False
+
+    def _succeeded(self, provider: str) -> None:
+        self.breaker(provider).record_success()
+        self._count(provider, "successes")
+
+    def call(self, provider: str, fn: Callable[[], T], acquire: Optional[Callable[[], None]] = None) -> T:
+        """Run fn with retries, recording the outcome on the provider's breaker.
+
+        `acquire` runs before every attempt, so each retry is charged to the
+        rate limiter; an exception from it is raised without being counted.
+        """
+        for attempt in range(self.attempts):
+            if acquire is not None:
+                try:
+                    acquire()
+                except BaseException:
+                    # Rate limited or cancelled before calling: give back any half-open trial
+                    self.breaker(provider).release()
+                    raise
+            try:
+                result = fn()
+            except Exception as e:
+                if not self._should_retry(provider, attempt, e):
+                    raise
+                time.sleep(self.backoff(attempt))
+                continue
+            self._succeeded(provider)
+            return result
+        raise RuntimeError("unreachable")
+
+    async def acall(
+        self,
+        provider: str,
+        fn: Callable[[], Awaitable[T]],
+        acquire: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> T:
+        """Async version of call; fn and acquire are called again for every attempt"""
+        for attempt in range(self.attempts):
+            if acquire is not None:
+                try:
+                    await acquire()
+                except BaseException:
+                    # Rate limited or cancelled before calling: give back any half-open trial
+                    self.breaker(provider).release()
+                    raise
+            try:
+                result = await fn()
+            except asyncio.CancelledError:
+                self.breaker(provider).release()
+                raise
+            except Exception as e:
+                if not self._should_retry(provider, attempt, e):
+                    raise
+                await asyncio.sleep(self.backoff(attempt))
+                continue
+            self._succeeded(provider)
+            return result
+        raise RuntimeError("unreachable")
+
+    def record_failure(self, provider: str) -> None:
+        """A failure outside call/acall, e.g. a stream breaking part way"""
+        self.breaker(provider).record_failure()
+        self._count(provider, "failures")
+
+    def record_skip(self, provider: str) -> None:
+        """A call not attempted because the provider's circuit is open"""
+        self._count(provider, "skipped_open")
+
+    def record_failover(self, from_provider: str, to_provider: str) -> None:
+        logger.warning(f"LLM failover: {from_provider} -> {to_provider}")
+        with self._lock:
+            self._failovers[f"{from_provider}->{to_provider}"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            providers = sorted(set(self._breakers) | set(self._counters))
+            counters = {provider: dict(self._counters[provider]) for provider in providers}
+            failovers = dict(self._failovers)
+        return {
+            "retry": {"attempts": self.attempts, "base_delay": self.base_delay, "max_delay": self.max_delay},
+            "providers": {
+                provider: {**self.breaker(provider).snapshot(), **counters.get(provider, {})}
+                for provider in providers
+            },
+            "failovers": failovers,
+            "total_failovers": sum(failovers.values())
+        }
+
+
+# Global instance shared by utils.llm
+provider_resilience = ProviderResilience(
+    attempts=int(os.getenv("LLM_RETRY_ATTEMPTS", "3")),
+    base_delay=float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5")),
+    max_delay=float(os.getenv("LLM_RETRY_MAX_SECONDS", "8")),
+    failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+    reset_timeout=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+)
@@ -0,0 +1,341 @@
+"""Rate limiting and prioritised queueing for outbound LLM calls.
+
+Each provider has two token buckets, refilled continuously:
+
+  - requests per minute (LLM_<PROVIDER>_RPM)
+  - tokens per minute (LLM_<PROVIDER>_TPM), charged with an estimate of
+    prompt tokens plus max_tokens
+
+A limit of 0 disables that bucket. A call that finds capacity goes straight
+through; otherwise it waits in the provider's bounded priority queue, where
+interactive requests (the flow planner) are served before normal ones
+(content) and bulk jobs (batch sponsor outreach). Waiters of equal priority are
+served first come, first served.
+
+Callers are rejected fast with LLMRateLimited instead of queueing when:
+
+  - the estimated wait, given the queue ahead of them, exceeds their timeout
+  - the queue is full of requests of the same or higher priority (a lower
+    priority waiter is displaced instead, if there is one)
+
+and while queued if their timeout passes after being overtaken.
+
+Usage:
+  from utils.llm_scheduler import llm_scheduler
+  await llm_scheduler.acquire("gemini", tokens=1500, priority="interactive")
+"""
+import asyncio
+import heapq
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Lower value is served first
+PRIORITIES = {"interactive": 0, "normal": 1, "bulk": 2}
+
+DEFAULT_QUEUE_TIMEOUTS = {"interactive": 10.0, "normal": 30.0, "bulk": 120.0}
+
+
+class LLMRateLimited(RuntimeError):
+    """An LLM call refused by the scheduler rather than queued"""
+
+    def __init__(self, provider: str, reason: str, retry_after: Optional[float] = None):
+        super().__init__(f"{provider} rate limited: {reason}")
+        self.provider = provider
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def estimate_tokens(prompt: str, max_tokens: int) -> int:
+    """Rough cost of a call: about four characters per prompt token, plus the completion budget"""
+    return len(prompt) // 4 + max_tokens
+
+
+class TokenBucket:
+    """Continuously refilled bucket holding at most one minute of allowance"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (amount may exceed one bucket, for a backlog)"""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float, now: float) -> None:
+        if not self.unlimited:
+            self._refill(now)
+            self.level -= amount
+
+    def cost(self, amount: float) -> float:
+        """Amount charged for one call; never more than a full bucket, so any call can be served"""
+        return amount if self.unlimited else min(amount, self.capacity)
+
+
+class _Waiter:
+    """A queued call; woken through an asyncio future or a threading event"""
+
+    def __init__(self, priority: str, seq: int, tokens: float, deadline: float, loop=None):
+        self.priority = priority
+        self.rank = (PRIORITIES[priority], seq)
+        self.tokens = tokens
+        self.deadline = deadline
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.error: Optional[LLMRateLimited] = None
+        self.loop = loop
+        self.future = loop.create_future() if loop is not None else None
+        self.event = threading.Event() if loop is None else None
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return self.rank < other.rank
+
+    def wake(self) -> None:
+        if self.event is not None:
+            self.event.set()
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: "asyncio.Future") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class _ProviderQueue:
+    """Buckets, waiters and metrics for one provider"""
+
+    def __init__(self, provider: str, rpm: float, tpm: float, wait_samples: int):
+        self.provider = provider
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.waiters: List[_Waiter] = []
+        self.max_depth = 0
+        self.granted: Dict[str, int] = defaultdict(int)
+        self.rejected: Dict[str, int] = defaultdict(int)
+        self.waits: Deque[float] = deque(maxlen=wait_samples)
+
+    def wait_time(self, requests: float, tokens: float, now: float) -> float:
+        return max(self.requests.wait_time(requests, now), self.tokens.wait_time(tokens, now))
+
+    def grant(self, priority: str, tokens: float, waited: float, now: float) -> None:
+        self.requests.take(1, now)
+        self.tokens.take(tokens, now)
+        self.granted[priority] += 1
+        self.waits.append(waited)
+
+    def remove(self, waiter: _Waiter) -> bool:
+        if waiter not in self.waiters:
+            return False
+        self.waiters.remove(waiter)
+        heapq.heapify(self.waiters)
+        return True
+
+    def pump(self, now: float) -> Optional[float]:
+        """Grant queued calls in priority order while capacity lasts; returns
+        seconds until the head of the queue can go, or None if it is empty"""
+        while self.waiters:
+            head = self.waiters[0]
+            wait = self.wait_time(1, head.tokens, now)
+            if wait > 0:
+                return wait
+            heapq.heappop(self.waiters)
+            self.grant(head.priority, head.tokens, now - head.enqueued_at, now)
+            head.granted = True
+            head.wake()
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self.waits)
+        depth = defaultdict(int)
+        for waiter in self.waiters:
+            depth[waiter.priority] += 1
+        return {
+            "queued": len(self.waiters),
+            "queued_by_priority": dict(depth),
+            "max_queued": self.max_depth,
+            "requests_per_minute": self.requests.capacity or None,
+            "tokens_per_minute": self.tokens.capacity or None,
+            "requests_available": None if self.requests.unlimited else round(self.requests.level, 2),
+            "tokens_available": None if self.tokens.unlimited else round(self.tokens.level),
+            "granted": dict(self.granted),
+            "rejected": dict(self.rejected),
+            "wait_seconds": {
+                "avg": sum(waits) / len(waits) if waits else None,
+                "p95": waits[int(0.95 * (len(waits) - 1))] if waits else None,
+                "max": waits[-1] if waits else None
+            }
+        }
+
+
+class LLMScheduler:
+    """Per-provider token buckets in front of a bounded priority queue. Thread safe."""
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        max_queue: int = 100,
+        timeouts: Optional[Dict[str, float]] = None,
+        wait_samples: int = 500
+    ):
+        self.limits = limits or {}
+        self.max_queue = max_queue
+        self.timeouts = {**DEFAULT_QUEUE_TIMEOUTS, **(timeouts or {})}
+        self.wait_samples = wait_samples
+        self._queues: Dict[str, _ProviderQueue] = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def _queue(self, provider: str) -> _ProviderQueue:
+        """Called with the lock held"""
+        queue = self._queues.get(provider)
+        if queue is None:
+            rpm, tpm = self.limits.get(provider, (0, 0))
+            queue = self._queues[provider] = _ProviderQueue(provider, rpm, tpm, self.wait_samples)
+        return queue
+
+    def _admit(
+        self, provider: str, tokens: float, priority: str, timeout: Optional[float], loop
+    ) -> Tuple[_ProviderQueue, Optional[_Waiter]]:
+        """Grant the call now (no waiter), queue it, or raise LLMRateLimited"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown LLM priority: {priority}")
+        timeout = self.timeouts[priority] if timeout is None else timeout
+
+        with self._lock:
+            now = time.monotonic()
+            queue = self._queue(provider)
+            queue.pump(now)
+            tokens = queue.tokens.cost(tokens)
+
+            ahead = [waiter for waiter in queue.waiters if waiter.rank[0] <= PRIORITIES[priority]]
+            if not ahead and queue.wait_time(1, tokens, now) == 0:
+                queue.grant(priority, tokens, 0.0, now)
+                return queue, None
+
+            estimate = queue.wait_time(len(ahead) + 1, sum(waiter.tokens for waiter in ahead) + tokens, now)
+            if estimate > timeout:
+                queue.rejected["deadline"] += 1
+                raise LLMRateLimited(
+                    provider, f"estimated wait {estimate:.1f}s exceeds {timeout:g}s", retry_after=estimate
+                )
+
+            if len(queue.waiters) >= self.max_queue:
+                lowest = max(queue.waiters)
+                if lowest.rank[0] <= PRIORITIES[priority]:
+                    queue.rejected["queue_full"] += 1
+                    raise LLMRateLimited(provider, f"queue is full ({self.max_queue} waiting)", retry_after=estimate)
+                queue.remove(lowest)
+                queue.rejected["displaced"] += 1
+                lowest.error = LLMRateLimited(provider, "displaced by a higher priority request")
+                lowest.wake()
+
+            self._seq += 1
+            waiter = _Waiter(priority, self._seq, tokens, now + timeout, loop)
+            heapq.heappush(queue.waiters, waiter)
+            queue.max_depth = max(queue.max_depth, len(queue.waiters))
+            return queue, waiter
+
+    def _poll(self, queue: _ProviderQueue, waiter: _Waiter) -> Optional[float]:
+        """None once the waiter is granted, else seconds to sleep before polling again"""
+        with self._lock:
+            now = time.monotonic()
+            head_wait = queue.pump(now)
+            if waiter.granted:
+                return None
+            if waiter.error is not None:
+                raise waiter.error
+            remaining = waiter.deadline - now
+            if remaining <= 0:
+                queue.remove(waiter)
+                queue.rejected["expired"] += 1
+                raise LLMRateLimited(queue.provider, "timed out in queue")
+            return remaining if head_wait is None else min(remaining, head_wait)
+
+    def _withdraw(self, queue: _ProviderQueue, waiter: _Waiter) -> None:
+        with self._lock:
+            if queue.remove(waiter):
+                queue.rejected["cancelled"] += 1
+
+    async def acquire(
+        self, provider: str, tokens: float, priority: str = "normal", timeout: Optional[float] = None
+    ) -> None:
+        """Wait for capacity to call `provider`; raises LLMRateLimited instead of waiting past timeout"""
+        queue, waiter = self._admit(provider, tokens, priority, timeout, asyncio.get_running_loop())
+        if waiter is None:
+            return
+        try:
+            while True:
+                delay = self._poll(queue, waiter)
+                if delay is None:
+                    return
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter.future), delay)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            self._withdraw(queue, waiter)
+            raise
+
+    def acquire_sync(
+        self, provider: str, tokens: float, priority: str = "normal", timeout: Optional[float] = None
+    ) -> None:
+        """Blocking version of acquire, for generate_text"""
+        queue, waiter = self._admit(provider, tokens, priority, timeout, None)
+        if waiter is None:
+            return
+        while True:
+            delay = self._poll(queue, waiter)
+            if delay is None:
+                return
+            waiter.event.wait(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            providers = {}
+            for provider, queue in sorted(self._queues.items()):
+                queue.pump(now)
+                providers[provider] = queue.stats()
+        return {
+            "max_queue": self.max_queue,
+            "timeouts": self.timeouts,
+            "total_queued": sum(queue["queued"] for queue in providers.values()),
+            "providers": providers
+        }
+
+
+def _scheduler_from_env() -> LLMScheduler:
+    return LLMScheduler(
+        limits={
+            "gemini": (float(os.getenv("LLM_GEMINI_RPM", "60")), float(os.getenv("LLM_GEMINI_TPM", "1000000"))),
+            "openai": (float(os.getenv("LLM_OPENAI_RPM", "60")), float(os.getenv("LLM_OPENAI_TPM", "90000")))
+        },
+        max_queue=int(os.getenv("LLM_QUEUE_SIZE", "100")),
+        timeouts={
+            priority: float(os.getenv(f"LLM_QUEUE_TIMEOUT_{priority.upper()}", str(default)))
+            for priority, default in DEFAULT_QUEUE_TIMEOUTS.items()
+        }
+    )
+
+
+# Global scheduler shared by utils.llm
+llm_scheduler = _scheduler_from_env()
@@ -0,0 +1,206 @@
+"""Slot-occupancy bitmaps per venue per day.
+
+Each (venue, UTC day) is a Python int whose bit i is set when slot i of that
+day (slot_minutes long, 15 by default) is booked by any event. Partially
+booked slots count as busy. Availability questions then become bitwise
+operations on a handful of ints instead of scans over event documents:
+
+  - is a venue free for a range: AND with the range mask
+  - first free block: AND-shift the free bits of the window until only
+    starts of long-enough runs remain, then take the lowest set bit
+  - venues free at a time: the same range mask against every venue
+
+Maps serialize to JSON (hex per day) so they can be saved and warm-loaded.
+
+Usage:
+  from utils.occupancy import OccupancyMap
+  occupancy = OccupancyMap(slot_minutes=15)
+  occupancy.load(events)
+  occupancy.is_free("Main Hall", start, end)
+"""
+import json
+import logging
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.calendar_index import event_span, event_time_bounds, expand_event
+
+logger = logging.getLogger(__name__)
+
+DAY = timedelta(days=1)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+class OccupancyMap:
+    """Per-venue, per-day slot bitmaps. Safe to share between threads."""
+
+    def __init__(self, slot_minutes: int = 15):
+        if slot_minutes <= 0 or 1440 % slot_minutes:
+            raise ValueError("slot_minutes must divide a day evenly (e.g. 5 or 15)")
+        self.slot_minutes = slot_minutes
+        self.slot = timedelta(minutes=slot_minutes)
+        self.slots_per_day = 1440 // slot_minutes
+        self._maps: Dict[str, Dict[date, int]] = {}
+        self._lock = threading.RLock()
+        self.loaded_at: Optional[datetime] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def venues(self) -> List[str]:
+        with self._lock:
+            return sorted(self._maps)
+
+    def _slot_range(self, start: datetime, end: datetime, origin: datetime, busy: bool) -> Tuple[int, int]:
+        """Slot indexes [first, last) relative to origin.
+
+        Busy ranges round outwards (any touched slot is busy); ranges being
+        checked for free slots round inwards to whole slots.
+        """
+        first, rest = divmod(start - origin, self.slot)
+        last, rest_end = divmod(end - origin, self.slot)
+        if busy:
+            return first, last + (1 if rest_end else 0)
+        return first + (1 if rest else 0), last
+
+    def _day_masks(self, start: datetime, end: datetime, busy: bool) -> Iterable[Tuple[date, int]]:
+        """Split [start, end) into (day, bitmask) pairs."""
+        start = start.astimezone(timezone.utc)
+        end = end.astimezone(timezone.utc)
+        day = start.date()
+        while _day_start(day) < end:
+            origin = _day_start(day)
+            first, last = self._slot_range(max(start, origin), min(end, origin + DAY), origin, busy)
+            if last > first:
+                yield day, (1 << last) - (1 << first)
+            day += DAY
+
+    def mark(self, venue: str, start: datetime, end: datetime) -> None:
+        """Mark the slots touched by [start, end) as booked."""
+        with self._lock:
+            venue_maps = self._maps.setdefault(venue, {})
+            for day, mask in self._day_masks(start, end, busy=True):
+                venue_maps[day] = venue_maps.get(day, 0) | mask
+
+    def add_event(self, event: Dict[str, Any]) -> None:
+        """Mark an event, or every occurrence of a series."""
+        venue = event.get('venue') or ""
+        for occurrence in expand_event(event, *event_span(event)):
+            self.mark(venue, *event_time_bounds(occurrence))
+
+    def load(self, events: Iterable[Dict[str, Any]]) -> None:
+        """Replace all maps with the occupancy of the given events."""
+        with self._lock:
+            self._maps = {}
+            for event in events:
+                self.add_event(event)
+            self.loaded_at = datetime.now(timezone.utc)
+        logger.debug(f"Occupancy maps loaded for {len(self._maps)} venues")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._maps = {}
+            self.loaded_at = None
+
+    def reset_days(self, venue: str, days: Iterable[date]) -> None:
+        """Clear a venue's maps for the given days so they can be re-marked."""
+        with self._lock:
+            venue_maps = self._maps.get(venue, {})
+            for day in days:
+                venue_maps.pop(day, None)
+
+    def day_map(self, venue: str, day: date) -> int:
+        """Bitmap of booked slots for a venue on a UTC day."""
+        with self._lock:
+            return self._maps.get(venue, {}).get(day, 0)
+
+    def _window_bits(self, venue: str, origin: datetime, days: int) -> int:
+        """Concatenate `days` day maps starting at origin into one bitmap."""
+        with self._lock:
+            venue_maps = self._maps.get(venue, {})
+            bits = 0
+            for k in range(days):
+                bits |= venue_maps.get((origin + k * DAY).date(), 0) << (k * self.slots_per_day)
+            return bits
+
+    def is_free(self, venue: str, start: datetime, end: datetime) -> bool:
+        """True when no slot touched by [start, end) is booked."""
+        with self._lock:
+            venue_maps = self._maps.get(venue, {})
+            return all(
+                not venue_maps.get(day, 0) & mask
+                for day, mask in self._day_masks(start, end, busy=True)
+            )
+
+    def free_venues(self, start: datetime, end: datetime, venues: Optional[Iterable[str]] = None) -> List[str]:
+        """Venues (known to the maps, or the given ones) free for [start, end)."""
+        candidates = self.venues() if venues is None else venues
+        return [venue for venue in candidates if self.is_free(venue, start, end)]
+
+    def first_free_block(
+        self,
+        venue: str,
+        window_start: datetime,
+        window_end: datetime,
+        duration: timedelta
+    ) -> Optional[Tuple[datetime, datetime]]:
+        """Earliest slot-aligned free block of `duration` inside the window, or None."""
+        needed = -(-duration // self.slot)
+        if needed <= 0:
+            return None
+        origin = _day_start(window_start.astimezone(timezone.utc).date())
+        days = (window_end.astimezone(timezone.utc) - origin - timedelta(microseconds=1)) // DAY + 1
+        first, last = self._slot_range(window_start, window_end, origin, busy=False)
+        if last - first < needed:
+            return None
+
+        window_mask = (1 << last) - (1 << first)
+        runs = ~self._window_bits(venue, origin, days) & window_mask
+        # After this loop bit p is set only if bits p..p+needed-1 were all free
+        length = 1
+        while length < needed and runs:
+            shift = min(length, needed - length)
+            runs &= runs >> shift
+            length += shift
+        if not runs:
+            return None
+        position = (runs & -runs).bit_length() - 1
+        start = origin + position * self.slot
+        return start, start + needed * self.slot
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form: hex bitmap per venue per ISO day."""
+        with self._lock:
+            return {
+                "slot_minutes": self.slot_minutes,
+                "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+                "maps": {
+                    venue: {day.isoformat(): format(bits, "x") for day, bits in venue_maps.items() if bits}
+                    for venue, venue_maps in self._maps.items()
+                }
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OccupancyMap":
+        occupancy = cls(slot_minutes=int(data["slot_minutes"]))
+        occupancy._maps = {
+            venue: {date.fromisoformat(day): int(bits, 16) for day, bits in venue_maps.items()}
+            for venue, venue_maps in data.get("maps", {}).items()
+        }
+        if data.get("loaded_at"):
+            occupancy.loaded_at = datetime.fromisoformat(data["loaded_at"])
+        return occupancy
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load_file(cls, path: str) -> "OccupancyMap":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
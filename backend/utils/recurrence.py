@@ -0,0 +1,167 @@
+"""Recurring event series.
+
+A series is stored as a single event document whose `start_time`/`end_time`
+are the first occurrence, plus an RFC 5545 RRULE in `recurrence`, optional
+`exdates` (occurrence starts to skip) and a precomputed `series_end`. Only
+occurrences inside a queried window are ever generated, so reads and storage
+stay proportional to the number of series rather than occurrences.
+
+Firestore keeps only UTC instants, so a series also stores the organiser's
+time zone in `tzid` (an IANA name such as "America/Los_Angeles", or a fixed
+offset such as "-07:00"). Rules are expanded in that zone, so BYDAY/BYHOUR
+and DST transitions follow local wall-clock time, and each occurrence is
+converted to UTC afterwards.
+
+Usage:
+  from utils.recurrence import build_rule, occurrences, resolve_zone
+  rule = build_rule("FREQ=WEEKLY;BYDAY=TU;COUNT=15", start.astimezone(resolve_zone(tzid)))
+  for occ_start, occ_end in occurrences(rule, start, end, window_start, window_end):
+      ...
+"""
+import re
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable, Iterator, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil.rrule import rrule, rrulestr
+
+Interval = Tuple[datetime, datetime]
+
+# Hard limits on a single series, so expanding one never stalls the event loop
+MAX_OCCURRENCES = 1000
+MAX_SERIES_SPAN = timedelta(days=5 * 366)
+_SUB_DAILY_FREQS = ("HOURLY", "MINUTELY", "SECONDLY")
+
+_OFFSET_RE = re.compile(r"([+-])(\d{2}):?(\d{2})")
+
+
+def zone_name(value: datetime) -> str:
+    """TZID to store for an aware datetime: its IANA zone name, else its fixed UTC offset."""
+    key = getattr(value.tzinfo, "key", None)
+    if key:
+        return key
+    offset = value.utcoffset() or timedelta(0)
+    if not offset:
+        return "UTC"
+    minutes = abs(int(offset.total_seconds())) // 60
+    sign = "-" if offset < timedelta(0) else "+"
+    return f"{sign}{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+@lru_cache(maxsize=256)
+def resolve_zone(tzid: Optional[str]) -> tzinfo:
+    """Resolve a stored TZID (IANA name or "+HH:MM" offset) to a tzinfo; None means UTC."""
+    if not tzid or tzid.upper() in ("UTC", "Z"):
+        return timezone.utc
+    match = _OFFSET_RE.fullmatch(tzid)
+    if match:
+        sign, hours, minutes = match.groups()
+        offset = timedelta(hours=int(hours), minutes=int(minutes))
+        return timezone(-offset if sign == "-" else offset)
+    try:
+        return ZoneInfo(tzid)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone '{tzid}'")
+
+
+def build_rule(recurrence: str, dtstart: datetime) -> rrule:
+    """Parse an RRULE (with or without the "RRULE:" prefix) anchored at dtstart.
+
+    The rule is expanded in dtstart's time zone. Rules must be bounded by
+    COUNT or UNTIL so every series has an end, repeat no more often than
+    daily, and produce at most MAX_OCCURRENCES occurrences within
+    MAX_SERIES_SPAN of dtstart. UNTIL values without a timezone are read as UTC.
+    """
+    rule_text = recurrence.strip()
+    if rule_text.upper().startswith("RRULE:"):
+        rule_text = rule_text[len("RRULE:"):]
+    parts = [part for part in rule_text.split(";") if part]
+    if not any(part.upper().startswith(("COUNT=", "UNTIL=")) for part in parts):
+        raise ValueError("Recurrence rule must be bounded by COUNT or UNTIL")
+    if any(part.upper() in (f"FREQ={freq}" for freq in _SUB_DAILY_FREQS) for part in parts):
+        raise ValueError("Recurrence rule must repeat at most daily")
+    if dtstart.tzinfo is not None:
+        # dateutil requires UNTIL in UTC when DTSTART is timezone-aware
+        for i, part in enumerate(parts):
+            if part.upper().startswith("UNTIL="):
+                until = part[len("UNTIL="):].upper()
+                if "T" not in until:
+                    until += "T235959"
+                if not until.endswith("Z"):
+                    until += "Z"
+                parts[i] = f"UNTIL={until}"
+    try:
+        rule = rrulestr(";".join(parts), dtstart=dtstart, cache=True)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid recurrence rule '{recurrence}': {e}")
+    if not isinstance(rule, rrule):
+        raise ValueError("Recurrence must be a single RRULE")
+    # Walk the rule once within the limits; cache=True keeps the result for later expansions
+    horizon = dtstart + MAX_SERIES_SPAN
+    for count, occurrence in enumerate(rule, start=1):
+        if count > MAX_OCCURRENCES:
+            raise ValueError(f"Recurrence rule produces more than {MAX_OCCURRENCES} occurrences")
+        if occurrence > horizon:
+            raise ValueError(f"Recurrence rule runs past {MAX_SERIES_SPAN.days} days")
+    return rule
+
+
+@lru_cache(maxsize=1024)
+def cached_rule(recurrence: str, dtstart: datetime, tzid: Optional[str] = None) -> rrule:
+    """build_rule in the `tzid` zone for hot paths; rules are immutable so parsed ones are shared.
+
+    `tzid` is part of the cache key because aware datetimes for the same
+    instant compare equal whatever their zone.
+    """
+    return build_rule(recurrence, dtstart.astimezone(resolve_zone(tzid)))
+
+
+def series_end(rule: rrule, duration: timedelta) -> Optional[datetime]:
+    """End (UTC) of the last occurrence, or None if the rule produces no occurrences.
+
+    Only the first MAX_OCCURRENCES occurrences are considered.
+    """
+    last = None
+    for last in islice(rule, MAX_OCCURRENCES):
+        pass
+    return last.astimezone(timezone.utc) + duration if last is not None else None
+
+
+def occurrences(
+    rule: rrule,
+    start: datetime,
+    end: datetime,
+    window_start: datetime,
+    window_end: datetime,
+    exdates: Iterable[datetime] = ()
+) -> Iterator[Interval]:
+    """Lazily yield UTC (start, end) occurrences overlapping [window_start, window_end).
+
+    `start`/`end` are the first occurrence; every occurrence has the same
+    duration. Occurrences whose start is in `exdates` are skipped.
+    """
+    duration = end - start
+    skipped = {as_utc(exdate) for exdate in exdates}
+    # An occurrence overlapping the window must start after window_start - duration
+    for occ_start in rule.xafter(window_start - duration, inc=False):
+        if occ_start >= window_end:
+            return
+        occ_start = occ_start.astimezone(timezone.utc)
+        if occ_start in skipped:
+            continue
+        occ_end = occ_start + duration
+        if occ_end > window_start:
+            yield occ_start, occ_end
+
+
+def as_utc(value) -> datetime:
+    """Normalise an ISO string, datetime or Firestore timestamp to an aware UTC datetime."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    if hasattr(value, 'timestamp'):
+        return datetime.fromtimestamp(value.timestamp(), tz=timezone.utc)
+    return value
@@ -0,0 +1,147 @@
+"""Session-to-room allocation for multi-track event schedules.
+
+Sessions with fixed times form an interval graph, so the fewest rooms that
+avoid any double-booking equals the largest number of sessions running at
+once. Sweeping sessions in start order and giving each a room that has
+become free (opening a new room only when none is) reaches that minimum.
+Which free room is picked does not change the count, so a session reuses
+its track's previous room when possible to keep tracks in one place.
+
+Sessions without a start time are laid out back to back per track and day,
+from `day_start`.
+
+Usage:
+  from utils.room_allocation import allocate_rooms
+  items = allocate_rooms(sessions, rooms=["Hall A", "Hall B"])
+"""
+import heapq
+from typing import Any, Dict, List, Optional, Tuple
+
+DAY_MINUTES = 24 * 60
+
+
+def parse_clock(value: str) -> int:
+    """Minutes since midnight for "H:MM" / "HH:MM" (24:00 allowed as end of day)."""
+    try:
+        hours, minutes = (int(part) for part in value.strip().split(":"))
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid time {value!r}, expected HH:MM")
+    if not (0 <= minutes < 60 and 0 <= hours * 60 + minutes <= DAY_MINUTES):
+        raise ValueError(f"Invalid time {value!r}, expected HH:MM")
+    return hours * 60 + minutes
+
+
+def format_clock(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _timed_sessions(sessions: List[Dict[str, Any]], day_start: str) -> List[Tuple[int, int, Dict[str, Any]]]:
+    """(absolute start, absolute end, session) with missing times filled in per track and day."""
+    default_start = parse_clock(day_start)
+    cursors: Dict[Tuple[int, Optional[str]], int] = {}
+    timed = []
+    for session in sessions:
+        day = int(session.get('day') or 1)
+        if day < 1:
+            raise ValueError(f"Session {session.get('session')!r} has day {day}; days start at 1")
+        track = session.get('track')
+        cursor_key = (day, track)
+
+        if session.get('startTime'):
+            start = parse_clock(session['startTime'])
+        else:
+            start = cursors.get(cursor_key, default_start)
+        if session.get('endTime'):
+            end = parse_clock(session['endTime'])
+        elif session.get('durationMinutes'):
+            end = start + int(session['durationMinutes'])
+        else:
+            raise ValueError(f"Session {session.get('session')!r} needs an endTime or durationMinutes")
+        if end <= start or end > DAY_MINUTES:
+            raise ValueError(f"Session {session.get('session')!r} must end after it starts and within its day")
+
+        cursors[cursor_key] = max(cursors.get(cursor_key, default_start), end)
+        offset = (day - 1) * DAY_MINUTES
+        timed.append((offset + start, offset + end, session))
+    return timed
+
+
+def allocate_rooms(
+    sessions: List[Dict[str, Any]],
+    rooms: Optional[List[str]] = None,
+    day_start: str = "09:00"
+) -> List[Dict[str, Any]]:
+    """
+    Assign every session a room using as few rooms as possible.
+
+    Args:
+        sessions: Dicts with session, day (1-based), startTime and endTime
+            ("HH:MM") or durationMinutes, and an optional track. Sessions of
+            one track must not overlap.
+        rooms: Room names to use in order; rooms are numbered "Room N" when omitted
+        day_start: Start time for sessions given only a duration
+
+    Returns:
+        Copies of the sessions with startTime, endTime and room set, in day
+        and start order
+
+    Raises:
+        ValueError: On invalid times, overlapping sessions within a track,
+            or when more rooms are needed than were named
+    """
+    timed = sorted(_timed_sessions(sessions, day_start), key=lambda item: (item[0], item[1]))
+
+    last_by_track: Dict[str, Tuple[int, str]] = {}
+    for start, end, session in timed:
+        track = session.get('track')
+        if not track:
+            continue
+        previous = last_by_track.get(track)
+        if previous is not None and previous[0] > start:
+            raise ValueError(
+                f"Sessions {previous[1]!r} and {session.get('session')!r} overlap in track {track!r}"
+            )
+        last_by_track[track] = (end, session.get('session'))
+
+    busy: List[Tuple[int, int]] = []   # (end, room) of rooms in use
+    free: List[int] = []               # free room numbers, lowest first
+    is_free: List[bool] = []
+    track_rooms: Dict[str, int] = {}
+    allocated = []
+
+    for start, end, session in timed:
+        while busy and busy[0][0] <= start:
+            _, room = heapq.heappop(busy)
+            is_free[room] = True
+            heapq.heappush(free, room)
+
+        track = session.get('track')
+        room = track_rooms.get(track) if track else None
+        if room is None or not is_free[room]:
+            # Lazily skip entries taken out of order for a track
+            while free and not is_free[free[0]]:
+                heapq.heappop(free)
+            if free:
+                room = heapq.heappop(free)
+            else:
+                room = len(is_free)
+                is_free.append(False)
+        is_free[room] = False
+        heapq.heappush(busy, (end, room))
+        if track:
+            track_rooms[track] = room
+
+        day, offset = divmod(start, DAY_MINUTES)
+        allocated.append((room, {
+            **session,
+            "day": day + 1,
+            "startTime": format_clock(offset),
+            "endTime": format_clock(end - day * DAY_MINUTES)
+        }))
+
+    if rooms is not None and len(is_free) > len(rooms):
+        raise ValueError(f"Schedule needs {len(is_free)} rooms at its busiest but only {len(rooms)} were given")
+    return [
+        {**session, "room": rooms[room] if rooms is not None else f"Room {room + 1}"}
+        for room, session in allocated
+    ]
@@ -0,0 +1,130 @@
+"""Venue catalog with indexed capacity and feature search.
+
+Every venue gets a bit position. Each feature and accessibility option is
+an int bitmask of the venues that have it, and capacities are kept sorted
+with a suffix mask per position, so "capacity >= 300 with a projector and
+a hearing loop" is one bisect plus a few ANDs regardless of catalog size.
+The scheduler then intersects the result with the venues that are free in
+the requested window.
+
+Usage:
+  from utils.venue_catalog import VenueCatalog
+  catalog = VenueCatalog.load_file("data/venues.json")
+  catalog.search(min_capacity=300, features=["projector"])
+"""
+import bisect
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(value: str) -> str:
+    return value.strip().lower().replace(" ", "_").replace("-", "_")
+
+
+class VenueCatalog:
+    """Read-only catalog of venues, indexed by capacity, feature and accessibility option."""
+
+    def __init__(self, venues: Iterable[Dict[str, Any]] = ()):
+        self._venues: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}
+        self._features: Dict[str, int] = {}
+        self._accessibility: Dict[str, int] = {}
+        self._capacities: List[int] = []
+        self._capacity_masks: List[int] = []
+        for venue in venues:
+            self._add(venue)
+        self._build_capacity_index()
+
+    @classmethod
+    def load_file(cls, path: str) -> "VenueCatalog":
+        """Load a catalog from a JSON file with a top-level "venues" list."""
+        with open(path) as f:
+            return cls(json.load(f).get("venues", []))
+
+    def __len__(self) -> int:
+        return len(self._venues)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._positions
+
+    def _add(self, venue: Dict[str, Any]) -> None:
+        name = venue.get("name")
+        if not name:
+            raise ValueError("Venue must have a name")
+        if name in self._positions:
+            raise ValueError(f"Duplicate venue in catalog: {name}")
+        venue = {
+            **venue,
+            "capacity": int(venue.get("capacity") or 0),
+            "features": sorted({_normalize(f) for f in venue.get("features", [])}),
+            "accessibility": sorted({_normalize(a) for a in venue.get("accessibility", [])})
+        }
+        bit = 1 << len(self._venues)
+        self._positions[name] = len(self._venues)
+        self._venues.append(venue)
+        for feature in venue["features"]:
+            self._features[feature] = self._features.get(feature, 0) | bit
+        for option in venue["accessibility"]:
+            self._accessibility[option] = self._accessibility.get(option, 0) | bit
+
+    def _build_capacity_index(self) -> None:
+        order = sorted(range(len(self._venues)), key=lambda n: self._venues[n]["capacity"])
+        self._capacities = [self._venues[n]["capacity"] for n in order]
+        # _capacity_masks[i] holds every venue at sorted position i or later
+        self._capacity_masks = [0] * (len(order) + 1)
+        for i in range(len(order) - 1, -1, -1):
+            self._capacity_masks[i] = self._capacity_masks[i + 1] | (1 << order[i])
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        position = self._positions.get(name)
+        return dict(self._venues[position]) if position is not None else None
+
+    def venues(self) -> List[Dict[str, Any]]:
+        return [dict(venue) for venue in self._venues]
+
+    def features(self) -> List[str]:
+        return sorted(self._features)
+
+    def accessibility_options(self) -> List[str]:
+        return sorted(self._accessibility)
+
+    def match_mask(
+        self,
+        min_capacity: Optional[int] = None,
+        features: Iterable[str] = (),
+        accessibility: Iterable[str] = ()
+    ) -> int:
+        """Bitmask of venues meeting every requirement"""
+        mask = (1 << len(self._venues)) - 1
+        if min_capacity:
+            mask &= self._capacity_masks[bisect.bisect_left(self._capacities, min_capacity)]
+        for feature in features:
+            mask &= self._features.get(_normalize(feature), 0)
+        for option in accessibility:
+            mask &= self._accessibility.get(_normalize(option), 0)
+        return mask
+
+    def search(
+        self,
+        min_capacity: Optional[int] = None,
+        features: Iterable[str] = (),
+        accessibility: Iterable[str] = ()
+    ) -> List[Dict[str, Any]]:
+        """
+        Venues meeting every requirement, smallest sufficient capacity first.
+
+        Args:
+            min_capacity: Minimum number of seats
+            features: Required features, e.g. ["projector", "sound_system"]
+            accessibility: Required accessibility options, e.g. ["wheelchair"]
+        """
+        mask = self.match_mask(min_capacity, features, accessibility)
+        matches = []
+        while mask:
+            low = mask & -mask
+            matches.append(dict(self._venues[low.bit_length() - 1]))
+            mask ^= low
+        return sorted(matches, key=lambda venue: (venue["capacity"], venue["name"]))
@@ -0,0 +1,35 @@
+"""
+Rebuild the venue-day summary documents from the scheduled events.
+
+Run once after upgrading so events booked before the summaries existed are
+covered by venue-day conflict checks.
+
+Usage:
+  python scripts/backfill_venue_days.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv(BACKEND_DIR / ".env")
+
+from agents.scheduler import scheduler_agent  # noqa: E402
+from database.firebase_connection import init_firebase, close_firebase  # noqa: E402
+
+
+async def run() -> None:
+    await init_firebase()
+    try:
+        written = await scheduler_agent.rebuild_venue_days()
+    finally:
+        await close_firebase()
+    print(f"Wrote {written} venue-day documents")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,62 @@
+"""
+Bulk import events from a CSV, JSON or ICS file into Firestore.
+
+Uses the same conflict sweep and batched writes as POST /api/events/import.
+
+Usage:
+  python scripts/import_events.py semester.ics
+  python scripts/import_events.py clubs.csv --dry-run
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv(BACKEND_DIR / ".env")
+
+from agents.scheduler import scheduler_agent  # noqa: E402
+from database.firebase_connection import init_firebase, close_firebase  # noqa: E402
+from utils.event_import import SUPPORTED_FORMATS, detect_format, parse_events  # noqa: E402
+
+
+async def run(args) -> int:
+    fmt = args.format or detect_format(args.file)
+    if not fmt:
+        print(f"Could not detect format of {args.file}, pass --format", file=sys.stderr)
+        return 2
+    rows = parse_events(Path(args.file).read_text(encoding="utf-8-sig"), fmt)
+
+    await init_firebase()
+    try:
+        report = await scheduler_agent.import_events(rows, dry_run=args.dry_run)
+    finally:
+        await close_firebase()
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        for entry in report["rows"]:
+            detail = entry.get("id") or entry.get("reason") or ""
+            print(f"{entry['row']:>5}  {entry['status']:<8}  {entry.get('title') or '':<40}  {detail}")
+        verb = "Would import" if args.dry_run else "Imported"
+        print(f"{verb} {report['accepted']} of {report['total']} events ({report['rejected']} rejected)")
+    return 0 if report["rejected"] == 0 else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import events into Apokria")
+    parser.add_argument("file", help="CSV, JSON or ICS file to import")
+    parser.add_argument("--format", choices=SUPPORTED_FORMATS, help="File format (defaults to the extension)")
+    parser.add_argument("--dry-run", action="store_true", help="Report conflicts without writing events")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()